@@ -11,7 +11,9 @@ import streamlit as st
 
 from live_data_query import (get_db_connection,
                              get_filter_data,
-                             get_plant_readings,
+                             get_hourly_readings,
+                             get_latest_readings,
+                             get_times_watered_today,
                              get_unique_plants,
                              get_unique_countries,
                              get_unique_botanists)
@@ -82,49 +84,39 @@ def display_key_metrics(plants: int, countries: int, botanists: int):
                     help="Total number of botanists monitoring the plants.")
 
 
-def display_live_data(df: pd.DataFrame):
-    """Display live plant data chart."""
+def display_live_data(df: pd.DataFrame, latest: pd.Series, times_watered: int):
+    """Display hourly plant data charts next to the plant's latest reading."""
 
     col1, col2 = st.columns([3, 1])
     with col1:
         chart = plant_scatter_chart(df,
-                                    'recording_taken',
-                                    'Time',
+                                    'reading_hour',
+                                    'Hour',
                                     'soil_moisture',
-                                    'Soil Moisture').configure_legend(disable=True)
+                                    'Average Soil Moisture').configure_legend(disable=True)
         st.altair_chart(chart)
 
     with col2:
-        moisture = df.copy()
-        moisture = moisture.sort_values(
-            by='recording_taken', ascending=False)
-        current_moisture = moisture['soil_moisture'].iloc[0]
+        current_moisture = latest['soil_moisture']
         st.metric(label="Current Soil Moisture",
                     value=f"{current_moisture} %",
                     help="Current soil moisture level of the selected plant.")
 
-        watered = df.copy()
-        watered = watered[watered["last_watered"].dt.date ==
-                            pd.Timestamp.now().date()]
-        unique_watered_dates = watered['last_watered'].unique()
-        last_watered = len(unique_watered_dates)
         st.metric(label="Times Watered Today",
-                    value=f"{last_watered}",
+                    value=f"{times_watered}",
                     help="Number of times the selected plant was watered today.")
 
     col3, col4 = st.columns([3, 1])
     with col3:
         chart = plant_scatter_chart(df,
-                                    'recording_taken',
-                                    'Time',
+                                    'reading_hour',
+                                    'Hour',
                                     'temperature',
-                                    'Temperature').configure_legend(disable=True)
+                                    'Average Temperature').configure_legend(disable=True)
         st.altair_chart(chart)
 
     with col4:
-        temps = df.copy()
-        temps = temps.sort_values(by='recording_taken', ascending=False)
-        current_temp = temps['temperature'].iloc[0]
+        current_temp = latest['temperature']
         st.metric(label="Current Temperature",
                     value=f"{current_temp:.1f} °C",
                     help="Current temperature of the selected plant.")
@@ -140,9 +132,13 @@ if __name__ == "__main__":
 
     filter_plant_id = display_sidebar(filter_data_df)
 
-    plant_readings_df = get_plant_readings(conn)
-    filtered_plant_readings_df = plant_readings_df[
-        plant_readings_df['plant_id'] == filter_plant_id]
+    # One row per plant plus one plant's hourly rollups, rather than every reading
+    latest_readings_df = get_latest_readings(conn)
+    latest_reading = latest_readings_df[
+        latest_readings_df['plant_id'] == filter_plant_id].iloc[0]
+    filtered_plant_readings_df = get_hourly_readings(conn, filter_plant_id)
+    # Rollups keep only each hour's first and last watering, so count the events
+    plant_times_watered = get_times_watered_today(conn, filter_plant_id)
 
     unique_plants = get_unique_plants(conn)
     unique_countries = get_unique_countries(conn)
@@ -154,11 +150,11 @@ if __name__ == "__main__":
         display_key_metrics(int(unique_plants['unique_plants'].iloc[0]),
                             int(unique_countries['unique_countries'].iloc[0]),
                             int(unique_botanists['unique_botanists'].iloc[0]))
-        st.subheader(filtered_plant_readings_df['plant_name'].iloc[0])
+        st.subheader(latest_reading['plant_name'])
     with col2:
         with st.container(border=True):
             try:
-                image = filtered_plant_readings_df['image_url'].iloc[0]
+                image = latest_reading['image_url']
                 if 'image/upgrade_access' in image:
                     raise Exception("Invalid image URL")
                 st.image(image, width='stretch')
@@ -168,6 +164,6 @@ if __name__ == "__main__":
                 
     st.header("Daily Overview")
 
-    display_live_data(filtered_plant_readings_df)
+    display_live_data(filtered_plant_readings_df, latest_reading, plant_times_watered)
 
     conn.close()
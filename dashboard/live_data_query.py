@@ -3,16 +3,32 @@
 # pylint: disable=no-name-in-module
 # pylint: disable=redefined-outer-name
 
+import sqlite3
+import sys
+from contextlib import closing
 from os import environ as ENV, _Environ
+from pathlib import Path
 from dotenv import load_dotenv
 from pymssql import connect, Connection
 import pandas as pd
 import streamlit as st
 
 
+# The image copies sql_dialects.py in beside this file; in the repository it is
+# read from the pipeline
+sys.path.append(str(Path(__file__).resolve().parent.parent / "pipeline"))
+from sql_dialects import get_sql_dialect, register_datetime_converter  # pylint: disable=wrong-import-position
+
+register_datetime_converter()
+
+
 # @st.cache_resource
 def get_db_connection(_config: _Environ) -> Connection:
     """Create and return a database connection"""
+    if _config.get("DB_BACKEND", "mssql") == "sqlite":
+        return sqlite3.connect(_config.get("SQLITE_PATH", "plants.db"),
+                               detect_types=sqlite3.PARSE_DECLTYPES,
+                               check_same_thread=False)
     return connect(
         server=_config['DB_HOST'],
         port=int(_config['DB_PORT']),
@@ -25,7 +41,7 @@ def get_db_connection(_config: _Environ) -> Connection:
 def query_database(conn: Connection, query: str, parameters: dict = None) -> pd.DataFrame:
     """Returns a query result."""
 
-    with conn.cursor() as cur:
+    with closing(conn.cursor()) as cur:
         if parameters:
             cur.execute(query, parameters)
         else:
@@ -65,22 +81,67 @@ def get_filter_data(_conn: Connection) -> pd.DataFrame:
 
 
 @st.cache_data(ttl=600)
-def get_plant_readings(_conn: Connection) -> pd.DataFrame:
-    """Returns plant moisture as a DataFrame."""
+def get_hourly_readings(_conn: Connection, plant_id: int) -> pd.DataFrame:
+    """Returns the last 24 hours of one plant's hourly rollups as a DataFrame."""
+
+    dialect = get_sql_dialect()
+    query = f"""
+        SELECT
+            h.plant_id,
+            p.name AS plant_name,
+            h.reading_hour,
+            h.reading_count,
+            h.sum_soil_moisture / h.reading_count AS soil_moisture,
+            h.min_soil_moisture,
+            h.max_soil_moisture,
+            h.sum_temperature / h.reading_count AS temperature,
+            h.min_temperature,
+            h.max_temperature,
+            h.first_watered,
+            h.last_watered
+        FROM plant_reading_hourly AS h
+        JOIN plant AS p
+            ON h.plant_id = p.plant_id
+        WHERE h.plant_id = {dialect["placeholder"]}
+            AND h.reading_hour > {dialect["recent_cutoff"]}
+    """
+
+    return query_database(_conn, query, (int(plant_id),))
+
+
+@st.cache_data(ttl=60)
+def get_times_watered_today(_conn: Connection, plant_id: int) -> int:
+    """Returns how many times one plant has been watered today."""
+
+    dialect = get_sql_dialect()
+    query = f"""
+        SELECT
+            count(*) AS times_watered
+        FROM plant_watering
+        WHERE plant_id = {dialect["placeholder"]}
+            AND watered_at >= {dialect["today_start"]}
+    """
+
+    return int(query_database(_conn, query, (int(plant_id),))['times_watered'].iloc[0])
+
+
+@st.cache_data(ttl=60)
+def get_latest_readings(_conn: Connection) -> pd.DataFrame:
+    """Returns every plant's latest reading, maintained by the pipeline."""
 
     query = """
         SELECT
-            pr.plant_id,
+            l.plant_id,
             p.name AS plant_name,
-            pr.soil_moisture,
-            pr.temperature,
-            pr.last_watered,
-            pr.recording_taken,
+            l.soil_moisture,
+            l.temperature,
+            l.last_watered,
+            l.recording_taken,
+            l.hours_since_watered,
             p.image_url
-        FROM plant_reading AS pr
-        JOIN plant AS p 
-            ON pr.plant_id = p.plant_id
-        WHERE recording_taken > DATEADD(hour, -24, GETDATE())
+        FROM plant_latest_reading AS l
+        JOIN plant AS p
+            ON l.plant_id = p.plant_id
     """
 
     return query_database(_conn, query)
@@ -131,7 +192,7 @@ if __name__ == "__main__":
 
     conn = get_db_connection(ENV)
 
-    df = get_plant_readings(conn)
+    df = get_latest_readings(conn)
 
     print(df.info())
 
@@ -17,28 +17,21 @@ from live_data_query import get_db_connection, query_database
 
 @st.cache_data(ttl=600)
 def get_plant_readings(_conn) -> pd.DataFrame:
-    """Returns plant moisture as a DataFrame."""
+    """Returns each plant's latest reading as a DataFrame."""
 
     query = """
         SELECT
-            pr.plant_id,
+            l.plant_id,
             p.name AS plant_name,
-            pr.soil_moisture,
-            pr.temperature,
-            pr.last_watered,
-            pr.recording_taken,
+            l.soil_moisture,
+            l.temperature,
+            l.last_watered,
+            l.recording_taken,
             p.image_url,
             b.name AS botanist_name
-        FROM plant_reading AS pr
-        JOIN (
-            SELECT plant_id, MAX(recording_taken) AS max_recording
-            FROM plant_reading
-            GROUP BY plant_id
-        ) AS latest 
-            ON pr.plant_id = latest.plant_id 
-            AND pr.recording_taken = latest.max_recording
+        FROM plant_latest_reading AS l
         JOIN plant AS p 
-            ON pr.plant_id = p.plant_id
+            ON l.plant_id = p.plant_id
         JOIN botanist AS b
             ON p.botanist_id = b.botanist_id
     """
@@ -0,0 +1,250 @@
+"""Stream a large CSV of historical plant readings into the database.
+
+Usage (from the `pipeline/` directory):
+
+    python backfill_readings.py readings.csv --chunk-size 50000 --workers 4
+
+The file is read in fixed-size chunks with explicit dtypes, so memory stays
+flat however long the history is. Each chunk is bulk inserted and committed in
+its own transaction, then recorded in a checkpoint file next to the CSV. Re-run
+the same command after a failure to resume: finished chunks are skipped, and
+readings from chunks that were in flight are only inserted if not already
+present. With more than one worker, chunks load in parallel on separate
+connections.
+
+The hourly rollups are not merged chunk by chunk: chunks share hours at their
+boundaries and may be retried. Once every chunk has committed, the rollups of
+every hour the file covers are recomputed from plant_reading in one
+transaction, which gives the same result however often it runs.
+"""
+import argparse
+import json
+from datetime import timedelta
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from os import environ as ENV, replace
+from pathlib import Path
+from threading import Lock
+from time import perf_counter
+import pandas as pd
+
+from db_backend import get_connection, require_schema_version, transaction
+from load_scheduler import ConnectionPool
+from load.load_plant_readings import (
+    READING_COLUMNS, get_reading_rows, insert_plant_readings_bulk, insert_waterings)
+from load.load_hourly_rollup import rebuild_hourly_rollups
+from reading_spool import remove_loaded_readings
+
+
+DEFAULT_CHUNK_SIZE = int(ENV.get("BACKFILL_CHUNK_SIZE", "50000"))
+
+# plant_id is read as nullable so rows missing it can be dropped, then narrowed
+READING_DTYPES = {
+    "plant_id": "Int32",
+    "soil_moisture": "float64",
+    "temperature": "float64"
+}
+
+TIMESTAMP_COLUMNS = ["recording_taken", "last_watered"]
+TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+
+def read_chunks(filepath: str, chunk_size: int = DEFAULT_CHUNK_SIZE):
+    """Yield (index, DataFrame) chunks of readings with fixed dtypes."""
+    reader = pd.read_csv(
+        filepath,
+        usecols=READING_COLUMNS,
+        dtype=READING_DTYPES,
+        parse_dates=TIMESTAMP_COLUMNS,
+        date_format=TIMESTAMP_FORMAT,
+        chunksize=chunk_size
+    )
+    with reader:
+        for index, chunk in enumerate(reader):
+            yield index, chunk[READING_COLUMNS].dropna().astype({"plant_id": "int32"})
+
+
+class BackfillCheckpoint:
+    """The chunks of a backfill that have been committed, persisted as JSON."""
+
+    def __init__(self, path: str, source: str, chunk_size: int):
+        self.path = Path(path)
+        self.source = str(source)
+        self.chunk_size = chunk_size
+        self.done = set()
+        self.rows = 0
+        self.resumed = False
+        self._lock = Lock()
+
+    def load(self) -> "BackfillCheckpoint":
+        """Read an earlier checkpoint for the same file and chunk size, if any."""
+        if not self.path.exists():
+            return self
+        saved = json.loads(self.path.read_text(encoding="utf-8"))
+        if saved["source"] != self.source or saved["chunk_size"] != self.chunk_size:
+            raise ValueError(f"Checkpoint {self.path} was written for "
+                             f"{saved['source']} with chunk size {saved['chunk_size']}.")
+        self.done = set(saved["done"])
+        self.rows = saved["rows"]
+        self.resumed = True
+        return self
+
+    def mark_done(self, index: int, rows: int) -> None:
+        """Record a committed chunk, replacing the file atomically."""
+        with self._lock:
+            self.done.add(index)
+            self.rows += rows
+            temp_path = self.path.with_name(self.path.name + ".tmp")
+            temp_path.write_text(json.dumps({
+                "source": self.source,
+                "chunk_size": self.chunk_size,
+                "done": sorted(self.done),
+                "rows": self.rows
+            }), encoding="utf-8")
+            replace(temp_path, self.path)
+
+
+class BackfillProgress:
+    """Count rows as chunks finish and print a running rows/sec figure.
+
+    Also tracks the hours the file covers, whether or not a chunk is skipped.
+    """
+
+    def __init__(self):
+        self.rows = 0
+        self.chunks = 0
+        self.skipped = 0
+        self.first_hour = None
+        self.last_hour = None
+        self._started = perf_counter()
+        self._lock = Lock()
+
+    def cover(self, chunk: pd.DataFrame) -> None:
+        """Widen the covered hours to include a chunk's readings."""
+        if chunk.empty:
+            return
+        first = chunk["recording_taken"].min().floor("h").to_pydatetime()
+        last = chunk["recording_taken"].max().floor("h").to_pydatetime()
+        self.first_hour = first if self.first_hour is None else min(self.first_hour, first)
+        self.last_hour = last if self.last_hour is None else max(self.last_hour, last)
+
+    @property
+    def seconds(self) -> float:
+        """Time since the backfill started."""
+        return perf_counter() - self._started
+
+    @property
+    def rate(self) -> float:
+        """Rows inserted per second so far."""
+        return self.rows / self.seconds if self.seconds > 0 else 0.0
+
+    def chunk_done(self, index: int, rows: int) -> None:
+        """Record and report a finished chunk."""
+        with self._lock:
+            self.rows += rows
+            self.chunks += 1
+            print(f"  Chunk {index}: {rows} rows "
+                  f"({self.rows} total, {self.rate:.0f} rows/sec)")
+
+
+def load_chunk(conn, chunk: pd.DataFrame, skip_loaded: bool = False) -> int:
+    """Bulk insert one chunk with its waterings and commit.
+
+    Rows go in READINGS_BATCH_SIZE at a time. Returns the rows inserted.
+    """
+    with transaction(conn):
+        if skip_loaded:
+            chunk = remove_loaded_readings(conn, chunk)
+        inserted = insert_plant_readings_bulk(conn, get_reading_rows(chunk))
+        insert_waterings(conn, chunk)
+    return inserted
+
+
+def rebuild_rollups(conn, progress: BackfillProgress) -> int:
+    """Recompute the hourly rollups of every hour the file covers and commit."""
+    if progress.first_hour is None:
+        return 0
+    with transaction(conn):
+        return rebuild_hourly_rollups(conn, progress.first_hour,
+                                      progress.last_hour + timedelta(hours=1))
+
+
+def run_bounded(executor: ThreadPoolExecutor, jobs, max_pending: int) -> None:
+    """Submit (function, *args) jobs with at most max_pending in flight; wait for all."""
+    running = set()
+    for job in jobs:
+        if len(running) >= max_pending:
+            done, running = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                future.result()
+        running.add(executor.submit(*job))
+    for future in running:
+        future.result()
+
+
+def backfill_readings(filepath: str, chunk_size: int = DEFAULT_CHUNK_SIZE,
+                      workers: int = 1, checkpoint_path: str = None,
+                      connection_factory=None) -> dict:
+    """Stream a readings CSV into the database in committed, resumable chunks.
+
+    Returns a dict with the rows inserted, chunks loaded, chunks skipped
+    because an earlier run finished them, and the elapsed seconds.
+    """
+    require_schema_version(connection_factory or get_connection)
+    checkpoint = BackfillCheckpoint(
+        checkpoint_path or f"{filepath}.checkpoint.json", filepath, chunk_size).load()
+    progress = BackfillProgress()
+    pool = ConnectionPool(workers, connection_factory)
+
+    def run_chunk(index: int, chunk: pd.DataFrame) -> None:
+        with pool.acquire() as conn:
+            inserted = load_chunk(conn, chunk, checkpoint.resumed)
+        checkpoint.mark_done(index, inserted)
+        progress.chunk_done(index, inserted)
+
+    def pending_chunks():
+        for index, chunk in read_chunks(filepath, chunk_size):
+            progress.cover(chunk)
+            if index in checkpoint.done:
+                progress.skipped += 1
+                continue
+            yield run_chunk, index, chunk
+
+    try:
+        with ThreadPoolExecutor(workers) as executor:
+            # Bound the chunks held in memory to two per worker
+            run_bounded(executor, pending_chunks(), 2 * workers)
+        with pool.acquire() as conn:
+            rollups = rebuild_rollups(conn, progress)
+    finally:
+        pool.close()
+
+    print(f"Backfilled {progress.rows} readings in {progress.chunks} chunks "
+          f"({progress.skipped} already done) and rebuilt {rollups} hourly rollups "
+          f"in {progress.seconds:.1f}s ({progress.rate:.0f} rows/sec)")
+    return {
+        "rows": progress.rows,
+        "chunks": progress.chunks,
+        "skipped_chunks": progress.skipped,
+        "rollups": rollups,
+        "seconds": progress.seconds
+    }
+
+
+def parse_args(argv: list[str] = None) -> argparse.Namespace:
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("filepath")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE)
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--checkpoint", default=None)
+    return parser.parse_args(argv)
+
+
+def main(argv: list[str] = None) -> None:
+    """Run a backfill from the command line."""
+    args = parse_args(argv)
+    backfill_readings(args.filepath, args.chunk_size, args.workers, args.checkpoint)
+
+
+if __name__ == "__main__":
+    main()
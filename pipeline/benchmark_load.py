@@ -0,0 +1,194 @@
+"""Compare the wall-clock time of the serial and concurrent load phases.
+
+Usage (from the `pipeline/` directory):
+
+    python benchmark_load.py --plants 200 --latency-ms 20 --workers 3
+    python benchmark_load.py --plants 200 --backend sqlite
+
+By default the loaders run against a simulated, empty database that sleeps for
+a fixed latency on every login and round trip, which is what dominates load
+time against RDS. With `--backend sqlite` they run the real statements against
+a fresh embedded database built from the schema; SQLite serialises writers, so
+that mode measures statement cost rather than overlap.
+
+Both sides are the production entry points: `load_phase.load`, one
+`LoadSession` transaction, and `load_phase.load_concurrently`.
+"""
+# pylint: disable=unused-argument
+import argparse
+import contextlib
+import io
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent / "transform"))
+
+# pylint: disable=wrong-import-position
+from benchmark_transform import make_synthetic_plants, STAGES
+from db_backend import connect_sqlite, create_schema
+from dimension_cache import DIMENSION_CACHE, DIMENSION_TABLES, VERSION_QUERY
+from migrate import migrate
+from load_phase import load, load_concurrently
+from reading_spool import ReadingSpool
+
+
+class SimulatedCursor:
+    """A cursor that waits one round trip per statement and returns no rows."""
+
+    def __init__(self, latency: float):
+        self.latency = latency
+        self.last_query = None
+        self.round_trips = 0
+        self.rowcount = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        return False
+
+    def execute(self, query, params=None):
+        """Simulate sending a statement to the server."""
+        time.sleep(self.latency)
+        self.last_query = query
+        self.round_trips += 1
+
+    def fetchall(self) -> list:
+        """Return the rows an empty database would return."""
+        if self.last_query is VERSION_QUERY:
+            return [(table, 0, None) for table in DIMENSION_TABLES]
+        return []
+
+    def fetchone(self):
+        """Return no row."""
+        return None
+
+
+class SimulatedConnection:
+    """A connection to an empty database with a fixed round-trip latency."""
+
+    def __init__(self, latency: float):
+        self.latency = latency
+        self.cursors = []
+
+    def cursor(self) -> SimulatedCursor:
+        """Open a cursor."""
+        cursor = SimulatedCursor(self.latency)
+        self.cursors.append(cursor)
+        return cursor
+
+    def commit(self):
+        """Simulate a commit round trip."""
+        time.sleep(self.latency)
+
+    def rollback(self):
+        """Simulate a rollback round trip."""
+        time.sleep(self.latency)
+
+    def close(self):
+        """Nothing to close."""
+
+
+def transform_synthetic(n_plants: int) -> dict:
+    """Return transformed synthetic data keyed like `pipeline.transform`."""
+    plants_df = make_synthetic_plants(n_plants)
+    with contextlib.redirect_stdout(io.StringIO()):
+        return {
+            "origin": STAGES["transform_origin_data"](plants_df.copy()),
+            "botanist": STAGES["get_botanists"](plants_df.copy()),
+            "plant": STAGES["transform_plant_data"](plants_df.copy()),
+            "readings": STAGES["transform_plant_readings"](plants_df.copy())
+        }
+
+
+def simulated_connection_factory(latency: float, login: float):
+    """Return a factory for simulated connections with the given delays."""
+    def factory():
+        time.sleep(login)
+        return SimulatedConnection(latency)
+    return factory
+
+
+def sqlite_connection_factory(path: str):
+    """Return a factory for connections to an embedded database file."""
+    return lambda: connect_sqlite(path)
+
+
+def reset_sqlite(path: str) -> None:
+    """Recreate every table so each timed run starts from an empty database."""
+    conn = connect_sqlite(path)
+    create_schema(conn)
+    with contextlib.redirect_stdout(io.StringIO()):
+        migrate(conn)
+    conn.close()
+
+
+def time_load(transformed_data: dict, connection_factory, workers: int,
+              reset=None) -> float:
+    """Run the load phase and return its wall-clock time in seconds.
+
+    One worker runs `load_phase.load`, the single-transaction path the pipeline
+    uses by default; more run `load_phase.load_concurrently`. `reset`, if given,
+    is called first to empty the database.
+    """
+    if reset:
+        reset()
+    DIMENSION_CACHE.clear()
+
+    with tempfile.TemporaryDirectory() as directory:
+        spool = ReadingSpool(str(Path(directory) / "readings.spool"))
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            if workers == 1:
+                load(transformed_data, connection_factory, spool)
+            else:
+                load_concurrently(transformed_data, workers, connection_factory, spool)
+        return time.perf_counter() - start
+
+
+def compare_load_modes(transformed_data: dict, connection_factory, workers: int,
+                       reset=None) -> dict:
+    """Time serial and concurrent loading of the same data."""
+    serial = time_load(transformed_data, connection_factory, 1, reset)
+    concurrent = time_load(transformed_data, connection_factory, workers, reset)
+    return {
+        "serial": serial,
+        "concurrent": concurrent,
+        "speedup": serial / concurrent if concurrent > 0 else float("inf")
+    }
+
+
+def parse_args(argv: list[str] = None) -> argparse.Namespace:
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--backend", choices=["simulated", "sqlite"], default="simulated")
+    parser.add_argument("--plants", type=int, default=200)
+    parser.add_argument("--workers", type=int, default=3)
+    parser.add_argument("--latency-ms", type=float, default=20.0)
+    parser.add_argument("--login-ms", type=float, default=100.0)
+    return parser.parse_args(argv)
+
+
+def main(argv: list[str] = None) -> None:
+    """Run the comparison and print the results."""
+    args = parse_args(argv)
+    transformed_data = transform_synthetic(args.plants)
+
+    if args.backend == "sqlite":
+        with tempfile.TemporaryDirectory() as directory:
+            path = str(Path(directory) / "benchmark.db")
+            result = compare_load_modes(transformed_data, sqlite_connection_factory(path),
+                                        args.workers, lambda: reset_sqlite(path))
+    else:
+        factory = simulated_connection_factory(args.latency_ms / 1000, args.login_ms / 1000)
+        result = compare_load_modes(transformed_data, factory, args.workers)
+
+    print(f"Serial:     {result['serial']:.3f}s")
+    print(f"Concurrent: {result['concurrent']:.3f}s ({args.workers} workers)")
+    print(f"Speedup:    {result['speedup']:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,222 @@
+"""Time the hot query paths before and after the hot path index migration.
+
+Usage (from the `pipeline/` directory):
+
+    python benchmark_queries.py --plants 100 --readings-per-plant 2880
+    python benchmark_queries.py --explain   # also print the query plans
+
+A fresh embedded SQLite database is built from the real schema and filled
+with synthetic plants and a reading per plant per minute. Every hot query is
+timed, migration 001 is applied, and the queries are timed again. The later
+migrations change the tables themselves, so they are left out to measure the
+indexes alone.
+"""
+import argparse
+import contextlib
+import io
+import tempfile
+import time
+from pathlib import Path
+import numpy as np
+import pandas as pd
+
+from benchmark_load import transform_synthetic
+from db_backend import connect_sqlite, create_schema
+from dimension_cache import DIMENSION_CACHE
+from load_session import LoadSession
+from load.load_origin import load_origins_bulk
+from load.load_botanist import load_botanists_bulk
+from load.load_plant import load_plants_bulk
+from migrate import migrate
+
+
+# 001_hot_path_indexes: the only migration "after" applies
+INDEX_MIGRATION = 1
+
+# Readings end here, so the last 24 hours and everything older are both populated
+REFERENCE_TIME = pd.Timestamp("2026-01-28 00:00:00")
+
+# name -> (query, function of the sample keys returning its parameters)
+HOT_QUERIES = {
+    "dashboard_last_24h": ("""
+        SELECT pr.plant_id, p.name, pr.soil_moisture, pr.temperature,
+               pr.recording_taken
+        FROM plant_reading AS pr
+        JOIN plant AS p ON pr.plant_id = p.plant_id
+        WHERE pr.recording_taken > %s
+    """, lambda keys: (keys["day_ago"],)),
+    "notifications_latest": ("""
+        SELECT pr.plant_id, pr.soil_moisture, pr.temperature, pr.recording_taken
+        FROM plant_reading AS pr
+        JOIN (SELECT plant_id, MAX(recording_taken) AS max_recording
+              FROM plant_reading GROUP BY plant_id) AS latest
+            ON pr.plant_id = latest.plant_id
+            AND pr.recording_taken = latest.max_recording
+    """, lambda keys: None),
+    "plant_history_hour": ("""
+        SELECT recording_taken, soil_moisture, temperature
+        FROM plant_reading
+        WHERE plant_id = %s AND recording_taken > %s
+    """, lambda keys: (keys["plant_id"], keys["hour_ago"])),
+    "retention_candidates": ("""
+        SELECT COUNT(*) FROM plant_reading WHERE recording_taken < %s
+    """, lambda keys: (keys["day_ago"],)),
+    "spool_dedupe_minute": ("""
+        SELECT plant_id, recording_taken FROM plant_reading
+        WHERE recording_taken BETWEEN %s AND %s
+    """, lambda keys: (keys["minute_ago"], keys["latest"])),
+    "botanist_by_email": ("""
+        SELECT botanist_id FROM botanist WHERE email = %s
+    """, lambda keys: (keys["email"],)),
+    "origin_by_coordinates": ("""
+        SELECT origin_id FROM origin WHERE lat = %s AND long = %s
+    """, lambda keys: keys["coordinates"]),
+    "city_by_name": ("""
+        SELECT city_id FROM city WHERE city_name = %s AND country_id = %s
+    """, lambda keys: keys["city"])
+}
+
+
+def make_synthetic_readings(plant_ids: list[int], readings_per_plant: int,
+                            seed: int = 42) -> list[tuple]:
+    """Return one reading per plant per minute, ending at REFERENCE_TIME."""
+    rng = np.random.default_rng(seed)
+    times = pd.date_range(end=REFERENCE_TIME, periods=readings_per_plant,
+                          freq="min").to_pydatetime()
+    n_rows = len(plant_ids) * readings_per_plant
+    moisture = rng.uniform(0, 100, n_rows).round(3)
+    temperature = rng.uniform(5, 35, n_rows)
+    return [(int(plant_id), float(moisture[i]), float(temperature[i]), taken, taken)
+            for i, (taken, plant_id) in enumerate(
+                (taken, plant_id) for taken in times for plant_id in plant_ids)]
+
+
+def seed_database(path: str, n_plants: int, readings_per_plant: int) -> None:
+    """Create the schema and fill it with synthetic dimensions and readings."""
+    conn = connect_sqlite(path)
+    create_schema(conn)
+    conn.close()
+
+    transformed_data = transform_synthetic(n_plants)
+    DIMENSION_CACHE.clear()
+    with contextlib.redirect_stdout(io.StringIO()):
+        with LoadSession(lambda: connect_sqlite(path)) as session:
+            load_origins_bulk(session.conn, transformed_data["origin"])
+            email_to_id = load_botanists_bulk(session.conn, transformed_data["botanist"])
+            load_plants_bulk(session.conn, transformed_data["plant"], email_to_id)
+
+            readings = make_synthetic_readings(
+                list(transformed_data["plant"]["plant_id"]), readings_per_plant)
+            with session.conn.cursor() as cursor:
+                cursor.executemany(
+                    "INSERT INTO plant_reading (plant_id, soil_moisture, temperature, "
+                    "recording_taken, last_watered) VALUES (%s, %s, %s, %s, %s)", readings)
+
+
+def get_sample_keys(conn) -> dict:
+    """Pick existing keys and time bounds to look up."""
+    with conn.cursor() as cursor:
+        cursor.execute("SELECT email FROM botanist ORDER BY botanist_id DESC")
+        email = cursor.fetchone()[0]
+        cursor.execute("SELECT lat, long FROM origin ORDER BY origin_id DESC")
+        coordinates = cursor.fetchone()
+        cursor.execute("SELECT city_name, country_id FROM city ORDER BY city_id DESC")
+        city = cursor.fetchone()
+        cursor.execute("SELECT MAX(plant_id) FROM plant")
+        plant_id = cursor.fetchone()[0]
+    latest = REFERENCE_TIME.to_pydatetime()
+    return {
+        "email": email,
+        "coordinates": tuple(coordinates),
+        "city": tuple(city),
+        "plant_id": plant_id,
+        "latest": latest,
+        "minute_ago": latest - pd.Timedelta(minutes=1),
+        "hour_ago": latest - pd.Timedelta(hours=1),
+        "day_ago": latest - pd.Timedelta(hours=24)
+    }
+
+
+def time_query(conn, query: str, params: tuple, repeats: int) -> float:
+    """Return the best of `repeats` runs of a query, in seconds."""
+    best = float("inf")
+    for _ in range(repeats):
+        with conn.cursor() as cursor:
+            start = time.perf_counter()
+            cursor.execute(query, params)
+            cursor.fetchall()
+            best = min(best, time.perf_counter() - start)
+    conn.commit()
+    return best
+
+
+def explain_query(conn, query: str, params: tuple) -> list[str]:
+    """Return SQLite's plan for a query, one line per step."""
+    with conn.cursor() as cursor:
+        cursor.execute("EXPLAIN QUERY PLAN " + query, params)
+        return [row[-1] for row in cursor.fetchall()]
+
+
+def time_hot_queries(conn, keys: dict, repeats: int) -> dict:
+    """Time every hot query and return name -> seconds."""
+    return {name: time_query(conn, query, get_params(keys), repeats)
+            for name, (query, get_params) in HOT_QUERIES.items()}
+
+
+def run_benchmark(path: str, n_plants: int, readings_per_plant: int,
+                  repeats: int = 3, explain: bool = False) -> dict:
+    """Time the hot queries before and after the index migration.
+
+    Returns name -> {"before", "after", "speedup"}.
+    """
+    seed_database(path, n_plants, readings_per_plant)
+    conn = connect_sqlite(path)
+    try:
+        keys = get_sample_keys(conn)
+        plans = {name: explain_query(conn, query, get_params(keys))
+                 for name, (query, get_params) in HOT_QUERIES.items()}
+        before = time_hot_queries(conn, keys, repeats)
+
+        with contextlib.redirect_stdout(io.StringIO()):
+            migrate(conn, target=INDEX_MIGRATION)
+        after = time_hot_queries(conn, keys, repeats)
+
+        if explain:
+            for name, (query, get_params) in HOT_QUERIES.items():
+                print(f"{name}\n  before: {plans[name]}\n"
+                      f"  after:  {explain_query(conn, query, get_params(keys))}")
+    finally:
+        conn.close()
+
+    return {name: {
+        "before": before[name],
+        "after": after[name],
+        "speedup": before[name] / after[name] if after[name] > 0 else float("inf")
+    } for name in HOT_QUERIES}
+
+
+def parse_args(argv: list[str] = None) -> argparse.Namespace:
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--plants", type=int, default=100)
+    parser.add_argument("--readings-per-plant", type=int, default=2880)
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--explain", action="store_true")
+    return parser.parse_args(argv)
+
+
+def main(argv: list[str] = None) -> None:
+    """Run the benchmark and print a before/after table."""
+    args = parse_args(argv)
+    with tempfile.TemporaryDirectory() as directory:
+        results = run_benchmark(str(Path(directory) / "queries.db"), args.plants,
+                                args.readings_per_plant, args.repeats, args.explain)
+
+    print(f"{'query':<24} {'before (ms)':>12} {'after (ms)':>12} {'speedup':>9}")
+    for name, result in results.items():
+        print(f"{name:<24} {result['before'] * 1000:>12.2f} "
+              f"{result['after'] * 1000:>12.2f} {result['speedup']:>8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
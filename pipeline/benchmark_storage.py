@@ -0,0 +1,200 @@
+"""Compare plant_reading's storage layout before and after migration 005.
+
+Usage (from the `pipeline/` directory):
+
+    python benchmark_storage.py --plants 100 --readings-per-plant 2880
+
+Two embedded SQLite databases are built from the real schema: one migrated
+up to version 4 (one last_watered per reading) and one fully migrated (the
+compact layout, with waterings in plant_watering). The same synthetic
+readings are inserted into both, then rows per page, insert throughput and
+the time to read the last 24 hours are compared.
+
+SQLite stores every REAL in eight bytes and cannot compress pages, so this
+measures the normalisation alone; on SQL Server the REAL, DATETIME2(0) and
+page compression savings come on top.
+"""
+import argparse
+import contextlib
+import io
+import tempfile
+import time
+from pathlib import Path
+import numpy as np
+import pandas as pd
+
+from benchmark_queries import REFERENCE_TIME, seed_database
+from db_backend import connect_sqlite, stage_rows
+from load.load_plant_readings import READING_COLUMNS, load_plant_readings_bulk
+from migrate import migrate
+
+
+# Layout name -> migration version it is migrated to (None is every migration)
+LAYOUTS = {"current": 4, "compact": None}
+
+LAST_24H_QUERIES = {
+    "current": """
+        SELECT plant_id, soil_moisture, temperature, recording_taken, last_watered
+        FROM plant_reading
+        WHERE recording_taken > %s
+    """,
+    "compact": """
+        SELECT pr.plant_id, pr.soil_moisture, pr.temperature, pr.recording_taken,
+               (SELECT MAX(w.watered_at) FROM plant_watering w
+                WHERE w.plant_id = pr.plant_id
+                  AND w.watered_at <= pr.recording_taken) AS last_watered
+        FROM plant_reading AS pr
+        WHERE pr.recording_taken > %s
+    """
+}
+
+# Objects that hold each layout's readings, for the page counts
+STORAGE_OBJECTS = {
+    "current": ["plant_reading", "ix_plant_reading_plant_recording",
+                "ix_plant_reading_recording_taken"],
+    "compact": ["plant_reading", "ix_plant_reading_plant_recording",
+                "ix_plant_reading_recording_taken", "plant_watering"]
+}
+
+WATERING_INTERVAL = "12h"
+
+
+def make_readings(plant_ids: list[int], readings_per_plant: int,
+                  seed: int = 42) -> pd.DataFrame:
+    """Return one reading per plant per minute, ending at REFERENCE_TIME.
+
+    Each plant is watered every WATERING_INTERVAL.
+    """
+    rng = np.random.default_rng(seed)
+    times = pd.date_range(end=REFERENCE_TIME, periods=readings_per_plant, freq="min")
+    n_rows = len(plant_ids) * readings_per_plant
+    recording_taken = times.repeat(len(plant_ids))
+    return pd.DataFrame({
+        "plant_id": np.tile(plant_ids, readings_per_plant),
+        "soil_moisture": rng.uniform(0, 100, n_rows).round(3),
+        "temperature": rng.uniform(5, 35, n_rows),
+        "recording_taken": recording_taken,
+        "last_watered": recording_taken.floor(WATERING_INTERVAL)
+    })
+
+
+def build_database(path: str, n_plants: int, target: int = None) -> list[int]:
+    """Create a database with synthetic plants, migrated up to `target`.
+
+    Returns the plant IDs.
+    """
+    seed_database(path, n_plants, 0)
+    conn = connect_sqlite(path)
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            migrate(conn, target)
+        with conn.cursor() as cursor:
+            cursor.execute("SELECT plant_id FROM plant ORDER BY plant_id")
+            plant_ids = [row[0] for row in cursor.fetchall()]
+        conn.commit()
+    finally:
+        conn.close()
+    return plant_ids
+
+
+def insert_current_layout(conn, df: pd.DataFrame) -> None:
+    """Insert readings with last_watered on every row, as before migration 005."""
+    with conn.cursor() as cursor:
+        stage_rows(cursor, "plant_reading", READING_COLUMNS,
+                   df[READING_COLUMNS].itertuples(index=False, name=None))
+
+
+def insert_readings(conn, layout: str, df: pd.DataFrame) -> float:
+    """Insert and commit readings in a layout and return the seconds taken."""
+    start = time.perf_counter()
+    if layout == "current":
+        insert_current_layout(conn, df)
+    else:
+        with contextlib.redirect_stdout(io.StringIO()):
+            load_plant_readings_bulk(conn, df)
+    conn.commit()
+    return time.perf_counter() - start
+
+
+def count_pages(conn, name: str) -> int:
+    """Return the pages a table or index occupies."""
+    with conn.cursor() as cursor:
+        cursor.execute("SELECT COUNT(*) FROM dbstat WHERE name = %s", (name,))
+        pages = cursor.fetchone()[0]
+    conn.commit()
+    return pages
+
+
+def time_last_24h(conn, layout: str, repeats: int) -> float:
+    """Return the best of `repeats` reads of the last 24 hours, in seconds."""
+    day_ago = (REFERENCE_TIME - pd.Timedelta(hours=24)).to_pydatetime()
+    best = float("inf")
+    for _ in range(repeats):
+        with conn.cursor() as cursor:
+            start = time.perf_counter()
+            cursor.execute(LAST_24H_QUERIES[layout], (day_ago,))
+            cursor.fetchall()
+            best = min(best, time.perf_counter() - start)
+    conn.commit()
+    return best
+
+
+def measure_layout(path: str, layout: str, n_plants: int, readings_per_plant: int,
+                   repeats: int = 3) -> dict:
+    """Build one layout, insert the readings and measure it."""
+    plant_ids = build_database(path, n_plants, LAYOUTS[layout])
+    df = make_readings(plant_ids, readings_per_plant)
+
+    conn = connect_sqlite(path)
+    try:
+        insert_seconds = insert_readings(conn, layout, df)
+        table_pages = count_pages(conn, "plant_reading")
+        total_pages = sum(count_pages(conn, name) for name in STORAGE_OBJECTS[layout])
+        query_seconds = time_last_24h(conn, layout, repeats)
+    finally:
+        conn.close()
+
+    return {
+        "rows": len(df),
+        "table_pages": table_pages,
+        "total_pages": total_pages,
+        "rows_per_page": len(df) / table_pages,
+        "insert_rows_per_sec": len(df) / insert_seconds,
+        "last_24h_seconds": query_seconds
+    }
+
+
+def run_benchmark(directory: str, n_plants: int, readings_per_plant: int,
+                  repeats: int = 3) -> dict:
+    """Measure every layout and return layout name -> measurements."""
+    return {layout: measure_layout(str(Path(directory) / f"{layout}.db"), layout,
+                                   n_plants, readings_per_plant, repeats)
+            for layout in LAYOUTS}
+
+
+def parse_args(argv: list[str] = None) -> argparse.Namespace:
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--plants", type=int, default=100)
+    parser.add_argument("--readings-per-plant", type=int, default=2880)
+    parser.add_argument("--repeats", type=int, default=3)
+    return parser.parse_args(argv)
+
+
+def main(argv: list[str] = None) -> None:
+    """Run the benchmark and print one row per layout."""
+    args = parse_args(argv)
+    with tempfile.TemporaryDirectory() as directory:
+        results = run_benchmark(directory, args.plants, args.readings_per_plant,
+                                args.repeats)
+
+    print(f"{'layout':<10} {'rows/page':>10} {'pages':>8} {'all pages':>10} "
+          f"{'insert rows/s':>14} {'24h read (ms)':>14}")
+    for layout, result in results.items():
+        print(f"{layout:<10} {result['rows_per_page']:>10.1f} {result['table_pages']:>8} "
+              f"{result['total_pages']:>10} {result['insert_rows_per_sec']:>14.0f} "
+              f"{result['last_24h_seconds'] * 1000:>14.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,13 @@
+import contextlib
+import io
 import pytest
 import requests
 import pandas as pd
 
+from db_backend import connect_sqlite, create_schema
+from dimension_cache import DIMENSION_CACHE
+from migrate import migrate
+
 
 @pytest.fixture
 def mock_plant_not_found(monkeypatch):
@@ -153,3 +159,21 @@ def sample_transformed_plant_table_data():
         "image_original_url": "https://example.com/image.jpg",
         "image_thumbnail": "https://example.com/image.jpg"
     }
+
+
+@pytest.fixture(autouse=True)
+def clear_dimension_cache():
+    """Start every test with an empty dimension ID cache."""
+    DIMENSION_CACHE.clear()
+
+
+@pytest.fixture
+def sqlite_path(tmp_path):
+    """Path to an embedded database created from the real schema and migrations."""
+    path = str(tmp_path / "plants.db")
+    conn = connect_sqlite(path)
+    create_schema(conn)
+    with contextlib.redirect_stdout(io.StringIO()):
+        migrate(conn)
+    conn.close()
+    return path
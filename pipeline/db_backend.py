@@ -0,0 +1,404 @@
+"""Database backends for the load phase: SQL Server in production, SQLite locally.
+
+The loaders are written in T-SQL. With DB_BACKEND=sqlite, connections come from
+an embedded SQLite file instead and each statement is rewritten with a small
+set of dialect rules (temp tables, savepoints, identities, covering indexes,
+paramstyle), so the whole pipeline can run, be profiled and be
+integration-tested without a live SQL Server. Statements that have no
+mechanical translation, such as MERGE, provide a SQLite equivalent alongside
+the T-SQL and go through `execute_upsert`.
+
+Create an empty local database from the real schema with:
+
+    DB_BACKEND=sqlite SQLITE_PATH=plants.db python db_backend.py
+"""
+import re
+import sqlite3
+from contextlib import contextmanager
+from datetime import datetime
+from functools import cache
+from itertools import islice
+from os import environ as ENV
+from pathlib import Path
+from time import monotonic
+import pandas as pd
+from dotenv import load_dotenv
+from pymssql import (connect, DataError, IntegrityError, InterfaceError, OperationalError,
+                     ProgrammingError)
+from sql_dialects import register_datetime_converter
+
+
+SCHEMA_PATH = Path(__file__).resolve().parent.parent / "schema" / "schema.sql"
+
+DEFAULT_SQLITE_PATH = "plants.db"
+
+# Seconds a SQLite connection waits for another writer before giving up
+SQLITE_BUSY_TIMEOUT = 30
+
+# Deadlines in seconds for logins and statements (0 waits forever). Together
+# they stay well inside the pipeline Lambda's 60 second timeout, so a slow
+# database fails the load, and its readings are spooled, before the
+# invocation is killed.
+DB_LOGIN_TIMEOUT = int(ENV.get("DB_LOGIN_TIMEOUT", "10"))
+DB_QUERY_TIMEOUT = int(ENV.get("DB_QUERY_TIMEOUT", "20"))
+
+# schema.sql is the layout before schema/migrations; the loaders write the
+# layout of migrations 001-006 (plant_watering, the hourly and latest reading
+# tables and the export watermark)
+REQUIRED_SCHEMA_VERSION = 6
+
+# SQLite virtual machine instructions between checks of the statement deadline
+SQLITE_DEADLINE_CHECK_STEPS = 1000
+
+# SQL Server accepts at most 2100 parameters per request and 1000 rows per VALUES list
+MAX_SQL_PARAMETERS = 2100
+MAX_ROWS_PER_VALUES = 1000
+
+# Failures of the connection rather than of the data: the database was
+# unreachable, timed out or was locked, so the same rows can be retried later
+CONNECTION_ERRORS = (ConnectionError, TimeoutError, OperationalError, InterfaceError,
+                     sqlite3.OperationalError)
+
+# Failures of the rows themselves, such as a constraint violation or a value
+# out of range, which fail the same way on every retry
+DATA_ERRORS = (IntegrityError, DataError, sqlite3.IntegrityError, sqlite3.DataError)
+
+# Ordered (pattern, replacement) rules that rewrite T-SQL into SQLite
+TSQL_TO_SQLITE = [
+    (re.compile(r"IF OBJECT_ID\('tempdb\.\.#(\w+)'\) IS NOT NULL DROP TABLE #\w+"),
+     r"DROP TABLE IF EXISTS temp.\1"),
+    (re.compile(r"IF OBJECT_ID\('(\w+)', 'U'\) IS NOT NULL DROP TABLE \w+"),
+     r"DROP TABLE IF EXISTS \1"),
+    (re.compile(r"IF OBJECT_ID\('(\w+)', 'U'\) IS NULL\s+CREATE TABLE \w+"),
+     r"CREATE TABLE IF NOT EXISTS \1"),
+    (re.compile(r"CREATE TABLE #(\w+)"), r"CREATE TEMP TABLE \1"),
+    (re.compile(r"#(\w+)"), r"\1"),
+    (re.compile(r"\w*INT IDENTITY\(1,\s*1\) NOT NULL PRIMARY KEY"), "INTEGER PRIMARY KEY"),
+    (re.compile(r"SCOPE_IDENTITY\(\)"), "last_insert_rowid()"),
+    # SQLite has no included columns, so a covering index carries them in its key
+    (re.compile(r"CREATE NONCLUSTERED INDEX"), "CREATE INDEX"),
+    (re.compile(r"\(([^()]*)\)\s+INCLUDE \(([^()]*)\)"), r"(\1, \2)"),
+    (re.compile(r"SAVE TRANSACTION (\w+)"), r"SAVEPOINT \1"),
+    (re.compile(r"ROLLBACK TRANSACTION (\w+)"), r"ROLLBACK TO \1"),
+    (re.compile(r"DATEADD\((\w+), (-?\d+), GETDATE\(\)\)"),
+     r"datetime('now', 'localtime', '\2 \1s')"),
+    # Truncation to the hour, as in migration 004
+    (re.compile(r"DATEADD\(hour, DATEDIFF\(hour, 0, (\w+)\), 0\)"),
+     r"strftime('%Y-%m-%d %H:00:00', \1)"),
+    (re.compile(r"%s"), "?")
+]
+
+LINE_COMMENT = re.compile(r"--[^\n]*")
+
+# SQLite cannot add constraints to an existing table, so these are skipped
+UNSUPPORTED_SQLITE_STATEMENT = re.compile(r"^\s*ALTER TABLE \w+\s+ADD CONSTRAINT", re.I)
+
+
+def to_sqlite_timestamp(value: datetime) -> str:
+    """Store timestamps as sortable ISO text, as SQLite has no DATETIME type."""
+    return value.isoformat(sep=" ")
+
+
+sqlite3.register_adapter(datetime, to_sqlite_timestamp)
+sqlite3.register_adapter(pd.Timestamp, to_sqlite_timestamp)
+register_datetime_converter()
+
+
+def translate_to_sqlite(query: str) -> str:
+    """Rewrite a T-SQL statement or batch into SQLite."""
+    for pattern, replacement in TSQL_TO_SQLITE:
+        query = pattern.sub(replacement, query)
+    return query
+
+
+def split_statements(query: str) -> list[str]:
+    """Split a batch into its non-empty statements, dropping line comments."""
+    query = LINE_COMMENT.sub("", query)
+    return [statement for statement in query.split(";") if statement.strip()]
+
+
+class SchemaVersionError(RuntimeError):
+    """The database has not been migrated as far as the loaders need."""
+
+
+class SQLiteCursor:
+    """A cursor that accepts the T-SQL the loaders send to SQL Server."""
+
+    def __init__(self, connection: "SQLiteConnection"):
+        self.connection = connection
+        self._cursor = connection.raw.cursor()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+        return False
+
+    def execute(self, query: str, params: tuple = None) -> None:
+        """Translate and run a statement or batch of statements."""
+        self.connection.begin()
+        self.connection.start_deadline()
+        statements = split_statements(translate_to_sqlite(query))
+        if params is not None and len(statements) > 1:
+            raise ValueError("Parameters are only supported for single statements.")
+        for statement in statements:
+            if UNSUPPORTED_SQLITE_STATEMENT.match(statement):
+                continue
+            self._cursor.execute(statement, params or ())
+
+    def executemany(self, query: str, seq_of_params: list) -> None:
+        """Run a single statement once per parameter tuple."""
+        self.connection.begin()
+        self.connection.start_deadline()
+        self._cursor.executemany(translate_to_sqlite(query), seq_of_params)
+
+    def fetchone(self):
+        """Return the next row or None."""
+        return self._cursor.fetchone()
+
+    def fetchmany(self, size: int = None) -> list:
+        """Return up to `size` rows."""
+        return self._cursor.fetchmany(size or self._cursor.arraysize)
+
+    def fetchall(self) -> list:
+        """Return every remaining row."""
+        return self._cursor.fetchall()
+
+    @property
+    def description(self):
+        """Column descriptions of the last query."""
+        return self._cursor.description
+
+    @property
+    def rowcount(self) -> int:
+        """Rows affected by the last statement."""
+        return self._cursor.rowcount
+
+    def close(self) -> None:
+        """Close the cursor."""
+        self._cursor.close()
+
+
+class SQLiteConnection:
+    """A SQLite connection that behaves like a pymssql one.
+
+    Like SQL Server, a transaction is opened implicitly by the first statement
+    and stays open until commit or rollback. Transactions take the write lock
+    up front, so concurrent loaders queue instead of deadlocking.
+
+    Like pymssql's `timeout`, each call to execute gets `query_timeout`
+    seconds (0 waits forever); a statement still running after that is
+    interrupted with sqlite3.OperationalError.
+    """
+
+    dialect = "sqlite"
+
+    def __init__(self, path: str = DEFAULT_SQLITE_PATH, query_timeout: float = 0):
+        self.path = str(path)
+        self.raw = sqlite3.connect(self.path, timeout=SQLITE_BUSY_TIMEOUT,
+                                   isolation_level=None, check_same_thread=False,
+                                   detect_types=sqlite3.PARSE_DECLTYPES)
+        self.raw.execute("PRAGMA journal_mode=WAL")
+        self.in_transaction = False
+        self.query_timeout = query_timeout
+        self.deadline = None
+        if query_timeout:
+            self.raw.set_progress_handler(self.is_past_deadline,
+                                          SQLITE_DEADLINE_CHECK_STEPS)
+
+    def start_deadline(self) -> None:
+        """Give the next statement `query_timeout` seconds from now."""
+        if self.query_timeout:
+            self.deadline = monotonic() + self.query_timeout
+
+    def is_past_deadline(self) -> bool:
+        """Return True, interrupting SQLite, once the running statement is overdue."""
+        return self.deadline is not None and monotonic() > self.deadline
+
+    def begin(self) -> None:
+        """Open a transaction if one is not already open."""
+        if not self.in_transaction:
+            self.raw.execute("BEGIN IMMEDIATE")
+            self.in_transaction = True
+
+    def cursor(self) -> SQLiteCursor:
+        """Open a cursor."""
+        return SQLiteCursor(self)
+
+    def commit(self) -> None:
+        """Commit the open transaction, if any."""
+        if self.in_transaction:
+            self.raw.execute("COMMIT")
+            self.in_transaction = False
+
+    def rollback(self) -> None:
+        """Roll back the open transaction, if any."""
+        if self.in_transaction:
+            self.raw.execute("ROLLBACK")
+            self.in_transaction = False
+
+    def close(self) -> None:
+        """Roll back anything uncommitted and close the file."""
+        self.rollback()
+        self.raw.close()
+
+
+def is_connection_error(error: Exception) -> bool:
+    """Return True if an error came from the connection rather than the data."""
+    return isinstance(error, CONNECTION_ERRORS)
+
+
+def is_data_error(error: Exception) -> bool:
+    """Return True if the database rejected the rows themselves."""
+    return isinstance(error, DATA_ERRORS)
+
+
+def get_dialect(conn) -> str:
+    """Return 'sqlite' for embedded connections and 'mssql' otherwise."""
+    return "sqlite" if getattr(conn, "dialect", None) == "sqlite" else "mssql"
+
+
+def execute_upsert(conn, cursor, merge_query: str,
+                   update_query: str, insert_query: str) -> list[str]:
+    """Run a MERGE ... OUTPUT $action and return the action of each affected row.
+
+    SQLite has no MERGE, so there the equivalent UPDATE then INSERT run instead
+    and the actions are rebuilt from their row counts.
+    """
+    if get_dialect(conn) == "sqlite":
+        cursor.execute(update_query)
+        updated = cursor.rowcount
+        cursor.execute(insert_query)
+        return ["UPDATE"] * updated + ["INSERT"] * cursor.rowcount
+
+    cursor.execute(merge_query)
+    return [row[0] for row in cursor.fetchall()]
+
+
+def get_max_rows_per_insert(n_columns: int) -> int:
+    """Return the most rows of n_columns values one multi-row INSERT can carry."""
+    return min(MAX_ROWS_PER_VALUES, (MAX_SQL_PARAMETERS - 1) // n_columns)
+
+
+def stage_rows(cursor, table: str, columns: list[str], rows, batch_size: int = None) -> int:
+    """Insert rows in as few multi-row INSERTs as SQL Server's limits allow.
+
+    `rows` may be any iterable of tuples, so large inputs can be streamed;
+    `batch_size` lowers the rows per INSERT. Returns the rows inserted.
+    """
+    max_rows = get_max_rows_per_insert(len(columns))
+    batch_size = min(batch_size or max_rows, max_rows)
+    placeholders = "(" + ", ".join(["%s"] * len(columns)) + ")"
+    rows = iter(rows)
+    n_rows = 0
+    while True:
+        batch = list(islice(rows, batch_size))
+        if not batch:
+            return n_rows
+        cursor.execute(f"INSERT INTO {table} ({', '.join(columns)}) VALUES "
+                       + ", ".join([placeholders] * len(batch)),
+                       tuple(value for row in batch for value in row))
+        n_rows += len(batch)
+
+
+@contextmanager
+def transaction(conn, on_rollback=None):
+    """Commit the block's work on an open connection, or roll it back and re-raise.
+
+    `on_rollback` is called after a rollback, for example to forget IDs the
+    rolled back statements returned.
+    """
+    try:
+        yield conn
+        conn.commit()
+    except Exception as e:
+        conn.rollback()
+        if on_rollback is not None:
+            on_rollback()
+        raise e
+
+
+@contextmanager
+def open_transaction(connection_factory, on_rollback=None):
+    """Open a connection for one transaction of the block's work and close it after."""
+    conn = connection_factory()
+    try:
+        with transaction(conn, on_rollback):
+            yield conn
+    finally:
+        conn.close()
+
+
+def connect_sqlite(path: str = None, query_timeout: float = 0) -> SQLiteConnection:
+    """Open the embedded database."""
+    return SQLiteConnection(path or ENV.get("SQLITE_PATH", DEFAULT_SQLITE_PATH),
+                            query_timeout)
+
+
+def create_schema(conn, schema_path: Path = SCHEMA_PATH) -> None:
+    """Run the real schema file against a connection and commit."""
+    with conn.cursor() as cursor:
+        cursor.execute(Path(schema_path).read_text(encoding="utf-8"))
+    conn.commit()
+
+
+def get_connection(query_timeout: float = DB_QUERY_TIMEOUT):
+    """Create a connection to the configured database backend.
+
+    Statements get `query_timeout` seconds each; maintenance commands that
+    rewrite whole tables pass 0 to wait for them.
+    """
+    load_dotenv()
+    if ENV.get("DB_BACKEND", "mssql") == "sqlite":
+        return connect_sqlite(query_timeout=query_timeout)
+
+    return connect(
+        server=ENV["DB_HOST"],
+        user=ENV["DB_USER"],
+        password=ENV["DB_PASSWORD"],
+        database=ENV["DB_NAME"],
+        port=ENV.get("DB_PORT", "1433"),
+        login_timeout=DB_LOGIN_TIMEOUT,
+        timeout=query_timeout
+    )
+
+
+def get_schema_version(conn) -> int:
+    """Return the latest migration applied, or 0 if migrate.py has never run."""
+    with conn.cursor() as cursor:
+        try:
+            cursor.execute("SELECT MAX(version) FROM schema_migrations")
+        except (ProgrammingError, sqlite3.OperationalError):
+            # migrate.py creates schema_migrations on its first run
+            return 0
+        version = cursor.fetchone()[0]
+    return version or 0
+
+
+@cache
+def require_schema_version(connection_factory=get_connection,
+                           required: int = REQUIRED_SCHEMA_VERSION) -> None:
+    """Raise SchemaVersionError unless migrations up to `required` are applied.
+
+    Runs once per process on its own connection: migrations only move
+    forward, so warm Lambda invocations do not repeat the check. A failed
+    check is not cached, so the next run sees a database migrated since.
+    """
+    conn = connection_factory()
+    try:
+        version = get_schema_version(conn)
+    finally:
+        conn.close()
+    if version < required:
+        raise SchemaVersionError(
+            f"Database schema is at migration {version}, but the loaders need "
+            f"{required}. Run `python migrate.py` from pipeline/ to apply "
+            f"schema/migrations first.")
+
+
+if __name__ == "__main__":
+    conn = connect_sqlite()
+    create_schema(conn)
+    print(f"Created schema in {conn.path}")
+    conn.close()
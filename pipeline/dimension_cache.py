@@ -0,0 +1,162 @@
+"""Process-wide cache of dimension table IDs shared by the load modules.
+
+Country, city, origin and botanist IDs effectively never change once created,
+so they are kept in bounded LRU maps at module level. The cache therefore
+survives warm Lambda invocations and repeated daemon cycles. Each run does one
+cheap version check (row count and max ID per table) and only re-warms tables
+that have changed.
+"""
+from collections import OrderedDict
+from os import environ as ENV
+from threading import RLock
+
+
+DEFAULT_MAX_ENTRIES = int(ENV.get("DIMENSION_CACHE_SIZE", "10000"))
+
+# Coordinates are rounded so keys built from API strings and DB floats agree
+COORDINATE_DECIMALS = 7
+
+# Warm queries order by ID descending so the lowest ID wins for duplicate keys,
+# matching the first-row-wins lookups in the load modules
+DIMENSION_TABLES = {
+    "country": "SELECT country_name, country_id FROM country ORDER BY country_id DESC",
+    "city": "SELECT city_name, country_id, city_id FROM city ORDER BY city_id DESC",
+    "origin": "SELECT lat, long, origin_id FROM origin ORDER BY origin_id DESC",
+    "botanist": "SELECT email, botanist_id FROM botanist ORDER BY botanist_id DESC"
+}
+
+VERSION_QUERY = """
+    SELECT 'country', COUNT(*), MAX(country_id) FROM country
+    UNION ALL SELECT 'city', COUNT(*), MAX(city_id) FROM city
+    UNION ALL SELECT 'origin', COUNT(*), MAX(origin_id) FROM origin
+    UNION ALL SELECT 'botanist', COUNT(*), MAX(botanist_id) FROM botanist
+"""
+
+
+def coordinate_key(lat: float, long: float) -> tuple:
+    """Return a hashable key for a pair of coordinates."""
+    return (round(float(lat), COORDINATE_DECIMALS), round(float(long), COORDINATE_DECIMALS))
+
+
+def make_key(table: str, key):
+    """Normalise a lookup key for the given table."""
+    if table == "origin":
+        return coordinate_key(*key)
+    return key
+
+
+class LRUCache:
+    """A bounded, thread-safe mapping that evicts the least recently used entry."""
+
+    def __init__(self, max_entries: int = DEFAULT_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._data = OrderedDict()
+        self._lock = RLock()
+
+    def get(self, key):
+        """Return the cached value or None, marking the key as recently used."""
+        with self._lock:
+            if key not in self._data:
+                return None
+            self._data.move_to_end(key)
+            return self._data[key]
+
+    def put(self, key, value) -> None:
+        """Store a value, evicting the oldest entry if the cache is full."""
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            if len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def clear(self) -> None:
+        """Remove every entry."""
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __contains__(self, key) -> bool:
+        return key in self._data
+
+
+class DimensionCache:
+    """LRU maps of natural key -> ID for each dimension table."""
+
+    def __init__(self, max_entries: int = DEFAULT_MAX_ENTRIES):
+        self.maps = {table: LRUCache(max_entries) for table in DIMENSION_TABLES}
+        self.versions = {table: None for table in DIMENSION_TABLES}
+        self.complete = {table: False for table in DIMENSION_TABLES}
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, table: str, key) -> int | None:
+        """Return a cached ID, or None on a miss."""
+        value = self.maps[table].get(make_key(table, key))
+        if value is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return value
+
+    def put(self, table: str, key, value) -> None:
+        """Cache a single ID."""
+        if value is not None:
+            self.maps[table].put(make_key(table, key), int(value))
+
+    def update(self, table: str, mapping: dict) -> None:
+        """Cache every key -> ID pair in a mapping."""
+        for key, value in mapping.items():
+            self.put(table, key, value)
+
+    def is_authoritative(self, table: str) -> bool:
+        """Return True if a miss means the key is not in the database."""
+        return self.complete[table]
+
+    def warm(self, conn, table: str) -> None:
+        """Reload a table's map with a single bulk SELECT."""
+        with conn.cursor() as cursor:
+            cursor.execute(DIMENSION_TABLES[table])
+            rows = cursor.fetchall()
+
+        self.maps[table].clear()
+        for *key, value in rows:
+            self.put(table, key[0] if len(key) == 1 else tuple(key), value)
+        self.complete[table] = len(rows) <= self.maps[table].max_entries
+
+    def get_versions(self, conn) -> dict:
+        """Return (row count, max ID) for every dimension table in one query."""
+        with conn.cursor() as cursor:
+            cursor.execute(VERSION_QUERY)
+            return {table: (count, max_id) for table, count, max_id in cursor.fetchall()}
+
+    def refresh(self, conn) -> list[str]:
+        """Re-warm any table whose version changed and return their names."""
+        stale = []
+        for table, version in self.get_versions(conn).items():
+            if version != self.versions.get(table):
+                self.warm(conn, table)
+                self.versions[table] = version
+                stale.append(table)
+        return stale
+
+    def invalidate(self, table: str = None) -> None:
+        """Drop a table's, or every table's, IDs and re-warm it on the next refresh.
+
+        Called after a rollback, so IDs of rows that were never committed must go
+        rather than be served to lookups that do not refresh first.
+        """
+        for name in [table] if table else DIMENSION_TABLES:
+            self.maps[name].clear()
+            self.versions[name] = None
+            self.complete[name] = False
+
+    def clear(self) -> None:
+        """Empty every map, forget all versions and reset the counters."""
+        self.invalidate()
+        self.hits = 0
+        self.misses = 0
+
+
+DIMENSION_CACHE = DimensionCache()
@@ -1,29 +1,76 @@
 """Load botanist data into the database."""
-from os import environ as ENV
 import pandas as pd
-from dotenv import load_dotenv
-from pymssql import connect
-
-
-def get_connection():
-    """Create a connection to the MS SQL database."""
-    load_dotenv()
-    return connect(
-        server=ENV["DB_HOST"],
-        user=ENV["DB_USER"],
-        password=ENV["DB_PASSWORD"],
-        database=ENV["DB_NAME"],
-        port=ENV.get("DB_PORT", 1433)
-    )
+
+from db_backend import get_connection, execute_upsert, open_transaction, stage_rows
+from dimension_cache import DIMENSION_CACHE
+
+
+BOTANIST_FRAME_COLUMNS = ["botanist_name", "botanist_email", "botanist_phone"]
+
+BOTANIST_STAGING_COLUMNS = ["name", "email", "phone"]
+
+CREATE_BOTANIST_STAGING_QUERY = """
+    IF OBJECT_ID('tempdb..#botanist_staging') IS NOT NULL DROP TABLE #botanist_staging;
+    CREATE TABLE #botanist_staging (
+        name VARCHAR(255) NOT NULL,
+        email VARCHAR(255) NOT NULL PRIMARY KEY,
+        phone VARCHAR(255) NULL
+    );
+"""
+
+MERGE_BOTANISTS_QUERY = """
+    MERGE botanist AS target
+    USING #botanist_staging AS source
+    ON target.email = source.email
+    WHEN MATCHED AND EXISTS (
+        SELECT source.name, source.phone
+        EXCEPT
+        SELECT target.name, target.phone
+    ) THEN
+        UPDATE SET name = source.name, phone = source.phone
+    WHEN NOT MATCHED BY TARGET THEN
+        INSERT (name, email, phone)
+        VALUES (source.name, source.email, source.phone)
+    OUTPUT $action;
+"""
+
+# SQLite has no MERGE; db_backend.execute_upsert runs these in its place
+UPDATE_STAGED_BOTANISTS_QUERY = """
+    UPDATE botanist
+    SET name = source.name, phone = source.phone
+    FROM #botanist_staging AS source
+    WHERE botanist.email = source.email
+      AND (botanist.name IS NOT source.name OR botanist.phone IS NOT source.phone)
+"""
+
+INSERT_STAGED_BOTANISTS_QUERY = """
+    INSERT INTO botanist (name, email, phone)
+    SELECT source.name, source.email, source.phone
+    FROM #botanist_staging AS source
+    WHERE NOT EXISTS (SELECT 1 FROM botanist b WHERE b.email = source.email)
+"""
+
+STAGED_BOTANIST_IDS_QUERY = """
+    SELECT s.email, MIN(b.botanist_id)
+    FROM #botanist_staging s
+    JOIN botanist b ON b.email = s.email
+    GROUP BY s.email
+"""
 
 
 def get_botanist_id(conn, email: str) -> int | None:
-    """Get botanist_id from database by email, return None if not found."""
+    """Get botanist_id from the cache or database by email, return None if not found."""
+    cached = DIMENSION_CACHE.get("botanist", email)
+    if cached is not None:
+        return cached
     query = "SELECT botanist_id FROM botanist WHERE email = %s"
     with conn.cursor() as cursor:
         cursor.execute(query, (email,))
         result = cursor.fetchone()
-        return result[0] if result else None
+    if not result:
+        return None
+    DIMENSION_CACHE.put("botanist", email, result[0])
+    return result[0]
 
 
 def create_botanist(conn, name: str, email: str, phone: str) -> int:
@@ -34,7 +81,9 @@ def create_botanist(conn, name: str, email: str, phone: str) -> int:
             (name, email, phone)
         )
         cursor.execute("SELECT SCOPE_IDENTITY()")
-        return cursor.fetchone()[0]
+        botanist_id = cursor.fetchone()[0]
+    DIMENSION_CACHE.put("botanist", email, botanist_id)
+    return botanist_id
 
 
 def get_or_create_botanist(conn, name: str, email: str, phone: str) -> int:
@@ -55,28 +104,54 @@ def load_botanist(conn, row: dict) -> int:
     )
 
 
+def get_botanist_tuples(df: pd.DataFrame) -> list[tuple]:
+    """Return one (name, email, phone) tuple per botanist email."""
+    botanists = df[BOTANIST_FRAME_COLUMNS].dropna(
+        subset=["botanist_email"]).drop_duplicates(subset="botanist_email", keep="last")
+    return [tuple(None if pd.isna(value) else value for value in row)
+            for row in botanists.itertuples(index=False, name=None)]
+
+
+def stage_botanists(conn, rows: list[tuple]) -> None:
+    """Bulk-load botanist tuples into the #botanist_staging temp table."""
+    with conn.cursor() as cursor:
+        cursor.execute(CREATE_BOTANIST_STAGING_QUERY)
+        stage_rows(cursor, "#botanist_staging", BOTANIST_STAGING_COLUMNS, rows)
+
+
+def merge_staged_botanists(conn) -> dict:
+    """Insert new botanists and update changed names and phones in one MERGE.
+
+    Returns a dict mapping botanist_email -> botanist_id for every staged botanist.
+    """
+    with conn.cursor() as cursor:
+        actions = execute_upsert(conn, cursor, MERGE_BOTANISTS_QUERY,
+                                 UPDATE_STAGED_BOTANISTS_QUERY,
+                                 INSERT_STAGED_BOTANISTS_QUERY)
+
+        cursor.execute(STAGED_BOTANIST_IDS_QUERY)
+        email_to_id = dict(cursor.fetchall())
+
+    DIMENSION_CACHE.update("botanist", email_to_id)
+
+    print(f"  Botanists: {actions.count('INSERT')} inserted, "
+          f"{actions.count('UPDATE')} updated")
+    return email_to_id
+
+
+def load_botanists_bulk(conn, df: pd.DataFrame) -> dict:
+    """Upsert all unique botanists with set-based statements on an open connection."""
+    stage_botanists(conn, get_botanist_tuples(df))
+    return merge_staged_botanists(conn)
+
+
 def load_botanists(df: pd.DataFrame) -> dict:
     """Load all unique botanists from dataframe into database.
 
     Returns a dict mapping botanist_email -> botanist_id for later use.
     """
-    conn = get_connection()
-    email_to_id = {}
-
-    try:
-        unique_botanists = df[[
-            'botanist_name', 'botanist_email', 'botanist_phone']].drop_duplicates()
-        for _, row in unique_botanists.iterrows():
-            botanist_id = load_botanist(conn, row)
-            email_to_id[row["botanist_email"]] = botanist_id
-        conn.commit()
-    except Exception as e:
-        conn.rollback()
-        raise e
-    finally:
-        conn.close()
-
-    return email_to_id
+    with open_transaction(get_connection, DIMENSION_CACHE.invalidate) as conn:
+        return load_botanists_bulk(conn, df)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,193 @@
+"""Maintain plant_reading_hourly, the hourly per-plant rollups of readings."""
+from datetime import datetime
+import pandas as pd
+
+from db_backend import get_connection, execute_upsert, open_transaction, stage_rows
+
+
+MEASURES = ["temperature", "soil_moisture"]
+
+ROLLUP_COLUMNS = ["plant_id", "reading_hour", "reading_count"] + [
+    f"{statistic}_{measure}" for measure in MEASURES
+    for statistic in ["min", "max", "sum", "sum_squares"]
+] + ["first_watered", "last_watered"]
+
+
+def smaller_of(column: str) -> str:
+    """Return SQL keeping the smaller of a column's existing and incoming values."""
+    return (f"CASE WHEN source.{column} < {{target}}.{column} "
+            f"THEN source.{column} ELSE {{target}}.{column} END")
+
+
+def larger_of(column: str) -> str:
+    """Return SQL keeping the larger of a column's existing and incoming values."""
+    return (f"CASE WHEN source.{column} > {{target}}.{column} "
+            f"THEN source.{column} ELSE {{target}}.{column} END")
+
+
+def sum_of(column: str) -> str:
+    """Return SQL adding a column's incoming value to its existing one."""
+    return f"{{target}}.{column} + source.{column}"
+
+
+def get_rollup_merge_rules() -> dict[str, str]:
+    """Return how each column combines an existing rollup with a partial one for the same hour."""
+    statistic_rules = {"min": smaller_of, "max": larger_of, "sum": sum_of, "sum_squares": sum_of}
+    measure_rules = {f"{statistic}_{measure}": rule(f"{statistic}_{measure}")
+                     for measure in MEASURES for statistic, rule in statistic_rules.items()}
+    return {"reading_count": sum_of("reading_count"), **measure_rules,
+            "first_watered": smaller_of("first_watered"),
+            "last_watered": larger_of("last_watered")}
+
+
+ROLLUP_MERGE_RULES = get_rollup_merge_rules()
+
+CREATE_ROLLUP_STAGING_QUERY = f"""
+    IF OBJECT_ID('tempdb..#hourly_rollup_staging') IS NOT NULL DROP TABLE #hourly_rollup_staging;
+    CREATE TABLE #hourly_rollup_staging (
+        plant_id SMALLINT NOT NULL,
+        reading_hour DATETIME NOT NULL,
+        reading_count INT NOT NULL,
+        {" ".join(f"{column} FLOAT NOT NULL," for column in ROLLUP_COLUMNS[3:-2])}
+        first_watered DATETIME NOT NULL,
+        last_watered DATETIME NOT NULL,
+        PRIMARY KEY (plant_id, reading_hour)
+    );
+"""
+
+# HOLDLOCK stops concurrent loaders both inserting the same new hour
+MERGE_ROLLUPS_QUERY = f"""
+    MERGE plant_reading_hourly WITH (HOLDLOCK) AS target
+    USING #hourly_rollup_staging AS source
+    ON target.plant_id = source.plant_id AND target.reading_hour = source.reading_hour
+    WHEN MATCHED THEN
+        UPDATE SET {", ".join(f"{column} = {rule.format(target='target')}"
+                              for column, rule in ROLLUP_MERGE_RULES.items())}
+    WHEN NOT MATCHED BY TARGET THEN
+        INSERT ({", ".join(ROLLUP_COLUMNS)})
+        VALUES ({", ".join(f"source.{column}" for column in ROLLUP_COLUMNS)})
+    OUTPUT $action;
+"""
+
+# SQLite has no MERGE; db_backend.execute_upsert runs these in its place
+UPDATE_STAGED_ROLLUPS_QUERY = f"""
+    UPDATE plant_reading_hourly
+    SET {", ".join(f"{column} = {rule.format(target='plant_reading_hourly')}"
+                   for column, rule in ROLLUP_MERGE_RULES.items())}
+    FROM #hourly_rollup_staging AS source
+    WHERE plant_reading_hourly.plant_id = source.plant_id
+      AND plant_reading_hourly.reading_hour = source.reading_hour
+"""
+
+INSERT_STAGED_ROLLUPS_QUERY = f"""
+    INSERT INTO plant_reading_hourly ({", ".join(ROLLUP_COLUMNS)})
+    SELECT {", ".join(f"source.{column}" for column in ROLLUP_COLUMNS)}
+    FROM #hourly_rollup_staging AS source
+    WHERE NOT EXISTS (
+        SELECT 1 FROM plant_reading_hourly h
+        WHERE h.plant_id = source.plant_id AND h.reading_hour = source.reading_hour)
+"""
+
+READING_HOUR = "DATEADD(hour, DATEDIFF(hour, 0, recording_taken), 0)"
+
+DELETE_ROLLUPS_QUERY = """
+    DELETE FROM plant_reading_hourly WHERE reading_hour >= %s AND reading_hour < %s
+"""
+
+# A reading's last watering is the plant's latest at or before it, so an hour's
+# first and last waterings are those of its first and last readings
+REBUILD_ROLLUPS_QUERY = f"""
+    INSERT INTO plant_reading_hourly ({", ".join(ROLLUP_COLUMNS)})
+    SELECT hourly.plant_id, hourly.reading_hour, hourly.reading_count,
+           {", ".join(f"hourly.{column}" for column in ROLLUP_COLUMNS[3:-2])},
+           (SELECT MAX(w.watered_at) FROM plant_watering w
+            WHERE w.plant_id = hourly.plant_id AND w.watered_at <= hourly.first_taken),
+           (SELECT MAX(w.watered_at) FROM plant_watering w
+            WHERE w.plant_id = hourly.plant_id AND w.watered_at <= hourly.last_taken)
+    FROM (
+        SELECT plant_id, {READING_HOUR} AS reading_hour, COUNT(*) AS reading_count,
+               {", ".join(f"MIN({measure}) AS min_{measure}, MAX({measure}) AS max_{measure}, "
+                          f"SUM({measure}) AS sum_{measure}, "
+                          f"SUM({measure} * {measure}) AS sum_squares_{measure}"
+                          for measure in MEASURES)},
+               MIN(recording_taken) AS first_taken, MAX(recording_taken) AS last_taken
+        FROM plant_reading
+        WHERE recording_taken >= %s AND recording_taken < %s
+        GROUP BY plant_id, {READING_HOUR}
+    ) AS hourly
+"""
+
+
+def get_hourly_rollups(df: pd.DataFrame) -> pd.DataFrame:
+    """Aggregate readings into one partial rollup per plant and hour."""
+    readings = df.assign(
+        reading_hour=pd.to_datetime(df["recording_taken"]).dt.floor("h"),
+        last_watered=pd.to_datetime(df["last_watered"]),
+        **{f"{measure}_squared": df[measure] ** 2 for measure in MEASURES}
+    )
+
+    aggregations = {"reading_count": ("plant_id", "size")}
+    for measure in MEASURES:
+        aggregations.update({
+            f"min_{measure}": (measure, "min"),
+            f"max_{measure}": (measure, "max"),
+            f"sum_{measure}": (measure, "sum"),
+            f"sum_squares_{measure}": (f"{measure}_squared", "sum")
+        })
+    aggregations.update({
+        "first_watered": ("last_watered", "min"),
+        "last_watered": ("last_watered", "max")
+    })
+    rollups = readings.groupby(["plant_id", "reading_hour"], as_index=False).agg(**aggregations)
+    return rollups[ROLLUP_COLUMNS]
+
+
+def get_staging_rows(rollups: pd.DataFrame) -> list[tuple]:
+    """Convert rollups into staging tuples of plain Python values."""
+    return [tuple(value.to_pydatetime() if isinstance(value, pd.Timestamp) else value
+                  for value in row)
+            for row in rollups.itertuples(index=False, name=None)]
+
+
+def stage_rollups(conn, rows: list[tuple]) -> None:
+    """Bulk-load rollups into the #hourly_rollup_staging temp table."""
+    with conn.cursor() as cursor:
+        cursor.execute(CREATE_ROLLUP_STAGING_QUERY)
+        stage_rows(cursor, "#hourly_rollup_staging", ROLLUP_COLUMNS, rows)
+
+
+def upsert_hourly_rollups(conn, df: pd.DataFrame) -> dict:
+    """Merge newly inserted readings into their hourly rollups on an open connection.
+
+    Call it once per batch of inserted readings; passing the same readings
+    twice counts them twice. Returns a dict with inserted and updated counts.
+    """
+    rows = get_staging_rows(get_hourly_rollups(df))
+    if not rows:
+        return {"inserted": 0, "updated": 0}
+
+    stage_rollups(conn, rows)
+    with conn.cursor() as cursor:
+        actions = execute_upsert(conn, cursor, MERGE_ROLLUPS_QUERY,
+                                 UPDATE_STAGED_ROLLUPS_QUERY,
+                                 INSERT_STAGED_ROLLUPS_QUERY)
+    return {"inserted": actions.count("INSERT"), "updated": actions.count("UPDATE")}
+
+
+def rebuild_hourly_rollups(conn, start: datetime, end: datetime) -> int:
+    """Recompute the rollups of the hours from `start` up to `end` from plant_reading.
+
+    Unlike upsert_hourly_rollups this replaces the hours' rollups, so running
+    it again, or after readings were loaded on several connections, gives the
+    same result. Both bounds must be on the hour. Returns the rollups written.
+    """
+    with conn.cursor() as cursor:
+        cursor.execute(DELETE_ROLLUPS_QUERY, (start, end))
+        cursor.execute(REBUILD_ROLLUPS_QUERY, (start, end))
+        return cursor.rowcount
+
+
+def load_hourly_rollups(df: pd.DataFrame) -> dict:
+    """Merge readings into their hourly rollups in their own transaction."""
+    with open_transaction(get_connection) as conn:
+        return upsert_hourly_rollups(conn, df)
@@ -0,0 +1,118 @@
+"""Maintain plant_latest_reading, the newest reading of every plant."""
+import pandas as pd
+
+from db_backend import get_connection, execute_upsert, open_transaction, stage_rows
+
+
+LATEST_READING_COLUMNS = [
+    "plant_id",
+    "soil_moisture",
+    "temperature",
+    "recording_taken",
+    "last_watered",
+    "hours_since_watered"
+]
+
+CREATE_LATEST_READING_STAGING_QUERY = """
+    IF OBJECT_ID('tempdb..#latest_reading_staging') IS NOT NULL DROP TABLE #latest_reading_staging;
+    CREATE TABLE #latest_reading_staging (
+        plant_id SMALLINT NOT NULL PRIMARY KEY,
+        soil_moisture FLOAT NOT NULL,
+        temperature FLOAT NOT NULL,
+        recording_taken DATETIME NOT NULL,
+        last_watered DATETIME NOT NULL,
+        hours_since_watered FLOAT NOT NULL
+    );
+"""
+
+# Only move a plant's row forward, so replaying older readings cannot regress it
+MERGE_LATEST_READINGS_QUERY = """
+    MERGE plant_latest_reading AS target
+    USING #latest_reading_staging AS source
+    ON target.plant_id = source.plant_id
+    WHEN MATCHED AND source.recording_taken > target.recording_taken THEN
+        UPDATE SET soil_moisture = source.soil_moisture,
+                   temperature = source.temperature,
+                   recording_taken = source.recording_taken,
+                   last_watered = source.last_watered,
+                   hours_since_watered = source.hours_since_watered
+    WHEN NOT MATCHED BY TARGET THEN
+        INSERT (plant_id, soil_moisture, temperature, recording_taken,
+                last_watered, hours_since_watered)
+        VALUES (source.plant_id, source.soil_moisture, source.temperature,
+                source.recording_taken, source.last_watered, source.hours_since_watered)
+    OUTPUT $action;
+"""
+
+# SQLite has no MERGE; db_backend.execute_upsert runs these in its place
+UPDATE_STAGED_LATEST_READINGS_QUERY = f"""
+    UPDATE plant_latest_reading
+    SET {", ".join(f"{column} = source.{column}" for column in LATEST_READING_COLUMNS[1:])}
+    FROM #latest_reading_staging AS source
+    WHERE plant_latest_reading.plant_id = source.plant_id
+      AND source.recording_taken > plant_latest_reading.recording_taken
+"""
+
+INSERT_STAGED_LATEST_READINGS_QUERY = f"""
+    INSERT INTO plant_latest_reading ({", ".join(LATEST_READING_COLUMNS)})
+    SELECT {", ".join(f"source.{column}" for column in LATEST_READING_COLUMNS)}
+    FROM #latest_reading_staging AS source
+    WHERE NOT EXISTS (SELECT 1 FROM plant_latest_reading l WHERE l.plant_id = source.plant_id)
+"""
+
+
+def get_latest_readings(df: pd.DataFrame) -> pd.DataFrame:
+    """Return the newest reading of each plant with its derived fields."""
+    latest = df.assign(
+        recording_taken=pd.to_datetime(df["recording_taken"]),
+        last_watered=pd.to_datetime(df["last_watered"])
+    ).sort_values("recording_taken").drop_duplicates("plant_id", keep="last")
+    latest["hours_since_watered"] = (
+        latest["recording_taken"] - latest["last_watered"]).dt.total_seconds() / 3600
+    return latest[LATEST_READING_COLUMNS].sort_values("plant_id")
+
+
+def get_staging_rows(latest: pd.DataFrame) -> list[tuple]:
+    """Convert latest readings into staging tuples of plain Python values."""
+    return [(int(plant_id), float(moisture), float(temperature),
+             taken.to_pydatetime(), watered.to_pydatetime(), float(hours))
+            for plant_id, moisture, temperature, taken, watered, hours
+            in latest.itertuples(index=False, name=None)]
+
+
+def stage_latest_readings(conn, rows: list[tuple]) -> None:
+    """Bulk-load latest readings into the #latest_reading_staging temp table."""
+    with conn.cursor() as cursor:
+        cursor.execute(CREATE_LATEST_READING_STAGING_QUERY)
+        stage_rows(cursor, "#latest_reading_staging", LATEST_READING_COLUMNS, rows)
+
+
+def upsert_latest_readings(conn, df: pd.DataFrame) -> dict:
+    """Upsert each plant's newest reading on an open connection.
+
+    Returns a dict with inserted, updated and unchanged counts; unchanged
+    plants already had a reading at least as new.
+    """
+    rows = get_staging_rows(get_latest_readings(df))
+    if not rows:
+        return {"inserted": 0, "updated": 0, "unchanged": 0}
+
+    stage_latest_readings(conn, rows)
+    with conn.cursor() as cursor:
+        actions = execute_upsert(conn, cursor, MERGE_LATEST_READINGS_QUERY,
+                                 UPDATE_STAGED_LATEST_READINGS_QUERY,
+                                 INSERT_STAGED_LATEST_READINGS_QUERY)
+
+    inserted = actions.count("INSERT")
+    updated = actions.count("UPDATE")
+    return {
+        "inserted": inserted,
+        "updated": updated,
+        "unchanged": len(rows) - inserted - updated
+    }
+
+
+def load_latest_readings(df: pd.DataFrame) -> dict:
+    """Upsert each plant's newest reading in its own transaction."""
+    with open_transaction(get_connection) as conn:
+        return upsert_latest_readings(conn, df)
@@ -1,38 +1,107 @@
 """Load origin data into the database."""
 import pandas as pd
-from os import environ as ENV
-from dotenv import load_dotenv
-from pymssql import connect
 
-
-def get_connection():
-    """Create a connection to the MS SQL database."""
-    load_dotenv()
-    return connect(
-        server=ENV["DB_HOST"],
-        user=ENV["DB_USER"],
-        password=ENV["DB_PASSWORD"],
-        database=ENV["DB_NAME"],
-        port=ENV.get("DB_PORT", 1433)
-    )
+from db_backend import get_connection, open_transaction, stage_rows
+from dimension_cache import DIMENSION_CACHE
+
+
+ORIGIN_FRAME_COLUMNS = [
+    "origin_country",
+    "origin_city",
+    "origin_latitude",
+    "origin_longitude"
+]
+
+ORIGIN_STAGING_COLUMNS = ["country_name", "city_name", "lat", "long"]
+
+CREATE_ORIGIN_STAGING_QUERY = """
+    IF OBJECT_ID('tempdb..#origin_staging') IS NOT NULL DROP TABLE #origin_staging;
+    CREATE TABLE #origin_staging (
+        country_name VARCHAR(255) NOT NULL,
+        city_name VARCHAR(255) NOT NULL,
+        lat FLOAT NOT NULL,
+        long FLOAT NOT NULL
+    );
+"""
+
+# Duplicate names or coordinates resolve to their lowest ID, matching the
+# first-row-wins behaviour of the get_or_create_* helpers
+STAGED_COUNTRY_IDS = """
+    SELECT country_name, MIN(country_id) AS country_id
+    FROM country GROUP BY country_name
+"""
+
+STAGED_CITY_IDS = """
+    SELECT city_name, country_id, MIN(city_id) AS city_id
+    FROM city GROUP BY city_name, country_id
+"""
+
+UPSERT_STAGED_ORIGINS_QUERY = f"""
+    INSERT INTO country (country_name)
+    SELECT DISTINCT s.country_name
+    FROM #origin_staging s
+    WHERE NOT EXISTS (SELECT 1 FROM country c WHERE c.country_name = s.country_name);
+
+    INSERT INTO city (city_name, country_id)
+    SELECT DISTINCT s.city_name, c.country_id
+    FROM #origin_staging s
+    JOIN ({STAGED_COUNTRY_IDS}) c ON c.country_name = s.country_name
+    WHERE NOT EXISTS (SELECT 1 FROM city ci
+                      WHERE ci.city_name = s.city_name
+                        AND ci.country_id = c.country_id);
+
+    INSERT INTO origin (city_id, lat, long)
+    SELECT MIN(ci.city_id), s.lat, s.long
+    FROM #origin_staging s
+    JOIN ({STAGED_COUNTRY_IDS}) c ON c.country_name = s.country_name
+    JOIN ({STAGED_CITY_IDS}) ci
+        ON ci.city_name = s.city_name AND ci.country_id = c.country_id
+    WHERE NOT EXISTS (SELECT 1 FROM origin o
+                      WHERE o.lat = s.lat AND o.long = s.long)
+    GROUP BY s.lat, s.long;
+"""
+
+STAGED_ORIGIN_IDS_QUERY = f"""
+    SELECT s.country_name, c.country_id, s.city_name, ci.city_id,
+           s.lat, s.long, o.origin_id
+    FROM #origin_staging s
+    JOIN ({STAGED_COUNTRY_IDS}) c ON c.country_name = s.country_name
+    JOIN ({STAGED_CITY_IDS}) ci
+        ON ci.city_name = s.city_name AND ci.country_id = c.country_id
+    JOIN (SELECT lat, long, MIN(origin_id) AS origin_id
+          FROM origin GROUP BY lat, long) o
+        ON o.lat = s.lat AND o.long = s.long
+"""
 
 
 def get_country_id(conn, country_name: str) -> int | None:
-    """Get country ID from the database, return None if not found."""
+    """Get country ID from the cache or database, return None if not found."""
+    cached = DIMENSION_CACHE.get("country", country_name)
+    if cached is not None:
+        return cached
     query = "SELECT country_id FROM country WHERE country_name = %s"
     with conn.cursor() as cursor:
         cursor.execute(query, (country_name,))
         result = cursor.fetchone()
-        return result[0] if result else None
+    if not result:
+        return None
+    DIMENSION_CACHE.put("country", country_name, result[0])
+    return result[0]
 
 
 def get_city_id(conn, city_name: str, country_id: int) -> int | None:
-    """Get city_id from the database, return None if not found."""
+    """Get city_id from the cache or database, return None if not found."""
+    cached = DIMENSION_CACHE.get("city", (city_name, country_id))
+    if cached is not None:
+        return cached
     query = "SELECT city_id FROM city WHERE city_name = %s AND country_id = %s"
     with conn.cursor() as cursor:
         cursor.execute(query, (city_name, country_id))
         result = cursor.fetchone()
-        return result[0] if result else None
+    if not result:
+        return None
+    DIMENSION_CACHE.put("city", (city_name, country_id), result[0])
+    return result[0]
 
 
 def create_country(conn, country_name: str) -> int:
@@ -41,7 +110,9 @@ def create_country(conn, country_name: str) -> int:
         cursor.execute(
             "INSERT INTO country (country_name) VALUES (%s)", (country_name,))
         cursor.execute("SELECT SCOPE_IDENTITY()")
-        return cursor.fetchone()[0]
+        country_id = cursor.fetchone()[0]
+    DIMENSION_CACHE.put("country", country_name, country_id)
+    return country_id
 
 
 def create_city(conn, city_name: str, country_id: int) -> int:
@@ -50,7 +121,9 @@ def create_city(conn, city_name: str, country_id: int) -> int:
         cursor.execute(
             "INSERT INTO city (city_name, country_id) VALUES (%s, %s)", (city_name, country_id))
         cursor.execute("SELECT SCOPE_IDENTITY()")
-        return cursor.fetchone()[0]
+        city_id = cursor.fetchone()[0]
+    DIMENSION_CACHE.put("city", (city_name, country_id), city_id)
+    return city_id
 
 
 def get_or_create_country(conn, country_name: str) -> int:
@@ -70,12 +143,18 @@ def get_or_create_city(conn, city_name: str, country_id: int) -> int:
 
 
 def get_origin_id(conn, lat: float, long: float) -> int | None:
-    """Get origin_id from the database, return None if not found."""
+    """Get origin_id from the cache or database, return None if not found."""
+    cached = DIMENSION_CACHE.get("origin", (lat, long))
+    if cached is not None:
+        return cached
     query = "SELECT origin_id FROM origin WHERE lat = %s AND long = %s"
     with conn.cursor() as cursor:
-        cursor.execute(query, (lat, long))
+        cursor.execute(query, (float(lat), float(long)))
         result = cursor.fetchone()
-        return result[0] if result else None
+    if not result:
+        return None
+    DIMENSION_CACHE.put("origin", (lat, long), result[0])
+    return result[0]
 
 
 def insert_origin(conn, city_id: int, lat: float, long: float) -> int:
@@ -86,7 +165,9 @@ def insert_origin(conn, city_id: int, lat: float, long: float) -> int:
             (city_id, lat, long)
         )
         cursor.execute("SELECT SCOPE_IDENTITY()")
-        return cursor.fetchone()[0]
+        origin_id = cursor.fetchone()[0]
+    DIMENSION_CACHE.put("origin", (lat, long), origin_id)
+    return origin_id
 
 
 def get_or_create_origin(conn, city_id: int, lat: float, long: float) -> int:
@@ -106,19 +187,57 @@ def load_origin(conn, row: dict) -> int:
     return origin_id
 
 
-def load_origins(df: pd.DataFrame) -> None:
-    """Load all origins from dataframe into database."""
-    conn = get_connection()
+def get_origin_tuples(df: pd.DataFrame) -> list[tuple]:
+    """Return the unique (country, city, lat, long) tuples in the dataframe."""
+    origins = df[ORIGIN_FRAME_COLUMNS].dropna().drop_duplicates()
+    return [(country, city, float(lat), float(long))
+            for country, city, lat, long in origins.itertuples(index=False, name=None)]
+
+
+def stage_origins(conn, rows: list[tuple]) -> None:
+    """Bulk-load origin tuples into the #origin_staging temp table."""
+    with conn.cursor() as cursor:
+        cursor.execute(CREATE_ORIGIN_STAGING_QUERY)
+        stage_rows(cursor, "#origin_staging", ORIGIN_STAGING_COLUMNS, rows)
+
+
+def upsert_staged_origins(conn) -> dict:
+    """Insert missing countries, cities and origins, then return their IDs.
+
+    Returns a dict with three maps:
+        country: country_name -> country_id
+        city: (city_name, country_id) -> city_id
+        origin: (lat, long) -> origin_id
+    """
+    with conn.cursor() as cursor:
+        cursor.execute(UPSERT_STAGED_ORIGINS_QUERY)
+        cursor.execute(STAGED_ORIGIN_IDS_QUERY)
+        rows = cursor.fetchall()
+
+    id_maps = {"country": {}, "city": {}, "origin": {}}
+    for country_name, country_id, city_name, city_id, lat, long, origin_id in rows:
+        id_maps["country"][country_name] = country_id
+        id_maps["city"][(city_name, country_id)] = city_id
+        id_maps["origin"][(lat, long)] = origin_id
+
+    for table, mapping in id_maps.items():
+        DIMENSION_CACHE.update(table, mapping)
+    return id_maps
+
+
+def load_origins_bulk(conn, df: pd.DataFrame) -> dict:
+    """Load all unique origins with set-based statements on an open connection."""
+    stage_origins(conn, get_origin_tuples(df))
+    return upsert_staged_origins(conn)
+
+
+def load_origins(df: pd.DataFrame) -> dict:
+    """Load all origins from dataframe into database.
 
-    try:
-        for _, row in df.iterrows():
-            load_origin(conn, row)
-        conn.commit()
-    except Exception as e:
-        conn.rollback()
-        raise e
-    finally:
-        conn.close()
+    Returns the country, city and origin ID maps from upsert_staged_origins.
+    """
+    with open_transaction(get_connection, DIMENSION_CACHE.invalidate) as conn:
+        return load_origins_bulk(conn, df)
 
 
 def get_all_from_table(conn, table_name: str) -> pd.DataFrame:
@@ -1,9 +1,86 @@
 """Load plant data into the database."""
 # pylint: disable=redefined-outer-name
-from os import environ as ENV
 import pandas as pd
-from dotenv import load_dotenv
-from pymssql import connect
+
+from db_backend import get_connection, execute_upsert, open_transaction, stage_rows
+from dimension_cache import DIMENSION_CACHE
+from load.load_origin import get_origin_id
+
+
+# Staging columns match the plant table; IDs are resolved before staging
+PLANT_STAGING_COLUMNS = [
+    "plant_id",
+    "name",
+    "scientific_name",
+    "origin_id",
+    "botanist_id",
+    "image_license_url",
+    "image_original_url",
+    "image_thumbnail"
+]
+
+CREATE_PLANT_STAGING_QUERY = """
+    IF OBJECT_ID('tempdb..#plant_staging') IS NOT NULL DROP TABLE #plant_staging;
+    CREATE TABLE #plant_staging (
+        plant_id SMALLINT NOT NULL PRIMARY KEY,
+        name VARCHAR(255) NOT NULL,
+        scientific_name VARCHAR(255) NULL,
+        origin_id SMALLINT NOT NULL,
+        botanist_id SMALLINT NOT NULL,
+        image_license_url VARCHAR(1000) NULL,
+        image_url VARCHAR(1000) NULL,
+        thumbnail VARCHAR(1000) NULL
+    );
+"""
+
+MERGE_PLANTS_QUERY = """
+    MERGE plant AS target
+    USING #plant_staging AS source
+    ON target.plant_id = source.plant_id
+    WHEN MATCHED AND EXISTS (
+        SELECT source.name, source.scientific_name, source.origin_id,
+               source.botanist_id, source.image_license_url,
+               source.image_url, source.thumbnail
+        EXCEPT
+        SELECT target.name, target.scientific_name, target.origin_id,
+               target.botanist_id, target.image_license_url,
+               target.image_url, target.thumbnail
+    ) THEN
+        UPDATE SET name = source.name,
+                   scientific_name = source.scientific_name,
+                   origin_id = source.origin_id,
+                   botanist_id = source.botanist_id,
+                   image_license_url = source.image_license_url,
+                   image_url = source.image_url,
+                   thumbnail = source.thumbnail
+    WHEN NOT MATCHED BY TARGET THEN
+        INSERT (plant_id, name, scientific_name, origin_id, botanist_id,
+                image_license_url, image_url, thumbnail)
+        VALUES (source.plant_id, source.name, source.scientific_name,
+                source.origin_id, source.botanist_id,
+                source.image_license_url, source.image_url, source.thumbnail)
+    OUTPUT $action;
+"""
+
+PLANT_ATTRIBUTE_COLUMNS = ["name", "scientific_name", "origin_id", "botanist_id",
+                           "image_license_url", "image_url", "thumbnail"]
+
+# SQLite has no MERGE; db_backend.execute_upsert runs these in its place
+UPDATE_STAGED_PLANTS_QUERY = f"""
+    UPDATE plant
+    SET {", ".join(f"{column} = source.{column}" for column in PLANT_ATTRIBUTE_COLUMNS)}
+    FROM #plant_staging AS source
+    WHERE plant.plant_id = source.plant_id
+      AND ({" OR ".join(f"plant.{column} IS NOT source.{column}"
+                        for column in PLANT_ATTRIBUTE_COLUMNS)})
+"""
+
+INSERT_STAGED_PLANTS_QUERY = f"""
+    INSERT INTO plant (plant_id, {", ".join(PLANT_ATTRIBUTE_COLUMNS)})
+    SELECT source.plant_id, {", ".join(f"source.{column}" for column in PLANT_ATTRIBUTE_COLUMNS)}
+    FROM #plant_staging AS source
+    WHERE NOT EXISTS (SELECT 1 FROM plant p WHERE p.plant_id = source.plant_id)
+"""
 
 
 def nan_to_none(value):
@@ -13,153 +90,118 @@ def nan_to_none(value):
     return value
 
 
-def get_connection():
-    """Create a connection to the MS SQL database."""
-    load_dotenv()
-    return connect(
-        server=ENV["DB_HOST"],
-        user=ENV["DB_USER"],
-        password=ENV["DB_PASSWORD"],
-        database=ENV["DB_NAME"],
-        port=ENV.get("DB_PORT", 1433)
-    )
+def get_existing_plant_ids(conn) -> set[int]:
+    """Return the IDs of every plant already in the database."""
+    with conn.cursor() as cursor:
+        cursor.execute("SELECT plant_id FROM plant")
+        return {row[0] for row in cursor.fetchall()}
+
+
+def lookup_dimension_id(table: str, key, fallback, *fallback_args) -> int | None:
+    """Return an ID from the cache, querying the database only if the cache is partial."""
+    dimension_id = DIMENSION_CACHE.get(table, key)
+    if dimension_id is None and not DIMENSION_CACHE.is_authoritative(table):
+        dimension_id = fallback(*fallback_args)
+    return dimension_id
 
 
-def get_origin_id(conn, lat: float, long: float) -> int | None:
-    """Get origin_id from database by lat/long, return None if not found."""
-    query = "SELECT origin_id FROM origin WHERE lat = %s AND long = %s"
+def get_botanist_id(conn, email: str) -> int | None:
+    """Get botanist_id from database by email, return None if not found."""
+    query = "SELECT botanist_id FROM botanist WHERE email = %s"
     with conn.cursor() as cursor:
-        cursor.execute(query, (float(lat), float(long)))
+        cursor.execute(query, (email,))
         result = cursor.fetchone()
-        return result[0] if result else None
+    if not result:
+        return None
+    DIMENSION_CACHE.put("botanist", email, result[0])
+    return result[0]
+
 
+def resolve_plant_ids(conn, df: pd.DataFrame) -> pd.DataFrame:
+    """Add origin_id and botanist_id columns from the dimension cache.
 
-def get_origin_id_by_city(conn, city_name: str, lat: float, long: float) -> int | None:
-    """Get origin_id from database by city name and approximate coordinates."""
-    query = """
-        SELECT o.origin_id FROM origin o
-        JOIN city c ON o.city_id = c.city_id
-        WHERE c.city_name = %s
+    Plants whose botanist or origin cannot be resolved are dropped with a warning.
     """
-    with conn.cursor() as cursor:
-        cursor.execute(query, (city_name,))
-        result = cursor.fetchone()
-        return result[0] if result else None
+    DIMENSION_CACHE.refresh(conn)
 
+    plants = df.drop_duplicates(subset="plant_id", keep="last").copy()
+    plants["botanist_id"] = [
+        lookup_dimension_id("botanist", email, get_botanist_id, conn, email)
+        for email in plants["botanist_email"]]
+    plants["origin_id"] = [
+        lookup_dimension_id("origin", (lat, long), get_origin_id, conn, lat, long)
+        for lat, long in zip(plants["origin_latitude"], plants["origin_longitude"])]
+
+    unresolved = plants["botanist_id"].isna() | plants["origin_id"].isna()
+    for row in plants[unresolved].itertuples():
+        print(f"Warning: Could not resolve botanist ({row.botanist_email}) or origin "
+              f"({row.origin_latitude}, {row.origin_longitude}) for plant {row.plant_id}")
+
+    return plants[~unresolved].astype({"botanist_id": int, "origin_id": int})
 
-def get_plant_by_id(conn, plant_id: int) -> dict | None:
-    """Get plant record from database by plant_id."""
-    query = "SELECT plant_id FROM plant WHERE plant_id = %s"
-    with conn.cursor() as cursor:
-        cursor.execute(query, (plant_id,))
-        result = cursor.fetchone()
-        return result[0] if result else None
 
+def get_staging_rows(plants: pd.DataFrame) -> list[tuple]:
+    """Convert resolved plants into staging tuples."""
+    return [tuple(nan_to_none(value) for value in row)
+            for row in plants[PLANT_STAGING_COLUMNS].itertuples(index=False, name=None)]
 
-def create_plant(conn, plant_id: int, name: str, scientific_name: str,
-                 origin_id: int, botanist_id: int,
-                 image_license_url: str, image_url: str, thumbnail: str) -> int:
-    """Create a new plant record and return the plant_id."""
+
+def stage_plants(conn, rows: list[tuple]) -> None:
+    """Bulk-load plant rows into the #plant_staging temp table."""
     with conn.cursor() as cursor:
-        cursor.execute(
-            """INSERT INTO plant 
-               (plant_id, name, scientific_name, origin_id, botanist_id, 
-                image_license_url, image_url, thumbnail) 
-               VALUES (%s, %s, %s, %s, %s, %s, %s, %s)""",
-            (plant_id, name, scientific_name, origin_id, botanist_id,
-             image_license_url, image_url, thumbnail)
-        )
-        return plant_id
-
-
-def update_plant(conn, plant_id: int, name: str, scientific_name: str,
-                 origin_id: int, botanist_id: int,
-                 image_license_url: str, image_url: str, thumbnail: str) -> int:
-    """Update an existing plant record."""
+        cursor.execute(CREATE_PLANT_STAGING_QUERY)
+        stage_rows(cursor, "#plant_staging", ["plant_id", *PLANT_ATTRIBUTE_COLUMNS], rows)
+
+
+def merge_staged_plants(conn, n_staged: int) -> dict:
+    """Apply the staged plants with one MERGE and count the outcomes.
+
+    Returns a dict with inserted, updated and unchanged counts.
+    """
     with conn.cursor() as cursor:
-        cursor.execute(
-            """UPDATE plant 
-               SET name = %s, scientific_name = %s, origin_id = %s, 
-                   botanist_id = %s, image_license_url = %s, 
-                   image_url = %s, thumbnail = %s
-               WHERE plant_id = %s""",
-            (name, scientific_name, origin_id, botanist_id,
-             image_license_url, image_url, thumbnail, plant_id)
-        )
-        return plant_id
-
-
-def load_plant(conn, row: dict, botanist_id: int, origin_id: int) -> int:
-    """Load a single plant row into the database."""
-    existing = get_plant_by_id(conn, row["plant_id"])
-
-    # Convert NaN values to None for SQL compatibility
-    scientific_name = nan_to_none(row.get("scientific_name"))
-    image_license_url = nan_to_none(row.get("image_license_url"))
-    image_original_url = nan_to_none(row.get("image_original_url"))
-    image_thumbnail = nan_to_none(row.get("image_thumbnail"))
-
-    if existing:
-        return update_plant(
-            conn,
-            row["plant_id"],
-            row["name"],
-            scientific_name,
-            origin_id,
-            botanist_id,
-            image_license_url,
-            image_original_url,
-            image_thumbnail
-        )
-    else:
-        return create_plant(
-            conn,
-            row["plant_id"],
-            row["name"],
-            scientific_name,
-            origin_id,
-            botanist_id,
-            image_license_url,
-            image_original_url,
-            image_thumbnail
-        )
-
-
-def load_plants(df: pd.DataFrame, botanist_email_to_id: dict) -> None:
-    """Load all plants from dataframe into database.
+        actions = execute_upsert(conn, cursor, MERGE_PLANTS_QUERY,
+                                 UPDATE_STAGED_PLANTS_QUERY,
+                                 INSERT_STAGED_PLANTS_QUERY)
+
+    inserted = actions.count("INSERT")
+    updated = actions.count("UPDATE")
+    return {
+        "inserted": inserted,
+        "updated": updated,
+        "unchanged": n_staged - inserted - updated
+    }
+
+
+def load_plants_bulk(conn, df: pd.DataFrame, botanist_email_to_id: dict = None) -> dict:
+    """Upsert all plants with a set-based MERGE on an open connection.
+
+    Returns a dict with inserted, updated, unchanged and skipped counts.
+    """
+    if botanist_email_to_id:
+        DIMENSION_CACHE.update("botanist", botanist_email_to_id)
+
+    plants = resolve_plant_ids(conn, df)
+    rows = get_staging_rows(plants)
+    stage_plants(conn, rows)
+    counts = merge_staged_plants(conn, len(rows))
+    counts["skipped"] = df["plant_id"].nunique() - len(rows)
+    return counts
+
+
+def load_plants(df: pd.DataFrame, botanist_email_to_id: dict = None) -> dict:
+    """Load all plants from dataframe into database with a set-based MERGE.
+
+    Origin and botanist IDs come from the process-wide dimension cache, so the
+    number of round trips does not grow with the number of plants.
 
     Args:
         df: DataFrame with plant data
-        botanist_email_to_id: dict mapping botanist_email -> botanist_id
-    """
-    conn = get_connection()
+        botanist_email_to_id: optional dict mapping botanist_email -> botanist_id
 
-    try:
-        for _, row in df.iterrows():
-            botanist_id = botanist_email_to_id.get(row["botanist_email"])
-
-            # Look up origin_id directly from DB using coordinates
-            origin_id = get_origin_id(
-                conn,
-                row["origin_latitude"],
-                row["origin_longitude"]
-            )
-
-            if botanist_id is None:
-                print(f"Warning: No botanist_id for {row['botanist_email']}")
-                continue
-            if origin_id is None:
-                print(
-                    f"Warning: No origin_id for ({row['origin_latitude']}, {row['origin_longitude']})")
-                continue
-
-            load_plant(conn, row, botanist_id, origin_id)
-        conn.commit()
-    except Exception as e:
-        conn.rollback()
-        raise e
-    finally:
-        conn.close()
+    Returns a dict with inserted, updated, unchanged and skipped counts.
+    """
+    with open_transaction(get_connection) as conn:
+        return load_plants_bulk(conn, df, botanist_email_to_id)
 
 
 if __name__ == "__main__":
@@ -1,21 +1,57 @@
 """Load plant readings into the database."""
 # pylint: disable=no-member
 from os import environ as ENV
+from time import perf_counter
 import pandas as pd
-from dotenv import load_dotenv
-from pymssql import connect
 
+from db_backend import (get_connection, get_dialect, get_max_rows_per_insert, open_transaction,
+                        stage_rows)
 
-def get_connection():
-    """Create a connection to the MS SQL database."""
-    load_dotenv()
-    return connect(
-        server=ENV["DB_HOST"],
-        user=ENV["DB_USER"],
-        password=ENV["DB_PASSWORD"],
-        database=ENV["DB_NAME"],
-        port=ENV.get("DB_PORT", 1433)
-    )
+
+READING_COLUMNS = [
+    "plant_id",
+    "soil_moisture",
+    "temperature",
+    "recording_taken",
+    "last_watered"
+]
+
+# last_watered is stored once per watering in plant_watering (migration 005)
+STORED_READING_COLUMNS = READING_COLUMNS[:-1]
+
+WATERING_COLUMNS = ["plant_id", "watered_at"]
+
+MAX_ROWS_PER_INSERT = get_max_rows_per_insert(len(STORED_READING_COLUMNS))
+DEFAULT_BATCH_SIZE = int(ENV.get("READINGS_BATCH_SIZE", str(MAX_ROWS_PER_INSERT)))
+
+CREATE_WATERING_STAGING_QUERY = """
+    IF OBJECT_ID('tempdb..#watering_staging') IS NOT NULL DROP TABLE #watering_staging;
+    CREATE TABLE #watering_staging (
+        plant_id SMALLINT NOT NULL,
+        watered_at DATETIME2(0) NOT NULL,
+        PRIMARY KEY (plant_id, watered_at)
+    );
+"""
+
+# The lock hints stop concurrent loaders both inserting the same new watering
+INSERT_STAGED_WATERINGS_QUERY = {
+    "mssql": """
+        INSERT INTO plant_watering (plant_id, watered_at)
+        SELECT source.plant_id, source.watered_at
+        FROM #watering_staging AS source
+        WHERE NOT EXISTS (
+            SELECT 1 FROM plant_watering w WITH (UPDLOCK, HOLDLOCK)
+            WHERE w.plant_id = source.plant_id AND w.watered_at = source.watered_at)
+    """,
+    "sqlite": """
+        INSERT INTO plant_watering (plant_id, watered_at)
+        SELECT source.plant_id, source.watered_at
+        FROM #watering_staging AS source
+        WHERE NOT EXISTS (
+            SELECT 1 FROM plant_watering w
+            WHERE w.plant_id = source.plant_id AND w.watered_at = source.watered_at)
+    """
+}
 
 
 def load_csv(filepath: str) -> pd.DataFrame:
@@ -26,48 +62,100 @@ def load_csv(filepath: str) -> pd.DataFrame:
 def insert_plant_reading(conn, row: dict) -> None:
     """Insert a single plant reading into the database."""
     query = """
-        INSERT INTO plant_reading (plant_id, soil_moisture, temperature, recording_taken, last_watered)
-        VALUES (%s, %s, %s, %s, %s)
+        INSERT INTO plant_reading (plant_id, soil_moisture, temperature, recording_taken)
+        VALUES (%s, %s, %s, %s)
     """
     with conn.cursor() as cursor:
         cursor.execute(query, (
             row["plant_id"],
             row["soil_moisture"],
             row["temperature"],
-            row["recording_taken"],
-            row["last_watered"]
+            row["recording_taken"]
         ))
+    insert_waterings(conn, pd.DataFrame([row]))
+
+
+def get_reading_rows(df: pd.DataFrame) -> list[tuple]:
+    """Convert a readings DataFrame into a list of parameter tuples."""
+    return list(df[STORED_READING_COLUMNS].itertuples(index=False, name=None))
+
+
+def get_watering_rows(df: pd.DataFrame) -> list[tuple]:
+    """Return the distinct (plant_id, watered_at) events in a readings DataFrame.
+
+    Timestamps are truncated to the second, the precision they are stored at.
+    """
+    waterings = pd.DataFrame({
+        "plant_id": df["plant_id"],
+        "watered_at": pd.to_datetime(df["last_watered"]).dt.floor("s")
+    }).drop_duplicates().sort_values(["plant_id", "watered_at"])
+    return [(int(plant_id), watered_at.to_pydatetime())
+            for plant_id, watered_at in waterings.itertuples(index=False, name=None)]
+
+
+def insert_waterings(conn, df: pd.DataFrame) -> int:
+    """Record the watering events behind a batch of readings on an open connection.
+
+    Events already stored are skipped. Returns the number of new events.
+    """
+    rows = get_watering_rows(df)
+    if not rows:
+        return 0
+
+    with conn.cursor() as cursor:
+        cursor.execute(CREATE_WATERING_STAGING_QUERY)
+        stage_rows(cursor, "#watering_staging", WATERING_COLUMNS, rows)
+        cursor.execute(INSERT_STAGED_WATERINGS_QUERY[get_dialect(conn)])
+        return cursor.rowcount
+
+
+def get_batch_size(batch_size: int | None) -> int:
+    """Return a batch size that fits within SQL Server's parameter limits."""
+    if batch_size is None:
+        batch_size = DEFAULT_BATCH_SIZE
+    if batch_size < 1:
+        raise ValueError("Batch size must be at least 1.")
+    return min(batch_size, MAX_ROWS_PER_INSERT)
+
+
+def insert_plant_readings_bulk(conn, rows: list[tuple], batch_size: int = None) -> int:
+    """Insert plant readings in multi-row batches and return the row count."""
+    with conn.cursor() as cursor:
+        return stage_rows(cursor, "plant_reading", STORED_READING_COLUMNS, rows,
+                          get_batch_size(batch_size))
+
+
+def report_throughput(n_rows: int, seconds: float) -> None:
+    """Print the number of rows written and the rows per second."""
+    rate = n_rows / seconds if seconds > 0 else float("inf")
+    print(f"  Inserted {n_rows} plant readings in {seconds:.3f}s ({rate:.0f} rows/sec)")
 
 
-def load_plant_readings_from_csv(filepath: str) -> None:
-    """Load all plant readings from CSV into the database."""
-    df = load_csv(filepath)
-    conn = get_connection()
-
-    try:
-        for _, row in df.iterrows():
-            insert_plant_reading(conn, row)
-        conn.commit()
-    except Exception as e:
-        conn.rollback()
-        raise e
-    finally:
-        conn.close()
-
-
-def load_plant_readings(df: pd.DataFrame) -> None:
-    """Load all plant readings from DataFrame into the database."""
-    conn = get_connection()
-
-    try:
-        for _, row in df.iterrows():
-            insert_plant_reading(conn, row)
-        conn.commit()
-    except Exception as e:
-        conn.rollback()
-        raise e
-    finally:
-        conn.close()
+def load_plant_readings_bulk(conn, df: pd.DataFrame, batch_size: int = None) -> int:
+    """Bulk insert readings and their waterings on an open connection and report throughput."""
+    rows = get_reading_rows(df)
+    start = perf_counter()
+    inserted = insert_plant_readings_bulk(conn, rows, batch_size)
+    insert_waterings(conn, df)
+    report_throughput(inserted, perf_counter() - start)
+    return inserted
+
+
+def load_plant_readings(df: pd.DataFrame, batch_size: int = None) -> int:
+    """Load all plant readings from DataFrame into the database.
+
+    Returns the number of readings inserted.
+    """
+    with open_transaction(get_connection) as conn:
+        return load_plant_readings_bulk(conn, df, batch_size)
+
+
+def load_plant_readings_from_csv(filepath: str, batch_size: int = None) -> int:
+    """Load all plant readings from CSV into the database.
+
+    Reads the whole file into memory; use backfill_readings.py for large files.
+    """
+    return load_plant_readings(load_csv(filepath), batch_size)
 
 
 if __name__ == "__main__":
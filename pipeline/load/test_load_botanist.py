@@ -5,8 +5,13 @@ from load_botanist import (
     get_botanist_id,
     create_botanist,
     get_or_create_botanist,
-    load_botanists
+    load_botanists,
+    get_botanist_tuples,
+    stage_botanists,
+    merge_staged_botanists,
+    BOTANIST_STAGING_COLUMNS
 )
+from db_backend import get_max_rows_per_insert
 
 
 class TestGetBotanistId:
@@ -90,10 +95,14 @@ class TestLoadBotanists:
 
         mock_conn = mocker.MagicMock()
         mocker.patch("load_botanist.get_connection", return_value=mock_conn)
-        mocker.patch("load_botanist.load_botanist", side_effect=[10, 20])
+        mock_stage = mocker.patch("load_botanist.stage_botanists")
+        mocker.patch("load_botanist.merge_staged_botanists",
+                     return_value={'alice@test.com': 10, 'bob@test.com': 20})
 
         result = load_botanists(df)
 
+        assert len(mock_stage.call_args.args[1]) == 2
+
         assert result == {
             'alice@test.com': 10,
             'bob@test.com': 20
@@ -110,10 +119,64 @@ class TestLoadBotanists:
 
         mock_conn = mocker.MagicMock()
         mocker.patch("load_botanist.get_connection", return_value=mock_conn)
-        mocker.patch("load_botanist.load_botanist",
+        mocker.patch("load_botanist.stage_botanists")
+        mocker.patch("load_botanist.merge_staged_botanists",
                      side_effect=Exception("error"))
 
         with pytest.raises(Exception):
             load_botanists(df)
 
         mock_conn.rollback.assert_called_once()
+
+
+class TestGetBotanistTuples:
+    """Tests for the get_botanist_tuples function."""
+
+    def test_one_tuple_per_email(self):
+        """Should keep the latest details for each email."""
+        df = pd.DataFrame({
+            'botanist_name': ['Alice', 'Alice Smith', 'Bob'],
+            'botanist_email': ['alice@test.com', 'alice@test.com', 'bob@test.com'],
+            'botanist_phone': ['+1-111-1111', '+1-111-2222', None]
+        })
+
+        assert get_botanist_tuples(df) == [
+            ('Alice Smith', 'alice@test.com', '+1-111-2222'),
+            ('Bob', 'bob@test.com', None)
+        ]
+
+
+class TestStageBotanists:
+    """Tests for the stage_botanists function."""
+
+    def test_creates_table_and_inserts_in_batches(self, mocker):
+        """Should create the staging table then insert rows in batches."""
+        mock_cursor = mocker.MagicMock()
+        mock_conn = mocker.MagicMock()
+        mock_conn.cursor.return_value.__enter__.return_value = mock_cursor
+        rows = [('Name', f'{i}@test.com', None)
+                for i in range(get_max_rows_per_insert(len(BOTANIST_STAGING_COLUMNS)) + 1)]
+
+        stage_botanists(mock_conn, rows)
+
+        assert mock_cursor.execute.call_count == 3
+        assert len(mock_cursor.execute.call_args_list[2].args[1]) == 3
+
+
+class TestMergeStagedBotanists:
+    """Tests for the merge_staged_botanists function."""
+
+    def test_returns_complete_email_map(self, mocker):
+        """Should return IDs for new, updated and unchanged botanists."""
+        mock_cursor = mocker.MagicMock()
+        mock_cursor.fetchall.side_effect = [
+            [("INSERT",)],
+            [('alice@test.com', 10), ('bob@test.com', 20)]
+        ]
+        mock_conn = mocker.MagicMock()
+        mock_conn.cursor.return_value.__enter__.return_value = mock_cursor
+
+        result = merge_staged_botanists(mock_conn)
+
+        assert result == {'alice@test.com': 10, 'bob@test.com': 20}
+        assert "MERGE botanist" in mock_cursor.execute.call_args_list[0].args[0]
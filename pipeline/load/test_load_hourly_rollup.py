@@ -0,0 +1,136 @@
+"""Tests for the load_hourly_rollup module."""
+from datetime import datetime
+import pytest
+import pandas as pd
+from db_backend import connect_sqlite
+from load_plant_readings import load_plant_readings_bulk
+from load_hourly_rollup import (
+    get_hourly_rollups,
+    get_staging_rows,
+    upsert_hourly_rollups,
+    rebuild_hourly_rollups,
+    load_hourly_rollups,
+    ROLLUP_COLUMNS
+)
+
+
+@pytest.fixture
+def readings_df():
+    """Four readings for plant 1 across two hours and one for plant 2."""
+    return pd.DataFrame({
+        'plant_id': [1, 1, 1, 2, 1],
+        'soil_moisture': [40.0, 42.0, 44.0, 55.0, 30.0],
+        'temperature': [20.0, 21.0, 22.0, 18.0, 19.0],
+        'recording_taken': ['2026-01-27 10:00:00', '2026-01-27 10:20:00',
+                            '2026-01-27 10:40:00', '2026-01-27 10:05:00',
+                            '2026-01-27 11:00:00'],
+        'last_watered': ['2026-01-27 08:00:00', '2026-01-27 08:00:00',
+                         '2026-01-27 10:30:00', '2026-01-27 07:00:00',
+                         '2026-01-27 10:30:00']
+    })
+
+
+def get_stored_rollups(path: str) -> pd.DataFrame:
+    """Return every stored rollup, ordered by plant and hour."""
+    conn = connect_sqlite(path)
+    with conn.cursor() as cursor:
+        cursor.execute(f"SELECT {', '.join(ROLLUP_COLUMNS)} FROM plant_reading_hourly "
+                       "ORDER BY plant_id, reading_hour")
+        rows = cursor.fetchall()
+    conn.close()
+    return pd.DataFrame(rows, columns=ROLLUP_COLUMNS)
+
+
+class TestGetHourlyRollups:
+    """Tests for the get_hourly_rollups function."""
+
+    def test_aggregates_per_plant_and_hour(self, readings_df):
+        """Should produce one rollup per plant per hour."""
+        rollups = get_hourly_rollups(readings_df)
+
+        assert list(zip(rollups['plant_id'], rollups['reading_hour'].dt.hour)) == [
+            (1, 10), (1, 11), (2, 10)]
+        assert list(rollups['reading_count']) == [3, 1, 1]
+
+    def test_statistics(self, readings_df):
+        """Should keep min, max, sum, sum of squares and the watering range."""
+        first = get_hourly_rollups(readings_df).iloc[0]
+
+        assert (first['min_soil_moisture'], first['max_soil_moisture']) == (40.0, 44.0)
+        assert first['sum_temperature'] == 63.0
+        assert first['sum_squares_temperature'] == 20.0 ** 2 + 21.0 ** 2 + 22.0 ** 2
+        assert first['first_watered'] == pd.Timestamp('2026-01-27 08:00:00')
+        assert first['last_watered'] == pd.Timestamp('2026-01-27 10:30:00')
+
+    def test_staging_rows_are_plain_values(self, readings_df):
+        """Staging tuples should hold datetimes rather than pandas timestamps."""
+        row = get_staging_rows(get_hourly_rollups(readings_df))[0]
+
+        assert isinstance(row[1], datetime) and not isinstance(row[1], pd.Timestamp)
+        assert isinstance(row[-1], datetime) and not isinstance(row[-1], pd.Timestamp)
+
+
+class TestUpsertHourlyRollups:
+    """Tests for the upsert_hourly_rollups function."""
+
+    def test_skips_empty_batch(self, mocker):
+        """Should not touch the database without readings."""
+        conn = mocker.MagicMock()
+
+        counts = upsert_hourly_rollups(conn, pd.DataFrame(columns=[
+            'plant_id', 'soil_moisture', 'temperature', 'recording_taken', 'last_watered']))
+
+        assert counts == {'inserted': 0, 'updated': 0}
+        conn.cursor.assert_not_called()
+
+    def test_partial_hours_merge_to_the_full_hour(self, sqlite_path, readings_df):
+        """Loading an hour in pieces should store the same rollup as loading it at once."""
+        conn = connect_sqlite(sqlite_path)
+        first = upsert_hourly_rollups(conn, readings_df.iloc[[0, 3]])
+        second = upsert_hourly_rollups(conn, readings_df.iloc[[1, 2, 4]])
+        conn.commit()
+        conn.close()
+
+        assert first == {'inserted': 2, 'updated': 0}
+        assert second == {'inserted': 1, 'updated': 1}
+        expected = get_hourly_rollups(readings_df)
+        pd.testing.assert_frame_equal(get_stored_rollups(sqlite_path), expected,
+                                      check_dtype=False)
+
+
+class TestRebuildHourlyRollups:
+    """Tests for the rebuild_hourly_rollups function."""
+
+    def test_replaces_the_hours_with_their_readings(self, sqlite_path, readings_df):
+        """Rollups counted twice should be recomputed from the stored readings."""
+        conn = connect_sqlite(sqlite_path)
+        load_plant_readings_bulk(conn, readings_df)
+        upsert_hourly_rollups(conn, readings_df)
+        upsert_hourly_rollups(conn, readings_df)
+
+        rebuilt = rebuild_hourly_rollups(conn, datetime(2026, 1, 27, 10),
+                                         datetime(2026, 1, 27, 12))
+        rebuild_hourly_rollups(conn, datetime(2026, 1, 27, 10), datetime(2026, 1, 27, 12))
+        conn.commit()
+        conn.close()
+
+        assert rebuilt == 3
+        pd.testing.assert_frame_equal(get_stored_rollups(sqlite_path),
+                                      get_hourly_rollups(readings_df), check_dtype=False)
+
+
+class TestLoadHourlyRollups:
+    """Tests for the load_hourly_rollups function."""
+
+    def test_rolls_back_on_error(self, mocker, readings_df):
+        """Should roll back and re-raise if the upsert fails."""
+        mock_conn = mocker.MagicMock()
+        mocker.patch('load_hourly_rollup.get_connection', return_value=mock_conn)
+        mocker.patch('load_hourly_rollup.upsert_hourly_rollups',
+                     side_effect=Exception("DB error"))
+
+        with pytest.raises(Exception):
+            load_hourly_rollups(readings_df)
+
+        mock_conn.rollback.assert_called_once()
+        mock_conn.close.assert_called_once()
@@ -0,0 +1,107 @@
+"""Tests for the load_latest_reading module."""
+from datetime import datetime
+import pytest
+import pandas as pd
+from db_backend import connect_sqlite
+from load_latest_reading import (
+    get_latest_readings,
+    get_staging_rows,
+    upsert_latest_readings,
+    load_latest_readings
+)
+
+
+@pytest.fixture
+def readings_df():
+    """Two readings for plant 1 and one for plant 2, newest last."""
+    return pd.DataFrame({
+        'plant_id': [1, 2, 1],
+        'soil_moisture': [40.0, 55.0, 41.5],
+        'temperature': [20.0, 22.0, 20.5],
+        'recording_taken': ['2026-01-27 10:00:00', '2026-01-27 10:00:05',
+                            '2026-01-27 10:01:00'],
+        'last_watered': ['2026-01-27 08:00:00', '2026-01-26 22:00:05',
+                         '2026-01-27 08:00:00']
+    })
+
+
+def get_latest_rows(path: str) -> list[tuple]:
+    """Return (plant_id, soil_moisture, hours_since_watered) for every plant."""
+    conn = connect_sqlite(path)
+    with conn.cursor() as cursor:
+        cursor.execute("SELECT plant_id, soil_moisture, hours_since_watered "
+                       "FROM plant_latest_reading ORDER BY plant_id")
+        rows = cursor.fetchall()
+    conn.close()
+    return rows
+
+
+class TestGetLatestReadings:
+    """Tests for the get_latest_readings function."""
+
+    def test_keeps_newest_reading_per_plant(self, readings_df):
+        """Should keep one row per plant, taken from its newest reading."""
+        latest = get_latest_readings(readings_df)
+
+        assert list(latest['plant_id']) == [1, 2]
+        assert list(latest['soil_moisture']) == [41.5, 55.0]
+
+    def test_derives_hours_since_watered(self, readings_df):
+        """Should measure from the last watering to the reading."""
+        latest = get_latest_readings(readings_df)
+
+        assert list(latest['hours_since_watered']) == pytest.approx([2 + 1 / 60, 12])
+
+    def test_staging_rows_are_plain_values(self, readings_df):
+        """Staging tuples should hold Python types the database driver accepts."""
+        rows = get_staging_rows(get_latest_readings(readings_df))
+
+        assert [type(value) for value in rows[0]] == [
+            int, float, float, datetime, datetime, float]
+
+
+class TestUpsertLatestReadings:
+    """Tests for the upsert_latest_readings function."""
+
+    def test_skips_empty_batch(self, mocker):
+        """Should not touch the database without readings."""
+        conn = mocker.MagicMock()
+
+        counts = upsert_latest_readings(conn, pd.DataFrame(columns=[
+            'plant_id', 'soil_moisture', 'temperature', 'recording_taken', 'last_watered']))
+
+        assert counts == {'inserted': 0, 'updated': 0, 'unchanged': 0}
+        conn.cursor.assert_not_called()
+
+    def test_inserts_then_only_moves_forward(self, sqlite_path, readings_df):
+        """Newer readings should update a plant's row; older ones should not."""
+        conn = connect_sqlite(sqlite_path)
+        first = upsert_latest_readings(conn, readings_df)
+        newer = upsert_latest_readings(conn, readings_df.assign(
+            recording_taken='2026-01-27 11:00:00').iloc[[0]])
+        older = upsert_latest_readings(conn, readings_df.iloc[[1]].assign(
+            soil_moisture=1.0, recording_taken='2026-01-27 09:00:00'))
+        conn.commit()
+        conn.close()
+
+        assert first == {'inserted': 2, 'updated': 0, 'unchanged': 0}
+        assert newer == {'inserted': 0, 'updated': 1, 'unchanged': 0}
+        assert older == {'inserted': 0, 'updated': 0, 'unchanged': 1}
+        assert get_latest_rows(sqlite_path) == [(1, 40.0, 3.0), (2, 55.0, 12.0)]
+
+
+class TestLoadLatestReadings:
+    """Tests for the load_latest_readings function."""
+
+    def test_rolls_back_on_error(self, mocker, readings_df):
+        """Should roll back and re-raise if the upsert fails."""
+        mock_conn = mocker.MagicMock()
+        mocker.patch('load_latest_reading.get_connection', return_value=mock_conn)
+        mocker.patch('load_latest_reading.upsert_latest_readings',
+                     side_effect=Exception("DB error"))
+
+        with pytest.raises(Exception):
+            load_latest_readings(readings_df)
+
+        mock_conn.rollback.assert_called_once()
+        mock_conn.close.assert_called_once()
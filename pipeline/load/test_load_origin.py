@@ -12,8 +12,13 @@ from load_origin import (
     insert_origin,
     get_or_create_origin,
     load_origin,
-    load_origins
+    load_origins,
+    get_origin_tuples,
+    stage_origins,
+    upsert_staged_origins,
+    ORIGIN_STAGING_COLUMNS
 )
+from db_backend import get_max_rows_per_insert
 
 
 class TestGetCountryId:
@@ -245,12 +250,17 @@ class TestLoadOrigins:
             'origin_longitude': [-0.1, 2.3]
         })
 
+        id_maps = {"country": {}, "city": {}, "origin": {(51.5, -0.1): 1}}
+
         mock_conn = mocker.MagicMock()
         mocker.patch("load_origin.get_connection", return_value=mock_conn)
-        mocker.patch("load_origin.load_origin", side_effect=[1, 2])
+        mock_stage = mocker.patch("load_origin.stage_origins")
+        mocker.patch("load_origin.upsert_staged_origins", return_value=id_maps)
 
-        load_origins(df)
+        result = load_origins(df)
 
+        assert result == id_maps
+        assert len(mock_stage.call_args.args[1]) == 2
         mock_conn.commit.assert_called_once()
 
     def test_rollback_on_error(self, mocker):
@@ -264,9 +274,66 @@ class TestLoadOrigins:
 
         mock_conn = mocker.MagicMock()
         mocker.patch("load_origin.get_connection", return_value=mock_conn)
-        mocker.patch("load_origin.load_origin", side_effect=Exception("error"))
+        mocker.patch("load_origin.stage_origins")
+        mocker.patch("load_origin.upsert_staged_origins",
+                     side_effect=Exception("error"))
 
         with pytest.raises(Exception):
             load_origins(df)
 
         mock_conn.rollback.assert_called_once()
+
+
+class TestGetOriginTuples:
+    """Tests for the get_origin_tuples function."""
+
+    def test_returns_unique_tuples(self):
+        """Should drop duplicate and incomplete origins."""
+        df = pd.DataFrame({
+            'origin_country': ['UK', 'UK', 'France'],
+            'origin_city': ['London', 'London', None],
+            'origin_latitude': [51.5, 51.5, 48.8],
+            'origin_longitude': [-0.1, -0.1, 2.3]
+        })
+
+        assert get_origin_tuples(df) == [('UK', 'London', 51.5, -0.1)]
+
+
+class TestStageOrigins:
+    """Tests for the stage_origins function."""
+
+    def test_creates_table_and_inserts_in_batches(self, mocker):
+        """Should create the staging table then insert rows in batches."""
+        mock_cursor = mocker.MagicMock()
+        mock_conn = mocker.MagicMock()
+        mock_conn.cursor.return_value.__enter__.return_value = mock_cursor
+        rows = [('UK', 'London', float(i), 0.0)
+                for i in range(get_max_rows_per_insert(len(ORIGIN_STAGING_COLUMNS)) + 1)]
+
+        stage_origins(mock_conn, rows)
+
+        assert mock_cursor.execute.call_count == 3
+        assert len(mock_cursor.execute.call_args_list[2].args[1]) == 4
+
+
+class TestUpsertStagedOrigins:
+    """Tests for the upsert_staged_origins function."""
+
+    def test_builds_id_maps(self, mocker):
+        """Should return country, city and origin maps from one query."""
+        mock_cursor = mocker.MagicMock()
+        mock_cursor.fetchall.return_value = [
+            ('UK', 5, 'London', 10, 51.5, -0.1, 100),
+            ('UK', 5, 'Leeds', 11, 53.8, -1.5, 101)
+        ]
+        mock_conn = mocker.MagicMock()
+        mock_conn.cursor.return_value.__enter__.return_value = mock_cursor
+
+        result = upsert_staged_origins(mock_conn)
+
+        assert result == {
+            "country": {'UK': 5},
+            "city": {('London', 5): 10, ('Leeds', 5): 11},
+            "origin": {(51.5, -0.1): 100, (53.8, -1.5): 101}
+        }
+        assert mock_cursor.execute.call_count == 2
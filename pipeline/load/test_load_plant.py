@@ -3,13 +3,33 @@ import pytest
 import pandas as pd
 from load_plant import (
     get_origin_id,
-    get_plant_by_id,
-    create_plant,
-    update_plant,
-    load_plant,
     load_plants,
-    nan_to_none
+    nan_to_none,
+    get_staging_rows,
+    stage_plants,
+    merge_staged_plants,
+    resolve_plant_ids,
+    get_existing_plant_ids,
+    PLANT_STAGING_COLUMNS
 )
+from db_backend import get_max_rows_per_insert
+from dimension_cache import DIMENSION_CACHE
+
+
+@pytest.fixture
+def plants_df():
+    """Two transformed plants."""
+    return pd.DataFrame({
+        'plant_id': [1, 2],
+        'name': ['Rose', 'Tulip'],
+        'scientific_name': ['Rosa', None],
+        'botanist_email': ['alice@test.com', 'bob@test.com'],
+        'origin_latitude': [51.5, 52.3],
+        'origin_longitude': [-0.1, 1.2],
+        'image_license_url': [None, float('nan')],
+        'image_original_url': [None, None],
+        'image_thumbnail': [None, None]
+    })
 
 
 class TestNanToNone:
@@ -51,162 +71,146 @@ class TestGetOriginId:
         assert result is None
 
 
-class TestGetPlantById:
-    """Tests for the get_plant_by_id function."""
+class TestGetExistingPlantIds:
+    """Tests for the get_existing_plant_ids function."""
 
-    def test_returns_id_when_found(self, mocker):
-        """Should return plant_id when it exists."""
+    def test_returns_set_of_ids(self, mocker):
+        """Should return every plant_id in one query."""
         mock_cursor = mocker.MagicMock()
-        mock_cursor.fetchone.return_value = (10,)
+        mock_cursor.fetchall.return_value = [(1,), (2,), (5,)]
         mock_conn = mocker.MagicMock()
         mock_conn.cursor.return_value.__enter__.return_value = mock_cursor
 
-        result = get_plant_by_id(mock_conn, 10)
+        assert get_existing_plant_ids(mock_conn) == {1, 2, 5}
+        mock_cursor.execute.assert_called_once()
 
-        assert result == 10
 
-    def test_returns_none_when_not_found(self, mocker):
-        """Should return None when plant doesn't exist."""
-        mock_cursor = mocker.MagicMock()
-        mock_cursor.fetchone.return_value = None
+class TestResolvePlantIds:
+    """Tests for the resolve_plant_ids function."""
+
+    def test_resolves_from_cache(self, mocker, plants_df):
+        """Should resolve IDs from the warmed cache without per-plant queries."""
+        mocker.patch.object(DIMENSION_CACHE, "refresh")
+        DIMENSION_CACHE.update("botanist", {'alice@test.com': 10, 'bob@test.com': 20})
+        DIMENSION_CACHE.update("origin", {(51.5, -0.1): 5, (52.3, 1.2): 6})
         mock_conn = mocker.MagicMock()
-        mock_conn.cursor.return_value.__enter__.return_value = mock_cursor
 
-        result = get_plant_by_id(mock_conn, 999)
+        result = resolve_plant_ids(mock_conn, plants_df)
 
-        assert result is None
+        assert result["botanist_id"].tolist() == [10, 20]
+        assert result["origin_id"].tolist() == [5, 6]
+        mock_conn.cursor.assert_not_called()
 
+    def test_drops_unresolved_plants(self, mocker, plants_df):
+        """Should skip plants missing from an authoritative cache."""
+        mocker.patch.object(DIMENSION_CACHE, "refresh")
+        mocker.patch.object(DIMENSION_CACHE, "is_authoritative", return_value=True)
+        DIMENSION_CACHE.update("botanist", {'alice@test.com': 10, 'bob@test.com': 20})
+        DIMENSION_CACHE.update("origin", {(51.5, -0.1): 5})
 
-class TestCreatePlant:
-    """Tests for the create_plant function."""
+        result = resolve_plant_ids(mocker.MagicMock(), plants_df)
 
-    def test_inserts_plant_and_returns_id(self, mocker):
-        """Should insert plant and return plant_id."""
-        mock_cursor = mocker.MagicMock()
-        mock_conn = mocker.MagicMock()
-        mock_conn.cursor.return_value.__enter__.return_value = mock_cursor
+        assert result["plant_id"].tolist() == [1]
 
-        result = create_plant(
-            mock_conn, 1, "Rose", "Rosa", 5, 3,
-            "http://license.com", "http://image.com", "http://thumb.com"
-        )
+    def test_falls_back_to_database_when_cache_partial(self, mocker, plants_df):
+        """Should query the database for misses when the cache is incomplete."""
+        mocker.patch.object(DIMENSION_CACHE, "refresh")
+        DIMENSION_CACHE.update("botanist", {'alice@test.com': 10, 'bob@test.com': 20})
+        mock_get_origin = mocker.patch("load_plant.get_origin_id", side_effect=[5, 6])
 
-        assert result == 1
-        mock_cursor.execute.assert_called_once()
+        result = resolve_plant_ids(mocker.MagicMock(), plants_df)
+
+        assert result["origin_id"].tolist() == [5, 6]
+        assert mock_get_origin.call_count == 2
+
+
+class TestGetStagingRows:
+    """Tests for the get_staging_rows function."""
 
+    def test_converts_nan_to_none(self, plants_df):
+        """Should return tuples in staging order with NaN replaced by None."""
+        plants = plants_df.assign(origin_id=[5, 6], botanist_id=[10, 20])
 
-class TestUpdatePlant:
-    """Tests for the update_plant function."""
+        rows = get_staging_rows(plants)
 
-    def test_updates_plant_and_returns_id(self, mocker):
-        """Should update plant and return plant_id."""
+        assert rows[1] == (2, 'Tulip', None, 6, 20, None, None, None)
+
+
+class TestStagePlants:
+    """Tests for the stage_plants function."""
+
+    def test_creates_table_and_inserts_in_batches(self, mocker):
+        """Should create the staging table then insert rows in batches."""
         mock_cursor = mocker.MagicMock()
         mock_conn = mocker.MagicMock()
         mock_conn.cursor.return_value.__enter__.return_value = mock_cursor
+        rows = [(i, 'Rose', None, 5, 3, None, None, None)
+                for i in range(get_max_rows_per_insert(len(PLANT_STAGING_COLUMNS)) + 1)]
 
-        result = update_plant(
-            mock_conn, 1, "Sunflower", "Helianthus", 7, 2,
-            None, None, None
-        )
+        stage_plants(mock_conn, rows)
 
-        assert result == 1
-        mock_cursor.execute.assert_called_once()
+        assert mock_cursor.execute.call_count == 3
+        assert "#plant_staging" in mock_cursor.execute.call_args_list[0].args[0]
+        assert len(mock_cursor.execute.call_args_list[2].args[1]) == 8
 
 
-class TestLoadPlant:
-    """Tests for the load_plant function."""
+class TestMergeStagedPlants:
+    """Tests for the merge_staged_plants function."""
 
-    def test_creates_new_plant(self, mocker):
-        """Should create plant when it doesn't exist."""
-        mocker.patch("load_plant.get_plant_by_id", return_value=None)
-        mock_create = mocker.patch("load_plant.create_plant", return_value=5)
+    def test_counts_actions(self, mocker):
+        """Should count inserted, updated and unchanged plants."""
+        mock_cursor = mocker.MagicMock()
+        mock_cursor.fetchall.return_value = [("INSERT",), ("UPDATE",), ("INSERT",)]
         mock_conn = mocker.MagicMock()
+        mock_conn.cursor.return_value.__enter__.return_value = mock_cursor
 
-        row = {
-            "plant_id": 5,
-            "name": "Cactus",
-            "scientific_name": "Cactaceae",
-            "image_license_url": None,
-            "image_original_url": None,
-            "image_thumbnail": None
-        }
-
-        result = load_plant(mock_conn, row, botanist_id=2, origin_id=8)
+        result = merge_staged_plants(mock_conn, 5)
 
-        assert result == 5
-        mock_create.assert_called_once()
+        assert result == {"inserted": 2, "updated": 1, "unchanged": 2}
 
-    def test_updates_existing_plant(self, mocker):
-        """Should update plant when it exists."""
-        mocker.patch("load_plant.get_plant_by_id", return_value=5)
-        mock_update = mocker.patch("load_plant.update_plant", return_value=5)
+    def test_merge_only_updates_changed_rows(self, mocker):
+        """The MERGE should guard updates with a change check."""
+        mock_cursor = mocker.MagicMock()
+        mock_cursor.fetchall.return_value = []
         mock_conn = mocker.MagicMock()
+        mock_conn.cursor.return_value.__enter__.return_value = mock_cursor
 
-        row = {
-            "plant_id": 5,
-            "name": "Updated Cactus",
-            "scientific_name": "Cactaceae",
-            "image_license_url": None,
-            "image_original_url": None,
-            "image_thumbnail": None
-        }
+        merge_staged_plants(mock_conn, 0)
 
-        result = load_plant(mock_conn, row, botanist_id=2, origin_id=8)
-
-        assert result == 5
-        mock_update.assert_called_once()
+        merge_query = mock_cursor.execute.call_args_list[0].args[0]
+        assert "MERGE plant" in merge_query
+        assert "EXCEPT" in merge_query
 
 
 class TestLoadPlants:
     """Tests for the load_plants function."""
 
-    def test_loads_all_plants(self, mocker):
-        """Should load all plants from dataframe."""
-        df = pd.DataFrame({
-            'plant_id': [1, 2],
-            'name': ['Rose', 'Tulip'],
-            'scientific_name': ['Rosa', 'Tulipa'],
-            'botanist_email': ['alice@test.com', 'bob@test.com'],
-            'origin_latitude': [51.5, 52.3],
-            'origin_longitude': [-0.1, 1.2],
-            'image_license_url': [None, None],
-            'image_original_url': [None, None],
-            'image_thumbnail': [None, None]
-        })
-
+    def test_loads_all_plants(self, mocker, plants_df):
+        """Should resolve, stage and merge all plants in one transaction."""
         botanist_map = {'alice@test.com': 10, 'bob@test.com': 20}
+        counts = {"inserted": 2, "updated": 0, "unchanged": 0}
 
         mock_conn = mocker.MagicMock()
         mocker.patch("load_plant.get_connection", return_value=mock_conn)
-        mocker.patch("load_plant.get_origin_id", side_effect=[5, 6])
-        mocker.patch("load_plant.load_plant")
+        mocker.patch("load_plant.resolve_plant_ids",
+                     return_value=plants_df.assign(origin_id=[5, 6], botanist_id=[10, 20]))
+        mock_stage = mocker.patch("load_plant.stage_plants")
+        mocker.patch("load_plant.merge_staged_plants", return_value=counts)
 
-        load_plants(df, botanist_map)
+        result = load_plants(plants_df, botanist_map)
 
+        assert result == {"inserted": 2, "updated": 0, "unchanged": 0, "skipped": 0}
+        assert len(mock_stage.call_args.args[1]) == 2
         mock_conn.commit.assert_called_once()
 
-    def test_rollback_on_error(self, mocker):
+    def test_rollback_on_error(self, mocker, plants_df):
         """Should rollback on error."""
-        df = pd.DataFrame({
-            'plant_id': [1],
-            'name': ['Rose'],
-            'scientific_name': ['Rosa'],
-            'botanist_email': ['alice@test.com'],
-            'origin_latitude': [51.5],
-            'origin_longitude': [-0.1],
-            'image_license_url': [None],
-            'image_original_url': [None],
-            'image_thumbnail': [None]
-        })
-
-        botanist_map = {'alice@test.com': 10}
-
         mock_conn = mocker.MagicMock()
         mocker.patch("load_plant.get_connection", return_value=mock_conn)
-        mocker.patch("load_plant.get_origin_id", return_value=5)
-        mocker.patch("load_plant.load_plant", side_effect=Exception("error"))
+        mocker.patch("load_plant.resolve_plant_ids",
+                     side_effect=Exception("error"))
 
         with pytest.raises(Exception):
-            load_plants(df, botanist_map)
+            load_plants(plants_df, {'alice@test.com': 10})
 
         mock_conn.rollback.assert_called_once()
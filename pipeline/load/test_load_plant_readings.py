@@ -1,14 +1,39 @@
 """Tests for the load_plant_readings module."""
+from datetime import datetime
 import pytest
 import pandas as pd
-from load_plant_readings import insert_plant_reading, load_plant_readings
+from db_backend import connect_sqlite
+from load_plant_readings import (
+    insert_plant_reading,
+    load_plant_readings,
+    load_plant_readings_from_csv,
+    get_reading_rows,
+    get_batch_size,
+    insert_plant_readings_bulk,
+    load_plant_readings_bulk,
+    get_watering_rows,
+    insert_waterings,
+    MAX_ROWS_PER_INSERT
+)
+
+
+@pytest.fixture
+def readings_df():
+    """Three plant readings."""
+    return pd.DataFrame({
+        'plant_id': [1, 2, 3],
+        'soil_moisture': [25.5, 30.1, 40.2],
+        'temperature': [18.2, 19.0, 20.5],
+        'recording_taken': ['2026-01-27', '2026-01-27', '2026-01-27'],
+        'last_watered': ['2026-01-26', '2026-01-26', '2026-01-26']
+    })
 
 
 class TestInsertPlantReading:
     """Tests for the insert_plant_reading function."""
 
     def test_calls_execute(self, mocker):
-        """Should call cursor.execute."""
+        """Should insert the reading, then record its watering."""
         mock_cursor = mocker.MagicMock()
         mock_conn = mocker.MagicMock()
         mock_conn.cursor.return_value.__enter__ = mocker.MagicMock(
@@ -26,7 +51,9 @@ class TestInsertPlantReading:
 
         insert_plant_reading(mock_conn, row)
 
-        mock_cursor.execute.assert_called_once()
+        queries = [call.args[0] for call in mock_cursor.execute.call_args_list]
+        assert "INSERT INTO plant_reading" in queries[0]
+        assert "INSERT INTO plant_watering" in queries[-1]
 
 
 class TestLoadPlantReadings:
@@ -64,10 +91,138 @@ class TestLoadPlantReadings:
         mock_conn = mocker.MagicMock()
         mocker.patch("load_plant_readings.get_connection",
                      return_value=mock_conn)
-        mocker.patch("load_plant_readings.insert_plant_reading",
+        mocker.patch("load_plant_readings.insert_plant_readings_bulk",
                      side_effect=Exception("error"))
 
         with pytest.raises(Exception):
             load_plant_readings(df)
 
         mock_conn.rollback.assert_called_once()
+
+    def test_returns_row_count(self, mocker, readings_df):
+        """Should return the number of readings inserted."""
+        mocker.patch("load_plant_readings.get_connection",
+                     return_value=mocker.MagicMock())
+
+        assert load_plant_readings(readings_df) == 3
+
+    def test_csv_uses_bulk_loader(self, mocker, readings_df):
+        """Should load CSV readings through the bulk loader."""
+        mocker.patch("load_plant_readings.load_csv", return_value=readings_df)
+        mocker.patch("load_plant_readings.get_connection",
+                     return_value=mocker.MagicMock())
+        mock_bulk = mocker.patch("load_plant_readings.insert_plant_readings_bulk",
+                                 return_value=3)
+
+        load_plant_readings_from_csv("readings.csv", batch_size=2)
+
+        mock_bulk.assert_called_once()
+        assert mock_bulk.call_args.args[2] == 2
+
+
+class TestGetReadingRows:
+    """Tests for the get_reading_rows function."""
+
+    def test_returns_tuples_in_column_order(self, readings_df):
+        """Should return one tuple per reading in insert column order."""
+        rows = get_reading_rows(readings_df)
+
+        assert len(rows) == 3
+        assert rows[0] == (1, 25.5, 18.2, '2026-01-27')
+
+
+class TestGetBatchSize:
+    """Tests for the get_batch_size function."""
+
+    @pytest.mark.parametrize("requested, expected", [
+        [1, 1],
+        [100, 100],
+        [5000, MAX_ROWS_PER_INSERT],
+    ])
+    def test_caps_at_parameter_limit(self, requested, expected):
+        """Should never exceed SQL Server's parameter limit."""
+        assert get_batch_size(requested) == expected
+        assert get_batch_size(requested) * 4 < 2100
+
+    def test_rejects_non_positive(self):
+        """Should raise for batch sizes below one."""
+        with pytest.raises(ValueError):
+            get_batch_size(0)
+
+
+class TestInsertPlantReadingsBulk:
+    """Tests for the insert_plant_readings_bulk function."""
+
+    def test_executes_one_statement_per_batch(self, mocker, readings_df):
+        """Should split rows into batches of the requested size."""
+        mock_cursor = mocker.MagicMock()
+        mock_conn = mocker.MagicMock()
+        mock_conn.cursor.return_value.__enter__.return_value = mock_cursor
+
+        result = insert_plant_readings_bulk(
+            mock_conn, get_reading_rows(readings_df), batch_size=2)
+
+        assert result == 3
+        assert mock_cursor.execute.call_count == 2
+        assert len(mock_cursor.execute.call_args_list[0].args[1]) == 8
+        assert len(mock_cursor.execute.call_args_list[1].args[1]) == 4
+
+    def test_no_rows(self, mocker):
+        """Should not execute anything for an empty batch."""
+        mock_cursor = mocker.MagicMock()
+        mock_conn = mocker.MagicMock()
+        mock_conn.cursor.return_value.__enter__.return_value = mock_cursor
+
+        assert insert_plant_readings_bulk(mock_conn, []) == 0
+        mock_cursor.execute.assert_not_called()
+
+
+class TestLoadPlantReadingsBulk:
+    """Tests for the load_plant_readings_bulk function."""
+
+    def test_uses_given_connection_without_committing(self, mocker, readings_df):
+        """Should insert on the caller's connection and leave the commit to it."""
+        mock_conn = mocker.MagicMock()
+        mock_get_connection = mocker.patch("load_plant_readings.get_connection")
+
+        result = load_plant_readings_bulk(mock_conn, readings_df)
+
+        assert result == 3
+        mock_get_connection.assert_not_called()
+        mock_conn.commit.assert_not_called()
+
+
+class TestGetWateringRows:
+    """Tests for the get_watering_rows function."""
+
+    def test_one_row_per_watering(self, readings_df):
+        """Readings that share a watering should give one event."""
+        rows = get_watering_rows(readings_df.assign(plant_id=[1, 1, 2]))
+
+        assert rows == [(1, datetime(2026, 1, 26)), (2, datetime(2026, 1, 26))]
+
+    def test_truncates_to_the_second(self, readings_df):
+        """Fractions of a second should not create separate events."""
+        rows = get_watering_rows(readings_df.assign(
+            plant_id=1, last_watered=['2026-01-26 08:00:00.200', '2026-01-26 08:00:00.700',
+                                      '2026-01-26 08:00:00.000']))
+
+        assert rows == [(1, datetime(2026, 1, 26, 8))]
+
+
+class TestInsertWaterings:
+    """Tests for the insert_waterings function."""
+
+    def test_skips_waterings_already_stored(self, sqlite_path, readings_df):
+        """Replaying a batch should not add its waterings twice."""
+        conn = connect_sqlite(sqlite_path)
+        first = insert_waterings(conn, readings_df)
+        second = insert_waterings(conn, readings_df.assign(
+            last_watered=['2026-01-26 00:00:00', '2026-01-26 00:00:00', '2026-01-27 06:00:00']))
+        conn.commit()
+        with conn.cursor() as cursor:
+            cursor.execute("SELECT COUNT(*) FROM plant_watering")
+            stored = cursor.fetchone()[0]
+        conn.close()
+
+        assert (first, second, stored) == (3, 1, 4)
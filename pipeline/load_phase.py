@@ -0,0 +1,134 @@
+"""The load phase of the pipeline: one transaction, or concurrent loaders.
+
+Kept apart from pipeline.py so the load can be run and benchmarked without
+importing the extract and transform stages.
+"""
+from os import environ as ENV
+
+from load_session import LoadSession
+from load_scheduler import ConnectionPool, build_load_scheduler
+from reading_spool import ReadingSpool, get_readings_to_load
+from load.load_origin import load_origins_bulk
+from load.load_botanist import load_botanists_bulk
+from load.load_plant import load_plants_bulk
+from load.load_plant_readings import load_plant_readings_bulk
+from load.load_hourly_rollup import upsert_hourly_rollups
+from load.load_latest_reading import upsert_latest_readings
+
+
+def get_load_concurrency() -> int:
+    """Return the number of pooled connections to load with.
+
+    The default of 1 keeps the single transaction of load(), so a failure
+    leaves no partial data, on every backend. Setting LOAD_CONCURRENCY above
+    1 opts in to load_concurrently(), which commits each loader on its own.
+    """
+    return int(ENV.get("LOAD_CONCURRENCY", "1"))
+
+
+LOAD_CONCURRENCY = get_load_concurrency()
+
+
+def load_concurrently(transformed_data: dict, workers: int = LOAD_CONCURRENCY,
+                      connection_factory=None, spool: ReadingSpool = None) -> None:
+    """Load all transformed data, running independent loaders concurrently.
+
+    Only used when LOAD_CONCURRENCY is above 1. Each loader commits on its
+    own pooled connection, so unlike load() a failure can leave the loaders
+    that already finished committed: for example new origins and botanists
+    without the plants that would have referenced them.
+    """
+    print("\n=== LOAD PHASE (concurrent) ===")
+
+    spool = ReadingSpool() if spool is None else spool
+    pool = ConnectionPool(workers, connection_factory)
+    try:
+        with spool.protect(transformed_data["readings"]):
+            scheduler = build_load_scheduler(transformed_data, pool, spool)
+            results = scheduler.run()
+    finally:
+        pool.close()
+
+    print(f"  Loaded {len(results['origins']['origin'])} unique origins, "
+          f"{len(results['botanists'])} botanists and "
+          f"{len(transformed_data['plant'])} plants")
+    print("\nLoad timings:")
+    scheduler.report()
+
+    print("\n=== PIPELINE COMPLETE ===")
+
+
+def load(transformed_data: dict, connection_factory=None,
+         spool: ReadingSpool = None) -> None:
+    """Load all transformed data into the database.
+
+    Order of loading respects foreign key constraints:
+    1. country (created via origin load)
+    2. city (created via origin load)
+    3. origin
+    4. botanist
+    5. plant (references origin_id and botanist_id)
+    6. plant_reading (references plant_id)
+    7. plant_reading_hourly (references plant_id)
+    8. plant_latest_reading (references plant_id)
+    """
+    print("\n=== LOAD PHASE ===")
+
+    origin_df = transformed_data["origin"]
+    botanist_df = transformed_data["botanist"]
+    plant_df = transformed_data["plant"]
+    readings_df = transformed_data["readings"]
+
+    # All loaders share one connection and one transaction, so a failure
+    # part way through leaves no partial data behind. If it fails, the
+    # readings are spooled locally and drained by the next successful load.
+    spool = ReadingSpool() if spool is None else spool
+    with spool.protect(readings_df):
+        with LoadSession(connection_factory) as session:
+            # 1. Load origins (also creates countries and cities)
+            print("Loading origins (with countries and cities)...")
+            with session.step("origins"):
+                origin_id_maps = load_origins_bulk(session.conn, origin_df)
+            print(f"  Loaded {len(origin_id_maps['origin'])} unique origins")
+
+            # 2. Load botanists
+            print("Loading botanists...")
+            with session.step("botanists"):
+                botanist_email_to_id = load_botanists_bulk(session.conn, botanist_df)
+            print(f"  Loaded {len(botanist_email_to_id)} unique botanists")
+
+            # 3. Load plants (origin_id and botanist_id come from the dimension cache)
+            print("Loading plants...")
+            with session.step("plants"):
+                plant_counts = load_plants_bulk(
+                    session.conn, plant_df, botanist_email_to_id)
+            print(f"  Loaded {len(plant_df)} plants ({plant_counts['inserted']} inserted, "
+                  f"{plant_counts['updated']} updated, {plant_counts['unchanged']} unchanged, "
+                  f"{plant_counts['skipped']} skipped)")
+
+            # 4. Load plant readings
+            print("Loading plant readings...")
+            with session.step("readings"):
+                new_readings = get_readings_to_load(session.conn, readings_df, spool)
+                n_readings = load_plant_readings_bulk(session.conn, new_readings)
+            print(f"  Loaded {n_readings} plant readings")
+
+            # 5. Merge the inserted readings into their hourly rollups
+            print("Updating hourly rollups...")
+            with session.step("hourly_rollups"):
+                rollup_counts = upsert_hourly_rollups(session.conn, new_readings)
+            print(f"  Updated hourly rollups ({rollup_counts['inserted']} inserted, "
+                  f"{rollup_counts['updated']} updated)")
+
+            # 6. Move each plant's latest reading forward
+            print("Updating latest readings...")
+            with session.step("latest_readings"):
+                latest_counts = upsert_latest_readings(session.conn, readings_df)
+            print(f"  Updated latest readings ({latest_counts['inserted']} inserted, "
+                  f"{latest_counts['updated']} updated, "
+                  f"{latest_counts['unchanged']} unchanged)")
+
+    print("\nLoad timings:")
+    session.report()
+
+    print("\n=== PIPELINE COMPLETE ===")
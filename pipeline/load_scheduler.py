@@ -0,0 +1,225 @@
+"""Run independent loaders concurrently on pooled database connections.
+
+Tasks declare the tasks they depend on. Every task whose dependencies have
+finished is started straight away on its own pooled connection, and each task
+commits its own transaction when it succeeds, so dependants on other
+connections can see (and reference) what it wrote.
+"""
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from contextlib import contextmanager
+from queue import Queue, Empty
+from threading import Lock
+from time import perf_counter
+
+from dimension_cache import DIMENSION_CACHE
+from db_backend import get_connection, transaction
+from load.load_origin import load_origins_bulk
+from load.load_botanist import load_botanists_bulk
+from load.load_plant import load_plants_bulk, get_existing_plant_ids
+from load.load_plant_readings import load_plant_readings_bulk
+from load.load_latest_reading import upsert_latest_readings
+from load.load_hourly_rollup import upsert_hourly_rollups
+from reading_spool import ReadingSpool, get_readings_to_load
+
+
+class ConnectionPool:
+    """A small pool of lazily opened connections, safe to share between threads."""
+
+    def __init__(self, size: int, connection_factory=None):
+        if size < 1:
+            raise ValueError("Pool size must be at least 1.")
+        self.size = size
+        self.connection_factory = connection_factory or get_connection
+        self.login_seconds = 0.0
+        self._idle = Queue()
+        self._created = []
+        self._reserved = 0
+        self._lock = Lock()
+
+    def _open(self):
+        """Open a new connection and record how long the login took."""
+        start = perf_counter()
+        conn = self.connection_factory()
+        with self._lock:
+            self.login_seconds += perf_counter() - start
+            self._created.append(conn)
+        return conn
+
+    def _get(self):
+        """Return an idle connection, opening one if the pool is not full."""
+        try:
+            return self._idle.get_nowait()
+        except Empty:
+            pass
+        # Reserve the slot under the lock, so racing threads cannot open more than `size`
+        with self._lock:
+            can_open = self._reserved < self.size
+            if can_open:
+                self._reserved += 1
+        if not can_open:
+            return self._idle.get()
+        try:
+            return self._open()
+        except Exception as e:
+            with self._lock:
+                self._reserved -= 1
+            raise e
+
+    @contextmanager
+    def acquire(self):
+        """Borrow a connection for the duration of the block."""
+        conn = self._get()
+        try:
+            yield conn
+        finally:
+            self._idle.put(conn)
+
+    @property
+    def opened(self) -> int:
+        """Number of connections opened so far."""
+        return len(self._created)
+
+    def close(self) -> None:
+        """Close every connection the pool has opened."""
+        for conn in self._created:
+            conn.close()
+        self._created.clear()
+        self._reserved = 0
+
+
+class LoadTask:
+    """A named loader and the names of the tasks it depends on.
+
+    `func` is called as func(conn, results), where results maps the name of
+    every finished task to the value it returned.
+    """
+
+    def __init__(self, name: str, func, depends_on: tuple = ()):
+        self.name = name
+        self.func = func
+        self.depends_on = tuple(depends_on)
+
+
+class LoadScheduler:
+    """Run load tasks as soon as their dependencies have committed."""
+
+    def __init__(self, pool: ConnectionPool):
+        self.pool = pool
+        self.tasks = {}
+        self.timings = {}
+        self._started = 0.0
+
+    def add_task(self, name: str, func, depends_on: tuple = ()) -> None:
+        """Register a task. Dependencies must be registered first."""
+        if name in self.tasks:
+            raise ValueError(f"Duplicate load task '{name}'.")
+        missing = [dep for dep in depends_on if dep not in self.tasks]
+        if missing:
+            raise ValueError(f"Load task '{name}' depends on unknown tasks: {missing}")
+        self.tasks[name] = LoadTask(name, func, depends_on)
+
+    def _run_task(self, task: LoadTask, results: dict):
+        """Run one task in its own transaction on a pooled connection."""
+        with self.pool.acquire() as conn:
+            start = perf_counter()
+            try:
+                with transaction(conn, DIMENSION_CACHE.invalidate):
+                    result = task.func(conn, results)
+            finally:
+                self.timings[task.name] = (start - self._started,
+                                           perf_counter() - self._started)
+        return result
+
+    def run(self, max_workers: int = None) -> dict:
+        """Run every task, overlapping any that do not depend on each other.
+
+        Returns a dict mapping task name -> result. The first task error is
+        re-raised once the tasks already running have finished; tasks that
+        had not started are skipped.
+        """
+        self._started = perf_counter()
+        results = {}
+        pending = dict(self.tasks)
+        running = {}
+
+        with ThreadPoolExecutor(max_workers or self.pool.size) as executor:
+            while pending or running:
+                for name, task in list(pending.items()):
+                    if all(dep in results for dep in task.depends_on):
+                        future = executor.submit(self._run_task, task, dict(results))
+                        running[future] = name
+                        del pending[name]
+
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    results[running.pop(future)] = future.result()
+
+        return results
+
+    def run_serial(self) -> dict:
+        """Run every task one after another in registration order."""
+        self._started = perf_counter()
+        results = {}
+        for task in self.tasks.values():
+            results[task.name] = self._run_task(task, dict(results))
+        return results
+
+    @property
+    def wall_seconds(self) -> float:
+        """Time from the start of the run until the last task finished."""
+        return max((end for _, end in self.timings.values()), default=0.0)
+
+    def report(self) -> None:
+        """Print when each task started and finished relative to the run."""
+        print(f"  Login: {self.pool.login_seconds:.3f}s across "
+              f"{self.pool.opened} connections")
+        for name, (start, end) in self.timings.items():
+            print(f"  {name}: {start:.3f}s -> {end:.3f}s ({end - start:.3f}s)")
+        print(f"  Wall clock: {self.wall_seconds:.3f}s")
+
+
+def build_load_scheduler(transformed_data: dict, pool: ConnectionPool,
+                         spool: ReadingSpool = None) -> LoadScheduler:
+    """Build the load task graph.
+
+    Origins and botanists are independent. Readings for plants that already
+    exist start immediately; readings for new plants wait for the plant load,
+    and so does draining any spooled readings, whose plants may be new too.
+    Both reading tasks merge what they insert into the hourly rollups in the
+    same transaction. Each plant's latest reading is upserted once all
+    readings are stored.
+    """
+    readings_df = transformed_data["readings"]
+    scheduler = LoadScheduler(pool)
+
+    def load_known_readings(conn, _results):
+        known_ids = get_existing_plant_ids(conn)
+        known = readings_df[readings_df["plant_id"].isin(known_ids)]
+        load_plant_readings_bulk(conn, known)
+        upsert_hourly_rollups(conn, known)
+        return known_ids
+
+    def load_new_readings(conn, results):
+        new = readings_df[~readings_df["plant_id"].isin(results["known_readings"])]
+        if spool is not None:
+            new = get_readings_to_load(conn, new, spool)
+        inserted = load_plant_readings_bulk(conn, new)
+        upsert_hourly_rollups(conn, new)
+        return inserted
+
+    scheduler.add_task(
+        "origins", lambda conn, _: load_origins_bulk(conn, transformed_data["origin"]))
+    scheduler.add_task(
+        "botanists", lambda conn, _: load_botanists_bulk(conn, transformed_data["botanist"]))
+    scheduler.add_task("known_readings", load_known_readings)
+    scheduler.add_task(
+        "plants",
+        lambda conn, results: load_plants_bulk(
+            conn, transformed_data["plant"], results["botanists"]),
+        depends_on=("origins", "botanists"))
+    scheduler.add_task("new_readings", load_new_readings,
+                       depends_on=("plants", "known_readings"))
+    scheduler.add_task(
+        "latest_readings", lambda conn, _: upsert_latest_readings(conn, readings_df),
+        depends_on=("new_readings",))
+    return scheduler
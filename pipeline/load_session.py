@@ -0,0 +1,81 @@
+"""A single connection and transaction shared by every loader in the load phase."""
+from contextlib import contextmanager
+from time import perf_counter
+
+from db_backend import get_connection
+from dimension_cache import DIMENSION_CACHE
+
+
+class LoadSession:
+    """Own one database connection and run the whole load in one transaction.
+
+    Each loader runs inside a `step`, which sets a savepoint so a failed step
+    can be rolled back on its own. The transaction is committed when the
+    session exits cleanly and rolled back if any error escapes it.
+
+        with LoadSession() as session:
+            with session.step("origins"):
+                load_origins_bulk(session.conn, origin_df)
+    """
+
+    def __init__(self, connection_factory=None):
+        self.connection_factory = connection_factory or get_connection
+        self.conn = None
+        self.login_seconds = 0.0
+        self.step_seconds = {}
+        self.failed_steps = []
+
+    def __enter__(self):
+        start = perf_counter()
+        self.conn = self.connection_factory()
+        self.login_seconds = perf_counter() - start
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        try:
+            if exc_type is None:
+                self.conn.commit()
+            else:
+                self.conn.rollback()
+                # IDs written through during the failed transaction no longer exist
+                DIMENSION_CACHE.invalidate()
+        finally:
+            self.conn.close()
+        return False
+
+    @contextmanager
+    def step(self, name: str, optional: bool = False):
+        """Time a load step and roll back to its savepoint if it fails.
+
+        Errors in optional steps are recorded and swallowed so the rest of the
+        load can still commit; errors in required steps are re-raised.
+        """
+        savepoint = f"sp_{name}"
+        with self.conn.cursor() as cursor:
+            cursor.execute(f"SAVE TRANSACTION {savepoint}")
+
+        start = perf_counter()
+        try:
+            yield self.conn
+        except Exception as e:
+            with self.conn.cursor() as cursor:
+                cursor.execute(f"ROLLBACK TRANSACTION {savepoint}")
+            DIMENSION_CACHE.invalidate()
+            self.failed_steps.append(name)
+            if not optional:
+                raise e
+            print(f"Warning: optional load step '{name}' rolled back: {e}")
+        finally:
+            self.step_seconds[name] = perf_counter() - start
+
+    @property
+    def work_seconds(self) -> float:
+        """Total time spent inside load steps."""
+        return sum(self.step_seconds.values())
+
+    def report(self) -> None:
+        """Print login time separately from the time spent loading."""
+        print(f"  Login: {self.login_seconds:.3f}s")
+        for name, seconds in self.step_seconds.items():
+            print(f"  {name}: {seconds:.3f}s")
+        print(f"  Work total: {self.work_seconds:.3f}s")
@@ -0,0 +1,142 @@
+"""Apply the versioned schema migrations in `schema/migrations/`.
+
+Usage (from the `pipeline/` directory):
+
+    python migrate.py            # apply every pending migration
+    python migrate.py --list     # show applied and pending migrations
+    python migrate.py --target 1 # apply migrations up to version 1
+
+Migrations are files named `<version>_<name>.sql`, applied in version order.
+Each runs in its own transaction together with the row that records it in
+`schema_migrations`, so a failed migration leaves nothing behind and is
+retried on the next run. Works against SQL Server and the SQLite backend; a
+`<version>_<name>.sqlite.sql` file replaces the T-SQL on SQLite when the
+change has no mechanical translation.
+"""
+import argparse
+import re
+from datetime import datetime
+from pathlib import Path
+
+from db_backend import SCHEMA_PATH, get_connection, get_dialect
+
+
+MIGRATIONS_DIR = SCHEMA_PATH.parent / "migrations"
+
+MIGRATION_FILE = re.compile(r"^(\d+)_(\w+?)(?:\.(sqlite))?\.sql$")
+
+CREATE_MIGRATIONS_TABLE_QUERY = """
+    IF OBJECT_ID('schema_migrations', 'U') IS NULL
+    CREATE TABLE schema_migrations (
+        version INT NOT NULL PRIMARY KEY,
+        name VARCHAR(255) NOT NULL,
+        applied_at DATETIME NOT NULL
+    )
+"""
+
+
+class Migration:
+    """One versioned SQL migration file."""
+
+    def __init__(self, version: int, name: str, path: Path):
+        self.version = version
+        self.name = name
+        self.path = path
+        self.dialect_paths = {}
+
+    def get_sql(self, dialect: str = "mssql") -> str:
+        """The migration's SQL batch for a dialect."""
+        path = self.dialect_paths.get(dialect, self.path)
+        return path.read_text(encoding="utf-8")
+
+    def __repr__(self) -> str:
+        return f"Migration({self.version}, {self.name!r})"
+
+
+def discover_migrations(directory: Path = MIGRATIONS_DIR) -> list[Migration]:
+    """Return the migrations in a directory, ordered by version."""
+    migrations = {}
+    overrides = []
+    for path in sorted(Path(directory).glob("*.sql")):
+        match = MIGRATION_FILE.match(path.name)
+        if not match:
+            raise ValueError(f"Migration file {path.name} is not named <version>_<name>.sql")
+        version, name, dialect = int(match.group(1)), match.group(2), match.group(3)
+        if dialect:
+            overrides.append((version, name, dialect, path))
+            continue
+        if version in migrations:
+            raise ValueError(f"Duplicate migration version {version}: {path.name}")
+        migrations[version] = Migration(version, name, path)
+
+    for version, name, dialect, path in overrides:
+        if version not in migrations or migrations[version].name != name:
+            raise ValueError(f"{path.name} does not override an existing migration")
+        migrations[version].dialect_paths[dialect] = path
+    return [migrations[version] for version in sorted(migrations)]
+
+
+def get_applied_versions(conn) -> set[int]:
+    """Return the versions already recorded, creating the table if needed."""
+    with conn.cursor() as cursor:
+        cursor.execute(CREATE_MIGRATIONS_TABLE_QUERY)
+        cursor.execute("SELECT version FROM schema_migrations")
+        versions = {row[0] for row in cursor.fetchall()}
+    conn.commit()
+    return versions
+
+
+def apply_migration(conn, migration: Migration) -> None:
+    """Run one migration and record it in the same transaction."""
+    try:
+        with conn.cursor() as cursor:
+            cursor.execute(migration.get_sql(get_dialect(conn)))
+            cursor.execute(
+                "INSERT INTO schema_migrations (version, name, applied_at) VALUES (%s, %s, %s)",
+                (migration.version, migration.name, datetime.now()))
+        conn.commit()
+    except Exception as e:
+        conn.rollback()
+        raise e
+
+
+def migrate(conn, target: int = None, directory: Path = MIGRATIONS_DIR) -> list[Migration]:
+    """Apply pending migrations up to `target` (default: all) and return them."""
+    applied = get_applied_versions(conn)
+    pending = [migration for migration in discover_migrations(directory)
+               if migration.version not in applied
+               and (target is None or migration.version <= target)]
+
+    for migration in pending:
+        print(f"Applying migration {migration.version} ({migration.name})...")
+        apply_migration(conn, migration)
+    return pending
+
+
+def parse_args(argv: list[str] = None) -> argparse.Namespace:
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--target", type=int, default=None)
+    parser.add_argument("--list", action="store_true")
+    return parser.parse_args(argv)
+
+
+def main(argv: list[str] = None) -> None:
+    """Apply or list migrations against the configured database."""
+    args = parse_args(argv)
+    conn = get_connection(query_timeout=0)
+    try:
+        if args.list:
+            applied = get_applied_versions(conn)
+            for migration in discover_migrations():
+                status = "applied" if migration.version in applied else "pending"
+                print(f"{migration.version:>4} {migration.name:<40} {status}")
+        else:
+            applied = migrate(conn, args.target)
+            print(f"Applied {len(applied)} migrations.")
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -12,10 +12,8 @@ from transform.transform_plants import transform_plant_data
 from transform.transform_readings import transform_plant_readings
 
 # Load
-from load.load_origin import get_connection, load_origin
-from load.load_botanist import load_botanists
-from load.load_plant import load_plants
-from load.load_plant_readings import load_plant_readings
+from db_backend import require_schema_version
+from load_phase import LOAD_CONCURRENCY, load, load_concurrently
 
 
 def extract() -> pd.DataFrame:
@@ -60,55 +58,11 @@ def transform(plants_df: pd.DataFrame) -> dict:
     }
 
 
-def load(transformed_data: dict) -> None:
-    """Load all transformed data into the database.
-
-    Order of loading respects foreign key constraints:
-    1. country (created via origin load)
-    2. city (created via origin load)
-    3. origin
-    4. botanist
-    5. plant (references origin_id and botanist_id)
-    6. plant_reading (references plant_id)
-    """
-    print("\n=== LOAD PHASE ===")
-
-    origin_df = transformed_data["origin"]
-    botanist_df = transformed_data["botanist"]
-    plant_df = transformed_data["plant"]
-    readings_df = transformed_data["readings"]
-
-    # 1. Load origins (also creates countries and cities)
-    print("Loading origins (with countries and cities)...")
-    conn = get_connection()
-    try:
-        for _, row in origin_df.iterrows():
-            load_origin(conn, row)
-        conn.commit()
-    finally:
-        conn.close()
-    print(f"  Loaded {len(origin_df)} unique origins")
-
-    # 2. Load botanists
-    print("Loading botanists...")
-    botanist_email_to_id = load_botanists(botanist_df)
-    print(f"  Loaded {len(botanist_email_to_id)} unique botanists")
-
-    # 3. Load plants (looks up origin_id from DB directly)
-    print("Loading plants...")
-    load_plants(plant_df, botanist_email_to_id)
-    print(f"  Loaded {len(plant_df)} plants")
-
-    # 4. Load plant readings
-    print("Loading plant readings...")
-    load_plant_readings(readings_df)
-    print(f"  Loaded {len(readings_df)} plant readings")
-
-    print("\n=== PIPELINE COMPLETE ===")
-
-
 def run_pipeline() -> None:
     """Run the full ETL pipeline."""
+    # Fail before extracting if the database predates the layout the loaders write
+    require_schema_version()
+
     # Extract
     plants_df = extract()
 
@@ -116,7 +70,10 @@ def run_pipeline() -> None:
     transformed_data = transform(plants_df)
 
     # Load
-    load(transformed_data)
+    if LOAD_CONCURRENCY > 1:
+        load_concurrently(transformed_data, LOAD_CONCURRENCY)
+    else:
+        load(transformed_data)
 
 
 def handler(event, context) -> None:
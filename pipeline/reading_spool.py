@@ -0,0 +1,195 @@
+"""Durable local spool for plant readings the database could not accept.
+
+When the load fails, for example because RDS is down or a statement runs past
+DB_QUERY_TIMEOUT, that run's readings are appended to a local file instead of
+being lost. The next successful load drains the spool in the same transaction
+as its own readings, oldest first, skipping any (plant_id, recording_taken)
+already in the table, and empties the spool once that transaction commits.
+
+A load the database rejects on its data, such as a foreign key violation,
+would fail the same way on every retry. That run's readings go to a quarantine
+file beside the spool instead, for a person to inspect. Any other error, such
+as a bug in the load itself, is re-raised with the spool left as it was.
+
+The spool is an append-only file of fixed-width little-endian records (36
+bytes per reading), so appends are a single write and a record torn by a crash
+mid-write is simply ignored. Point READINGS_SPOOL_PATH at durable storage (an
+EFS mount on Lambda); the /tmp default only survives warm invocations.
+"""
+from contextlib import contextmanager
+from os import environ as ENV, fsync
+from pathlib import Path
+import numpy as np
+import pandas as pd
+
+from db_backend import is_connection_error, is_data_error
+from load.load_plant_readings import READING_COLUMNS, load_plant_readings_bulk
+
+
+DEFAULT_SPOOL_PATH = ENV.get("READINGS_SPOOL_PATH", "/tmp/plant_readings.spool")
+
+TIMESTAMP_COLUMNS = ["recording_taken", "last_watered"]
+
+# Timestamps are stored as microseconds since the epoch
+SPOOL_RECORD = np.dtype([
+    ("plant_id", "<i4"),
+    ("soil_moisture", "<f8"),
+    ("temperature", "<f8"),
+    ("recording_taken", "<i8"),
+    ("last_watered", "<i8")
+])
+
+READING_KEY = ["plant_id", "recording_taken"]
+
+LOADED_READING_KEYS_QUERY = """
+    SELECT plant_id, recording_taken FROM plant_reading
+    WHERE recording_taken BETWEEN %s AND %s
+"""
+
+
+def encode_readings(df: pd.DataFrame) -> bytes:
+    """Pack readings into spool records."""
+    records = np.empty(len(df), dtype=SPOOL_RECORD)
+    for column in READING_COLUMNS:
+        values = df[column]
+        if column in TIMESTAMP_COLUMNS:
+            values = pd.to_datetime(values).astype("datetime64[us]").astype("int64")
+        records[column] = values.to_numpy()
+    return records.tobytes()
+
+
+def decode_readings(data: bytes) -> pd.DataFrame:
+    """Unpack spool records, ignoring a trailing partial record."""
+    complete = len(data) - len(data) % SPOOL_RECORD.itemsize
+    records = np.frombuffer(data[:complete], dtype=SPOOL_RECORD)
+    df = pd.DataFrame({column: records[column] for column in READING_COLUMNS})
+    for column in TIMESTAMP_COLUMNS:
+        df[column] = df[column].astype("datetime64[us]")
+    df["plant_id"] = df["plant_id"].astype("int64")
+    return df
+
+
+def append_records(path: Path, df: pd.DataFrame) -> int:
+    """Durably append readings to a record file and return how many were written."""
+    if df.empty:
+        return 0
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "ab") as records_file:
+        records_file.write(encode_readings(df))
+        records_file.flush()
+        fsync(records_file.fileno())
+    return len(df)
+
+
+def deduplicate_readings(df: pd.DataFrame) -> pd.DataFrame:
+    """Order readings oldest first, keeping the first copy of each key."""
+    return (df.sort_values("recording_taken", kind="stable")
+            .drop_duplicates(subset=READING_KEY, keep="first")
+            .reset_index(drop=True))
+
+
+def read_records(path: Path) -> pd.DataFrame:
+    """Return the readings in a record file, oldest first and de-duplicated."""
+    if not path.exists():
+        return decode_readings(b"")
+    return deduplicate_readings(decode_readings(path.read_bytes()))
+
+
+class ReadingSpool:
+    """An append-only file of readings waiting to be written to the database."""
+
+    def __init__(self, path: str = None, quarantine_path: str = None):
+        self.path = Path(path or DEFAULT_SPOOL_PATH)
+        self.quarantine_path = Path(quarantine_path or f"{self.path}.quarantine")
+
+    def append(self, df: pd.DataFrame) -> int:
+        """Durably append readings and return how many were spooled."""
+        return append_records(self.path, df)
+
+    def quarantine(self, df: pd.DataFrame) -> int:
+        """Durably append df to the quarantine file and return how many were written."""
+        return append_records(self.quarantine_path, df)
+
+    def read_quarantine(self) -> pd.DataFrame:
+        """Return every quarantined reading, oldest first and de-duplicated."""
+        return read_records(self.quarantine_path)
+
+    def read(self) -> pd.DataFrame:
+        """Return every spooled reading, oldest first and de-duplicated."""
+        return read_records(self.path)
+
+    def __len__(self) -> int:
+        if not self.path.exists():
+            return 0
+        return self.path.stat().st_size // SPOOL_RECORD.itemsize
+
+    def is_empty(self) -> bool:
+        """Return True if no readings are waiting."""
+        return len(self) == 0
+
+    def clear(self) -> None:
+        """Forget every spooled reading."""
+        self.path.unlink(missing_ok=True)
+
+    @contextmanager
+    def protect(self, df: pd.DataFrame):
+        """Spool `df` if the block fails; empty the spool if it succeeds.
+
+        Connection failures spool df for retry. Data errors quarantine df
+        instead; the readings already spooled stay for the next run. Any
+        other error is re-raised with the spool untouched. The block must
+        commit the drained readings before it exits.
+        """
+        try:
+            yield self
+        except Exception as e:
+            if is_connection_error(e):
+                spooled = self.append(df)
+                print(f"Warning: load failed, spooled {spooled} readings to {self.path} "
+                      f"({len(self)} pending): {e}")
+            elif is_data_error(e):
+                quarantined = self.quarantine(df)
+                print(f"Warning: load failed on its data, quarantined {quarantined} "
+                      f"readings to {self.quarantine_path}: {e}")
+            raise e
+        self.clear()
+
+
+def get_loaded_reading_keys(conn, df: pd.DataFrame) -> set[tuple]:
+    """Return the (plant_id, recording_taken) keys of df already in the database."""
+    if df.empty:
+        return set()
+    with conn.cursor() as cursor:
+        cursor.execute(LOADED_READING_KEYS_QUERY, (
+            df["recording_taken"].min().to_pydatetime(),
+            df["recording_taken"].max().to_pydatetime()))
+        return {(int(plant_id), pd.Timestamp(taken)) for plant_id, taken in cursor.fetchall()}
+
+
+def remove_loaded_readings(conn, df: pd.DataFrame) -> pd.DataFrame:
+    """Drop readings whose key is already in the plant_reading table."""
+    loaded = get_loaded_reading_keys(conn, df)
+    if not loaded:
+        return df
+    keys = zip(df["plant_id"], df["recording_taken"])
+    return df[[(int(plant_id), taken) not in loaded for plant_id, taken in keys]]
+
+
+def get_readings_to_load(conn, df: pd.DataFrame, spool: ReadingSpool) -> pd.DataFrame:
+    """Return the spooled readings oldest first, then df, minus any already stored.
+
+    Without a backlog this is df itself. With one, readings that an earlier,
+    interrupted run already wrote are dropped.
+    """
+    if spool.is_empty():
+        return df
+
+    pending = spool.read()
+    print(f"  Draining {len(pending)} spooled readings")
+    readings = deduplicate_readings(pd.concat([pending, df[READING_COLUMNS]]))
+    return remove_loaded_readings(conn, readings)
+
+
+def load_readings_with_spool(conn, df: pd.DataFrame, spool: ReadingSpool) -> int:
+    """Insert spooled readings oldest first, then df, on an open connection."""
+    return load_plant_readings_bulk(conn, get_readings_to_load(conn, df, spool))
@@ -0,0 +1,44 @@
+"""SQL fragments that differ between SQL Server and the embedded SQLite backend.
+
+One copy shared by the pipeline, the RDS-to-S3 export and the dashboard, which
+pick their fragments by DB_BACKEND. It only needs the standard library, so the
+export and dashboard images copy it in beside their own modules (see their
+READMEs) rather than taking the pipeline's dependencies.
+"""
+import sqlite3
+from datetime import datetime
+from os import environ as ENV
+
+
+SQL_DIALECTS = {
+    "mssql": {
+        "placeholder": "%s",
+        "named_placeholder": "%({})s",
+        "recent_cutoff": "DATEADD(hour, -24, GETDATE())",
+        "today_start": "CAST(CAST(GETDATE() AS DATE) AS DATETIME2(0))"
+    },
+    "sqlite": {
+        "placeholder": "?",
+        "named_placeholder": ":{}",
+        "recent_cutoff": "datetime('now', 'localtime', '-24 hours')",
+        "today_start": "datetime('now', 'localtime', 'start of day')"
+    }
+}
+
+
+def get_sql_dialect(config=ENV) -> dict:
+    """Return the SQL fragments for the configured DB_BACKEND."""
+    backend = config.get("DB_BACKEND", "mssql")
+    if backend not in SQL_DIALECTS:
+        raise ValueError(f"Unsupported DB_BACKEND '{backend}'.")
+    return SQL_DIALECTS[backend]
+
+
+def parse_sqlite_datetime(value: bytes) -> datetime:
+    """Read back a timestamp stored as ISO text in a DATETIME column."""
+    return datetime.fromisoformat(value.decode())
+
+
+def register_datetime_converter() -> None:
+    """Return DATETIME columns as datetimes on connections opened with PARSE_DECLTYPES."""
+    sqlite3.register_converter("DATETIME", parse_sqlite_datetime)
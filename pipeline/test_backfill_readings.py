@@ -0,0 +1,157 @@
+"""Tests for the backfill_readings module."""
+from functools import partial
+import pytest
+import pandas as pd
+from db_backend import connect_sqlite
+from backfill_readings import (
+    read_chunks, backfill_readings, BackfillCheckpoint, load_chunk)
+from load.load_plant_readings import insert_plant_readings_bulk
+from load.load_hourly_rollup import get_hourly_rollups, ROLLUP_COLUMNS
+
+
+@pytest.fixture
+def readings_csv(tmp_path):
+    """A CSV of ten readings for plant 1, one minute apart."""
+    times = pd.date_range("2026-01-27 10:00:00", periods=10, freq="min")
+    path = tmp_path / "readings.csv"
+    pd.DataFrame({
+        "plant_id": [1] * 10,
+        "soil_moisture": [40.0 + i for i in range(10)],
+        "temperature": [20.0] * 10,
+        "recording_taken": times.strftime("%Y-%m-%d %H:%M:%S"),
+        "last_watered": ["2026-01-27 08:00:00"] * 10
+    }).to_csv(path, index=False)
+    return str(path)
+
+
+def get_stored_rollups(path: str) -> pd.DataFrame:
+    """Return every stored hourly rollup, ordered by plant and hour."""
+    conn = connect_sqlite(path)
+    with conn.cursor() as cursor:
+        cursor.execute(f"SELECT {', '.join(ROLLUP_COLUMNS)} FROM plant_reading_hourly "
+                       "ORDER BY plant_id, reading_hour")
+        rows = cursor.fetchall()
+    conn.close()
+    return pd.DataFrame(rows, columns=ROLLUP_COLUMNS)
+
+
+def count_readings(path: str) -> int:
+    """Return the number of rows in plant_reading."""
+    conn = connect_sqlite(path)
+    with conn.cursor() as cursor:
+        cursor.execute("SELECT COUNT(*) FROM plant_reading")
+        count = cursor.fetchone()[0]
+    conn.close()
+    return count
+
+
+class TestReadChunks:
+    """Tests for the read_chunks function."""
+
+    def test_yields_typed_chunks(self, readings_csv):
+        """Should split the file and parse each column to its fixed dtype."""
+        chunks = list(read_chunks(readings_csv, chunk_size=4))
+
+        assert [index for index, _ in chunks] == [0, 1, 2]
+        assert [len(chunk) for _, chunk in chunks] == [4, 4, 2]
+        first = chunks[0][1]
+        assert first["plant_id"].dtype == "int32"
+        assert pd.api.types.is_datetime64_any_dtype(first["recording_taken"])
+
+    def test_drops_rows_without_a_plant(self, tmp_path):
+        """A reading missing its plant_id should be dropped, not fail the read."""
+        path = tmp_path / "readings.csv"
+        path.write_text("plant_id,soil_moisture,temperature,recording_taken,last_watered\n"
+                        "1,40.0,20.0,2026-01-27 10:00:00,2026-01-27 08:00:00\n"
+                        ",41.0,20.0,2026-01-27 10:01:00,2026-01-27 08:00:00\n",
+                        encoding="utf-8")
+
+        chunk = next(read_chunks(str(path)))[1]
+
+        assert list(chunk["plant_id"]) == [1]
+        assert chunk["plant_id"].dtype == "int32"
+
+
+class TestBackfillCheckpoint:
+    """Tests for the BackfillCheckpoint class."""
+
+    def test_persists_done_chunks(self, tmp_path):
+        """A reloaded checkpoint should know which chunks finished."""
+        path = str(tmp_path / "checkpoint.json")
+        BackfillCheckpoint(path, "readings.csv", 100).mark_done(3, 100)
+
+        checkpoint = BackfillCheckpoint(path, "readings.csv", 100).load()
+
+        assert checkpoint.done == {3}
+        assert checkpoint.rows == 100
+        assert checkpoint.resumed
+
+    def test_rejects_different_chunk_size(self, tmp_path):
+        """Chunk indices only line up if the chunk size is unchanged."""
+        path = str(tmp_path / "checkpoint.json")
+        BackfillCheckpoint(path, "readings.csv", 100).mark_done(0, 100)
+
+        with pytest.raises(ValueError):
+            BackfillCheckpoint(path, "readings.csv", 50).load()
+
+
+class TestLoadChunk:
+    """Tests for the load_chunk function."""
+
+    def test_rolls_back_on_error(self, mocker):
+        """Should roll back and re-raise if the insert fails."""
+        mocker.patch("backfill_readings.insert_plant_readings_bulk",
+                     side_effect=Exception("DB error"))
+        conn = mocker.MagicMock()
+
+        with pytest.raises(Exception):
+            load_chunk(conn, pd.DataFrame(columns=["plant_id"]))
+
+        conn.rollback.assert_called_once()
+        conn.commit.assert_not_called()
+
+
+class TestBackfillReadings:
+    """Tests for the backfill_readings function."""
+
+    @pytest.mark.parametrize("workers", [1, 3])
+    def test_loads_every_row(self, sqlite_path, readings_csv, workers):
+        """Should insert the whole file whether chunks run serially or in parallel."""
+        result = backfill_readings(readings_csv, chunk_size=3, workers=workers,
+                                   connection_factory=lambda: connect_sqlite(sqlite_path))
+
+        assert result["rows"] == 10
+        assert result["chunks"] == 4
+        assert count_readings(sqlite_path) == 10
+
+    @pytest.mark.parametrize("workers", [1, 3])
+    def test_rolls_up_each_hour_once(self, sqlite_path, readings_csv, workers):
+        """Chunks sharing an hour, and a re-run, should still count each reading once."""
+        factory = partial(connect_sqlite, sqlite_path)
+        backfill_readings(readings_csv, chunk_size=3, workers=workers,
+                          connection_factory=factory)
+        result = backfill_readings(readings_csv, chunk_size=3, workers=workers,
+                                   connection_factory=factory)
+
+        assert result["skipped_chunks"] == 4
+        assert result["rollups"] == 1
+        expected = get_hourly_rollups(pd.read_csv(readings_csv))
+        pd.testing.assert_frame_equal(get_stored_rollups(sqlite_path), expected,
+                                      check_dtype=False)
+
+    def test_resumes_after_failure(self, mocker, sqlite_path, readings_csv):
+        """A re-run should skip committed chunks and not duplicate any rows."""
+        factory = partial(connect_sqlite, sqlite_path)
+        mocker.patch("backfill_readings.insert_plant_readings_bulk",
+                     side_effect=[3, Exception("connection lost")])
+
+        with pytest.raises(Exception):
+            backfill_readings(readings_csv, chunk_size=3, connection_factory=factory)
+
+        mocker.patch("backfill_readings.insert_plant_readings_bulk",
+                     side_effect=insert_plant_readings_bulk)
+        result = backfill_readings(readings_csv, chunk_size=3, connection_factory=factory)
+
+        assert result["skipped_chunks"] == 1
+        assert result["chunks"] == 3
+        assert count_readings(sqlite_path) == 7
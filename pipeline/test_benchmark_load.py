@@ -0,0 +1,74 @@
+"""Tests for the load benchmark."""
+from benchmark_load import (
+    compare_load_modes, simulated_connection_factory, sqlite_connection_factory,
+    reset_sqlite, transform_synthetic, SimulatedConnection, time_load)
+from dimension_cache import VERSION_QUERY
+from load_phase import get_load_concurrency
+
+
+class TestSimulatedConnection:
+    """Tests for the simulated database connection."""
+
+    def test_reports_empty_tables(self):
+        """Should answer the version check as if every table were empty."""
+        conn = SimulatedConnection(0)
+        with conn.cursor() as cursor:
+            cursor.execute(VERSION_QUERY)
+            versions = cursor.fetchall()
+            cursor.execute("SELECT plant_id FROM plant")
+
+            assert all(count == 0 for _, count, _ in versions)
+            assert cursor.fetchall() == []
+            assert cursor.round_trips == 2
+
+
+class TestCompareLoadModes:
+    """Tests for the compare_load_modes function."""
+
+    def test_runs_both_modes(self):
+        """Should time the full load graph serially and concurrently."""
+        transformed_data = transform_synthetic(20)
+        factory = simulated_connection_factory(latency=0.002, login=0.01)
+
+        result = compare_load_modes(transformed_data, factory, workers=3)
+
+        assert result["serial"] > 0
+        assert result["concurrent"] > 0
+        assert result["speedup"] > 0
+
+    def test_runs_against_sqlite(self, tmp_path):
+        """Should run the real statements against a fresh embedded database."""
+        path = str(tmp_path / "benchmark.db")
+        transformed_data = transform_synthetic(20)
+
+        result = compare_load_modes(transformed_data, sqlite_connection_factory(path),
+                                    workers=3, reset=lambda: reset_sqlite(path))
+
+        assert result["serial"] > 0
+        assert result["concurrent"] > 0
+
+    def test_serial_side_is_the_production_load(self, mocker):
+        """One worker should time load_phase.load, not the scheduler."""
+        mock_load = mocker.patch("benchmark_load.load")
+        mock_concurrent = mocker.patch("benchmark_load.load_concurrently")
+        factory = simulated_connection_factory(latency=0, login=0)
+
+        time_load({}, factory, 1)
+        time_load({}, factory, 3)
+
+        assert mock_load.call_args.args[1] is factory
+        assert mock_concurrent.call_args.args[1:3] == (3, factory)
+
+
+class TestGetLoadConcurrency:
+    """Tests for the LOAD_CONCURRENCY default."""
+
+    def test_serial_on_every_backend(self, monkeypatch):
+        """Every backend should keep the single transaction unless concurrency is opted in to."""
+        monkeypatch.delenv("LOAD_CONCURRENCY", raising=False)
+        for backend in ["sqlite", "mssql"]:
+            monkeypatch.setenv("DB_BACKEND", backend)
+            assert get_load_concurrency() == 1
+
+        monkeypatch.setenv("LOAD_CONCURRENCY", "3")
+        assert get_load_concurrency() == 3
@@ -0,0 +1,37 @@
+"""Tests for the query benchmark."""
+from benchmark_queries import run_benchmark, make_synthetic_readings, HOT_QUERIES
+from db_backend import connect_sqlite
+from migrate import get_applied_versions
+
+
+class TestMakeSyntheticReadings:
+    """Tests for the make_synthetic_readings function."""
+
+    def test_one_reading_per_plant_per_minute(self):
+        """Should produce a reading for every plant at every minute."""
+        readings = make_synthetic_readings([1, 2], 3)
+
+        assert len(readings) == 6
+        assert len({(row[0], row[3]) for row in readings}) == 6
+
+
+class TestRunBenchmark:
+    """Tests for the run_benchmark function."""
+
+    def test_times_every_query_before_and_after(self, tmp_path):
+        """Should report a before and after timing for each hot query."""
+        results = run_benchmark(str(tmp_path / "queries.db"), n_plants=5,
+                                readings_per_plant=30, repeats=1)
+
+        assert set(results) == set(HOT_QUERIES)
+        assert all(result["before"] > 0 and result["after"] > 0
+                   for result in results.values())
+
+    def test_after_applies_only_the_index_migration(self, tmp_path):
+        """Only migration 001 should separate the before and after timings."""
+        path = str(tmp_path / "queries.db")
+        run_benchmark(path, n_plants=5, readings_per_plant=30, repeats=1)
+
+        conn = connect_sqlite(path)
+        assert get_applied_versions(conn) == {1}
+        conn.close()
@@ -0,0 +1,34 @@
+"""Tests for the storage layout benchmark."""
+from benchmark_storage import run_benchmark, make_readings, LAYOUTS
+
+
+class TestMakeReadings:
+    """Tests for the make_readings function."""
+
+    def test_one_reading_per_plant_per_minute(self):
+        """Should produce a reading for every plant at every minute."""
+        readings = make_readings([1, 2], 3)
+
+        assert len(readings) == 6
+        assert len(set(zip(readings["plant_id"], readings["recording_taken"]))) == 6
+
+    def test_waterings_repeat_across_readings(self):
+        """Many readings should share each watering, as they do in production."""
+        readings = make_readings([1], 120)
+
+        assert readings["last_watered"].nunique() < len(readings)
+        assert (readings["last_watered"] <= readings["recording_taken"]).all()
+
+
+class TestRunBenchmark:
+    """Tests for the run_benchmark function."""
+
+    def test_measures_every_layout(self, tmp_path):
+        """Should store the same rows in each layout and time both."""
+        results = run_benchmark(str(tmp_path), n_plants=5, readings_per_plant=60, repeats=1)
+
+        assert set(results) == set(LAYOUTS)
+        assert {result["rows"] for result in results.values()} == {300}
+        assert all(result["rows_per_page"] > 0 and result["last_24h_seconds"] > 0
+                   for result in results.values())
+        assert results["compact"]["table_pages"] <= results["current"]["table_pages"]
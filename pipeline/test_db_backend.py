@@ -0,0 +1,297 @@
+"""Tests for the db_backend module."""
+import sqlite3
+import pytest
+from benchmark_load import transform_synthetic
+from db_backend import (
+    translate_to_sqlite, connect_sqlite, get_connection, get_dialect, execute_upsert,
+    get_max_rows_per_insert, stage_rows, transaction, open_transaction, create_schema,
+    require_schema_version, SchemaVersionError, SQLiteConnection, DB_QUERY_TIMEOUT)
+from load_scheduler import ConnectionPool, build_load_scheduler
+from load_session import LoadSession
+from migrate import migrate
+from load.load_origin import load_origins_bulk
+from load.load_botanist import load_botanists_bulk
+from load.load_plant import load_plants_bulk
+from load.load_plant_readings import load_plant_readings_bulk
+
+
+def count_rows(path: str, table: str) -> int:
+    """Return the number of rows in a table of the embedded database."""
+    conn = connect_sqlite(path)
+    with conn.cursor() as cursor:
+        cursor.execute(f"SELECT COUNT(*) FROM {table}")
+        count = cursor.fetchone()[0]
+    conn.close()
+    return count
+
+
+def run_load(path: str, transformed_data: dict) -> dict:
+    """Run the serial load phase against the embedded database."""
+    with LoadSession(lambda: connect_sqlite(path)) as session:
+        with session.step("origins"):
+            load_origins_bulk(session.conn, transformed_data["origin"])
+        with session.step("botanists"):
+            email_to_id = load_botanists_bulk(session.conn, transformed_data["botanist"])
+        with session.step("plants"):
+            counts = load_plants_bulk(session.conn, transformed_data["plant"], email_to_id)
+        with session.step("readings"):
+            load_plant_readings_bulk(session.conn, transformed_data["readings"])
+    return counts
+
+
+class TestTranslateToSqlite:
+    """Tests for the translate_to_sqlite function."""
+
+    @pytest.mark.parametrize("tsql, expected", [
+        ("IF OBJECT_ID('tempdb..#plant_staging') IS NOT NULL DROP TABLE #plant_staging",
+         "DROP TABLE IF EXISTS temp.plant_staging"),
+        ("CREATE TABLE #plant_staging (plant_id SMALLINT)",
+         "CREATE TEMP TABLE plant_staging (plant_id SMALLINT)"),
+        ("INSERT INTO #plant_staging VALUES (%s, %s)",
+         "INSERT INTO plant_staging VALUES (?, ?)"),
+        ("SELECT SCOPE_IDENTITY()", "SELECT last_insert_rowid()"),
+        ("SAVE TRANSACTION sp_origins", "SAVEPOINT sp_origins"),
+        ("ROLLBACK TRANSACTION sp_origins", "ROLLBACK TO sp_origins"),
+        ("city_id BIGINT IDENTITY(1,1) NOT NULL PRIMARY KEY", "city_id INTEGER PRIMARY KEY"),
+        ("CREATE NONCLUSTERED INDEX ix ON plant_reading (plant_id) INCLUDE (temperature)",
+         "CREATE INDEX ix ON plant_reading (plant_id, temperature)"),
+        ("IF OBJECT_ID('schema_migrations', 'U') IS NULL CREATE TABLE schema_migrations",
+         "CREATE TABLE IF NOT EXISTS schema_migrations"),
+        ("WHERE recording_taken < DATEADD(hour, -24, GETDATE())",
+         "WHERE recording_taken < datetime('now', 'localtime', '-24 hours')"),
+        ("GROUP BY DATEADD(hour, DATEDIFF(hour, 0, recording_taken), 0)",
+         "GROUP BY strftime('%Y-%m-%d %H:00:00', recording_taken)")
+    ])
+    def test_rewrites_tsql(self, tsql, expected):
+        """Should rewrite each T-SQL construct the loaders use."""
+        assert translate_to_sqlite(tsql) == expected
+
+
+class TestStageRows:
+    """Tests for the stage_rows function."""
+
+    def test_stays_within_sql_server_limits(self, mocker):
+        """Every INSERT should carry under 2100 parameters and at most 1000 rows."""
+        cursor = mocker.MagicMock()
+        rows = [(i, i) for i in range(2500)]
+
+        inserted = stage_rows(cursor, "#watering_staging", ["plant_id", "watered_at"], rows)
+
+        assert inserted == 2500
+        assert [len(call.args[1]) for call in cursor.execute.call_args_list] == [
+            2000, 2000, 1000]
+        assert cursor.execute.call_args_list[0].args[0].startswith(
+            "INSERT INTO #watering_staging (plant_id, watered_at) VALUES (%s, %s), ")
+        assert get_max_rows_per_insert(4) == 524
+
+    def test_streams_in_smaller_batches(self, mocker):
+        """A generator should be inserted in batches of at most batch_size rows."""
+        cursor = mocker.MagicMock()
+
+        inserted = stage_rows(cursor, "plant_reading", ["plant_id"],
+                              ((i,) for i in range(5)), batch_size=2)
+
+        assert inserted == 5
+        assert [call.args[1] for call in cursor.execute.call_args_list] == [
+            (0, 1), (2, 3), (4,)]
+
+
+class TestTransaction:
+    """Tests for the transaction and open_transaction context managers."""
+
+    def test_commits_on_success(self, mocker):
+        """The block's work should be committed once it finishes."""
+        conn = mocker.MagicMock()
+
+        with transaction(conn):
+            pass
+
+        conn.commit.assert_called_once()
+        conn.rollback.assert_not_called()
+
+    def test_rolls_back_and_reraises(self, mocker):
+        """A failure should roll back, call on_rollback and propagate."""
+        conn = mocker.MagicMock()
+        on_rollback = mocker.MagicMock()
+
+        with pytest.raises(ValueError):
+            with transaction(conn, on_rollback):
+                raise ValueError("boom")
+
+        conn.rollback.assert_called_once()
+        conn.commit.assert_not_called()
+        on_rollback.assert_called_once()
+
+    def test_open_transaction_always_closes(self, mocker):
+        """The connection it opened should be closed whether or not the block fails."""
+        conn = mocker.MagicMock()
+
+        with pytest.raises(ValueError):
+            with open_transaction(lambda: conn):
+                raise ValueError("boom")
+
+        conn.rollback.assert_called_once()
+        conn.close.assert_called_once()
+
+
+class TestRequireSchemaVersion:
+    """Tests for the require_schema_version function."""
+
+    def test_accepts_a_migrated_database(self, sqlite_path):
+        """A database with every migration applied should pass."""
+        require_schema_version(lambda: connect_sqlite(sqlite_path))
+
+    def test_rejects_schema_sql_alone(self, tmp_path):
+        """schema.sql without the migrations should fail before anything is loaded."""
+        path = str(tmp_path / "bare.db")
+        conn = connect_sqlite(path)
+        create_schema(conn)
+        conn.close()
+
+        with pytest.raises(SchemaVersionError, match="at migration 0"):
+            require_schema_version(lambda: connect_sqlite(path))
+
+    def test_rejects_a_partly_migrated_database(self, tmp_path, capsys):
+        """Stopping short of the required migration should fail too."""
+        path = str(tmp_path / "partial.db")
+        conn = connect_sqlite(path)
+        create_schema(conn)
+        migrate(conn, target=4)
+        conn.close()
+        capsys.readouterr()
+
+        with pytest.raises(SchemaVersionError, match="at migration 4"):
+            require_schema_version(lambda: connect_sqlite(path))
+
+    def test_checks_once_per_factory(self, sqlite_path, mocker):
+        """Warm invocations should not open another connection to re-check."""
+        factory = mocker.MagicMock(side_effect=lambda: connect_sqlite(sqlite_path))
+
+        require_schema_version(factory)
+        require_schema_version(factory)
+
+        factory.assert_called_once()
+
+
+class TestGetConnection:
+    """Tests for the get_connection function."""
+
+    def test_uses_sqlite_when_configured(self, monkeypatch, tmp_path):
+        """Should open the embedded database when DB_BACKEND is sqlite."""
+        monkeypatch.setenv("DB_BACKEND", "sqlite")
+        monkeypatch.setenv("SQLITE_PATH", str(tmp_path / "local.db"))
+
+        conn = get_connection()
+
+        assert isinstance(conn, SQLiteConnection)
+        assert get_dialect(conn) == "sqlite"
+        conn.close()
+
+    def test_defaults_to_sql_server(self, mocker, monkeypatch):
+        """Should connect to SQL Server by default."""
+        monkeypatch.delenv("DB_BACKEND", raising=False)
+        mocker.patch("db_backend.load_dotenv")
+        mock_connect = mocker.patch("db_backend.connect")
+        for key in ["DB_HOST", "DB_USER", "DB_PASSWORD", "DB_NAME"]:
+            monkeypatch.setenv(key, "test")
+
+        conn = get_connection()
+
+        assert conn is mock_connect.return_value
+        assert get_dialect(conn) == "mssql"
+        assert mock_connect.call_args.kwargs["timeout"] == DB_QUERY_TIMEOUT > 0
+
+
+class TestStatementDeadline:
+    """Tests for the SQLite statement deadline."""
+
+    SLOW_QUERY = ("WITH RECURSIVE n(i) AS (SELECT 1 UNION ALL SELECT i + 1 FROM n "
+                  "WHERE i < 100000000) SELECT COUNT(*) FROM n")
+
+    def test_interrupts_an_overdue_statement(self, tmp_path):
+        """A statement running past query_timeout should fail like a pymssql timeout."""
+        conn = connect_sqlite(str(tmp_path / "local.db"), query_timeout=0.05)
+
+        with pytest.raises(sqlite3.OperationalError, match="interrupted"):
+            with conn.cursor() as cursor:
+                cursor.execute(self.SLOW_QUERY)
+        conn.close()
+
+    def test_deadline_restarts_per_statement(self, tmp_path):
+        """Each statement should get the whole timeout, however long the connection is open."""
+        conn = connect_sqlite(str(tmp_path / "local.db"), query_timeout=5)
+        conn.deadline = 0
+
+        with conn.cursor() as cursor:
+            cursor.execute("WITH RECURSIVE n(i) AS (SELECT 1 UNION ALL SELECT i + 1 FROM n "
+                           "WHERE i < 10000) SELECT COUNT(*) FROM n")
+            assert cursor.fetchone() == (10000,)
+        conn.close()
+
+
+class TestExecuteUpsert:
+    """Tests for the execute_upsert function."""
+
+    def test_runs_merge_on_sql_server(self, mocker):
+        """Should run the MERGE and return its OUTPUT actions."""
+        conn = mocker.MagicMock()
+        cursor = mocker.MagicMock()
+        cursor.fetchall.return_value = [("INSERT",), ("UPDATE",)]
+
+        actions = execute_upsert(conn, cursor, "MERGE", "UPDATE", "INSERT")
+
+        cursor.execute.assert_called_once_with("MERGE")
+        assert actions == ["INSERT", "UPDATE"]
+
+
+class TestSqliteLoad:
+    """Integration tests running the loaders against the embedded database."""
+
+    def test_loads_every_table(self, sqlite_path):
+        """Should load dimensions, plants and readings from the real schema."""
+        transformed_data = transform_synthetic(30)
+
+        counts = run_load(sqlite_path, transformed_data)
+
+        assert counts["inserted"] == 30
+        assert count_rows(sqlite_path, "plant") == 30
+        assert count_rows(sqlite_path, "botanist") == transformed_data[
+            "botanist"]["botanist_email"].nunique()
+        assert count_rows(sqlite_path, "plant_reading") == len(transformed_data["readings"])
+
+    def test_reload_updates_only_changed_plants(self, sqlite_path):
+        """Should leave unchanged plants alone and update renamed ones."""
+        transformed_data = transform_synthetic(30)
+        run_load(sqlite_path, transformed_data)
+
+        transformed_data["plant"].loc[0, "name"] = "Renamed"
+        counts = run_load(sqlite_path, transformed_data)
+
+        assert counts == {"inserted": 0, "updated": 1, "unchanged": 29, "skipped": 0}
+        assert count_rows(sqlite_path, "country") == transformed_data[
+            "origin"]["origin_country"].nunique()
+
+    def test_failed_step_rolls_back_to_savepoint(self, sqlite_path):
+        """An optional step that fails should not undo earlier steps."""
+        transformed_data = transform_synthetic(10)
+
+        with LoadSession(lambda: connect_sqlite(sqlite_path)) as session:
+            with session.step("origins"):
+                load_origins_bulk(session.conn, transformed_data["origin"])
+            with session.step("readings", optional=True):
+                load_plant_readings_bulk(session.conn, transformed_data["readings"])
+                raise ValueError("boom")
+
+        assert count_rows(sqlite_path, "origin") > 0
+        assert count_rows(sqlite_path, "plant_reading") == 0
+
+    def test_concurrent_scheduler(self, sqlite_path):
+        """Should load everything when tasks run on several connections."""
+        transformed_data = transform_synthetic(30)
+        pool = ConnectionPool(3, lambda: connect_sqlite(sqlite_path))
+
+        build_load_scheduler(transformed_data, pool).run()
+        pool.close()
+
+        assert count_rows(sqlite_path, "plant") == 30
+        assert count_rows(sqlite_path, "plant_reading") == len(transformed_data["readings"])
@@ -0,0 +1,112 @@
+"""Tests for the dimension_cache module."""
+import pytest
+from dimension_cache import LRUCache, DimensionCache, coordinate_key
+
+
+@pytest.fixture
+def mock_conn(mocker):
+    """A connection whose cursor can be configured per test."""
+    conn = mocker.MagicMock()
+    conn.cursor.return_value.__enter__.return_value = mocker.MagicMock()
+    return conn
+
+
+class TestLRUCache:
+    """Tests for the LRUCache class."""
+
+    def test_evicts_least_recently_used(self):
+        """Should drop the oldest untouched entry when full."""
+        cache = LRUCache(max_entries=2)
+        cache.put("a", 1)
+        cache.put("b", 2)
+        cache.get("a")
+        cache.put("c", 3)
+
+        assert "a" in cache
+        assert "b" not in cache
+        assert len(cache) == 2
+
+    def test_missing_key_returns_none(self):
+        """Should return None for unknown keys."""
+        assert LRUCache().get("missing") is None
+
+
+class TestCoordinateKey:
+    """Tests for the coordinate_key function."""
+
+    def test_string_and_float_coordinates_match(self):
+        """Keys built from API strings and DB floats should be equal."""
+        assert coordinate_key("81.2003535", "7.815683") == coordinate_key(81.2003535, 7.815683)
+
+
+class TestDimensionCache:
+    """Tests for the DimensionCache class."""
+
+    def test_put_and_get(self):
+        """Should return cached IDs as ints and count hits and misses."""
+        cache = DimensionCache()
+        cache.put("origin", ("51.5", "-0.1"), 7.0)
+
+        assert cache.get("origin", (51.5, -0.1)) == 7
+        assert cache.get("country", "Atlantis") is None
+        assert (cache.hits, cache.misses) == (1, 1)
+
+    def test_warm_loads_table(self, mock_conn):
+        """Should load a table with one query, lowest ID winning."""
+        cursor = mock_conn.cursor.return_value.__enter__.return_value
+        cursor.fetchall.return_value = [("London", 5, 11), ("London", 5, 10)]
+        cache = DimensionCache()
+
+        cache.warm(mock_conn, "city")
+
+        assert cache.get("city", ("London", 5)) == 10
+        assert cache.is_authoritative("city")
+        cursor.execute.assert_called_once()
+
+    def test_warm_beyond_capacity_is_not_authoritative(self, mock_conn):
+        """A partially cached table should not treat misses as missing rows."""
+        cursor = mock_conn.cursor.return_value.__enter__.return_value
+        cursor.fetchall.return_value = [("a@test.com", 1), ("b@test.com", 2)]
+        cache = DimensionCache(max_entries=1)
+
+        cache.warm(mock_conn, "botanist")
+
+        assert not cache.is_authoritative("botanist")
+
+    def test_refresh_only_rewarms_changed_tables(self, mocker, mock_conn):
+        """Should re-warm a table only when its row count or max ID changes."""
+        cache = DimensionCache()
+        versions = {"country": (1, 1), "city": (1, 1), "origin": (1, 1), "botanist": (1, 1)}
+        mocker.patch.object(cache, "get_versions", return_value=versions)
+        mock_warm = mocker.patch.object(cache, "warm")
+
+        assert len(cache.refresh(mock_conn)) == 4
+        assert cache.refresh(mock_conn) == []
+
+        versions["botanist"] = (2, 2)
+        assert cache.refresh(mock_conn) == ["botanist"]
+        assert mock_warm.call_count == 5
+
+    def test_invalidate_drops_ids_from_a_rolled_back_step(self):
+        """IDs cached before a rollback should not be served afterwards."""
+        cache = DimensionCache()
+        cache.put("origin", (51.5, -0.1), 7)
+        cache.put("botanist", "a@test.com", 1)
+        cache.complete["origin"] = True
+
+        cache.invalidate("origin")
+
+        assert cache.get("origin", (51.5, -0.1)) is None
+        assert not cache.is_authoritative("origin")
+        assert cache.get("botanist", "a@test.com") == 1
+
+    def test_clear_forgets_everything(self):
+        """Should empty maps and versions."""
+        cache = DimensionCache()
+        cache.put("botanist", "a@test.com", 1)
+        cache.versions["botanist"] = (1, 1)
+
+        cache.clear()
+
+        assert cache.get("botanist", "a@test.com") is None
+        assert cache.versions["botanist"] is None
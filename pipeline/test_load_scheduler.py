@@ -0,0 +1,167 @@
+"""Tests for the load_scheduler module."""
+import threading
+import time
+import pytest
+from load_scheduler import ConnectionPool, LoadScheduler
+
+
+@pytest.fixture
+def factory(mocker):
+    """A connection factory returning a fresh mock connection per call."""
+    return mocker.MagicMock(side_effect=mocker.MagicMock)
+
+
+class TestConnectionPool:
+    """Tests for the ConnectionPool class."""
+
+    def test_reuses_idle_connections(self, factory):
+        """Should not open a new connection when one is idle."""
+        pool = ConnectionPool(2, factory)
+
+        with pool.acquire() as first:
+            pass
+        with pool.acquire() as second:
+            pass
+
+        assert first is second
+        assert pool.opened == 1
+
+    def test_never_exceeds_size(self, factory):
+        """Should open at most `size` connections."""
+        pool = ConnectionPool(2, factory)
+
+        with pool.acquire() as first, pool.acquire() as second:
+            assert first is not second
+
+        assert pool.opened == 2
+
+    def test_racing_threads_never_exceed_size(self, mocker):
+        """Threads that all find the pool empty at once should still open at most `size`."""
+        def slow_factory():
+            time.sleep(0.05)
+            return mocker.MagicMock()
+
+        pool = ConnectionPool(2, slow_factory)
+        barrier = threading.Barrier(6, timeout=5)
+
+        def borrow():
+            barrier.wait()
+            with pool.acquire():
+                time.sleep(0.01)
+
+        threads = [threading.Thread(target=borrow) for _ in range(6)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert pool.opened == 2
+
+    def test_failed_login_frees_its_slot(self, mocker):
+        """A connection that fails to open should not use up a slot in the pool."""
+        factory = mocker.MagicMock(side_effect=[ConnectionError("login"), mocker.MagicMock()])
+        pool = ConnectionPool(1, factory)
+
+        with pytest.raises(ConnectionError):
+            with pool.acquire():
+                pass
+        with pool.acquire():
+            pass
+
+        assert pool.opened == 1
+
+    def test_close_closes_every_connection(self, factory):
+        """Should close all opened connections."""
+        pool = ConnectionPool(2, factory)
+        with pool.acquire() as conn:
+            pass
+
+        pool.close()
+
+        conn.close.assert_called_once()
+
+    def test_rejects_empty_pool(self):
+        """Should require at least one connection."""
+        with pytest.raises(ValueError):
+            ConnectionPool(0)
+
+
+class TestLoadScheduler:
+    """Tests for the LoadScheduler class."""
+
+    def test_rejects_unknown_dependencies(self, factory):
+        """Should only accept dependencies registered earlier."""
+        scheduler = LoadScheduler(ConnectionPool(1, factory))
+
+        with pytest.raises(ValueError):
+            scheduler.add_task("plants", lambda conn, results: None, ("origins",))
+
+    def test_passes_dependency_results(self, factory):
+        """Dependants should receive the results of finished tasks."""
+        scheduler = LoadScheduler(ConnectionPool(2, factory))
+        scheduler.add_task("botanists", lambda conn, results: {"a@test.com": 1})
+        scheduler.add_task("plants", lambda conn, results: results["botanists"]["a@test.com"],
+                           depends_on=("botanists",))
+
+        results = scheduler.run()
+
+        assert results == {"botanists": {"a@test.com": 1}, "plants": 1}
+
+    def test_runs_independent_tasks_concurrently(self, factory):
+        """Independent tasks should overlap; dependants wait for them."""
+        barrier = threading.Barrier(2, timeout=5)
+        scheduler = LoadScheduler(ConnectionPool(2, factory))
+        scheduler.add_task("origins", lambda conn, results: barrier.wait())
+        scheduler.add_task("botanists", lambda conn, results: barrier.wait())
+        scheduler.add_task("plants", lambda conn, results: sorted(results),
+                           depends_on=("origins", "botanists"))
+
+        results = scheduler.run()
+
+        assert results["plants"] == ["botanists", "origins"]
+        assert scheduler.timings["plants"][0] >= max(
+            scheduler.timings["origins"][1], scheduler.timings["botanists"][1])
+
+    def test_commits_each_task(self, mocker):
+        """Each task should commit on its own connection."""
+        conn = mocker.MagicMock()
+        scheduler = LoadScheduler(ConnectionPool(1, lambda: conn))
+        scheduler.add_task("origins", lambda conn, results: None)
+        scheduler.add_task("botanists", lambda conn, results: None)
+
+        scheduler.run_serial()
+
+        assert conn.commit.call_count == 2
+
+    def test_failure_rolls_back_and_skips_dependants(self, mocker):
+        """A failed task should roll back and stop dependants from starting."""
+        conn = mocker.MagicMock()
+        dependant = mocker.MagicMock()
+        scheduler = LoadScheduler(ConnectionPool(1, lambda: conn))
+
+        def fail(conn, results):
+            raise ValueError("boom")
+
+        scheduler.add_task("origins", fail)
+        scheduler.add_task("plants", dependant, depends_on=("origins",))
+
+        with pytest.raises(ValueError):
+            scheduler.run()
+
+        conn.rollback.assert_called_once()
+        dependant.assert_not_called()
+
+    def test_concurrent_is_faster_than_serial(self, factory):
+        """Overlapping independent sleeps should beat running them in order."""
+        def make_scheduler():
+            scheduler = LoadScheduler(ConnectionPool(3, factory))
+            for name in ["origins", "botanists", "known_readings"]:
+                scheduler.add_task(name, lambda conn, results: time.sleep(0.05))
+            return scheduler
+
+        serial = make_scheduler()
+        serial.run_serial()
+        concurrent = make_scheduler()
+        concurrent.run()
+
+        assert concurrent.wall_seconds < serial.wall_seconds
@@ -0,0 +1,76 @@
+"""Tests for the load_session module."""
+import pytest
+from load_session import LoadSession
+from dimension_cache import DIMENSION_CACHE
+
+
+@pytest.fixture
+def mock_conn(mocker):
+    """A mock connection with a context-managed cursor."""
+    conn = mocker.MagicMock()
+    conn.cursor.return_value.__enter__.return_value = mocker.MagicMock()
+    return conn
+
+
+def executed_sql(conn) -> list[str]:
+    """Return every SQL statement executed on the connection's cursor."""
+    cursor = conn.cursor.return_value.__enter__.return_value
+    return [call.args[0] for call in cursor.execute.call_args_list]
+
+
+class TestLoadSession:
+    """Tests for the LoadSession class."""
+
+    def test_opens_one_connection_and_commits_once(self, mocker, mock_conn):
+        """Should share one connection across steps and commit at the end."""
+        factory = mocker.MagicMock(return_value=mock_conn)
+
+        with LoadSession(factory) as session:
+            with session.step("origins") as conn:
+                assert conn is mock_conn
+            with session.step("plants"):
+                pass
+
+        factory.assert_called_once()
+        mock_conn.commit.assert_called_once()
+        mock_conn.rollback.assert_not_called()
+        mock_conn.close.assert_called_once()
+        assert executed_sql(mock_conn) == ["SAVE TRANSACTION sp_origins",
+                                           "SAVE TRANSACTION sp_plants"]
+
+    def test_required_step_failure_rolls_back_everything(self, mocker, mock_conn):
+        """Should roll back the savepoint, then the whole transaction."""
+        mocker.patch.object(DIMENSION_CACHE, "invalidate")
+
+        with pytest.raises(ValueError):
+            with LoadSession(lambda: mock_conn) as session:
+                with session.step("readings"):
+                    raise ValueError("boom")
+
+        assert "ROLLBACK TRANSACTION sp_readings" in executed_sql(mock_conn)
+        mock_conn.rollback.assert_called_once()
+        mock_conn.commit.assert_not_called()
+        assert session.failed_steps == ["readings"]
+        DIMENSION_CACHE.invalidate.assert_called()
+
+    def test_optional_step_failure_still_commits(self, mock_conn):
+        """Should roll back only the failed optional step."""
+        with LoadSession(lambda: mock_conn) as session:
+            with session.step("extras", optional=True):
+                raise ValueError("boom")
+
+        assert "ROLLBACK TRANSACTION sp_extras" in executed_sql(mock_conn)
+        mock_conn.commit.assert_called_once()
+        assert session.failed_steps == ["extras"]
+
+    def test_times_login_and_steps_separately(self, mock_conn):
+        """Should record login time apart from per-step work time."""
+        with LoadSession(lambda: mock_conn) as session:
+            with session.step("origins"):
+                pass
+            with session.step("botanists"):
+                pass
+
+        assert session.login_seconds >= 0
+        assert set(session.step_seconds) == {"origins", "botanists"}
+        assert session.work_seconds == pytest.approx(sum(session.step_seconds.values()))
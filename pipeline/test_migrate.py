@@ -0,0 +1,187 @@
+"""Tests for the migrate module."""
+from datetime import datetime
+import pytest
+from db_backend import connect_sqlite, create_schema
+from migrate import discover_migrations, get_applied_versions, migrate
+
+
+@pytest.fixture
+def conn(tmp_path):
+    """An open connection to an embedded database with no migrations applied."""
+    conn = connect_sqlite(str(tmp_path / "plants.db"))
+    create_schema(conn)
+    yield conn
+    conn.close()
+
+
+def get_index_names(conn) -> set[str]:
+    """Return the names of every index created by a migration."""
+    with conn.cursor() as cursor:
+        cursor.execute("SELECT name FROM sqlite_master WHERE type = 'index' "
+                       "AND name NOT LIKE 'sqlite_%'")
+        names = {row[0] for row in cursor.fetchall()}
+    conn.commit()
+    return names
+
+
+class TestDiscoverMigrations:
+    """Tests for the discover_migrations function."""
+
+    def test_orders_by_version(self, tmp_path):
+        """Should order numerically, not alphabetically."""
+        (tmp_path / "10_later.sql").write_text("SELECT 1")
+        (tmp_path / "2_earlier.sql").write_text("SELECT 1")
+
+        assert [m.version for m in discover_migrations(tmp_path)] == [2, 10]
+
+    def test_rejects_duplicate_versions(self, tmp_path):
+        """Two files with the same version should be an error."""
+        (tmp_path / "001_first.sql").write_text("SELECT 1")
+        (tmp_path / "1_again.sql").write_text("SELECT 1")
+
+        with pytest.raises(ValueError):
+            discover_migrations(tmp_path)
+
+    def test_rejects_badly_named_files(self, tmp_path):
+        """Files must be named <version>_<name>.sql."""
+        (tmp_path / "indexes.sql").write_text("SELECT 1")
+
+        with pytest.raises(ValueError):
+            discover_migrations(tmp_path)
+
+    def test_attaches_dialect_overrides(self, tmp_path):
+        """A .sqlite.sql file should replace the T-SQL only on SQLite."""
+        (tmp_path / "1_partition.sql").write_text("CREATE PARTITION FUNCTION")
+        (tmp_path / "1_partition.sqlite.sql").write_text("SELECT 1")
+
+        [migration] = discover_migrations(tmp_path)
+
+        assert migration.get_sql("mssql") == "CREATE PARTITION FUNCTION"
+        assert migration.get_sql("sqlite") == "SELECT 1"
+
+    def test_rejects_orphan_override(self, tmp_path):
+        """An override without a base migration should be an error."""
+        (tmp_path / "1_partition.sqlite.sql").write_text("SELECT 1")
+
+        with pytest.raises(ValueError):
+            discover_migrations(tmp_path)
+
+    def test_repo_migrations_are_valid(self):
+        """The shipped migrations should be discoverable."""
+        assert discover_migrations()[0].version == 1
+
+
+class TestMigrate:
+    """Tests for the migrate function."""
+
+    def test_applies_hot_path_indexes(self, conn):
+        """Should create the indexes and record the version."""
+        applied = migrate(conn)
+
+        assert 1 in [m.version for m in applied]
+        assert 1 in get_applied_versions(conn)
+        assert {"uq_botanist_email", "uq_origin_coordinates", "uq_city_name_country",
+                "ix_plant_reading_plant_recording",
+                "ix_plant_reading_recording_taken"} <= get_index_names(conn)
+
+    def test_is_idempotent(self, conn):
+        """A second run should apply nothing."""
+        migrate(conn)
+
+        assert migrate(conn) == []
+
+    def test_respects_target(self, conn, tmp_path):
+        """Should stop at the target version."""
+        (tmp_path / "1_first.sql").write_text("CREATE TABLE first_table (id INT)")
+        (tmp_path / "2_second.sql").write_text("CREATE TABLE second_table (id INT)")
+
+        applied = migrate(conn, target=1, directory=tmp_path)
+
+        assert [m.version for m in applied] == [1]
+        assert get_applied_versions(conn) == {1}
+
+    def test_failed_migration_rolls_back(self, conn, tmp_path):
+        """A failing migration should leave no partial changes or version row."""
+        (tmp_path / "1_broken.sql").write_text(
+            "CREATE TABLE half_done (id INT); CREATE TABLE half_done (id INT);")
+
+        with pytest.raises(Exception):
+            migrate(conn, directory=tmp_path)
+
+        assert get_applied_versions(conn) == set()
+        with conn.cursor() as cursor:
+            cursor.execute("SELECT name FROM sqlite_master WHERE name = 'half_done'")
+            assert cursor.fetchone() is None
+
+    def test_seeds_latest_readings(self, conn):
+        """Migrating should seed plant_latest_reading from the stored readings."""
+        with conn.cursor() as cursor:
+            cursor.execute(
+                "INSERT INTO plant_reading (plant_id, soil_moisture, temperature, "
+                "recording_taken, last_watered) VALUES (1, 40, 20, %s, %s), (1, 41, 21, %s, %s)",
+                ("2026-01-27 10:00:00", "2026-01-27 08:00:00",
+                 "2026-01-27 10:01:00", "2026-01-27 08:00:00"))
+        conn.commit()
+
+        migrate(conn)
+
+        with conn.cursor() as cursor:
+            cursor.execute("SELECT plant_id, soil_moisture, hours_since_watered "
+                           "FROM plant_latest_reading")
+            [(plant_id, moisture, hours)] = cursor.fetchall()
+        conn.commit()
+        assert (plant_id, moisture) == (1, 41)
+        assert hours == pytest.approx(2 + 1 / 60)
+
+    def test_seeds_hourly_rollups(self, conn):
+        """Migrating should roll the stored readings up by plant and hour."""
+        with conn.cursor() as cursor:
+            cursor.execute(
+                "INSERT INTO plant_reading (plant_id, soil_moisture, temperature, "
+                "recording_taken, last_watered) VALUES (1, 40, 20, %s, %s), (1, 42, 22, %s, %s)",
+                ("2026-01-27 10:00:00", "2026-01-27 08:00:00",
+                 "2026-01-27 10:59:00", "2026-01-27 10:30:00"))
+        conn.commit()
+
+        migrate(conn)
+
+        with conn.cursor() as cursor:
+            cursor.execute("SELECT reading_hour, reading_count, sum_squares_temperature, "
+                           "last_watered FROM plant_reading_hourly")
+            rows = cursor.fetchall()
+        conn.commit()
+        assert rows == [(datetime(2026, 1, 27, 10), 2, 884.0, datetime(2026, 1, 27, 10, 30))]
+
+    def test_moves_waterings_out_of_readings(self, conn):
+        """Migrating should keep one plant_watering row per watering and drop the column."""
+        with conn.cursor() as cursor:
+            cursor.execute(
+                "INSERT INTO plant_reading (plant_id, soil_moisture, temperature, "
+                "recording_taken, last_watered) VALUES (1, 40, 20, %s, %s), "
+                "(1, 41, 21, %s, %s), (1, 42, 22, %s, %s)",
+                ("2026-01-27 10:00:00", "2026-01-27 08:00:00",
+                 "2026-01-27 10:01:00", "2026-01-27 08:00:00",
+                 "2026-01-27 10:02:00", "2026-01-27 10:01:30"))
+        conn.commit()
+
+        migrate(conn)
+
+        with conn.cursor() as cursor:
+            cursor.execute("SELECT plant_id, watered_at FROM plant_watering ORDER BY watered_at")
+            waterings = cursor.fetchall()
+            cursor.execute("SELECT name FROM pragma_table_info('plant_reading')")
+            columns = {row[0] for row in cursor.fetchall()}
+        conn.commit()
+        assert waterings == [(1, datetime(2026, 1, 27, 8)), (1, datetime(2026, 1, 27, 10, 1, 30))]
+        assert "last_watered" not in columns
+
+    def test_unique_email_rejects_duplicates(self, conn):
+        """After migrating, a second botanist with the same email should fail."""
+        migrate(conn)
+        with conn.cursor() as cursor:
+            cursor.execute("INSERT INTO botanist (email, name, phone) VALUES (%s, %s, %s)",
+                           ("a@test.com", "A", "1"))
+            with pytest.raises(Exception):
+                cursor.execute("INSERT INTO botanist (email, name, phone) VALUES (%s, %s, %s)",
+                               ("a@test.com", "B", "2"))
+        conn.rollback()
@@ -0,0 +1,190 @@
+"""Tests for the reading_spool module."""
+import sqlite3
+from itertools import count
+import pytest
+import pandas as pd
+from benchmark_load import transform_synthetic
+from db_backend import connect_sqlite
+from load_phase import load
+from reading_spool import (
+    ReadingSpool, encode_readings, decode_readings, deduplicate_readings,
+    load_readings_with_spool, SPOOL_RECORD)
+from load.load_plant_readings import load_plant_readings_bulk
+
+
+@pytest.fixture
+def readings():
+    """Three readings for two plants."""
+    return pd.DataFrame({
+        "plant_id": [1, 2, 1],
+        "soil_moisture": [40.5, 55.0, 41.25],
+        "temperature": [20.1, 22.3, 20.4],
+        "recording_taken": pd.to_datetime(["2026-01-27 10:01:00", "2026-01-27 10:01:05",
+                                           "2026-01-27 10:02:00"]),
+        "last_watered": pd.to_datetime(["2026-01-26 08:00:00"] * 3)
+    })
+
+
+@pytest.fixture
+def spool(tmp_path):
+    """An empty spool in a temporary directory."""
+    return ReadingSpool(str(tmp_path / "readings.spool"))
+
+
+def add_plants(path: str, plant_ids: list[int]) -> None:
+    """Insert bare plant rows so readings can reference them."""
+    conn = connect_sqlite(path)
+    with conn.cursor() as cursor:
+        for plant_id in plant_ids:
+            cursor.execute("INSERT INTO plant (plant_id, name, origin_id, botanist_id) "
+                           "VALUES (%s, %s, 1, 1)", (plant_id, f"Plant {plant_id}"))
+    conn.commit()
+    conn.close()
+
+
+def get_loaded_readings(path: str) -> list[tuple]:
+    """Return (plant_id, recording_taken) for every stored reading."""
+    conn = connect_sqlite(path)
+    with conn.cursor() as cursor:
+        cursor.execute("SELECT plant_id, recording_taken FROM plant_reading "
+                       "ORDER BY plant_reading_id")
+        rows = cursor.fetchall()
+    conn.close()
+    return rows
+
+
+class TestEncoding:
+    """Tests for the spool record format."""
+
+    def test_round_trip(self, readings):
+        """Decoding should return exactly the readings that were encoded."""
+        decoded = decode_readings(encode_readings(readings))
+
+        pd.testing.assert_frame_equal(decoded, readings, check_dtype=False)
+
+    def test_fixed_width_records(self, readings):
+        """Each reading should take one fixed-size record."""
+        assert len(encode_readings(readings)) == 3 * SPOOL_RECORD.itemsize
+
+    def test_ignores_torn_record(self, readings):
+        """A partially written trailing record should be dropped."""
+        data = encode_readings(readings)
+
+        decoded = decode_readings(data + data[:10])
+
+        assert len(decoded) == 3
+
+
+class TestDeduplicateReadings:
+    """Tests for the deduplicate_readings function."""
+
+    def test_orders_oldest_first_and_drops_repeats(self, readings):
+        """Should sort by recording time and keep one copy of each key."""
+        result = deduplicate_readings(pd.concat([readings.iloc[[2]], readings]))
+
+        assert len(result) == 3
+        assert result["recording_taken"].is_monotonic_increasing
+
+
+class TestReadingSpool:
+    """Tests for the ReadingSpool class."""
+
+    def test_append_and_read(self, spool, readings):
+        """Appended readings should be read back oldest first without duplicates."""
+        spool.append(readings.iloc[[2]])
+        spool.append(readings)
+
+        assert len(spool) == 4
+        assert list(spool.read()["recording_taken"]) == list(readings["recording_taken"])
+
+    def test_empty_spool(self, spool):
+        """A missing spool file should read as no readings."""
+        assert len(spool) == 0
+        assert spool.is_empty()
+        assert spool.read().empty
+
+    def test_protect_spools_on_failure(self, spool, readings):
+        """Readings should be spooled and the error re-raised when the load fails."""
+        with pytest.raises(ConnectionError):
+            with spool.protect(readings):
+                raise ConnectionError("database unavailable")
+
+        assert len(spool) == 3
+
+    def test_protect_quarantines_data_errors(self, spool, readings):
+        """A load that fails on its data should quarantine only df and keep the backlog."""
+        spool.append(readings.iloc[[0]])
+
+        with pytest.raises(sqlite3.IntegrityError):
+            with spool.protect(readings.iloc[[1, 2]]):
+                raise sqlite3.IntegrityError("FOREIGN KEY constraint failed")
+
+        assert list(spool.read()["recording_taken"]) == [readings["recording_taken"][0]]
+        assert list(spool.read_quarantine()["recording_taken"]) == list(
+            readings["recording_taken"][1:])
+
+    def test_protect_leaves_the_spool_on_other_errors(self, spool, readings):
+        """A bug in the load should be raised without touching the spool or quarantine."""
+        spool.append(readings.iloc[[0]])
+
+        with pytest.raises(KeyError):
+            with spool.protect(readings.iloc[[1, 2]]):
+                raise KeyError("plant_id")
+
+        assert len(spool) == 1
+        assert not spool.quarantine_path.exists()
+
+    def test_timed_out_load_is_spooled(self, mocker, sqlite_path, spool):
+        """A load interrupted by the statement deadline should spool its readings."""
+        mocker.patch("db_backend.SQLITE_DEADLINE_CHECK_STEPS", 1)
+        mocker.patch("db_backend.monotonic", side_effect=count(0, 60))
+        transformed_data = transform_synthetic(3)
+
+        with pytest.raises(sqlite3.OperationalError, match="interrupted"):
+            load(transformed_data, lambda: connect_sqlite(sqlite_path, query_timeout=20),
+                 spool)
+
+        assert len(spool) == len(transformed_data["readings"])
+        assert not spool.quarantine_path.exists()
+
+    def test_protect_clears_on_success(self, spool, readings):
+        """The spool should be emptied once the load succeeds."""
+        spool.append(readings)
+
+        with spool.protect(readings):
+            pass
+
+        assert len(spool) == 0
+
+
+class TestLoadReadingsWithSpool:
+    """Tests for the load_readings_with_spool function."""
+
+    def test_without_backlog_inserts_directly(self, mocker, spool, readings):
+        """Should not query for existing readings when nothing is spooled."""
+        mock_bulk = mocker.patch("reading_spool.load_plant_readings_bulk", return_value=3)
+        conn = mocker.MagicMock()
+
+        assert load_readings_with_spool(conn, readings, spool) == 3
+        mock_bulk.assert_called_once_with(conn, readings)
+        conn.cursor.assert_not_called()
+
+    def test_drains_backlog_without_duplicates(self, sqlite_path, spool, readings):
+        """Spooled readings already written by an earlier run should be skipped."""
+        add_plants(sqlite_path, [1, 2])
+        conn = connect_sqlite(sqlite_path)
+        load_plant_readings_bulk(conn, readings.iloc[[0]])
+        conn.commit()
+        spool.append(readings.iloc[[0, 1]])
+
+        with spool.protect(readings):
+            inserted = load_readings_with_spool(conn, readings.iloc[[2]], spool)
+            conn.commit()
+        conn.close()
+
+        assert inserted == 2
+        assert len(spool) == 0
+        assert get_loaded_readings(sqlite_path) == [
+            (1, pd.Timestamp("2026-01-27 10:01:00")),
+            (2, pd.Timestamp("2026-01-27 10:01:05")),
+            (1, pd.Timestamp("2026-01-27 10:02:00"))]
@@ -0,0 +1,44 @@
+"""Tests for the sql_dialects module."""
+import sqlite3
+from datetime import datetime
+import pytest
+from sql_dialects import SQL_DIALECTS, get_sql_dialect, register_datetime_converter
+
+
+class TestGetSqlDialect:
+    """Tests for the get_sql_dialect function."""
+
+    @pytest.mark.parametrize("backend", ["mssql", "sqlite"])
+    def test_returns_the_configured_dialect(self, backend):
+        """Should pick the fragments for DB_BACKEND."""
+        assert get_sql_dialect({"DB_BACKEND": backend}) is SQL_DIALECTS[backend]
+
+    def test_defaults_to_sql_server(self):
+        """Should use SQL Server when DB_BACKEND is unset."""
+        assert get_sql_dialect({})["placeholder"] == "%s"
+
+    def test_rejects_unknown_backend(self):
+        """Should fail loudly for an unsupported backend."""
+        with pytest.raises(ValueError, match="oracle"):
+            get_sql_dialect({"DB_BACKEND": "oracle"})
+
+    def test_every_dialect_has_the_same_fragments(self):
+        """Each query built from a fragment should work on either backend."""
+        assert SQL_DIALECTS["mssql"].keys() == SQL_DIALECTS["sqlite"].keys()
+
+
+class TestRegisterDatetimeConverter:
+    """Tests for the register_datetime_converter function."""
+
+    def test_reads_datetime_columns_as_datetimes(self):
+        """DATETIME values should come back as datetimes, and today_start should bound them."""
+        register_datetime_converter()
+        conn = sqlite3.connect(":memory:", detect_types=sqlite3.PARSE_DECLTYPES)
+        conn.execute("CREATE TABLE plant_watering (plant_id INTEGER, watered_at DATETIME)")
+        conn.execute("INSERT INTO plant_watering VALUES (1, '2026-01-27 10:30:00')")
+
+        assert conn.execute("SELECT watered_at FROM plant_watering").fetchone() == (
+            datetime(2026, 1, 27, 10, 30),)
+        assert conn.execute("SELECT count(*) FROM plant_watering WHERE watered_at >= "
+                            + SQL_DIALECTS["sqlite"]["today_start"]).fetchone() == (0,)
+        conn.close()
@@ -0,0 +1,225 @@
+"""Benchmark the transform stage and guard it against performance regressions.
+
+Usage (from the `pipeline/` directory):
+
+    python transform/benchmark_transform.py run --output bench.json
+    python transform/benchmark_transform.py compare --current bench.json
+    python transform/benchmark_transform.py run --update-baseline
+
+`run` prints the results as JSON unless given `--output`; the committed
+baseline is only rewritten with `--update-baseline`.
+"""
+import argparse
+import contextlib
+import io
+import json
+import platform
+import sys
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from transform_origin import get_raw_origin, transform_origin_data
+from transform_botanist import get_botanists
+from transform_plants import transform_plant_data
+from transform_readings import transform_plant_readings
+
+
+DEFAULT_SIZES = [100, 1_000, 10_000]
+DEFAULT_REPEATS = 5
+DEFAULT_TOLERANCE = 0.25
+BASELINE_PATH = Path(__file__).parent / "benchmark_baseline.json"
+
+
+def make_synthetic_plants(n_rows: int, seed: int = 42) -> pd.DataFrame:
+    """Return a DataFrame shaped like the output of `extract.to_dataframe`."""
+    rng = np.random.default_rng(seed)
+    plant_ids = np.arange(1, n_rows + 1)
+    n_botanists = max(1, n_rows // 10)
+    n_origins = max(1, n_rows // 2)
+
+    botanist_idx = rng.integers(0, n_botanists, n_rows)
+    origin_idx = rng.integers(0, n_origins, n_rows)
+    origin_lat = rng.uniform(-90, 90, n_origins).round(7)
+    origin_long = rng.uniform(-180, 180, n_origins).round(7)
+
+    base_time = datetime(2026, 1, 27, 10, 0, 0)
+    recorded = [base_time + timedelta(seconds=int(s), microseconds=int(us))
+                for s, us in zip(rng.integers(0, 60, n_rows),
+                                 rng.integers(0, 1_000_000, n_rows))]
+    watered = [base_time - timedelta(minutes=int(m))
+               for m in rng.integers(0, 60 * 48, n_rows)]
+
+    has_image = rng.random(n_rows) > 0.3
+
+    return pd.DataFrame({
+        "plant_id": plant_ids,
+        "name": [f"plant ‘{i}’ (group)" for i in plant_ids],
+        "scientific_name": [f"genus  species '{i % 50}'" for i in plant_ids],
+        "soil_moisture": rng.uniform(-5, 105, n_rows),
+        "temperature": rng.uniform(-20, 75, n_rows),
+        "recording_taken": [t.isoformat() for t in recorded],
+        "last_watered": [t.isoformat() for t in watered],
+        "botanist_name": [f"Botanist {i}" for i in botanist_idx],
+        "botanist_email": [f"botanist.{i}@lnhm.co.uk" for i in botanist_idx],
+        "botanist_phone": [f"001-{i % 1000:03d}.555-{i % 10000:04d}x{i}"
+                           for i in botanist_idx],
+        "origin_city": [f" city {i} " for i in origin_idx],
+        "origin_country": [f"country {i % 150}" for i in origin_idx],
+        "origin_latitude": [str(origin_lat[i]) for i in origin_idx],
+        "origin_longitude": [str(origin_long[i]) for i in origin_idx],
+        "image_license_url": np.where(has_image, "https://example.com/license", None),
+        "image_original_url": np.where(
+            has_image, "https://example.com/image.jpg",
+            "https://example.com/upgrade_access.jpg"),
+        "image_thumbnail": np.where(has_image, "https://example.com/thumb.jpg", None),
+    })
+
+
+def run_origin_stage(plants_df: pd.DataFrame) -> pd.DataFrame:
+    """Run the origin transform exactly as `pipeline.transform` does."""
+    origin_df = get_raw_origin(plants_df).dropna().drop_duplicates()
+    return transform_origin_data(origin_df)
+
+
+STAGES = {
+    "transform_origin_data": run_origin_stage,
+    "get_botanists": get_botanists,
+    "transform_plant_data": transform_plant_data,
+    "transform_plant_readings": transform_plant_readings,
+}
+
+
+def time_stage(stage, plants_df: pd.DataFrame, repeats: int = DEFAULT_REPEATS) -> float:
+    """Return the best wall-clock time in seconds over several runs of a stage."""
+    timings = []
+    for _ in range(repeats):
+        data = plants_df.copy()
+        with contextlib.redirect_stdout(io.StringIO()):
+            start = time.perf_counter()
+            stage(data)
+            timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def run_benchmarks(sizes: list[int] = None, repeats: int = DEFAULT_REPEATS) -> dict:
+    """Time every transform stage at every input size."""
+    sizes = sizes or DEFAULT_SIZES
+    results = {name: {} for name in STAGES}
+
+    for size in sizes:
+        plants_df = make_synthetic_plants(size)
+        for name, stage in STAGES.items():
+            results[name][str(size)] = time_stage(stage, plants_df, repeats)
+
+    return {
+        "created_at": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "pandas": pd.__version__,
+        "machine": platform.machine(),
+        "repeats": repeats,
+        "results": results,
+    }
+
+
+def save_results(results: dict, path: Path) -> None:
+    """Save benchmark results to a JSON file."""
+    Path(path).write_text(json.dumps(results, indent=2) + "\n", encoding="utf-8")
+
+
+def load_results(path: Path) -> dict:
+    """Load benchmark results from a JSON file."""
+    return json.loads(Path(path).read_text(encoding="utf-8"))
+
+
+def compare_results(baseline: dict, current: dict,
+                    tolerance: float = DEFAULT_TOLERANCE) -> list[dict]:
+    """Return every stage/size whose time grew by more than the tolerance.
+
+    Stages or sizes missing from either side are ignored.
+    """
+    regressions = []
+    for stage, sizes in current["results"].items():
+        for size, seconds in sizes.items():
+            base_seconds = baseline["results"].get(stage, {}).get(size)
+            if base_seconds is None or base_seconds <= 0:
+                continue
+            ratio = seconds / base_seconds
+            if ratio > 1 + tolerance:
+                regressions.append({
+                    "stage": stage,
+                    "size": int(size),
+                    "baseline": base_seconds,
+                    "current": seconds,
+                    "ratio": ratio
+                })
+    return regressions
+
+
+def print_results(results: dict) -> None:
+    """Print benchmark results as a table of milliseconds."""
+    for stage, sizes in results["results"].items():
+        timings = ", ".join(f"{size} rows: {seconds * 1000:.2f} ms"
+                            for size, seconds in sizes.items())
+        print(f"{stage:<26} {timings}")
+
+
+def parse_args(argv: list[str] = None) -> argparse.Namespace:
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run = commands.add_parser("run", help="Run the benchmarks.")
+    run.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES)
+    run.add_argument("--repeats", type=int, default=DEFAULT_REPEATS)
+    destination = run.add_mutually_exclusive_group()
+    destination.add_argument("--output", type=Path,
+                             help="Save results to this file instead of printing them.")
+    destination.add_argument("--update-baseline", action="store_true",
+                             help=f"Replace the committed baseline, {BASELINE_PATH.name}.")
+
+    compare = commands.add_parser(
+        "compare", help="Fail if results regressed against a baseline.")
+    compare.add_argument("--baseline", type=Path, default=BASELINE_PATH)
+    compare.add_argument("--current", type=Path, required=True)
+    compare.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE)
+
+    return parser.parse_args(argv)
+
+
+def main(argv: list[str] = None) -> int:
+    """Run the benchmark command line and return the exit code."""
+    args = parse_args(argv)
+
+    if args.command == "run":
+        output = BASELINE_PATH if args.update_baseline else args.output
+        if output is not None and not args.update_baseline \
+                and output.resolve() == BASELINE_PATH.resolve():
+            print("Refusing to overwrite the baseline; use --update-baseline.")
+            return 2
+        results = run_benchmarks(args.sizes, args.repeats)
+        if output is None:
+            print(json.dumps(results, indent=2))
+            return 0
+        print_results(results)
+        save_results(results, output)
+        print(f"Saved results to {output}")
+        return 0
+
+    regressions = compare_results(
+        load_results(args.baseline), load_results(args.current), args.tolerance)
+    for reg in regressions:
+        print(f"REGRESSION {reg['stage']} @ {reg['size']} rows: "
+              f"{reg['baseline'] * 1000:.2f} ms -> {reg['current'] * 1000:.2f} ms "
+              f"({reg['ratio']:.2f}x)")
+    if regressions:
+        return 1
+    print(f"No regressions beyond {args.tolerance:.0%} tolerance.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,114 @@
+"""Tests for the transform benchmark suite."""
+
+import json
+import pytest
+from benchmark_transform import (
+    make_synthetic_plants, run_benchmarks, compare_results,
+    save_results, load_results, main, STAGES, BASELINE_PATH)
+
+
+def make_results(seconds: float) -> dict:
+    """Build a results dict with the same timing for every stage and size."""
+    return {"results": {stage: {"100": seconds} for stage in STAGES}}
+
+
+class TestMakeSyntheticPlants:
+    """Tests for the synthetic plant data generator."""
+
+    def test_has_extract_columns(self):
+        """Should produce the columns the transform stage expects."""
+        df = make_synthetic_plants(50)
+
+        assert len(df) == 50
+        for col in ["plant_id", "botanist_email", "origin_latitude",
+                    "recording_taken", "image_original_url"]:
+            assert col in df.columns
+
+    def test_is_deterministic(self):
+        """Should return identical data for the same seed."""
+        assert make_synthetic_plants(20).equals(make_synthetic_plants(20))
+
+    @pytest.mark.parametrize("stage", list(STAGES))
+    def test_stages_accept_synthetic_data(self, stage):
+        """Every stage should transform the synthetic data without errors."""
+        result = STAGES[stage](make_synthetic_plants(30))
+
+        assert not result.empty
+
+
+class TestRunBenchmarks:
+    """Tests for the run_benchmarks function."""
+
+    def test_times_every_stage_and_size(self):
+        """Should return a positive timing per stage per size."""
+        results = run_benchmarks(sizes=[10, 20], repeats=1)
+
+        assert set(results["results"]) == set(STAGES)
+        for sizes in results["results"].values():
+            assert set(sizes) == {"10", "20"}
+            assert all(seconds > 0 for seconds in sizes.values())
+
+
+class TestCompareResults:
+    """Tests for the compare_results function."""
+
+    def test_no_regression_within_tolerance(self):
+        """Should not flag slowdowns within the tolerance."""
+        assert compare_results(make_results(1.0), make_results(1.2), 0.25) == []
+
+    def test_flags_regression(self):
+        """Should flag every stage slower than the tolerance allows."""
+        regressions = compare_results(make_results(1.0), make_results(2.0), 0.25)
+
+        assert len(regressions) == len(STAGES)
+        assert regressions[0]["ratio"] == 2.0
+
+    def test_ignores_missing_baseline_entries(self):
+        """Should skip stages and sizes with no baseline."""
+        assert compare_results({"results": {}}, make_results(5.0)) == []
+
+
+class TestMain:
+    """Tests for the command line entry point."""
+
+    def test_compare_exit_codes(self, tmp_path):
+        """Should exit non-zero only when a stage regressed."""
+        baseline = tmp_path / "baseline.json"
+        fast = tmp_path / "fast.json"
+        slow = tmp_path / "slow.json"
+        save_results(make_results(1.0), baseline)
+        save_results(make_results(1.0), fast)
+        save_results(make_results(3.0), slow)
+
+        assert main(["compare", "--baseline", str(baseline),
+                     "--current", str(fast)]) == 0
+        assert main(["compare", "--baseline", str(baseline),
+                     "--current", str(slow)]) == 1
+
+    def test_run_saves_results(self, tmp_path):
+        """Should write results that can be loaded back."""
+        output = tmp_path / "bench.json"
+
+        main(["run", "--sizes", "10", "--repeats", "1", "--output", str(output)])
+
+        assert "transform_plant_data" in load_results(output)["results"]
+
+    def test_run_prints_without_touching_the_baseline(self, mocker, capsys):
+        """A plain run should print JSON and leave the baseline alone."""
+        mock_save = mocker.patch("benchmark_transform.save_results")
+
+        assert main(["run", "--sizes", "10", "--repeats", "1"]) == 0
+
+        mock_save.assert_not_called()
+        assert "transform_plant_data" in json.loads(capsys.readouterr().out)["results"]
+
+    def test_baseline_only_written_explicitly(self, mocker):
+        """--output pointing at the baseline should be refused; --update-baseline writes it."""
+        mock_save = mocker.patch("benchmark_transform.save_results")
+
+        assert main(["run", "--sizes", "10", "--repeats", "1",
+                     "--output", str(BASELINE_PATH)]) == 2
+        mock_save.assert_not_called()
+
+        assert main(["run", "--sizes", "10", "--repeats", "1", "--update-baseline"]) == 0
+        assert mock_save.call_args.args[1] == BASELINE_PATH
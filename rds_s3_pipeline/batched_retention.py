@@ -0,0 +1,158 @@
+"""Retire plant_reading rows in small batches where partitions cannot be truncated.
+
+SQLite and an unpartitioned SQL Server have to delete rows. One DELETE of a
+whole day writes the day to the log in one transaction and escalates to a
+table lock, blocking the per-minute inserts. Instead the oldest
+`RETENTION_BATCH_SIZE` rows, in clustered key order, are deleted and
+committed at a time, with a pause between batches.
+
+Work stops at a deadline: `RETENTION_TIME_BUDGET_SECONDS` from now, or, in
+Lambda, the time the invocation has left less `RETENTION_SAFETY_MARGIN_SECONDS`
+if that is sooner. Every batch takes the oldest rows still before the cutoff,
+so the next run resumes where this one stopped without keeping any state.
+
+On SQL Server each batch seeks an index leading on recording_taken: the
+clustered key (recording_taken, plant_reading_id) of migrations 002 and 005,
+or ix_plant_reading_recording_taken from migration 001. Without one of them
+every batch scans the whole table.
+
+plant_watering is never partitioned, so it is always retired this way,
+keeping each plant's latest watering before the cutoff.
+"""
+import os
+import time
+
+# Below the 5000 locks at which SQL Server escalates a statement to a table lock
+RETENTION_BATCH_SIZE = int(os.getenv('RETENTION_BATCH_SIZE', '4000'))
+RETENTION_BATCH_PAUSE_SECONDS = float(os.getenv('RETENTION_BATCH_PAUSE_SECONDS', '0.1'))
+RETENTION_TIME_BUDGET_SECONDS = float(os.getenv('RETENTION_TIME_BUDGET_SECONDS', '300'))
+# Left for the batch in flight, closing the connection and logging before Lambda's timeout
+RETENTION_SAFETY_MARGIN_SECONDS = float(os.getenv('RETENTION_SAFETY_MARGIN_SECONDS', '10'))
+
+# Oldest first in the order of the clustered key of migrations 002 and 005
+BATCH_DELETE_QUERIES = {
+    'mssql': """
+        WITH oldest AS (
+            SELECT TOP (%(batch_size)s) *
+            FROM plant_reading
+            WHERE recording_taken < %(retire_before)s
+            ORDER BY recording_taken, plant_reading_id
+        )
+        DELETE FROM oldest
+    """,
+    'sqlite': """
+        DELETE FROM plant_reading
+        WHERE rowid IN (
+            SELECT rowid FROM plant_reading
+            WHERE recording_taken < :retire_before
+            ORDER BY recording_taken
+            LIMIT :batch_size
+        )
+    """
+}
+
+
+# Waterings are kept while a reading may still need them: everything after
+# the cutoff, plus each plant's latest watering at or before it, which the
+# first readings after the cutoff take as their last watering
+WATERING_BATCH_DELETE_QUERIES = {
+    'mssql': """
+        WITH oldest AS (
+            SELECT TOP (%(batch_size)s) *
+            FROM plant_watering w
+            WHERE w.watered_at < (SELECT MAX(latest.watered_at) FROM plant_watering latest
+                                  WHERE latest.plant_id = w.plant_id
+                                    AND latest.watered_at <= %(retire_before)s)
+            ORDER BY plant_id, watered_at
+        )
+        DELETE FROM oldest
+    """,
+    'sqlite': """
+        DELETE FROM plant_watering
+        WHERE (plant_id, watered_at) IN (
+            SELECT w.plant_id, w.watered_at FROM plant_watering w
+            WHERE w.watered_at < (SELECT MAX(latest.watered_at) FROM plant_watering latest
+                                  WHERE latest.plant_id = w.plant_id
+                                    AND latest.watered_at <= :retire_before)
+            ORDER BY w.plant_id, w.watered_at
+            LIMIT :batch_size
+        )
+    """
+}
+
+
+def get_retention_deadline(context=None):
+    """Return the time.monotonic() value by which retention has to stop
+
+    `context` is the Lambda context; its remaining time, less
+    RETENTION_SAFETY_MARGIN_SECONDS, caps RETENTION_TIME_BUDGET_SECONDS.
+    """
+    budget = RETENTION_TIME_BUDGET_SECONDS
+    if context is not None:
+        remaining = context.get_remaining_time_in_millis() / 1000
+        budget = min(budget, max(remaining - RETENTION_SAFETY_MARGIN_SECONDS, 0))
+    return time.monotonic() + budget
+
+
+def run_delete_batches(conn, table, query, params, deadline=None):
+    """Run a batched DELETE until it deletes a short batch or the deadline comes
+
+    Every batch is its own transaction, with RETENTION_BATCH_PAUSE_SECONDS
+    between batches. Returns the rows deleted, the seconds taken and whether
+    every row the query targets is gone.
+    """
+    deadline = get_retention_deadline() if deadline is None else deadline
+    batch_size = params['batch_size']
+
+    start = time.monotonic()
+    deleted = 0
+    finished = False
+    cursor = conn.cursor()
+    try:
+        while time.monotonic() < deadline:
+            cursor.execute(query, params)
+            batch = cursor.rowcount
+            conn.commit()
+            deleted += batch
+            if batch < batch_size:
+                finished = True
+                break
+            if time.monotonic() + RETENTION_BATCH_PAUSE_SECONDS >= deadline:
+                break
+            time.sleep(RETENTION_BATCH_PAUSE_SECONDS)
+    except Exception as e:
+        conn.rollback()
+        raise e
+    finally:
+        cursor.close()
+
+    seconds = time.monotonic() - start
+    rate = deleted / seconds if seconds > 0 else 0
+    print(f"[INFO] Deleted {deleted} {table} records in batches of {batch_size}: "
+          f"{seconds:.1f}s, {rate:.0f} rows/s.")
+    if not finished:
+        print(f"[INFO] Retention deadline reached; the remaining {table} records "
+              f"are deleted on the next run.")
+    return {'deleted': deleted, 'seconds': seconds, 'finished': finished}
+
+
+def delete_in_batches(conn, retire_before, backend, batch_size=None, deadline=None):
+    """Delete the readings before `retire_before` one short transaction at a time
+
+    Returns the rows deleted, the seconds taken and whether every row before
+    the cutoff is gone.
+    """
+    params = {'batch_size': batch_size or RETENTION_BATCH_SIZE, 'retire_before': retire_before}
+    return run_delete_batches(conn, 'plant_reading', BATCH_DELETE_QUERIES[backend], params,
+                              deadline)
+
+
+def delete_waterings_in_batches(conn, retire_before, backend, batch_size=None, deadline=None):
+    """Delete the waterings no reading from `retire_before` on can need, in batches
+
+    Each plant keeps its latest watering at or before the cutoff. Returns the
+    same counts as delete_in_batches.
+    """
+    params = {'batch_size': batch_size or RETENTION_BATCH_SIZE, 'retire_before': retire_before}
+    return run_delete_batches(conn, 'plant_watering', WATERING_BATCH_DELETE_QUERIES[backend],
+                              params, deadline)
@@ -0,0 +1,114 @@
+"""Time calculate_daily_summary against the per-group lambda version it replaced.
+
+Usage (from the `rds_s3_pipeline/` directory):
+
+    python benchmark_daily_summary.py --plants 700 --readings-per-plant 1440
+
+Builds one day of synthetic readings, a reading per plant per minute
+(700 x 1440 is just over a million rows), summarises them both ways, checks
+the two results are identical and prints the timings.
+"""
+import argparse
+import time
+import numpy as np
+import pandas as pd
+
+from export_to_parquet import calculate_daily_summary
+
+READING_DATE = pd.Timestamp('2026-01-27')
+
+
+def calculate_daily_summary_lambdas(df) -> pd.DataFrame:
+    """The previous implementation: seven group keys and a Python call per group per statistic"""
+    df['reading_date'] = pd.to_datetime(df['reading_date'])
+    df['last_watered'] = pd.to_datetime(df['last_watered'])
+    summary = df.groupby(
+        ['reading_date', 'plant_id', 'plant_name', 'scientific_name',
+         'botanist_name', 'botanist_email', 'botanist_phone'],
+        as_index=False,
+        dropna=False
+    ).agg(
+        min_temperature=('temperature', 'min'),
+        max_temperature=('temperature', 'max'),
+        avg_temperature=('temperature', 'mean'),
+        median_temperature=('temperature', lambda x: x.quantile(0.5)),
+        percentile_25_temperature=('temperature', lambda x: x.quantile(0.25)),
+        percentile_75_temperature=('temperature', lambda x: x.quantile(0.75)),
+        min_humidity=('soil_moisture', 'min'),
+        max_humidity=('soil_moisture', 'max'),
+        avg_humidity=('soil_moisture', 'mean'),
+        median_humidity=('soil_moisture', lambda x: x.quantile(0.5)),
+        percentile_25_humidity=('soil_moisture', lambda x: x.quantile(0.25)),
+        percentile_75_humidity=('soil_moisture', lambda x: x.quantile(0.75)),
+        times_watered=('last_watered', lambda x: x.dt.date.nunique())
+    )
+    return summary.sort_values(['reading_date', 'plant_id'], ascending=[False, True])
+
+
+def make_readings(n_plants, readings_per_plant, seed=42) -> pd.DataFrame:
+    """Return one day of readings with the columns the export query produces"""
+    rng = np.random.default_rng(seed)
+    n_rows = n_plants * readings_per_plant
+    plant_ids = np.repeat(np.arange(1, n_plants + 1), readings_per_plant)
+    taken = READING_DATE + pd.to_timedelta(
+        np.tile(np.arange(readings_per_plant), n_plants), unit='min')
+    return pd.DataFrame({
+        'reading_date': READING_DATE,
+        'plant_id': plant_ids,
+        'plant_name': [f"Plant {plant_id}" for plant_id in plant_ids],
+        'scientific_name': [None if plant_id % 10 == 0 else f"Plantae {plant_id}"
+                            for plant_id in plant_ids],
+        'botanist_name': [f"Botanist {plant_id % 20}" for plant_id in plant_ids],
+        'botanist_email': [f"botanist.{plant_id % 20}@lnhm.co.uk" for plant_id in plant_ids],
+        'botanist_phone': [f"+44-{plant_id % 20:07d}" for plant_id in plant_ids],
+        'temperature': rng.normal(20, 5, n_rows),
+        'soil_moisture': rng.uniform(0, 100, n_rows),
+        # Watered twice a day, so last_watered spans yesterday and today
+        'last_watered': (taken - pd.Timedelta(hours=6)).floor('12h')
+    })
+
+
+def time_summary(function, df, repeats) -> tuple:
+    """Return the best time of `repeats` runs and the last result"""
+    best = float('inf')
+    for _ in range(repeats):
+        data = df.copy()
+        start = time.perf_counter()
+        result = function(data)
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def run_benchmark(n_plants, readings_per_plant, repeats=3) -> dict:
+    """Time both implementations on the same readings and check they agree"""
+    df = make_readings(n_plants, readings_per_plant)
+    before, expected = time_summary(calculate_daily_summary_lambdas, df, repeats)
+    after, actual = time_summary(calculate_daily_summary, df, repeats)
+    pd.testing.assert_frame_equal(actual, expected)
+    return {
+        'rows': len(df),
+        'before': before,
+        'after': after,
+        'speedup': before / after if after > 0 else float('inf')
+    }
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    """Parse command line arguments"""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--plants', type=int, default=700)
+    parser.add_argument('--readings-per-plant', type=int, default=1440)
+    parser.add_argument('--repeats', type=int, default=3)
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> None:
+    """Run the benchmark and print the timings"""
+    args = parse_args(argv)
+    result = run_benchmark(args.plants, args.readings_per_plant, args.repeats)
+    print(f"{result['rows']} readings: lambdas {result['before']:.3f}s, "
+          f"vectorised {result['after']:.3f}s ({result['speedup']:.1f}x), identical output")
+
+
+if __name__ == '__main__':
+    main()
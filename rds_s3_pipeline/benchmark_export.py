@@ -0,0 +1,157 @@
+"""Run the whole nightly export locally and measure its time and output.
+
+Usage (from the `rds_s3_pipeline/` directory):
+
+    python benchmark_export.py --plants 50 --days 2
+
+Builds an embedded SQLite database the way `schema/load_schema_and_data.py`
+does: the real schema, a synthetic catalogue of `--plants` plants and every
+migration. It then loads one reading per plant per minute for `--days`
+finished days plus the day that is kept, with the pipeline's own loaders, so
+the waterings (every 12 hours) and the hourly rollups are exactly what the
+pipeline would write. Then it runs `handler` with DB_BACKEND=sqlite and
+EXPORT_STORAGE_URL pointing at a local directory, so no AWS account or SQL
+Server is needed. It reports the export time and the files and bytes written
+per dataset.
+"""
+import argparse
+import contextlib
+import io
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+from datetime import timedelta
+from pathlib import Path
+import numpy as np
+import pandas as pd
+
+from export_to_parquet import handler
+from reading_partitions import get_retire_before
+
+REPOSITORY_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(REPOSITORY_ROOT / 'pipeline'))
+sys.path.insert(0, str(REPOSITORY_ROOT / 'schema'))
+
+from db_backend import connect_sqlite  # pylint: disable=wrong-import-position
+from load_schema_and_data import load_schema_and_data  # pylint: disable=wrong-import-position
+from load.load_plant_readings import load_plant_readings_bulk  # pylint: disable=wrong-import-position
+from load.load_hourly_rollup import upsert_hourly_rollups  # pylint: disable=wrong-import-position
+
+DATASETS = ['daily_plant_summaries', 'hourly_plant_summaries', 'raw_plant_readings']
+
+
+def make_readings(n_plants, n_days, seed=42) -> pd.DataFrame:
+    """Return a reading per plant per minute for n_days finished days and the kept day
+
+    Every plant is watered at midnight and noon.
+    """
+    rng = np.random.default_rng(seed)
+    start = get_retire_before() - timedelta(days=n_days)
+    times = pd.date_range(start=start, periods=(n_days + 1) * 1440, freq='min')
+    waterings = pd.date_range(start=start, periods=(n_days + 1) * 2, freq='12h')
+    n_rows = len(times) * n_plants
+    return pd.DataFrame({
+        'plant_id': np.tile(np.arange(1, n_plants + 1), len(times)),
+        'soil_moisture': rng.uniform(0, 100, n_rows),
+        'temperature': rng.normal(20, 5, n_rows),
+        'recording_taken': times.repeat(n_plants),
+        'last_watered': waterings.repeat(720 * n_plants)
+    })
+
+
+def build_database(path, n_plants, n_days, seed=42) -> int:
+    """Create the migrated schema with n_days finished days of readings; return the readings"""
+    readings = make_readings(n_plants, n_days, seed)
+    conn = connect_sqlite(path)
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            load_schema_and_data(conn, synthetic_plants=n_plants)
+            load_plant_readings_bulk(conn, readings)
+            upsert_hourly_rollups(conn, readings)
+        conn.commit()
+    finally:
+        conn.close()
+    return len(readings)
+
+
+@contextlib.contextmanager
+def environment(**values):
+    """Set environment variables for the duration of the block"""
+    previous = {name: os.environ.get(name) for name in values}
+    os.environ.update(values)
+    try:
+        yield
+    finally:
+        for name, value in previous.items():
+            if value is None:
+                os.environ.pop(name, None)
+            else:
+                os.environ[name] = value
+
+
+def measure_output(root) -> dict:
+    """Return the files and bytes written under each dataset"""
+    output = {}
+    for dataset in DATASETS:
+        files = [path for path in (Path(root) / 'input' / dataset).rglob('*.parquet')
+                 if '_staging' not in path.parts]
+        output[dataset] = {'files': len(files),
+                           'bytes': sum(path.stat().st_size for path in files)}
+    return output
+
+
+def remaining_readings(path) -> int:
+    """Return the readings left in plant_reading after retention"""
+    conn = sqlite3.connect(path)
+    try:
+        return conn.execute("SELECT COUNT(*) FROM plant_reading").fetchone()[0]
+    finally:
+        conn.close()
+
+
+def run_benchmark(directory, n_plants, n_days) -> dict:
+    """Build the database, run the handler against local storage and measure it"""
+    database = str(Path(directory) / 'plants.db')
+    root = str(Path(directory) / 'bucket')
+    n_readings = build_database(database, n_plants, n_days)
+
+    with environment(DB_BACKEND='sqlite', SQLITE_PATH=database, EXPORT_STORAGE_URL=root):
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            handler(None, None)
+        seconds = time.perf_counter() - start
+
+    return {
+        'readings': n_readings,
+        'exported': n_readings - remaining_readings(database),
+        'seconds': seconds,
+        'datasets': measure_output(root)
+    }
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    """Parse command line arguments"""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--plants', type=int, default=50)
+    parser.add_argument('--days', type=int, default=2)
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> None:
+    """Run the benchmark and print the time and one row per dataset"""
+    args = parse_args(argv)
+    with tempfile.TemporaryDirectory() as directory:
+        result = run_benchmark(directory, args.plants, args.days)
+
+    print(f"Exported and retired {result['exported']} of {result['readings']} readings "
+          f"in {result['seconds']:.2f}s "
+          f"({result['exported'] / result['seconds']:.0f} readings/s)")
+    print(f"{'dataset':<24} {'files':>6} {'KB':>10}")
+    for dataset, output in result['datasets'].items():
+        print(f"{dataset:<24} {output['files']:>6} {output['bytes'] / 1024:>10.1f}")
+
+
+if __name__ == '__main__':
+    main()
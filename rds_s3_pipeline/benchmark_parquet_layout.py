@@ -0,0 +1,167 @@
+"""Compare bytes scanned by a plant history query before and after the Parquet layout change.
+
+Usage (from the `rds_s3_pipeline/` directory):
+
+    python benchmark_parquet_layout.py --plants 5000 --days 30
+
+Writes the same synthetic daily summaries twice, as year/month/day
+partitions on local disk:
+- "defaults": one write per day with pyarrow's defaults (snappy, the whole
+  day in one row group), as awswrangler wrote them
+- "tuned": the export's layout (sorted by plant_id, PARQUET_ROW_GROUP_ROWS
+  per row group, zstd, dictionary encoded names, statistics)
+
+A history query reads one plant over a date range. Partition pruning picks
+the days and plant_id statistics pick the row groups; the bytes scanned are
+the footers plus the compressed column chunks of the row groups that cannot
+be skipped, which is what a pushdown reader such as Athena fetches.
+"""
+import argparse
+import tempfile
+import time
+from datetime import date, timedelta
+from pathlib import Path
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from export_to_parquet import (DAILY_SUMMARY_PARQUET_OPTIONS, DAILY_SUMMARY_SCHEMA,
+                               get_partition_path)
+from reading_stream import write_row_groups
+
+FIRST_DAY = date(2026, 1, 1)
+FILENAME = 'plant-health-daily-summary.parquet'
+LAYOUTS = ['defaults', 'tuned']
+
+
+def make_summaries(n_plants, day, seed=42) -> pd.DataFrame:
+    """Return one day of daily summaries for n_plants plants, ordered by plant"""
+    rng = np.random.default_rng([seed, day.toordinal()])
+    plant_ids = np.arange(1, n_plants + 1)
+    botanists = plant_ids % 20
+    df = pd.DataFrame({
+        'reading_date': pd.Timestamp(day),
+        'plant_id': plant_ids,
+        'plant_name': [f"Plant {plant_id % 300}" for plant_id in plant_ids],
+        'scientific_name': [f"Plantae species {plant_id % 300}" for plant_id in plant_ids],
+        'botanist_name': [f"Botanist {botanist}" for botanist in botanists],
+        'botanist_email': [f"botanist.{botanist}@lnhm.co.uk" for botanist in botanists],
+        'botanist_phone': [f"+44-{botanist:07d}" for botanist in botanists]
+    })
+    for measure, centre in [('temperature', 20), ('humidity', 50)]:
+        values = np.sort(rng.normal(centre, 5, (n_plants, 6)), axis=1)
+        for i, statistic in enumerate(['min', 'percentile_25', 'median', 'avg',
+                                       'percentile_75', 'max']):
+            df[f'{statistic}_{measure}'] = values[:, i]
+    df['times_watered'] = rng.integers(0, 3, n_plants)
+    return df[DAILY_SUMMARY_SCHEMA.names]
+
+
+def write_day(df, directory, layout, day) -> None:
+    """Write one day's summaries into its partition in the given layout"""
+    partition = Path(get_partition_path(str(Path(directory) / layout), day))
+    partition.mkdir(parents=True, exist_ok=True)
+    path = str(partition / FILENAME)
+    if layout == 'defaults':
+        pq.write_table(pa.Table.from_pandas(df, schema=DAILY_SUMMARY_SCHEMA,
+                                            preserve_index=False), path)
+    else:
+        write_row_groups(iter([df]), path, DAILY_SUMMARY_SCHEMA,
+                         **DAILY_SUMMARY_PARQUET_OPTIONS)
+
+
+def write_datasets(directory, n_plants, n_days) -> None:
+    """Write every day in both layouts"""
+    for offset in range(n_days):
+        day = FIRST_DAY + timedelta(days=offset)
+        df = make_summaries(n_plants, day)
+        for layout in LAYOUTS:
+            write_day(df, directory, layout, day)
+
+
+def get_day_files(directory, layout, start_day, n_days) -> list:
+    """Return the files of the partitions a date range prunes down to"""
+    return [str(Path(get_partition_path(str(Path(directory) / layout),
+                                        start_day + timedelta(days=offset))) / FILENAME)
+            for offset in range(n_days)]
+
+
+def bytes_scanned(paths, plant_id) -> int:
+    """Return the footer and column chunk bytes a pushdown reader fetches for one plant"""
+    total = 0
+    for path in paths:
+        metadata = pq.ParquetFile(path).metadata
+        total += metadata.serialized_size
+        plant_column = DAILY_SUMMARY_SCHEMA.get_field_index('plant_id')
+        for i in range(metadata.num_row_groups):
+            row_group = metadata.row_group(i)
+            statistics = row_group.column(plant_column).statistics
+            if statistics is not None and statistics.has_min_max \
+                    and not statistics.min <= plant_id <= statistics.max:
+                continue
+            total += sum(row_group.column(j).total_compressed_size
+                         for j in range(row_group.num_columns))
+    return total
+
+
+def history_query(paths, plant_id) -> pd.DataFrame:
+    """Read one plant's summaries from the given day files"""
+    return pq.read_table(paths, filters=[('plant_id', '=', plant_id)]).to_pandas()
+
+
+def dataset_bytes(directory, layout) -> int:
+    """Return the size of a layout's files on disk"""
+    return sum(path.stat().st_size for path in (Path(directory) / layout).rglob('*.parquet'))
+
+
+def run_benchmark(directory, n_plants, n_days, history_days=30, n_queries=20) -> dict:
+    """Write both layouts, run the same history queries on each and compare"""
+    write_datasets(directory, n_plants, n_days)
+    history_days = min(history_days, n_days)
+    start_day = FIRST_DAY + timedelta(days=n_days - history_days)
+    plant_ids = np.random.default_rng(0).integers(1, n_plants + 1, n_queries).tolist()
+
+    results = {}
+    answers = {}
+    for layout in LAYOUTS:
+        paths = get_day_files(directory, layout, start_day, history_days)
+        start = time.perf_counter()
+        answers[layout] = [history_query(paths, plant_id) for plant_id in plant_ids]
+        seconds = time.perf_counter() - start
+        results[layout] = {
+            'file_bytes': dataset_bytes(directory, layout),
+            'bytes_per_query': sum(bytes_scanned(paths, plant_id)
+                                   for plant_id in plant_ids) / n_queries,
+            'query_ms': seconds * 1000 / n_queries
+        }
+    for before, after in zip(*answers.values()):
+        pd.testing.assert_frame_equal(before, after)
+    return results
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    """Parse command line arguments"""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--plants', type=int, default=5000)
+    parser.add_argument('--days', type=int, default=30)
+    parser.add_argument('--history-days', type=int, default=30)
+    parser.add_argument('--queries', type=int, default=20)
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> None:
+    """Run the benchmark and print one row per layout"""
+    args = parse_args(argv)
+    with tempfile.TemporaryDirectory() as directory:
+        results = run_benchmark(directory, args.plants, args.days, args.history_days,
+                                args.queries)
+
+    print(f"{'layout':<10} {'dataset (KB)':>13} {'scanned/query (KB)':>19} {'query (ms)':>11}")
+    for layout, result in results.items():
+        print(f"{layout:<10} {result['file_bytes'] / 1024:>13.1f} "
+              f"{result['bytes_per_query'] / 1024:>19.1f} {result['query_ms']:>11.2f}")
+
+
+if __name__ == '__main__':
+    main()
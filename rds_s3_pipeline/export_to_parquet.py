@@ -1,13 +1,87 @@
 import os
+import sqlite3
+import sys
+import tempfile
 import pymssql
 import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
 import boto3
-import awswrangler as wr
-from datetime import datetime
+from datetime import datetime, time, timedelta
+from pathlib import Path
 from dotenv import load_dotenv
+from batched_retention import (delete_in_batches, delete_waterings_in_batches,
+                               get_retention_deadline)
+from reading_partitions import get_retire_before, is_partitioned, retire_partitions
+from reading_stream import (MemoryCeiling, iter_complete_plants, iter_reading_chunks,
+                            write_row_groups)
+import storage
+
+# The image copies sql_dialects.py in beside this file; in the repository it is
+# read from the pipeline
+sys.path.append(str(Path(__file__).resolve().parent.parent / 'pipeline'))
+from sql_dialects import get_sql_dialect, register_datetime_converter  # pylint: disable=wrong-import-position
 
 load_dotenv()
 
+DESCRIPTIVE_COLUMNS = ['plant_name', 'scientific_name', 'botanist_name',
+                       'botanist_email', 'botanist_phone']
+
+SUMMARY_KEYS = ['reading_date', 'plant_id']
+
+# Soil moisture is published as humidity
+MEASURE_NAMES = {'temperature': 'temperature', 'soil_moisture': 'humidity'}
+
+QUARTILES = {0.5: 'median', 0.25: 'percentile_25', 0.75: 'percentile_75'}
+
+# Row groups are appended as plants are summarised, so every group needs the same schema
+DAILY_SUMMARY_SCHEMA = pa.schema(
+    [('reading_date', pa.timestamp('ns')), ('plant_id', pa.int64())]
+    + [(column, pa.string()) for column in DESCRIPTIVE_COLUMNS]
+    + [(f'{statistic}_{measure}', pa.float64())
+       for measure in ['temperature', 'humidity']
+       for statistic in ['min', 'max', 'avg', 'median', 'percentile_25', 'percentile_75']]
+    + [('times_watered', pa.int64())]
+)
+
+# Files are staged here, inside each dataset, before they replace a partition
+STAGING_PREFIX = '_staging'
+
+# Each day's file is sorted by plant_id, the history page's filter, with
+# row-group statistics to skip on. The descriptive columns repeat the same
+# few names on every row, so they are dictionary encoded
+DAILY_SUMMARY_PARQUET_OPTIONS = {
+    'compression': 'zstd',
+    'use_dictionary': DESCRIPTIVE_COLUMNS,
+    'write_statistics': True,
+    'sorting_columns': [pq.SortingColumn(DAILY_SUMMARY_SCHEMA.get_field_index('plant_id'))]
+}
+
+# Raw readings are archived before retention deletes them, one file per hour
+RAW_READING_SCHEMA = pa.schema([
+    ('plant_id', pa.int32()),
+    ('recording_taken', pa.timestamp('us')),
+    ('soil_moisture', pa.float64()),
+    ('temperature', pa.float64()),
+    ('last_watered', pa.timestamp('us'))
+])
+
+# Sorted by plant then time; plant_id repeats within an hour, and splitting
+# the float bytes into streams lets zstd compress the readings
+RAW_READING_PARQUET_OPTIONS = {
+    'row_group_rows': 100000,
+    'compression': 'zstd',
+    'use_dictionary': ['plant_id'],
+    'use_byte_stream_split': ['soil_moisture', 'temperature'],
+    'write_statistics': True,
+    'sorting_columns': [pq.SortingColumn(0), pq.SortingColumn(1)]
+}
+
+# The export's progress is kept in export_watermark (schema migration 006)
+WATERMARK_NAME = 'daily_plant_summaries'
+
+register_datetime_converter()
+
 def create_boto3_session():
     """Create and return boto3 session with credentials from environment"""
     return boto3.Session(
@@ -16,31 +90,108 @@ def create_boto3_session():
         region_name=os.getenv('DEFAULT_REGION', 'eu-west-2')
     )
 
+def get_watered_readings_query(columns, order_by):
+    """Return SQL for the readings taken between the `start` and `end` parameters,
+    each with its last watering: the latest plant_watering event at or before it
+
+    Rather than look up a watering for every reading, each plant's day is cut
+    into spans at its waterings, and every span's readings are read in one
+    range seek of the (plant_id, recording_taken) index. The first span
+    carries the plant's last watering before the day. The CROSS JOIN keeps
+    the spans as the outer side on SQLite; SQL Server treats it as a join.
+    """
+    named = get_sql_dialect()['named_placeholder']
+    start, end = named.format('start'), named.format('end')
+    return f"""
+        WITH last_before AS (
+            SELECT plant_id, MAX(watered_at) AS watered_at
+            FROM plant_watering
+            WHERE watered_at <= {start}
+            GROUP BY plant_id
+        ),
+        spans AS (
+            SELECT p.plant_id, {start} AS span_start, lb.watered_at AS last_watered
+            FROM plant p
+            LEFT JOIN last_before lb ON lb.plant_id = p.plant_id
+            UNION ALL
+            SELECT plant_id, watered_at, watered_at
+            FROM plant_watering
+            WHERE watered_at > {start} AND watered_at < {end}
+        ),
+        bounded_spans AS (
+            SELECT plant_id, span_start, last_watered,
+                   LEAD(span_start, 1, {end}) OVER (
+                       PARTITION BY plant_id ORDER BY span_start) AS span_end
+            FROM spans
+        )
+        SELECT {', '.join(f'pr.{column}' for column in columns)}, s.last_watered
+        FROM bounded_spans s
+        CROSS JOIN plant_reading pr
+        WHERE pr.plant_id = s.plant_id
+          AND pr.recording_taken >= s.span_start
+          AND pr.recording_taken < s.span_end
+        ORDER BY {', '.join(f'pr.{column}' for column in order_by)}
+    """
+
 def get_raw_data_query():
-    """Return simple SQL query to get raw plant reading data with joins"""
+    """Return SQL for the readings taken between two times, ordered by plant
+
+    The plant and botanist details come from get_plant_details_query instead of
+    being repeated on every reading.
+    """
+    return get_watered_readings_query(['plant_id', 'temperature', 'soil_moisture'],
+                                      ['plant_id'])
+
+def get_raw_archive_query():
+    """Return SQL for every column of the readings taken between two times, for the archive"""
+    return get_watered_readings_query(
+        ['plant_id', 'recording_taken', 'soil_moisture', 'temperature'],
+        ['plant_id', 'recording_taken'])
+
+def get_plant_details_query():
+    """Return SQL for the plant and botanist details the daily summaries carry"""
     return """
         SELECT
-            CAST(pr.recording_taken AS DATE) AS reading_date,
             p.plant_id,
             p.name AS plant_name,
             p.scientific_name,
             b.name AS botanist_name,
             b.email AS botanist_email,
-            b.phone AS botanist_phone,
-            pr.temperature,
-            pr.soil_moisture,
-            pr.last_watered
+            b.phone AS botanist_phone
         FROM plant p
         INNER JOIN botanist b ON p.botanist_id = b.botanist_id
-        INNER JOIN plant_reading pr ON p.plant_id = pr.plant_id
-        ORDER BY pr.recording_taken DESC, p.plant_id
     """
 
-def execute_query(connection, query):
+def get_hourly_rollup_query():
+    """Return SQL for the hourly rollups the pipeline maintains, between two times"""
+    placeholder = get_sql_dialect()['placeholder']
+    return f"""
+        SELECT
+            h.reading_hour,
+            h.plant_id,
+            p.name AS plant_name,
+            h.reading_count,
+            h.min_temperature,
+            h.max_temperature,
+            h.sum_temperature,
+            h.sum_squares_temperature,
+            h.min_soil_moisture,
+            h.max_soil_moisture,
+            h.sum_soil_moisture,
+            h.sum_squares_soil_moisture,
+            h.first_watered,
+            h.last_watered
+        FROM plant_reading_hourly h
+        INNER JOIN plant p ON h.plant_id = p.plant_id
+        WHERE h.reading_hour >= {placeholder} AND h.reading_hour < {placeholder}
+        ORDER BY h.reading_hour, h.plant_id
+    """
+
+def execute_query(connection, query, params=()):
     """Execute SQL query and return results as DataFrame"""
     cursor = connection.cursor()
     try:
-        cursor.execute(query)
+        cursor.execute(query, params)
         columns = [desc[0] for desc in cursor.description]
         data = cursor.fetchall()
         return pd.DataFrame(data, columns=columns)
@@ -48,66 +199,123 @@ def execute_query(connection, query):
         cursor.close()
 
 def calculate_daily_summary(df) -> pd.DataFrame:
-    """Calculate daily plant health summary statistics using pandas"""
+    """Calculate daily plant health summary statistics using pandas
+
+    Groups on (reading_date, plant_id) only. Every statistic, the quartiles
+    included, is a vectorised groupby aggregation, and the plant and botanist
+    details are joined back onto the result.
+    """
     # Convert dates
     df['reading_date'] = pd.to_datetime(df['reading_date'])
     df['last_watered'] = pd.to_datetime(df['last_watered'])
+    if df.empty:
+        return pd.DataFrame(columns=DAILY_SUMMARY_SCHEMA.names).astype(
+            {'reading_date': df['reading_date'].dtype})
 
-    # Group by date and plant, calculate aggregations
-    summary = df.groupby(
-        ['reading_date', 'plant_id', 'plant_name', 'scientific_name',
-         'botanist_name', 'botanist_email', 'botanist_phone'],
-        as_index=False,
-        dropna=False
-    ).agg(
-        min_temperature=('temperature', 'min'),
-        max_temperature=('temperature', 'max'),
-        avg_temperature=('temperature', 'mean'),
-        median_temperature=('temperature', lambda x: x.quantile(0.5)),
-        percentile_25_temperature=('temperature', lambda x: x.quantile(0.25)),
-        percentile_75_temperature=('temperature', lambda x: x.quantile(0.75)),
-        min_humidity=('soil_moisture', 'min'),
-        max_humidity=('soil_moisture', 'max'),
-        avg_humidity=('soil_moisture', 'mean'),
-        median_humidity=('soil_moisture', lambda x: x.quantile(0.5)),
-        percentile_25_humidity=('soil_moisture', lambda x: x.quantile(0.25)),
-        percentile_75_humidity=('soil_moisture', lambda x: x.quantile(0.75)),
-        times_watered=('last_watered', lambda x: x.dt.date.nunique())
-    )
+    grouped = df.groupby(SUMMARY_KEYS, dropna=False)
+    measures = grouped[list(MEASURE_NAMES)]
+    basic = measures.agg(['min', 'max', 'mean'])
+    quartiles = measures.quantile(list(QUARTILES)).unstack()
+
+    statistics = {}
+    for measure, name in MEASURE_NAMES.items():
+        statistics[f'min_{name}'] = basic[(measure, 'min')]
+        statistics[f'max_{name}'] = basic[(measure, 'max')]
+        statistics[f'avg_{name}'] = basic[(measure, 'mean')]
+        for quantile, label in QUARTILES.items():
+            statistics[f'{label}_{name}'] = quartiles[(measure, quantile)]
+    # Distinct watering dates: normalising to midnight keeps it a datetime column
+    statistics['times_watered'] = (
+        df['last_watered'].dt.normalize().groupby([df[key] for key in SUMMARY_KEYS],
+                                                  dropna=False).nunique())
+
+    summary = pd.concat([grouped[DESCRIPTIVE_COLUMNS].first(skipna=False),
+                         pd.DataFrame(statistics)], axis=1).reset_index()
 
     # Sort by date descending
     summary = summary.sort_values(['reading_date', 'plant_id'], ascending=[False, True])
 
     return summary
 
-def add_partition_columns(df):
-    """Add year, month, day partition columns to DataFrame"""
-    df['reading_date'] = pd.to_datetime(df['reading_date'])
-    df['year'] = df['reading_date'].dt.year
-    df['month'] = df['reading_date'].dt.month.apply(lambda x: f"{x:02d}")
-    df['day'] = df['reading_date'].dt.day.apply(lambda x: f"{x:02d}")
-    return df
-
-def write_to_s3(df, output_path, partition_cols, session):
-    """Write DataFrame to S3 as partitioned parquet"""
-    wr.s3.to_parquet(
-        df=df,
-        path=output_path,
-        dataset=True,
-        partition_cols=partition_cols,
-        filename_prefix='plant-health-daily-summary',
-        mode='overwrite',
-        boto3_session=session
-    )
+def calculate_hourly_summary(df) -> pd.DataFrame:
+    """Calculate hourly plant statistics from rollups of count, sum and sum of squares"""
+    df['reading_hour'] = pd.to_datetime(df['reading_hour'])
+    summary = df[['reading_hour', 'plant_id', 'plant_name', 'reading_count']].copy()
+    summary.insert(0, 'reading_date', df['reading_hour'].dt.normalize())
 
-def create_output_folder(s3_bucket, session):
-    """Create empty output folder in S3 bucket"""
-    output_folder_path = f"s3://{s3_bucket}/output/"
-    wr.s3.to_parquet(
-        df=pd.DataFrame({'_placeholder': []}),
-        path=f"{output_folder_path}.placeholder",
-        boto3_session=session
-    )
+    # Soil moisture is published as humidity, as in the daily summaries
+    for measure, name in [('temperature', 'temperature'), ('soil_moisture', 'humidity')]:
+        mean = df[f'sum_{measure}'] / df['reading_count']
+        variance = (df[f'sum_squares_{measure}'] / df['reading_count'] - mean ** 2).clip(lower=0)
+        summary[f'min_{name}'] = df[f'min_{measure}']
+        summary[f'max_{name}'] = df[f'max_{measure}']
+        summary[f'avg_{name}'] = mean
+        summary[f'std_{name}'] = variance ** 0.5
+
+    summary['first_watered'] = pd.to_datetime(df['first_watered'])
+    summary['last_watered'] = pd.to_datetime(df['last_watered'])
+    return summary.sort_values(['reading_hour', 'plant_id'], ascending=[False, True])
+
+def add_plant_details(readings, plant_details, reading_date):
+    """Join plant and botanist details onto one day's readings"""
+    readings = readings.merge(plant_details, on='plant_id', how='inner')
+    readings.insert(0, 'reading_date', reading_date)
+    return readings
+
+def get_partition_path(output_path, day, hour=None):
+    """Return the prefix of one day's partition, or of one hour's within it"""
+    path = f"{output_path}/year={day.year}/month={day.month:02d}/day={day.day:02d}/"
+    return path if hour is None else f"{path}hour={hour:02d}/"
+
+def get_staging_path(output_path, day, hour=None):
+    """Return the prefix a partition's file is staged under before it is committed
+
+    Athena skips prefixes that start with an underscore, so staged files are
+    never read as part of the table.
+    """
+    name = f"{day:%Y-%m-%d}" if hour is None else f"{day:%Y-%m-%d}T{hour:02d}"
+    return f"{output_path}/{STAGING_PREFIX}/{name}/"
+
+def replace_partition(local_path, output_path, day, session,
+                      filename_prefix='plant-health-daily-summary'):
+    """Replace one day's (or hour's) partition with a local Parquet file
+
+    `day` is a date for a day partition, or a datetime for the partition of
+    the hour it falls in.
+
+    The file is staged first, then moved over the partition's single file,
+    so the partition is never empty and a re-run writes the same path. Any
+    other files in the partition are removed after the move; until then a
+    query can read them alongside the new file. On S3 the move is a copy
+    and a delete, not an atomic swap (see storage.move). `output_path` may
+    be an s3:// URL or a local directory.
+    """
+    hour = day.hour if isinstance(day, datetime) else None
+    filename = f"{filename_prefix}.parquet"
+    partition_path = get_partition_path(output_path, day, hour)
+    staged_path = f"{get_staging_path(output_path, day, hour)}{filename}"
+    storage.upload(local_path, staged_path, session)
+    storage.move(staged_path, f"{partition_path}{filename}", session)
+
+    stale = [path for path in storage.list_files(partition_path, session)
+             if path != f"{partition_path}{filename}"]
+    storage.delete(stale, session)
+
+def write_partitions(df, output_path, session, filename_prefix='plant-health-daily-summary'):
+    """Write DataFrame as Parquet, replacing only the day partitions it holds"""
+    for day, partition in df.groupby(df['reading_date'].dt.date):
+        local_path = os.path.join(tempfile.gettempdir(), f"{filename_prefix}-{day}.parquet")
+        try:
+            partition.to_parquet(local_path, index=False)
+            replace_partition(local_path, output_path, day, session, filename_prefix)
+        finally:
+            if os.path.exists(local_path):
+                os.remove(local_path)
+
+def create_output_folder(root, session):
+    """Create empty output folder under the storage root"""
+    output_folder_path = f"{root}/output/"
+    storage.make_folder(output_folder_path, session)
     return output_folder_path
 
 def get_s3_bucket():
@@ -117,81 +325,256 @@ def get_s3_bucket():
         raise Exception("No s3 bucket name found in environment!")
     return s3_bucket
 
+def get_storage_url():
+    """Return the root the export writes under: EXPORT_STORAGE_URL (an s3:// URL,
+    file:// URL or local directory) if set, otherwise the S3 bucket"""
+    return (os.getenv('EXPORT_STORAGE_URL') or f"s3://{get_s3_bucket()}").rstrip('/')
+
 def get_db_connection():
     """Create and return a database connection"""
+    if os.getenv('DB_BACKEND', 'mssql') == 'sqlite':
+        return sqlite3.connect(os.getenv('SQLITE_PATH', 'plants.db'),
+                               detect_types=sqlite3.PARSE_DECLTYPES)
     return pymssql.connect(
         server=os.getenv('DB_HOST'),
-        port=os.getenv('DB_PORT', 1433),
+        port=os.getenv('DB_PORT', '1433'),
         user=os.getenv('DB_USER'),
         password=os.getenv('DB_PASSWORD'),
         database=os.getenv('DB_NAME')
     )
 
-def export_daily_summaries():
-    """Main function to export daily plant summaries to S3"""
+def get_watermark(conn, export_name=WATERMARK_NAME):
+    """Return the last day an export has written, or None before its first run"""
+    placeholder = get_sql_dialect()['placeholder']
+    cursor = conn.cursor()
+    try:
+        cursor.execute(f"SELECT exported_through FROM export_watermark "
+                       f"WHERE export_name = {placeholder}", (export_name,))
+        row = cursor.fetchone()
+    finally:
+        cursor.close()
+    return pd.Timestamp(row[0]).date() if row else None
+
+def set_watermark(conn, exported_through, export_name=WATERMARK_NAME):
+    """Record that an export has written every day up to `exported_through`"""
+    placeholder = get_sql_dialect()['placeholder']
+    params = (exported_through, datetime.now(), export_name)
+    cursor = conn.cursor()
+    try:
+        cursor.execute(f"""
+            UPDATE export_watermark
+            SET exported_through = {placeholder}, updated_at = {placeholder}
+            WHERE export_name = {placeholder}
+        """, params)
+        if cursor.rowcount == 0:
+            cursor.execute(f"""
+                INSERT INTO export_watermark (exported_through, updated_at, export_name)
+                VALUES ({placeholder}, {placeholder}, {placeholder})
+            """, params)
+        conn.commit()
+    except Exception as e:
+        conn.rollback()
+        raise e
+    finally:
+        cursor.close()
+
+def get_first_reading_day(conn):
+    """Return the day of the oldest stored reading, or None if there are none"""
+    cursor = conn.cursor()
+    try:
+        cursor.execute("SELECT MIN(recording_taken) FROM plant_reading")
+        first_reading = cursor.fetchone()[0]
+    finally:
+        cursor.close()
+    return pd.Timestamp(first_reading).date() if first_reading is not None else None
+
+def get_days_to_export(watermark, first_reading_day, retire_before):
+    """Return the days after the watermark that ended before `retire_before`"""
+    first_day = watermark + timedelta(days=1) if watermark else first_reading_day
+    if first_day is None:
+        return []
+    return [first_day + timedelta(days=offset)
+            for offset in range((retire_before.date() - first_day).days)]
+
+def summarise_day(conn, day_start, day_end, local_path, ceiling):
+    """Stream one day's readings into a local Parquet file of daily summaries
+
+    Readings arrive in typed chunks ordered by plant; each run of whole plants
+    is summarised and appended, so the file is sorted by plant_id. Returns the
+    summary rows written.
+    """
+    plant_details = execute_query(conn, get_plant_details_query())
+    cursor = conn.cursor()
+    try:
+        cursor.execute(get_raw_data_query(), {'start': day_start, 'end': day_end})
+        summaries = (
+            calculate_daily_summary(add_plant_details(readings, plant_details, day_start))
+            for readings in iter_complete_plants(iter_reading_chunks(cursor, ceiling=ceiling))
+        )
+        return write_row_groups(summaries, local_path, DAILY_SUMMARY_SCHEMA,
+                                **DAILY_SUMMARY_PARQUET_OPTIONS)
+    finally:
+        cursor.close()
+
+def get_raw_archive_path(base_path):
+    """Return where raw readings are archived: RAW_ARCHIVE_PATH (an s3:// URL or a
+    local path) if set, otherwise beside the summaries"""
+    return os.getenv('RAW_ARCHIVE_PATH') or f"{base_path}/raw_plant_readings"
+
+def archive_day(conn, session, archive_path, day, ceiling):
+    """Archive one day's raw readings as one Parquet partition per hour
+
+    Each hour is read with its own time-bounded query, streamed in chunks and
+    committed before the next. Returns the readings archived.
+    """
+    n_readings = 0
+    for hour in range(24):
+        hour_start = datetime.combine(day, time(hour))
+        local_path = os.path.join(tempfile.gettempdir(), f"plant-readings-{day}-{hour:02d}.parquet")
+        cursor = conn.cursor()
+        try:
+            cursor.execute(get_raw_archive_query(),
+                           {'start': hour_start, 'end': hour_start + timedelta(hours=1)})
+            n_hour = write_row_groups(iter_reading_chunks(cursor, ceiling=ceiling), local_path,
+                                      RAW_READING_SCHEMA, **RAW_READING_PARQUET_OPTIONS)
+            if n_hour:
+                replace_partition(local_path, archive_path, hour_start, session,
+                                  filename_prefix='plant-readings')
+            n_readings += n_hour
+        finally:
+            cursor.close()
+            if os.path.exists(local_path):
+                os.remove(local_path)
+    return n_readings
+
+def export_day(conn, session, base_path, day):
+    """Export one day's daily and hourly summaries and archive its raw readings,
+    overwriting only that day's partitions"""
+    day_start = datetime.combine(day, time())
+    day_end = day_start + timedelta(days=1)
+
+    ceiling = MemoryCeiling()
+    local_path = os.path.join(tempfile.gettempdir(), f"plant-health-daily-summary-{day}.parquet")
+    try:
+        n_summaries = summarise_day(conn, day_start, day_end, local_path, ceiling)
+        print(f"✓ Streamed plant readings for {day}: {ceiling.report()}")
+        if n_summaries == 0:
+            return 0
+
+        output_path = f"{base_path}/daily_plant_summaries"
+        replace_partition(local_path, output_path, day, session)
+        print(f"✓ Exported daily plant summaries ({n_summaries} rows) to {output_path}")
+    finally:
+        if os.path.exists(local_path):
+            os.remove(local_path)
+
+    # Hourly summaries come from the pipeline's rollups, not the raw readings
+    rollup_df = execute_query(conn, get_hourly_rollup_query(), (day_start, day_end))
+    if not rollup_df.empty:
+        hourly_df = calculate_hourly_summary(rollup_df)
+        output_path = f"{base_path}/hourly_plant_summaries"
+        write_partitions(hourly_df, output_path, session,
+                         filename_prefix='plant-health-hourly-summary')
+        print(f"✓ Exported hourly plant summaries ({len(hourly_df)} rows) to {output_path}")
+
+    # The watermark only moves, and so retention only deletes, once this succeeds
+    archive_path = get_raw_archive_path(base_path)
+    ceiling = MemoryCeiling()
+    n_readings = archive_day(conn, session, archive_path, day, ceiling)
+    print(f"✓ Archived raw plant readings ({n_readings} rows) to {archive_path}: "
+          f"{ceiling.report()}")
+    return n_summaries
+
+
+def export_daily_summaries(retire_before=None):
+    """Export the summaries of each day since the watermark that is about to be retired
+
+    Every day is read with a date-bounded query and written to its own
+    partitions, then the watermark moves past it, so a run normally reads one
+    day however much history is stored. Returns the midnight after the last
+    exported day, or None if nothing has been exported yet.
+    """
     print("[INFO] Starting daily plant summary export from RDS to S3...")
+    retire_before = retire_before or get_retire_before()
 
     # Setup
-    session = create_boto3_session()
+    root = get_storage_url()
+    base_path = f"{root}/input"
+    # Only S3 needs credentials; local storage runs without AWS
+    uses_s3 = storage.is_s3(root) or storage.is_s3(get_raw_archive_path(base_path))
+    session = create_boto3_session() if uses_s3 else None
     conn = get_db_connection()
-    s3_bucket = get_s3_bucket()
-    base_path = f"s3://{s3_bucket}/input"
 
     print(f"Output path: {base_path}\n")
 
-    # Create output folder
-    output_folder = create_output_folder(s3_bucket, session)
-    print(f"✓ Ensured output folder exists: {output_folder}\n")
-
-    # Get raw data
-    query = get_raw_data_query()
-    raw_df = execute_query(conn, query)
-    print(f"✓ Retrieved {len(raw_df)} raw plant reading records")
+    try:
+        # Create output folder
+        output_folder = create_output_folder(root, session)
+        print(f"✓ Ensured output folder exists: {output_folder}\n")
 
-    if not raw_df.empty:
-        # Calculate summary statistics with pandas
-        summary_df = calculate_daily_summary(raw_df)
-        print(f"✓ Calculated {len(summary_df)} daily plant summary records")
+        watermark = get_watermark(conn)
+        days = get_days_to_export(watermark, get_first_reading_day(conn), retire_before)
+        if not days:
+            print(f"⚠ No data to export (exported through {watermark})")
 
-        # Transform and write
-        summary_df = add_partition_columns(summary_df)
-        output_path = f"{base_path}/daily_plant_summaries"
-        write_to_s3(summary_df, output_path, ['year', 'month', 'day'], session)
-        print(f"✓ Exported daily plant summaries ({len(summary_df)} rows) to {output_path}")
-    else:
-        print("⚠ No data to export")
+        # The watermark only moves once a day's partitions are written, so a
+        # failed run re-exports that day next time
+        for day in days:
+            export_day(conn, session, base_path, day)
+            set_watermark(conn, day)
+            watermark = day
+    finally:
+        # Cleanup
+        conn.close()
 
-    # Cleanup
-    conn.close()
     print("\n✓ Export complete!")
+    return datetime.combine(watermark + timedelta(days=1), time()) if watermark else None
 
-def delete_old_plant_readings():
-    """Delete plant_reading records older than 24 hours from the database"""
-    print("\n[INFO] Starting deletion of old plant_reading records...")
+def delete_old_plant_readings(retire_before=None, deadline=None):
+    """Retire the whole days of plant_reading records before `retire_before`
 
-    delete_query = """
-        DELETE FROM plant_reading
-        WHERE recording_taken < DATEADD(hour, -24, GETDATE())
+    On partitioned SQL Server the days' partitions are truncated; SQLite and
+    an unmigrated SQL Server fall back to deleting in small batches. The
+    waterings no remaining reading needs are then deleted in batches too.
+    Both batched deletes stop at the one `deadline`.
     """
+    print("\n[INFO] Starting deletion of old plant_reading records...")
+    retire_before = retire_before or get_retire_before()
+    deadline = get_retention_deadline() if deadline is None else deadline
 
     conn = get_db_connection()
     cursor = conn.cursor()
-    cursor.execute(delete_query)
-    deleted_count = cursor.rowcount
-    conn.commit()
-    cursor.close()
-    conn.close()
+    try:
+        backend = os.getenv('DB_BACKEND', 'mssql')
+        if backend == 'mssql' and is_partitioned(cursor):
+            deleted_count = retire_partitions(conn, retire_before)
+        else:
+            deleted_count = delete_in_batches(conn, retire_before, backend,
+                                              deadline=deadline)['deleted']
+        deleted_waterings = delete_waterings_in_batches(conn, retire_before, backend,
+                                                        deadline=deadline)['deleted']
+    finally:
+        cursor.close()
+        conn.close()
 
-    print(f"[INFO] Deleted {deleted_count} plant_reading records older than 24 hours.")
+    print(f"[INFO] Deleted {deleted_count} plant_reading records recorded before {retire_before}.")
+    print(f"[INFO] Deleted {deleted_waterings} plant_watering records superseded "
+          f"before {retire_before}.")
 
 def handler(event, context):
     """Lambda handler function"""
     print("[INFO] Starting daily plant summary export from RDS to S3...")
-    export_daily_summaries()
+    # Never retire past the watermark, so every deleted reading was exported first
+    retire_before = get_retire_before()
+    exported_before = export_daily_summaries(retire_before)
+    if exported_before is None:
+        print("[INFO] Nothing exported yet; no plant_reading records retired.")
+        return
     print("[INFO] Export complete. Proceeding to delete old plant_reading records...")
-    delete_old_plant_readings()
+    # Retention gets whatever time the export left in this invocation
+    delete_old_plant_readings(min(retire_before, exported_before),
+                              get_retention_deadline(context))
     print("[INFO] Data export and cleanup finished.")
 
 if __name__ == "__main__":
-    export_daily_summaries()
-    delete_old_plant_readings()
+    handler(None, None)
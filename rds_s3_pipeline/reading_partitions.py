@@ -0,0 +1,104 @@
+"""Day partitions of plant_reading on SQL Server (schema migrations 002 and 005).
+
+Retention retires whole days: the partitions before the cutoff are truncated,
+which only deallocates pages, and their boundaries are merged away. Boundaries
+for the coming days are split ahead of the data so splits never move rows.
+"""
+import os
+from datetime import datetime, time, timedelta
+
+# Migration 005 moved the partitions to a DATETIME2(0) function
+PARTITION_FUNCTION = 'pf_plant_reading_day_s'
+PARTITION_SCHEME = 'ps_plant_reading_day_s'
+PARTITION_DAYS_AHEAD = int(os.getenv('PARTITION_DAYS_AHEAD', '7'))
+RETENTION_HOURS = 24
+
+IS_PARTITIONED_QUERY = """
+    SELECT COUNT(*) FROM sys.partition_functions WHERE name = %s
+"""
+
+BOUNDARIES_QUERY = """
+    SELECT CAST(prv.value AS DATETIME2(0))
+    FROM sys.partition_range_values prv
+    INNER JOIN sys.partition_functions pf ON pf.function_id = prv.function_id
+    WHERE pf.name = %s
+    ORDER BY prv.boundary_id
+"""
+
+PARTITION_NUMBER_QUERY = f"SELECT $PARTITION.{PARTITION_FUNCTION}(%s)"
+
+ROWS_BEFORE_QUERY = f"""
+    SELECT COALESCE(SUM(p.rows), 0)
+    FROM sys.partitions p
+    WHERE p.object_id = OBJECT_ID('plant_reading')
+      AND p.index_id = 1
+      AND p.partition_number < $PARTITION.{PARTITION_FUNCTION}(%s)
+"""
+
+SPLIT_QUERY = f"""
+    ALTER PARTITION SCHEME {PARTITION_SCHEME} NEXT USED [PRIMARY];
+    ALTER PARTITION FUNCTION {PARTITION_FUNCTION}() SPLIT RANGE (%s)
+"""
+
+MERGE_QUERY = f"ALTER PARTITION FUNCTION {PARTITION_FUNCTION}() MERGE RANGE (%s)"
+
+def get_retire_before(now=None):
+    """Return the midnight before which whole days of readings are retired.
+
+    Every retired day ended more than RETENTION_HOURS ago, so the table holds
+    between one and two days of readings.
+    """
+    now = now or datetime.now()
+    return datetime.combine((now - timedelta(hours=RETENTION_HOURS)).date(), time())
+
+def is_partitioned(cursor):
+    """Return True once migrations 002 and 005 have partitioned plant_reading"""
+    cursor.execute(IS_PARTITIONED_QUERY, (PARTITION_FUNCTION,))
+    return cursor.fetchone()[0] > 0
+
+def get_partition_boundaries(cursor):
+    """Return the partition function's boundaries, oldest first"""
+    cursor.execute(BOUNDARIES_QUERY, (PARTITION_FUNCTION,))
+    return [row[0] for row in cursor.fetchall()]
+
+def get_partition_number(cursor, value):
+    """Return the partition a recording_taken value falls in"""
+    cursor.execute(PARTITION_NUMBER_QUERY, (value,))
+    return cursor.fetchone()[0]
+
+def count_rows_before(cursor, boundary):
+    """Return the row count of the partitions before a boundary, from metadata"""
+    cursor.execute(ROWS_BEFORE_QUERY, (boundary,))
+    return cursor.fetchone()[0]
+
+def retire_partitions(conn, retire_before, days_ahead=PARTITION_DAYS_AHEAD):
+    """Truncate every partition before `retire_before` and return the rows removed"""
+    cursor = conn.cursor()
+    try:
+        boundaries = get_partition_boundaries(cursor)
+        if retire_before not in boundaries:
+            cursor.execute(SPLIT_QUERY, (retire_before,))
+
+        retired_rows = count_rows_before(cursor, retire_before)
+        last_partition = get_partition_number(cursor, retire_before) - 1
+        if retired_rows:
+            partitions = '1' if last_partition == 1 else f'1 TO {last_partition}'
+            cursor.execute(f"TRUNCATE TABLE plant_reading WITH (PARTITIONS ({partitions}))")
+
+        # Merging empty partitions is metadata-only as well
+        for boundary in boundaries:
+            if boundary < retire_before:
+                cursor.execute(MERGE_QUERY, (boundary,))
+
+        for days in range(1, days_ahead + 2):
+            boundary = retire_before + timedelta(days=days)
+            if boundary not in boundaries:
+                cursor.execute(SPLIT_QUERY, (boundary,))
+
+        conn.commit()
+    except Exception as e:
+        conn.rollback()
+        raise e
+    finally:
+        cursor.close()
+    return retired_rows
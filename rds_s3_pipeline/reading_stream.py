@@ -0,0 +1,153 @@
+"""Stream a day's readings out of the database in bounded memory.
+
+Rows are fetched `EXPORT_FETCH_SIZE` at a time into typed column buffers
+instead of one list of tuples for the whole day. The query returns readings
+ordered by plant, so every plant except the last one in a chunk is complete
+and can be summarised straight away; the last plant's readings are carried
+into the next chunk. Summaries are appended to a Parquet file one row group
+at a time, in row groups of `PARQUET_ROW_GROUP_ROWS` summaries.
+"""
+import os
+import resource
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+EXPORT_FETCH_SIZE = int(os.getenv('EXPORT_FETCH_SIZE', '50000'))
+# Leaves headroom below the 512 MB the export Lambda is given
+EXPORT_MEMORY_LIMIT_MB = int(os.getenv('EXPORT_MEMORY_LIMIT_MB', '448'))
+
+# Summaries per Parquet row group. Files are sorted by plant, so each group's
+# plant_id statistics span a narrow range that readers can skip on
+PARQUET_ROW_GROUP_ROWS = int(os.getenv('PARQUET_ROW_GROUP_ROWS', '1000'))
+
+READING_COLUMN_TYPES = {
+    'plant_id': 'int32',
+    'recording_taken': 'datetime64[ns]',
+    'temperature': 'float64',
+    'soil_moisture': 'float64',
+    'last_watered': 'datetime64[ns]'
+}
+
+
+STATM_PATH = '/proc/self/statm'
+
+
+def get_memory_mb():
+    """Return the memory this process holds now (its resident set), in MB
+
+    ru_maxrss is a lifetime peak that never drops, so a warm Lambda would keep
+    reporting an earlier run's peak. Where /proc is missing, that peak is the
+    best available reading (Linux reports it in KB).
+    """
+    try:
+        with open(STATM_PATH, encoding='ascii') as statm:
+            resident_pages = int(statm.read().split()[1])
+    except OSError:
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    return resident_pages * os.sysconf('SC_PAGE_SIZE') / 2 ** 20
+
+
+class MemoryCeiling:
+    """Tracks the rows streamed and fails once the process's memory passes a limit.
+
+    The limit applies to the whole process, which is what the Lambda is
+    killed for; the report also gives the growth since the ceiling was made.
+    """
+
+    def __init__(self, limit_mb=EXPORT_MEMORY_LIMIT_MB):
+        self.limit_mb = limit_mb
+        self.rows = 0
+        self.baseline_mb = get_memory_mb()
+        self.peak_mb = self.baseline_mb
+
+    def check(self, n_rows=0):
+        """Count rows and raise MemoryError if current memory is over the limit"""
+        self.rows += n_rows
+        memory_mb = get_memory_mb()
+        self.peak_mb = max(self.peak_mb, memory_mb)
+        if memory_mb > self.limit_mb:
+            raise MemoryError(f"Export used {memory_mb:.0f} MB after {self.rows} rows, "
+                              f"over the {self.limit_mb} MB limit; lower EXPORT_FETCH_SIZE.")
+
+    def report(self):
+        """Return a one-line summary of the rows and memory used"""
+        return (f"{self.rows} rows, peak memory {self.peak_mb:.0f} MB of {self.limit_mb} MB "
+                f"({self.peak_mb - self.baseline_mb:+.0f} MB while streaming)")
+
+
+def to_column_buffers(rows, columns):
+    """Convert fetched rows into a DataFrame of typed column arrays"""
+    values = list(zip(*rows)) if rows else [()] * len(columns)
+    buffers = {}
+    for name, column in zip(columns, values):
+        dtype = READING_COLUMN_TYPES.get(name)
+        if dtype == 'datetime64[ns]':
+            buffers[name] = pd.to_datetime(pd.Series(column, dtype=object)).to_numpy(dtype)
+        else:
+            buffers[name] = np.asarray(column, dtype=dtype)
+    return pd.DataFrame(buffers)
+
+
+def iter_reading_chunks(cursor, fetch_size=None, ceiling=None):
+    """Yield the executed query's rows as typed DataFrames of up to fetch_size rows"""
+    fetch_size = fetch_size or EXPORT_FETCH_SIZE
+    columns = [description[0] for description in cursor.description]
+    while True:
+        rows = cursor.fetchmany(fetch_size)
+        if not rows:
+            return
+        chunk = to_column_buffers(rows, columns)
+        del rows
+        if ceiling:
+            ceiling.check(len(chunk))
+        yield chunk
+
+
+def iter_complete_plants(chunks):
+    """Regroup plant-ordered chunks so each yielded DataFrame holds whole plants only"""
+    carry = None
+    for chunk in chunks:
+        if carry is not None:
+            chunk = pd.concat([carry, chunk], ignore_index=True)
+        last_plant = chunk['plant_id'].iloc[-1]
+        is_last_plant = (chunk['plant_id'] == last_plant).to_numpy()
+        carry = chunk[is_last_plant]
+        complete = chunk[~is_last_plant]
+        if not complete.empty:
+            yield complete
+    if carry is not None and not carry.empty:
+        yield carry
+
+
+def write_row_groups(frames, path, schema, row_group_rows=None, **writer_options):
+    """Append DataFrames to a Parquet file in row groups of row_group_rows; return the rows written
+
+    Frames are buffered until a full row group is ready, so the group size does
+    not depend on how many plants each frame holds. `writer_options` are passed
+    to pyarrow's ParquetWriter. No file is created when there are no rows.
+    """
+    row_group_rows = row_group_rows or PARQUET_ROW_GROUP_ROWS
+    writer = None
+    pending = []
+    n_rows = 0
+    try:
+        for frame in frames:
+            if frame.empty:
+                continue
+            if writer is None:
+                writer = pq.ParquetWriter(path, schema, **writer_options)
+            pending.append(pa.Table.from_pandas(frame, schema=schema, preserve_index=False))
+            n_rows += len(frame)
+            if sum(table.num_rows for table in pending) >= row_group_rows:
+                table = pa.concat_tables(pending)
+                n_full = table.num_rows // row_group_rows * row_group_rows
+                writer.write_table(table.slice(0, n_full), row_group_size=row_group_rows)
+                pending = [table.slice(n_full)]
+        if pending and writer is not None:
+            writer.write_table(pa.concat_tables(pending), row_group_size=row_group_rows)
+    finally:
+        if writer is not None:
+            writer.close()
+    return n_rows
@@ -0,0 +1,104 @@
+"""File operations the export needs, on S3 or on the local filesystem.
+
+Every function takes a path and picks the backend from its URL scheme:
+`s3://bucket/key` goes through awswrangler with the given boto3 session,
+while a `file://` URL or a plain path is a local file and needs no session.
+This lets the whole export run, and be benchmarked, without AWS.
+"""
+import os
+import shutil
+from urllib.parse import urlparse
+import awswrangler as wr
+import pandas as pd
+
+LOCAL_SCHEMES = ['', 'file']
+
+
+def get_scheme(path):
+    """Return 's3' or 'file' for a path, failing loudly for anything else"""
+    scheme = urlparse(path).scheme
+    if scheme == 's3':
+        return 's3'
+    if scheme in LOCAL_SCHEMES:
+        return 'file'
+    raise ValueError(f"Unsupported storage URL '{path}'")
+
+
+def is_s3(path):
+    """Return True for an s3:// URL"""
+    return get_scheme(path) == 's3'
+
+
+def to_local_path(path):
+    """Return the filesystem path of a file:// URL or plain path"""
+    return path[len('file://'):] if path.startswith('file://') else path
+
+
+def upload(local_path, path, session=None):
+    """Copy a local file to a path"""
+    if is_s3(path):
+        wr.s3.upload(local_file=local_path, path=path, boto3_session=session)
+        return
+    target = to_local_path(path)
+    os.makedirs(os.path.dirname(target), exist_ok=True)
+    shutil.copyfile(local_path, target)
+
+
+def move(source, target, session=None):
+    """Replace `target` with `source` and remove `source`
+
+    Locally this is a rename, which is atomic within one filesystem. S3 has
+    no rename: the object is copied over `target`, then `source` is deleted
+    in a second request. Readers of `target` see the old object or the new
+    one, because S3 replaces an object whole, but the move is not atomic: a
+    failure after the copy leaves `source` behind as well.
+    """
+    if is_s3(target):
+        source_prefix, source_name = source.rsplit('/', 1)
+        target_prefix, target_name = target.rsplit('/', 1)
+        try:
+            wr.s3.copy_objects(paths=[source], source_path=f"{source_prefix}/",
+                               target_path=f"{target_prefix}/",
+                               replace_filenames={source_name: target_name},
+                               boto3_session=session)
+        finally:
+            wr.s3.delete_objects(path=[source], boto3_session=session)
+        return
+    local_target = to_local_path(target)
+    os.makedirs(os.path.dirname(local_target), exist_ok=True)
+    os.replace(to_local_path(source), local_target)
+
+
+def list_files(prefix, session=None):
+    """Return every file under a prefix, as paths in the prefix's own form"""
+    if is_s3(prefix):
+        return wr.s3.list_objects(prefix, boto3_session=session)
+    root = to_local_path(prefix)
+    paths = []
+    for directory, _, filenames in os.walk(root):
+        for filename in filenames:
+            relative = os.path.relpath(os.path.join(directory, filename), root)
+            paths.append(f"{prefix.rstrip('/')}/{relative.replace(os.sep, '/')}")
+    return sorted(paths)
+
+
+def delete(paths, session=None):
+    """Delete files; nothing happens for an empty list"""
+    s3_paths = [path for path in paths if is_s3(path)]
+    if s3_paths:
+        wr.s3.delete_objects(path=s3_paths, boto3_session=session)
+    for path in paths:
+        if not is_s3(path):
+            os.remove(to_local_path(path))
+
+
+def make_folder(path, session=None):
+    """Make sure a folder exists; S3 has no folders, so a placeholder object marks it"""
+    if is_s3(path):
+        wr.s3.to_parquet(
+            df=pd.DataFrame({'_placeholder': []}),
+            path=f"{path}.placeholder",
+            boto3_session=session
+        )
+        return
+    os.makedirs(to_local_path(path), exist_ok=True)
@@ -0,0 +1,141 @@
+"""Tests for batched_retention module."""
+import sqlite3
+from datetime import datetime
+import pytest
+from batched_retention import (delete_in_batches, delete_waterings_in_batches,
+                               get_retention_deadline, BATCH_DELETE_QUERIES)
+
+
+@pytest.fixture
+def readings_db():
+    """An in-memory plant_reading with five readings before 27 January and one after."""
+    conn = sqlite3.connect(':memory:')
+    conn.execute("CREATE TABLE plant_reading (plant_id INT, recording_taken DATETIME)")
+    conn.executemany("INSERT INTO plant_reading VALUES (1, ?)", [
+        (f'2026-01-26 0{hour}:00:00',) for hour in range(5)] + [('2026-01-27 00:00:00',)])
+    conn.commit()
+    yield conn
+    conn.close()
+
+
+@pytest.fixture
+def waterings_db():
+    """An in-memory plant_watering with three waterings before 27 January and one after."""
+    conn = sqlite3.connect(':memory:')
+    conn.execute("CREATE TABLE plant_watering (plant_id INT, watered_at DATETIME, "
+                 "PRIMARY KEY (plant_id, watered_at)) WITHOUT ROWID")
+    conn.executemany("INSERT INTO plant_watering VALUES (?, ?)", [
+        (1, '2026-01-25 08:00:00'), (1, '2026-01-26 08:00:00'), (1, '2026-01-27 08:00:00'),
+        (2, '2026-01-25 09:00:00')])
+    conn.commit()
+    yield conn
+    conn.close()
+
+
+def remaining(conn):
+    """Return the recording times left in plant_reading."""
+    return [row[0] for row in conn.execute(
+        "SELECT recording_taken FROM plant_reading ORDER BY recording_taken")]
+
+
+class TestGetRetentionDeadline:
+    """Tests for get_retention_deadline function."""
+
+    def test_uses_the_time_budget_outside_lambda(self, mocker):
+        """Without a Lambda context the deadline should be the configured budget away."""
+        mocker.patch('batched_retention.time.monotonic', return_value=1000)
+        mocker.patch('batched_retention.RETENTION_TIME_BUDGET_SECONDS', 300)
+
+        assert get_retention_deadline() == 1300
+
+    def test_stops_short_of_the_lambda_timeout(self, mocker):
+        """In Lambda the deadline should leave the safety margin before the timeout."""
+        mocker.patch('batched_retention.time.monotonic', return_value=1000)
+        mocker.patch('batched_retention.RETENTION_TIME_BUDGET_SECONDS', 300)
+        mocker.patch('batched_retention.RETENTION_SAFETY_MARGIN_SECONDS', 10)
+        context = mocker.MagicMock()
+        context.get_remaining_time_in_millis.return_value = 45000
+
+        assert get_retention_deadline(context) == 1035
+
+    def test_is_now_once_the_lambda_has_no_time_left(self, mocker):
+        """Less time left than the safety margin should leave no time for retention."""
+        mocker.patch('batched_retention.time.monotonic', return_value=1000)
+        context = mocker.MagicMock()
+        context.get_remaining_time_in_millis.return_value = 2000
+
+        assert get_retention_deadline(context) == 1000
+
+
+class TestDeleteInBatches:
+    """Tests for delete_in_batches function."""
+
+    def test_deletes_everything_before_the_cutoff(self, readings_db, mocker):
+        """Every batch should commit, pausing between full batches."""
+        mock_sleep = mocker.patch('batched_retention.time.sleep')
+
+        result = delete_in_batches(readings_db, '2026-01-27 00:00:00', 'sqlite',
+                                   batch_size=2)
+
+        assert result['deleted'] == 5
+        assert result['finished']
+        assert remaining(readings_db) == ['2026-01-27 00:00:00']
+        assert mock_sleep.call_count == 2
+
+    def test_stops_at_the_deadline_oldest_first(self, readings_db, mocker):
+        """Out of time, the oldest rows should be gone and the rest left for the next run."""
+        mocker.patch('batched_retention.time.sleep')
+        mocker.patch('batched_retention.time.monotonic', side_effect=[0, 0, 10, 10])
+
+        result = delete_in_batches(readings_db, '2026-01-27 00:00:00', 'sqlite',
+                                   batch_size=2, deadline=5)
+
+        assert result['deleted'] == 2
+        assert not result['finished']
+        assert remaining(readings_db)[0] == '2026-01-26 02:00:00'
+
+    def test_deletes_nothing_past_the_deadline(self, readings_db, mocker):
+        """A deadline an earlier delete used up should leave every row for the next run."""
+        mocker.patch('batched_retention.time.monotonic', return_value=10)
+
+        result = delete_in_batches(readings_db, '2026-01-27 00:00:00', 'sqlite', deadline=5)
+
+        assert result['deleted'] == 0
+        assert not result['finished']
+        assert len(remaining(readings_db)) == 6
+
+    def test_rolls_back_a_failed_batch(self, mocker):
+        """A failed batch should be rolled back and the error raised."""
+        conn = mocker.MagicMock()
+        conn.cursor.return_value.execute.side_effect = Exception("deadlock")
+
+        with pytest.raises(Exception, match="deadlock"):
+            delete_in_batches(conn, datetime(2026, 1, 27), 'mssql')
+
+        conn.rollback.assert_called_once()
+        conn.cursor.return_value.close.assert_called_once()
+
+    def test_sql_server_deletes_top_n_in_clustered_key_order(self):
+        """The T-SQL batch should take the oldest rows by the clustered key."""
+        query = BATCH_DELETE_QUERIES['mssql']
+
+        assert 'TOP (%(batch_size)s)' in query
+        assert 'ORDER BY recording_taken, plant_reading_id' in query
+
+
+class TestDeleteWateringsInBatches:
+    """Tests for delete_waterings_in_batches function."""
+
+    def test_keeps_each_plants_latest_watering_before_the_cutoff(self, waterings_db, mocker):
+        """Only waterings a later watering before the cutoff supersedes should go."""
+        mocker.patch('batched_retention.time.sleep')
+
+        result = delete_waterings_in_batches(waterings_db, '2026-01-27 00:00:00', 'sqlite',
+                                             batch_size=1)
+
+        assert result['deleted'] == 1
+        assert result['finished']
+        assert waterings_db.execute(
+            "SELECT plant_id, watered_at FROM plant_watering ORDER BY plant_id, watered_at"
+        ).fetchall() == [(1, '2026-01-26 08:00:00'), (1, '2026-01-27 08:00:00'),
+                         (2, '2026-01-25 09:00:00')]
@@ -0,0 +1,31 @@
+"""Tests for benchmark_daily_summary module."""
+from benchmark_daily_summary import make_readings, run_benchmark, main
+
+
+class TestMakeReadings:
+    """Tests for make_readings function."""
+
+    def test_one_reading_per_plant_per_minute(self):
+        """Test that every plant gets the requested number of readings."""
+        df = make_readings(3, 10)
+
+        assert len(df) == 30
+        assert df.groupby('plant_id').size().eq(10).all()
+
+
+class TestRunBenchmark:
+    """Tests for run_benchmark function."""
+
+    def test_reports_both_timings(self):
+        """Test that both implementations are timed on the same rows."""
+        result = run_benchmark(5, 20, repeats=1)
+
+        assert result['rows'] == 100
+        assert result['before'] > 0
+        assert result['after'] > 0
+
+    def test_main_prints_summary(self, capsys):
+        """Test that main prints the row count and identical output."""
+        main(['--plants', '2', '--readings-per-plant', '10', '--repeats', '1'])
+
+        assert '20 readings' in capsys.readouterr().out
@@ -0,0 +1,55 @@
+"""Tests for benchmark_export module."""
+import os
+import sqlite3
+from benchmark_export import build_database, run_benchmark, environment
+
+
+class TestBuildDatabase:
+    """Tests for build_database function."""
+
+    def test_builds_the_migrated_schema_with_the_pipelines_rows(self, tmp_path):
+        """Plants should have their origins and rollups their waterings, as in production."""
+        path = str(tmp_path / 'plants.db')
+
+        n_readings = build_database(path, 2, 1)
+
+        conn = sqlite3.connect(path)
+        plants = conn.execute("SELECT COUNT(*) FROM plant p INNER JOIN origin o "
+                              "ON p.origin_id = o.origin_id INNER JOIN city c "
+                              "ON o.city_id = c.city_id").fetchone()[0]
+        rollups = conn.execute("SELECT SUM(reading_count), COUNT(*) FROM plant_reading_hourly "
+                               "WHERE first_watered IS NOT NULL").fetchone()
+        waterings = conn.execute("SELECT COUNT(*) FROM plant_watering").fetchone()[0]
+        conn.close()
+        assert plants == 2
+        assert rollups == (n_readings, 2 * 2 * 24)
+        assert waterings == 2 * 2 * 2
+
+
+class TestRunBenchmark:
+    """Tests for run_benchmark function."""
+
+    def test_exports_finished_days_to_local_storage(self, tmp_path):
+        """Every finished day should be exported, archived hourly and retired."""
+        result = run_benchmark(tmp_path, 2, 1)
+
+        assert result['readings'] == 2 * 2 * 1440
+        assert result['exported'] == 2 * 1440
+        assert result['datasets']['daily_plant_summaries']['files'] == 1
+        assert result['datasets']['hourly_plant_summaries']['files'] == 1
+        assert result['datasets']['raw_plant_readings']['files'] == 24
+
+
+class TestEnvironment:
+    """Tests for the environment context manager."""
+
+    def test_restores_previous_values(self, monkeypatch):
+        """Variables should be put back, or removed, after the block."""
+        monkeypatch.setenv('DB_BACKEND', 'mssql')
+        monkeypatch.delenv('SQLITE_PATH', raising=False)
+
+        with environment(DB_BACKEND='sqlite', SQLITE_PATH='plants.db'):
+            assert os.environ['DB_BACKEND'] == 'sqlite'
+
+        assert os.environ['DB_BACKEND'] == 'mssql'
+        assert 'SQLITE_PATH' not in os.environ
@@ -0,0 +1,47 @@
+"""Tests for benchmark_parquet_layout module."""
+from datetime import date
+import pyarrow.parquet as pq
+from benchmark_parquet_layout import (make_summaries, write_day, get_day_files,
+                                      bytes_scanned, run_benchmark)
+
+
+class TestWriteDay:
+    """Tests for write_day function."""
+
+    def test_tuned_layout(self, tmp_path):
+        """The tuned layout should be zstd, sorted and split into row groups."""
+        day = date(2026, 1, 27)
+        write_day(make_summaries(2500, day), tmp_path, 'tuned', day)
+
+        [path] = get_day_files(tmp_path, 'tuned', day, 1)
+        metadata = pq.ParquetFile(path).metadata
+        assert metadata.num_row_groups == 3
+        assert metadata.row_group(0).column(0).compression == 'ZSTD'
+        assert metadata.row_group(0).sorting_columns[0].column_index == 1
+
+
+class TestBytesScanned:
+    """Tests for bytes_scanned function."""
+
+    def test_skips_row_groups_outside_the_plant(self, tmp_path):
+        """Only one row group of the tuned layout should be read for a plant."""
+        day = date(2026, 1, 27)
+        df = make_summaries(2500, day)
+        for layout in ['defaults', 'tuned']:
+            write_day(df, tmp_path, layout, day)
+
+        defaults = bytes_scanned(get_day_files(tmp_path, 'defaults', day, 1), 1200)
+        tuned = bytes_scanned(get_day_files(tmp_path, 'tuned', day, 1), 1200)
+
+        assert tuned < defaults / 2
+
+
+class TestRunBenchmark:
+    """Tests for run_benchmark function."""
+
+    def test_both_layouts_measured(self, tmp_path):
+        """Both layouts should answer the same queries and report their sizes."""
+        results = run_benchmark(tmp_path, 100, 3, history_days=2, n_queries=2)
+
+        assert set(results) == {'defaults', 'tuned'}
+        assert all(result['bytes_per_query'] > 0 for result in results.values())
@@ -1,8 +1,74 @@
 """Tests for export_to_parquet module."""
 import pytest
 import pandas as pd
-from datetime import datetime
-from export_to_parquet import calculate_daily_summary
+from datetime import date, datetime
+import sqlite3
+from export_to_parquet import (calculate_daily_summary, get_raw_data_query,
+                               get_raw_archive_query, get_sql_dialect,
+                               delete_old_plant_readings, calculate_hourly_summary,
+                               get_watermark, set_watermark, get_days_to_export,
+                               export_daily_summaries, handler, summarise_day,
+                               execute_query, get_plant_details_query, add_plant_details,
+                               replace_partition, write_partitions, archive_day)
+from reading_stream import MemoryCeiling
+from benchmark_daily_summary import calculate_daily_summary_lambdas, make_readings
+
+
+EXPORT_TABLES = """
+    CREATE TABLE botanist (botanist_id INT, name TEXT, email TEXT, phone TEXT);
+    CREATE TABLE plant (plant_id INT, name TEXT, scientific_name TEXT, botanist_id INT);
+    CREATE TABLE plant_reading (plant_id INT, soil_moisture REAL, temperature REAL,
+                                recording_taken DATETIME);
+    CREATE TABLE plant_watering (plant_id INT, watered_at DATETIME);
+    CREATE TABLE plant_reading_hourly (
+        plant_id INT, reading_hour DATETIME, reading_count INT,
+        min_temperature REAL, max_temperature REAL, sum_temperature REAL,
+        sum_squares_temperature REAL, min_soil_moisture REAL, max_soil_moisture REAL,
+        sum_soil_moisture REAL, sum_squares_soil_moisture REAL,
+        first_watered DATETIME, last_watered DATETIME);
+    CREATE TABLE export_watermark (export_name TEXT PRIMARY KEY, exported_through DATE,
+                                   updated_at DATETIME);
+"""
+
+
+@pytest.fixture
+def export_db(monkeypatch, tmp_path):
+    """A SQLite database holding readings on 26, 27 and 28 January, used by the export."""
+    path = str(tmp_path / 'plants.db')
+    conn = sqlite3.connect(path)
+    conn.executescript(EXPORT_TABLES)
+    conn.execute("INSERT INTO botanist VALUES (1, 'John Smith', 'john@lnhm.org', '+44-1')")
+    conn.execute("INSERT INTO plant VALUES (1, 'Venus Flytrap', 'Dionaea muscipula', 1)")
+    conn.execute("INSERT INTO plant_watering VALUES (1, '2026-01-25 08:00:00')")
+    conn.executemany("INSERT INTO plant_reading VALUES (1, 40, 20, ?)", [
+        ('2026-01-26 10:00:00',), ('2026-01-27 10:00:00',), ('2026-01-28 10:00:00',)])
+    conn.commit()
+    conn.close()
+    monkeypatch.setenv('DB_BACKEND', 'sqlite')
+    monkeypatch.setenv('SQLITE_PATH', path)
+    return path
+
+
+@pytest.fixture
+def mock_s3(mocker):
+    """Replace every S3 call; returns the mocked replace_partition, which keeps each file read."""
+    mocker.patch('export_to_parquet.create_boto3_session')
+    mocker.patch('export_to_parquet.get_s3_bucket', return_value='bucket')
+    mocker.patch('export_to_parquet.create_output_folder')
+    mocker.patch('export_to_parquet.write_partitions')
+    mock_replace = mocker.patch('export_to_parquet.replace_partition')
+    mock_replace.written = []
+
+    def keep_daily_summaries(path, output_path, *_args, **_kwargs):
+        if output_path.endswith('daily_plant_summaries'):
+            mock_replace.written.append(pd.read_parquet(path))
+    mock_replace.side_effect = keep_daily_summaries
+    return mock_replace
+
+
+def get_written_days(mock_replace) -> list:
+    """Return the days each replaced partition held, one list per partition."""
+    return [sorted(df['reading_date'].dt.date.unique()) for df in mock_replace.written]
 
 
 class TestCalculateDailySummary:
@@ -171,3 +237,428 @@ class TestCalculateDailySummary:
 
         for col in stat_columns:
             assert result[col].notna().all(), f"Column {col} contains null values"
+
+    def test_matches_per_group_lambdas(self):
+        """Test that the vectorised statistics equal the per-group lambda ones exactly."""
+        readings = make_readings(30, 50)
+
+        result = calculate_daily_summary(readings.copy())
+
+        pd.testing.assert_frame_equal(result, calculate_daily_summary_lambdas(readings.copy()))
+
+
+class TestCalculateHourlySummary:
+    """Tests for calculate_hourly_summary function."""
+
+    def test_statistics_from_rollups(self):
+        """Averages and standard deviations should match the rolled-up readings."""
+        temperatures, moistures = [20.0, 22.0, 27.0], [40.0, 40.0, 43.0]
+        rollups = pd.DataFrame({
+            'reading_hour': [datetime(2026, 1, 27, 10)],
+            'plant_id': [1],
+            'plant_name': ['Rose'],
+            'reading_count': [3],
+            'min_temperature': [min(temperatures)],
+            'max_temperature': [max(temperatures)],
+            'sum_temperature': [sum(temperatures)],
+            'sum_squares_temperature': [sum(t ** 2 for t in temperatures)],
+            'min_soil_moisture': [min(moistures)],
+            'max_soil_moisture': [max(moistures)],
+            'sum_soil_moisture': [sum(moistures)],
+            'sum_squares_soil_moisture': [sum(m ** 2 for m in moistures)],
+            'first_watered': [datetime(2026, 1, 27, 8)],
+            'last_watered': [datetime(2026, 1, 27, 10, 30)]
+        })
+
+        row = calculate_hourly_summary(rollups).iloc[0]
+
+        assert row['reading_date'] == pd.Timestamp('2026-01-27')
+        assert row['avg_temperature'] == pytest.approx(23.0)
+        assert row['std_temperature'] == pytest.approx(pd.Series(temperatures).std(ddof=0))
+        assert row['avg_humidity'] == pytest.approx(41.0)
+        assert row['std_humidity'] == pytest.approx(pd.Series(moistures).std(ddof=0))
+
+
+class TestSqlDialect:
+    """Tests for the DB_BACKEND dialect selection."""
+
+    def test_defaults_to_sql_server(self, monkeypatch):
+        """Should use T-SQL when no backend is configured."""
+        monkeypatch.delenv('DB_BACKEND', raising=False)
+
+        assert 'watered_at <= %(start)s' in get_raw_data_query()
+        assert 'watered_at < %(end)s' in get_raw_data_query()
+        assert 'watered_at < %(end)s' in get_raw_archive_query()
+
+    def test_sqlite_fragments(self, monkeypatch):
+        """Should use SQLite placeholders for the embedded backend."""
+        monkeypatch.setenv('DB_BACKEND', 'sqlite')
+
+        assert 'watered_at < :end' in get_raw_data_query()
+        assert 'watered_at < :end' in get_raw_archive_query()
+
+    def test_rejects_unknown_backend(self, monkeypatch):
+        """Should fail loudly for an unsupported backend."""
+        monkeypatch.setenv('DB_BACKEND', 'oracle')
+
+        with pytest.raises(ValueError):
+            get_sql_dialect()
+
+
+class TestRawArchiveQuery:
+    """Tests for the last watering the raw reading queries attach."""
+
+    def test_takes_the_latest_watering_at_or_before_each_reading(self, export_db):
+        """Waterings before the day, at its start, at a reading's time and mid-day should count."""
+        conn = sqlite3.connect(export_db)
+        conn.execute("INSERT INTO plant VALUES (2, 'Cactus', NULL, 1)")
+        conn.executemany("INSERT INTO plant_watering VALUES (1, ?)", [
+            ('2026-01-27 00:00:00',), ('2026-01-27 11:00:00',), ('2026-01-27 12:00:00',)])
+        conn.executemany("INSERT INTO plant_reading VALUES (?, 40, 20, ?)", [
+            (1, '2026-01-27 09:00:00'), (1, '2026-01-27 11:00:00'), (1, '2026-01-27 13:00:00'),
+            (2, '2026-01-27 10:00:00')])
+
+        readings = conn.execute(get_raw_archive_query(), {
+            'start': datetime(2026, 1, 27), 'end': datetime(2026, 1, 28)}).fetchall()
+        conn.close()
+
+        assert [(plant_id, taken, watered)
+                for plant_id, taken, _, _, watered in readings] == [
+            (1, '2026-01-27 09:00:00', '2026-01-27 00:00:00'),
+            (1, '2026-01-27 10:00:00', '2026-01-27 00:00:00'),
+            (1, '2026-01-27 11:00:00', '2026-01-27 11:00:00'),
+            (1, '2026-01-27 13:00:00', '2026-01-27 12:00:00'),
+            (2, '2026-01-27 10:00:00', None)]
+
+
+class TestDeleteOldPlantReadings:
+    """Tests for the delete_old_plant_readings function."""
+
+    def test_sqlite_deletes_only_retired_days(self, monkeypatch, tmp_path):
+        """Should range delete readings before the cutoff and keep the rest."""
+        path = str(tmp_path / 'plants.db')
+        conn = sqlite3.connect(path)
+        conn.execute("CREATE TABLE plant_reading (plant_id INT, recording_taken DATETIME)")
+        conn.execute("CREATE TABLE plant_watering (plant_id INT, watered_at DATETIME)")
+        conn.executemany("INSERT INTO plant_reading VALUES (1, ?)", [
+            ('2026-01-26 23:59:00',), ('2026-01-27 00:00:00',), ('2026-01-28 09:00:00',)])
+        conn.executemany("INSERT INTO plant_watering VALUES (1, ?)", [
+            ('2026-01-25 08:00:00',), ('2026-01-26 08:00:00',), ('2026-01-28 08:00:00',)])
+        conn.commit()
+        conn.close()
+        monkeypatch.setenv('DB_BACKEND', 'sqlite')
+        monkeypatch.setenv('SQLITE_PATH', path)
+
+        delete_old_plant_readings(datetime(2026, 1, 27))
+
+        conn = sqlite3.connect(path)
+        remaining = conn.execute("SELECT recording_taken FROM plant_reading").fetchall()
+        waterings = conn.execute("SELECT watered_at FROM plant_watering").fetchall()
+        conn.close()
+        assert remaining == [('2026-01-27 00:00:00',), ('2026-01-28 09:00:00',)]
+        assert waterings == [('2026-01-26 08:00:00',), ('2026-01-28 08:00:00',)]
+
+    def test_partitioned_sql_server_truncates(self, mocker, monkeypatch):
+        """Should hand over to partition retirement once plant_reading is partitioned."""
+        monkeypatch.delenv('DB_BACKEND', raising=False)
+        conn = mocker.MagicMock()
+        mocker.patch('export_to_parquet.get_db_connection', return_value=conn)
+        mocker.patch('export_to_parquet.is_partitioned', return_value=True)
+        mock_retire = mocker.patch('export_to_parquet.retire_partitions', return_value=5)
+        mock_delete = mocker.patch('export_to_parquet.delete_in_batches')
+        mock_waterings = mocker.patch('export_to_parquet.delete_waterings_in_batches',
+                                      return_value={'deleted': 2})
+
+        delete_old_plant_readings(datetime(2026, 1, 27), deadline=100)
+
+        mock_retire.assert_called_once_with(conn, datetime(2026, 1, 27))
+        mock_delete.assert_not_called()
+        mock_waterings.assert_called_once_with(conn, datetime(2026, 1, 27), 'mssql',
+                                               deadline=100)
+        conn.close.assert_called_once()
+
+
+class TestGetDaysToExport:
+    """Tests for the get_days_to_export function."""
+
+    def test_starts_after_the_watermark(self):
+        """Should export the days after the watermark that have ended."""
+        assert get_days_to_export(date(2026, 1, 25), date(2026, 1, 20),
+                                  datetime(2026, 1, 28)) == [date(2026, 1, 26), date(2026, 1, 27)]
+
+    def test_first_run_starts_at_the_oldest_reading(self):
+        """Without a watermark, should start from the oldest stored day."""
+        assert get_days_to_export(None, date(2026, 1, 27),
+                                  datetime(2026, 1, 28)) == [date(2026, 1, 27)]
+
+    def test_nothing_when_up_to_date(self):
+        """Should export nothing once the watermark reaches the cutoff."""
+        assert get_days_to_export(date(2026, 1, 27), None, datetime(2026, 1, 28)) == []
+        assert get_days_to_export(None, None, datetime(2026, 1, 28)) == []
+
+
+class TestWatermark:
+    """Tests for the get_watermark and set_watermark functions."""
+
+    def test_round_trip(self, export_db):
+        """Should be empty at first, then hold the last day set."""
+        conn = sqlite3.connect(export_db, detect_types=sqlite3.PARSE_DECLTYPES)
+
+        assert get_watermark(conn) is None
+        set_watermark(conn, date(2026, 1, 26))
+        set_watermark(conn, date(2026, 1, 27))
+
+        assert get_watermark(conn) == date(2026, 1, 27)
+        assert conn.execute("SELECT COUNT(*) FROM export_watermark").fetchone()[0] == 1
+        conn.close()
+
+
+class TestExportDailySummaries:
+    """Tests for the export_daily_summaries function."""
+
+    def test_first_run_exports_each_finished_day_separately(self, export_db, mock_s3):
+        """Should write one day per call and move the watermark to the last of them."""
+        exported_before = export_daily_summaries(datetime(2026, 1, 28))
+
+        assert get_written_days(mock_s3) == [[date(2026, 1, 26)], [date(2026, 1, 27)]]
+        assert exported_before == datetime(2026, 1, 28)
+        conn = sqlite3.connect(export_db, detect_types=sqlite3.PARSE_DECLTYPES)
+        assert get_watermark(conn) == date(2026, 1, 27)
+        conn.close()
+
+    def test_only_reads_days_after_the_watermark(self, export_db, mock_s3):
+        """A run after the watermark should export only the newly finished day."""
+        conn = sqlite3.connect(export_db)
+        set_watermark(conn, date(2026, 1, 26))
+        conn.close()
+
+        export_daily_summaries(datetime(2026, 1, 28))
+        export_daily_summaries(datetime(2026, 1, 28))
+
+        assert get_written_days(mock_s3) == [[date(2026, 1, 27)]]
+
+    def test_failed_write_keeps_the_watermark(self, export_db, mock_s3):
+        """A day whose write fails should be exported again next run."""
+        # 26 January's daily summaries and hourly archive, then 27 January's summaries
+        mock_s3.side_effect = [None, None, Exception("S3 error")]
+        mock_s3.written = []
+
+        with pytest.raises(Exception):
+            export_daily_summaries(datetime(2026, 1, 28))
+
+        conn = sqlite3.connect(export_db, detect_types=sqlite3.PARSE_DECLTYPES)
+        assert get_watermark(conn) == date(2026, 1, 26)
+        conn.close()
+
+
+class TestSummariseDay:
+    """Tests for the summarise_day function."""
+
+    def test_streamed_summary_matches_whole_day(self, export_db, mocker, tmp_path):
+        """Summarising in small chunks should give the same rows as one pass over the day."""
+        conn = sqlite3.connect(export_db, detect_types=sqlite3.PARSE_DECLTYPES)
+        conn.execute("INSERT INTO plant VALUES (2, 'Cactus', NULL, 1)")
+        conn.executemany("INSERT INTO plant_reading VALUES (?, ?, ?, ?)", [
+            (plant_id, 30 + minute, 18 + minute / 10, f'2026-01-27 11:{minute:02d}:00')
+            for plant_id in (1, 2) for minute in range(7)])
+        conn.execute("INSERT INTO plant_watering VALUES (2, '2026-01-27 11:03:00')")
+        conn.commit()
+        mocker.patch('reading_stream.EXPORT_FETCH_SIZE', 3)
+        day_start, day_end = datetime(2026, 1, 27), datetime(2026, 1, 28)
+        path = str(tmp_path / 'day.parquet')
+
+        n_rows = summarise_day(conn, day_start, day_end, path, MemoryCeiling(limit_mb=10 ** 6))
+
+        readings = execute_query(conn, get_raw_data_query(),
+                                 {'start': day_start, 'end': day_end})
+        expected = calculate_daily_summary(add_plant_details(
+            readings, execute_query(conn, get_plant_details_query()), day_start))
+        conn.close()
+        assert n_rows == 2
+        pd.testing.assert_frame_equal(pd.read_parquet(path), expected.reset_index(drop=True),
+                                      check_dtype=False)
+
+
+class TestReplacePartition:
+    """Tests for replace_partition function."""
+
+    PARTITION = 's3://bucket/input/daily_plant_summaries/year=2026/month=01/day=27/'
+    STAGED = 's3://bucket/input/daily_plant_summaries/_staging/2026-01-27/file.parquet'
+
+    def test_stages_then_copies_over_the_partition_object(self, mocker):
+        """The file should reach the partition by one copy from the staging prefix."""
+        mock_wr = mocker.patch('storage.wr')
+        mock_wr.s3.list_objects.return_value = [f'{self.PARTITION}file.parquet']
+
+        replace_partition('/tmp/day.parquet', 's3://bucket/input/daily_plant_summaries',
+                          date(2026, 1, 27), None, filename_prefix='file')
+
+        mock_wr.s3.upload.assert_called_once_with(local_file='/tmp/day.parquet',
+                                                  path=self.STAGED, boto3_session=None)
+        assert mock_wr.s3.copy_objects.call_args.kwargs['paths'] == [self.STAGED]
+        assert mock_wr.s3.copy_objects.call_args.kwargs['target_path'] == self.PARTITION
+        mock_wr.s3.delete_objects.assert_called_once_with(path=[self.STAGED],
+                                                          boto3_session=None)
+
+    def test_removes_other_objects_after_the_move(self, mocker):
+        """Files left by earlier writers should go, but not the committed file."""
+        mock_wr = mocker.patch('storage.wr')
+        mock_wr.s3.list_objects.return_value = [f'{self.PARTITION}file.parquet',
+                                                f'{self.PARTITION}old-uuid.snappy.parquet']
+
+        replace_partition('/tmp/day.parquet', 's3://bucket/input/daily_plant_summaries',
+                          date(2026, 1, 27), None, filename_prefix='file')
+
+        mock_wr.s3.delete_objects.assert_called_with(
+            path=[f'{self.PARTITION}old-uuid.snappy.parquet'], boto3_session=None)
+
+    def test_failed_copy_leaves_the_partition_alone(self, mocker):
+        """A failed commit should only clean up the staged file."""
+        mock_wr = mocker.patch('storage.wr')
+        mock_wr.s3.copy_objects.side_effect = Exception("copy failed")
+
+        with pytest.raises(Exception, match="copy failed"):
+            replace_partition('/tmp/day.parquet', 's3://bucket/input/daily_plant_summaries',
+                              date(2026, 1, 27), None, filename_prefix='file')
+
+        mock_wr.s3.delete_objects.assert_called_once_with(path=[self.STAGED],
+                                                          boto3_session=None)
+        mock_wr.s3.list_objects.assert_not_called()
+
+
+class TestReplaceLocalPartition:
+    """Tests for replace_partition with a local directory as the target."""
+
+    def test_moves_the_file_and_removes_others(self, tmp_path):
+        """The partition should end up holding only the new file."""
+        partition = tmp_path / 'out' / 'year=2026' / 'month=01' / 'day=27'
+        partition.mkdir(parents=True)
+        (partition / 'file.parquet').write_text('old')
+        (partition / 'stale.parquet').write_text('stale')
+        (tmp_path / 'new.parquet').write_text('new')
+
+        replace_partition(str(tmp_path / 'new.parquet'), str(tmp_path / 'out'),
+                          date(2026, 1, 27), None, filename_prefix='file')
+
+        assert [path.name for path in partition.iterdir()] == ['file.parquet']
+        assert (partition / 'file.parquet').read_text() == 'new'
+        assert not list((tmp_path / 'out' / '_staging').rglob('*.parquet'))
+
+
+class TestArchiveDay:
+    """Tests for archive_day function."""
+
+    def test_writes_hourly_partitions_to_a_local_directory(self, export_db, tmp_path):
+        """Each hour with readings should become its own sorted partition."""
+        conn = sqlite3.connect(export_db, detect_types=sqlite3.PARSE_DECLTYPES)
+        conn.execute("INSERT INTO plant VALUES (2, 'Corpse Flower', 'Amorphophallus', 1)")
+        conn.executemany("INSERT INTO plant_reading VALUES (?, 30, 15, ?)", [
+            (2, '2026-01-27 10:30:00'), (1, '2026-01-27 10:45:00'), (1, '2026-01-27 23:59:59')])
+        conn.commit()
+
+        n_readings = archive_day(conn, None, str(tmp_path / 'raw'), date(2026, 1, 27),
+                                 MemoryCeiling(limit_mb=10 ** 6))
+        conn.close()
+
+        day = tmp_path / 'raw' / 'year=2026' / 'month=01' / 'day=27'
+        assert n_readings == 4
+        assert sorted(path.name for path in day.iterdir()) == ['hour=10', 'hour=23']
+        ten = pd.read_parquet(day / 'hour=10' / 'plant-readings.parquet')
+        assert ten['plant_id'].tolist() == [1, 1, 2]
+        assert ten['last_watered'].tolist() == [pd.Timestamp('2026-01-25 08:00:00')] * 2 + [pd.NaT]
+
+    @pytest.mark.usefixtures('export_db', 'mock_s3')
+    def test_export_archives_before_moving_the_watermark(self, mocker):
+        """A failed archive should leave the day to be exported again."""
+        mocker.patch('export_to_parquet.archive_day', side_effect=Exception("archive failed"))
+        mock_set_watermark = mocker.patch('export_to_parquet.set_watermark')
+
+        with pytest.raises(Exception, match="archive failed"):
+            export_daily_summaries(datetime(2026, 1, 28))
+
+        mock_set_watermark.assert_not_called()
+
+
+class TestWritePartitions:
+    """Tests for write_partitions function."""
+
+    def test_replaces_one_partition_per_day(self, mocker):
+        """Each day in the frame should replace only its own partition."""
+        written = []
+        mocker.patch('export_to_parquet.replace_partition',
+                     side_effect=lambda path, output_path, day, *args: written.append(
+                         (day, len(pd.read_parquet(path)))))
+        df = pd.DataFrame({
+            'reading_date': pd.to_datetime(['2026-01-26', '2026-01-27', '2026-01-27']),
+            'plant_id': [1, 1, 2]
+        })
+
+        write_partitions(df, 's3://bucket/input/hourly_plant_summaries', None, 'hourly')
+
+        assert written == [(date(2026, 1, 26), 1), (date(2026, 1, 27), 2)]
+
+
+class TestHandler:
+    """Tests for the Lambda handler."""
+
+    def test_never_retires_past_the_watermark(self, mocker):
+        """Retention should stop at the end of the last exported day."""
+        mocker.patch('export_to_parquet.get_retire_before', return_value=datetime(2026, 1, 28))
+        mocker.patch('export_to_parquet.export_daily_summaries',
+                     return_value=datetime(2026, 1, 27))
+        mocker.patch('export_to_parquet.get_retention_deadline', return_value=100)
+        mock_delete = mocker.patch('export_to_parquet.delete_old_plant_readings')
+
+        handler(None, None)
+
+        mock_delete.assert_called_once_with(datetime(2026, 1, 27), 100)
+
+    def test_retention_gets_the_time_the_export_left(self, mocker):
+        """Retention's deadline should come from the Lambda context after the export."""
+        mocker.patch('export_to_parquet.get_retire_before', return_value=datetime(2026, 1, 28))
+        mocker.patch('export_to_parquet.export_daily_summaries',
+                     return_value=datetime(2026, 1, 27))
+        mock_deadline = mocker.patch('export_to_parquet.get_retention_deadline',
+                                     return_value=100)
+        mocker.patch('export_to_parquet.delete_old_plant_readings')
+        context = mocker.MagicMock()
+
+        handler(None, context)
+
+        mock_deadline.assert_called_once_with(context)
+
+    def test_retires_nothing_before_the_first_export(self, mocker):
+        """Nothing should be deleted until something has been exported."""
+        mocker.patch('export_to_parquet.get_retire_before', return_value=datetime(2026, 1, 28))
+        mocker.patch('export_to_parquet.export_daily_summaries', return_value=None)
+        mock_delete = mocker.patch('export_to_parquet.delete_old_plant_readings')
+
+        handler(None, None)
+
+        mock_delete.assert_not_called()
+
+    def test_runs_locally_without_aws(self, export_db, mocker, monkeypatch, tmp_path):
+        """The whole flow should run against SQLite and a local directory."""
+        monkeypatch.setenv('EXPORT_STORAGE_URL', f"file://{tmp_path / 'bucket'}")
+        monkeypatch.delenv('RAW_ARCHIVE_PATH', raising=False)
+        mocker.patch('export_to_parquet.get_retire_before', return_value=datetime(2026, 1, 28))
+        mock_session = mocker.patch('export_to_parquet.create_boto3_session')
+
+        handler(None, None)
+
+        files = sorted(str(path.relative_to(tmp_path / 'bucket'))
+                       for path in (tmp_path / 'bucket').rglob('*.parquet'))
+        daily = 'input/daily_plant_summaries/year=2026/month=01'
+        raw = 'input/raw_plant_readings/year=2026/month=01'
+        assert files == [
+            f'{daily}/day=26/plant-health-daily-summary.parquet',
+            f'{daily}/day=27/plant-health-daily-summary.parquet',
+            f'{raw}/day=26/hour=10/plant-readings.parquet',
+            f'{raw}/day=27/hour=10/plant-readings.parquet'
+        ]
+        assert (tmp_path / 'bucket' / 'output').is_dir()
+        mock_session.assert_not_called()
+        conn = sqlite3.connect(export_db)
+        assert conn.execute("SELECT recording_taken FROM plant_reading").fetchall() \
+            == [('2026-01-28 10:00:00',)]
+        conn.close()
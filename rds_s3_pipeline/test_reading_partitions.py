@@ -0,0 +1,70 @@
+"""Tests for reading_partitions module."""
+import pytest
+from datetime import datetime
+from reading_partitions import get_retire_before, retire_partitions, SPLIT_QUERY, MERGE_QUERY
+
+
+def make_connection(mocker, boundaries, retired_rows, partition_number):
+    """Mock a connection whose cursor answers the partition metadata queries."""
+    conn = mocker.MagicMock()
+    cursor = conn.cursor.return_value
+    cursor.fetchall.return_value = [(boundary,) for boundary in boundaries]
+    cursor.fetchone.side_effect = [(retired_rows,), (partition_number,)]
+    return conn, cursor
+
+
+def executed(cursor):
+    """Return (query, params) for every statement the cursor ran."""
+    return [(call.args[0], call.args[1] if len(call.args) > 1 else None)
+            for call in cursor.execute.call_args_list]
+
+
+class TestGetRetireBefore:
+    """Tests for get_retire_before function."""
+
+    @pytest.mark.parametrize('now, expected', [
+        (datetime(2026, 1, 28, 0, 30), datetime(2026, 1, 27)),
+        (datetime(2026, 1, 28, 23, 59), datetime(2026, 1, 27)),
+    ])
+    def test_retires_only_whole_days(self, now, expected):
+        """The cutoff should be the start of yesterday, whatever time the job runs."""
+        assert get_retire_before(now) == expected
+
+
+class TestRetirePartitions:
+    """Tests for retire_partitions function."""
+
+    def test_truncates_merges_and_splits_ahead(self, mocker):
+        """Should truncate old partitions, merge their boundaries and add future days."""
+        boundaries = [datetime(2026, 1, 26), datetime(2026, 1, 27), datetime(2026, 1, 28)]
+        conn, cursor = make_connection(mocker, boundaries, 1440, 3)
+
+        assert retire_partitions(conn, datetime(2026, 1, 27), days_ahead=1) == 1440
+
+        statements = executed(cursor)
+        assert ("TRUNCATE TABLE plant_reading WITH (PARTITIONS (1 TO 2))", None) in statements
+        assert (MERGE_QUERY, (datetime(2026, 1, 26),)) in statements
+        assert (SPLIT_QUERY, (datetime(2026, 1, 29),)) in statements
+        assert (SPLIT_QUERY, (datetime(2026, 1, 27),)) not in statements
+        conn.commit.assert_called_once()
+
+    def test_skips_truncate_when_empty(self, mocker):
+        """Should only add the cutoff boundary when nothing is old enough to retire."""
+        conn, cursor = make_connection(mocker, [], 0, 2)
+
+        assert retire_partitions(conn, datetime(2026, 1, 27), days_ahead=0) == 0
+
+        statements = executed(cursor)
+        assert (SPLIT_QUERY, (datetime(2026, 1, 27),)) in statements
+        assert not any(query.startswith('TRUNCATE') for query, _ in statements)
+
+    def test_rolls_back_on_error(self, mocker):
+        """Should roll back and re-raise if partition maintenance fails."""
+        conn = mocker.MagicMock()
+        conn.cursor.return_value.execute.side_effect = Exception("DB error")
+
+        with pytest.raises(Exception):
+            retire_partitions(conn, datetime(2026, 1, 27))
+
+        conn.rollback.assert_called_once()
+        conn.commit.assert_not_called()
@@ -0,0 +1,124 @@
+"""Tests for reading_stream module."""
+import sqlite3
+from datetime import datetime
+import pytest
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+from reading_stream import (MemoryCeiling, get_memory_mb, to_column_buffers,
+                            iter_reading_chunks, iter_complete_plants, write_row_groups)
+
+
+@pytest.fixture
+def readings_cursor():
+    """A cursor over seven readings of three plants, ordered by plant."""
+    conn = sqlite3.connect(':memory:')
+    conn.execute("CREATE TABLE reading (plant_id INT, temperature REAL, "
+                 "soil_moisture REAL, last_watered TEXT)")
+    conn.executemany("INSERT INTO reading VALUES (?, ?, ?, '2026-01-27 08:00:00')", [
+        (1, 20.0, 40.0), (1, 21.0, 41.0), (1, 22.0, 42.0), (2, 18.0, 50.0),
+        (3, 25.0, 30.0), (3, 26.0, 31.0), (3, 27.0, 32.0)])
+    cursor = conn.execute("SELECT * FROM reading ORDER BY plant_id")
+    yield cursor
+    conn.close()
+
+
+class TestToColumnBuffers:
+    """Tests for to_column_buffers function."""
+
+    def test_typed_columns(self):
+        """Rows should become typed arrays rather than Python objects."""
+        df = to_column_buffers([(1, 20.5, 40.0, '2026-01-27 08:00:00'),
+                                (2, 21.0, 41.0, datetime(2026, 1, 27, 9))],
+                               ['plant_id', 'temperature', 'soil_moisture', 'last_watered'])
+
+        assert str(df['plant_id'].dtype) == 'int32'
+        assert str(df['temperature'].dtype) == 'float64'
+        assert pd.api.types.is_datetime64_any_dtype(df['last_watered'])
+        assert df['last_watered'].iloc[1] == pd.Timestamp('2026-01-27 09:00:00')
+
+
+class TestIterReadingChunks:
+    """Tests for iter_reading_chunks function."""
+
+    def test_fetches_in_chunks(self, readings_cursor):
+        """Should yield chunks of at most fetch_size rows and count them."""
+        ceiling = MemoryCeiling(limit_mb=10 ** 6)
+
+        chunks = list(iter_reading_chunks(readings_cursor, fetch_size=3, ceiling=ceiling))
+
+        assert [len(chunk) for chunk in chunks] == [3, 3, 1]
+        assert ceiling.rows == 7
+
+    def test_enforces_memory_ceiling(self, readings_cursor):
+        """Should stop with a MemoryError once peak memory passes the limit."""
+        with pytest.raises(MemoryError):
+            list(iter_reading_chunks(readings_cursor, fetch_size=3,
+                                     ceiling=MemoryCeiling(limit_mb=1)))
+
+
+class TestMemoryCeiling:
+    """Tests for MemoryCeiling class."""
+
+    def test_a_new_ceiling_ignores_memory_already_freed(self):
+        """Once memory is released, a later ceiling should not trip on the earlier peak."""
+        limit_mb = get_memory_mb() + 100
+        first = MemoryCeiling(limit_mb=limit_mb)
+        held = np.ones(200 * 2 ** 20 // 8)
+        with pytest.raises(MemoryError):
+            first.check()
+        del held
+
+        second = MemoryCeiling(limit_mb=limit_mb)
+        second.check()
+
+        assert second.peak_mb < limit_mb < first.peak_mb
+
+
+class TestIterCompletePlants:
+    """Tests for iter_complete_plants function."""
+
+    def test_never_splits_a_plant(self, readings_cursor):
+        """Every plant should arrive whole, in exactly one frame, whatever the chunk size."""
+        frames = list(iter_complete_plants(iter_reading_chunks(readings_cursor, fetch_size=2)))
+
+        plants = [set(frame['plant_id']) for frame in frames]
+        assert [plant for group in plants for plant in group] == [1, 2, 3]
+        assert sum(len(frame) for frame in frames) == 7
+        assert len(frames[0]) == 3
+
+
+class TestWriteRowGroups:
+    """Tests for write_row_groups function."""
+
+    def test_row_groups_span_frames(self, tmp_path):
+        """Frames should be regrouped into row groups of row_group_rows."""
+        path = str(tmp_path / 'out.parquet')
+        schema = pa.schema([('plant_id', pa.int64()), ('name', pa.string())])
+        frames = [pd.DataFrame({'plant_id': [1, 2], 'name': ['a', None]}),
+                  pd.DataFrame({'plant_id': [3], 'name': [None]}),
+                  pd.DataFrame({'plant_id': [4, 5], 'name': ['b', 'c']})]
+
+        assert write_row_groups(iter(frames), path, schema, row_group_rows=2) == 5
+        metadata = pq.ParquetFile(path).metadata
+        assert [metadata.row_group(i).num_rows for i in range(metadata.num_row_groups)] \
+            == [2, 2, 1]
+        assert pq.read_table(path)['plant_id'].to_pylist() == [1, 2, 3, 4, 5]
+
+    def test_passes_writer_options(self, tmp_path):
+        """Writer options such as compression should reach the file."""
+        path = str(tmp_path / 'out.parquet')
+        schema = pa.schema([('plant_id', pa.int64())])
+
+        write_row_groups(iter([pd.DataFrame({'plant_id': [1]})]), path, schema,
+                         compression='zstd')
+
+        assert pq.ParquetFile(path).metadata.row_group(0).column(0).compression == 'ZSTD'
+
+    def test_no_file_without_rows(self, tmp_path):
+        """Nothing should be written when there are no rows."""
+        path = tmp_path / 'out.parquet'
+
+        assert write_row_groups(iter([]), str(path), pa.schema([('a', pa.int64())])) == 0
+        assert not path.exists()
@@ -0,0 +1,73 @@
+"""Tests for storage module."""
+import pytest
+from storage import get_scheme, upload, move, list_files, delete, make_folder
+
+
+class TestGetScheme:
+    """Tests for get_scheme function."""
+
+    def test_picks_backend_by_scheme(self):
+        """S3 URLs, file URLs and plain paths should each map to a backend."""
+        assert get_scheme('s3://bucket/input') == 's3'
+        assert get_scheme('file:///tmp/export') == 'file'
+        assert get_scheme('/tmp/export') == 'file'
+
+    def test_rejects_unknown_scheme(self):
+        """Should fail loudly for storage it cannot write to."""
+        with pytest.raises(ValueError):
+            get_scheme('gs://bucket/input')
+
+
+class TestLocalStorage:
+    """Tests for the local filesystem backend."""
+
+    def test_upload_move_list_delete(self, tmp_path):
+        """Files should be staged, moved in, listed recursively and deleted."""
+        (tmp_path / 'local.parquet').write_text('new')
+        root = f"file://{tmp_path / 'bucket'}"
+
+        upload(str(tmp_path / 'local.parquet'), f"{root}/_staging/file.parquet")
+        move(f"{root}/_staging/file.parquet", f"{root}/day=27/hour=10/file.parquet")
+
+        assert list_files(f"{root}/day=27/") == [f"{root}/day=27/hour=10/file.parquet"]
+        assert list_files(f"{root}/_staging/") == []
+        assert (tmp_path / 'bucket' / 'day=27' / 'hour=10' / 'file.parquet').read_text() == 'new'
+
+        delete(list_files(f"{root}/day=27/"))
+        assert list_files(f"{root}/day=27/") == []
+
+    def test_missing_prefix_lists_nothing(self, tmp_path):
+        """A partition that has never been written holds no files."""
+        assert list_files(str(tmp_path / 'missing')) == []
+
+    def test_make_folder(self, tmp_path):
+        """Local folders should be created rather than marked with a placeholder."""
+        make_folder(str(tmp_path / 'output') + '/')
+
+        assert (tmp_path / 'output').is_dir()
+        assert not list((tmp_path / 'output').iterdir())
+
+
+class TestS3Storage:
+    """Tests for the S3 backend."""
+
+    def test_move_copies_then_removes_the_source(self, mocker):
+        """The copy should keep the target's name and the source should be deleted."""
+        mock_wr = mocker.patch('storage.wr')
+
+        move('s3://bucket/_staging/a.parquet', 's3://bucket/day=27/b.parquet', 'session')
+
+        mock_wr.s3.copy_objects.assert_called_once_with(
+            paths=['s3://bucket/_staging/a.parquet'], source_path='s3://bucket/_staging/',
+            target_path='s3://bucket/day=27/', replace_filenames={'a.parquet': 'b.parquet'},
+            boto3_session='session')
+        mock_wr.s3.delete_objects.assert_called_once_with(
+            path=['s3://bucket/_staging/a.parquet'], boto3_session='session')
+
+    def test_delete_nothing_makes_no_call(self, mocker):
+        """An empty delete should not reach S3."""
+        mock_wr = mocker.patch('storage.wr')
+
+        delete([])
+
+        mock_wr.s3.delete_objects.assert_not_called()
@@ -1,52 +1,179 @@
-import os
-import pymssql
+"""Create the schema, seed the reference tables and build the indexes.
+
+Usage (from the `schema/` directory):
+
+    python load_schema_and_data.py                        # seed from the CSV files
+    python load_schema_and_data.py --synthetic-plants 30000
+
+Each CSV is streamed and bulk inserted in multi-row batches inside one
+transaction per table, with IDENTITY_INSERT switched on once per table. The
+migrations, which hold the secondary and unique indexes, run after the data is
+in, so the indexes are built once rather than maintained row by row. Works
+against SQL Server and, with DB_BACKEND=sqlite, the embedded SQLite backend.
+"""
+import argparse
 import csv
+import sys
+from pathlib import Path
+from time import perf_counter
 from dotenv import load_dotenv
 
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "pipeline"))
+
+from db_backend import (create_schema, get_connection, get_dialect,  # pylint: disable=wrong-import-position
+                        get_max_rows_per_insert, stage_rows, transaction)
+from migrate import migrate  # pylint: disable=wrong-import-position
+
 load_dotenv()
 
+SEED_DIR = Path(__file__).resolve().parent
+
+class SeedTable:
+    """A table to seed, its columns and, for CSV seeds, the file columns they come from."""
+
+    def __init__(self, name: str, columns: list[str], identity: bool = False,
+                 filename: str = None, csv_columns: list[str] = None):
+        self.name = name
+        self.columns = columns
+        self.identity = identity
+        self.filename = filename
+        self.csv_columns = csv_columns or columns
+
+    @property
+    def max_rows_per_insert(self) -> int:
+        """The most rows one multi-row INSERT can carry."""
+        return get_max_rows_per_insert(len(self.columns))
+
+
+# In foreign key order; identity tables keep the IDs other files refer to
+SEED_TABLES = [
+    SeedTable("country", ["country_id", "country_name"], identity=True,
+              filename="countries.csv", csv_columns=["country_id", "origin_country"]),
+    SeedTable("city", ["city_id", "city_name", "country_id"], identity=True,
+              filename="cities.csv", csv_columns=["city_id", "origin_city", "country_id"]),
+    SeedTable("botanist", ["email", "name", "phone"],
+              filename="seed_botanists.csv",
+              csv_columns=["botanist_email", "botanist_name", "botanist_phone"])
+]
+
+# The synthetic catalogue fills every dimension down to plant, with explicit IDs
+SYNTHETIC_TABLES = [
+    SeedTable("country", ["country_id", "country_name"], identity=True),
+    SeedTable("city", ["city_id", "city_name", "country_id"], identity=True),
+    SeedTable("origin", ["origin_id", "city_id", "lat", "long"], identity=True),
+    SeedTable("botanist", ["botanist_id", "email", "name", "phone"], identity=True),
+    SeedTable("plant", ["plant_id", "name", "scientific_name", "origin_id", "botanist_id"])
+]
+
+# Plants per parent row in the synthetic catalogue; plant_id is a SMALLINT
+PLANTS_PER_COUNTRY = 250
+PLANTS_PER_CITY = 5
+PLANTS_PER_BOTANIST = 20
+MAX_SYNTHETIC_PLANTS = 32767
+
+
+def read_csv_rows(path: Path, csv_columns: list[str]):
+    """Yield one tuple per CSV row, holding the given columns in order."""
+    with open(path, newline="", encoding="utf-8") as f:
+        for row in csv.DictReader(f):
+            yield tuple(row[column] for column in csv_columns)
+
+
+def make_synthetic_rows(n_plants: int) -> dict:
+    """Return table name -> row generator for a catalogue of n_plants plants.
+
+    Every name, email and coordinate pair is unique, so the unique indexes
+    build cleanly afterwards.
+    """
+    if not 0 < n_plants <= MAX_SYNTHETIC_PLANTS:
+        raise ValueError(f"A synthetic catalogue holds 1 to {MAX_SYNTHETIC_PLANTS} plants.")
+    n_countries = -(-n_plants // PLANTS_PER_COUNTRY)
+    n_cities = -(-n_plants // PLANTS_PER_CITY)
+    n_botanists = -(-n_plants // PLANTS_PER_BOTANIST)
+    return {
+        "country": ((i, f"Country {i}") for i in range(1, n_countries + 1)),
+        "city": ((i, f"City {i}", (i - 1) % n_countries + 1)
+                 for i in range(1, n_cities + 1)),
+        "origin": ((i, (i - 1) % n_cities + 1, round(-60 + i / 1000, 3),
+                    round(i * 0.137 % 360 - 180, 3))
+                   for i in range(1, n_plants + 1)),
+        "botanist": ((i, f"botanist.{i}@lnhm.co.uk", f"Botanist {i}", f"+44-{i:07d}")
+                     for i in range(1, n_botanists + 1)),
+        "plant": ((i, f"Plant {i}", f"Plantae synthetica {i}", i, (i - 1) % n_botanists + 1)
+                  for i in range(1, n_plants + 1))
+    }
+
+
+def seed_table(conn, table: SeedTable, rows, batch_size: int = None) -> int:
+    """Bulk insert rows into one table in a single transaction and return the count."""
+    set_identity_insert = table.identity and get_dialect(conn) == "mssql"
+    with transaction(conn), conn.cursor() as cursor:
+        if set_identity_insert:
+            cursor.execute(f"SET IDENTITY_INSERT {table.name} ON")
+        n_rows = stage_rows(cursor, table.name, table.columns, rows, batch_size)
+        if set_identity_insert:
+            cursor.execute(f"SET IDENTITY_INSERT {table.name} OFF")
+    return n_rows
+
+
+def report_timing(name: str, n_rows: int, seconds: float) -> None:
+    """Print the rows written for one step and the rows per second."""
+    rate = n_rows / seconds if seconds > 0 else float("inf")
+    print(f"  {name}: {n_rows} rows in {seconds:.3f}s ({rate:.0f} rows/sec)")
+
+
+def load_schema_and_data(conn, synthetic_plants: int = None, batch_size: int = None,
+                         seed_dir: Path = SEED_DIR) -> dict:
+    """Create the schema, seed every table, then build the indexes.
+
+    Seeds the CSV files, or a synthetic catalogue of `synthetic_plants` plants.
+    Returns step name -> (rows, seconds).
+    """
+    timings = {}
+
+    start = perf_counter()
+    create_schema(conn)
+    timings["schema"] = (0, perf_counter() - start)
+
+    if synthetic_plants:
+        synthetic_rows = make_synthetic_rows(synthetic_plants)
+        seeds = [(table, synthetic_rows[table.name]) for table in SYNTHETIC_TABLES]
+    else:
+        seeds = [(table, read_csv_rows(Path(seed_dir) / table.filename, table.csv_columns))
+                 for table in SEED_TABLES]
+
+    for table, rows in seeds:
+        start = perf_counter()
+        n_rows = seed_table(conn, table, rows, batch_size)
+        timings[table.name] = (n_rows, perf_counter() - start)
+        report_timing(table.name, *timings[table.name])
+
+    start = perf_counter()
+    applied = migrate(conn)
+    timings["indexes"] = (len(applied), perf_counter() - start)
+    print(f"  indexes: {len(applied)} migrations in {timings['indexes'][1]:.3f}s")
+    return timings
+
+
+def parse_args(argv: list[str] = None) -> argparse.Namespace:
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--synthetic-plants", type=int, default=None)
+    parser.add_argument("--batch-size", type=int, default=None)
+    return parser.parse_args(argv)
+
 
-def get_connection():
-    return pymssql.connect(server=os.getenv('DB_HOST'), port=int(os.getenv('DB_PORT', 1433)),
-                           user=os.getenv('DB_USER'), password=os.getenv('DB_PASSWORD'),
-                           database=os.getenv('DB_NAME'))
+def main(argv: list[str] = None) -> None:
+    """Seed the configured database from the command line."""
+    args = parse_args(argv)
+    conn = get_connection(query_timeout=0)
+    try:
+        timings = load_schema_and_data(conn, args.synthetic_plants, args.batch_size)
+    finally:
+        conn.close()
+    print(f"Schema and data loaded successfully in "
+          f"{sum(seconds for _, seconds in timings.values()):.3f}s.")
 
 
 if __name__ == "__main__":
-    conn = get_connection()
-    with conn.cursor() as cursor:
-        with open('schema.sql') as f:
-            for stmt in f.read().split(';'):
-                if stmt.strip():
-                    cursor.execute(stmt)
-                    conn.commit()
-
-    with conn.cursor() as cursor:
-        with open('seed_botanists.csv') as f:
-            for row in csv.DictReader(f):
-                cursor.execute("INSERT INTO botanist (email, name, phone) VALUES (%s, %s, %s)",
-                               (row['botanist_email'], row['botanist_name'], row['botanist_phone']))
-                conn.commit()
-
-    with conn.cursor() as cursor:
-        cursor.execute("SET IDENTITY_INSERT country ON")
-        with open('countries.csv') as f:
-            for row in csv.DictReader(f):
-                cursor.execute("INSERT INTO country (country_name, country_id) VALUES (%s, %s)",
-                               (row['origin_country'], row['country_id']))
-                conn.commit()
-        cursor.execute("SET IDENTITY_INSERT country OFF")
-        conn.commit()
-
-    with conn.cursor() as cursor:
-        cursor.execute("SET IDENTITY_INSERT city ON")
-        with open('cities.csv') as f:
-            for row in csv.DictReader(f):
-                cursor.execute("INSERT INTO city (city_name, city_id, country_id) VALUES (%s, %s, %s)",
-                               (row['origin_city'], row['city_id'], row['country_id']))
-                conn.commit()
-        cursor.execute("SET IDENTITY_INSERT city OFF")
-        conn.commit()
-
-    conn.close()
-    print("Schema and data loaded successfully.")
+    main()
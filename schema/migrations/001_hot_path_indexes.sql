@@ -0,0 +1,21 @@
+-- Indexes for the hot query paths; schema.sql only defines primary keys.
+-- Creating a unique index fails (and the migration rolls back) if the table
+-- already holds duplicates; the loaders treat the lowest ID as canonical, so
+-- repoint references to it and delete the others before migrating.
+
+-- Natural keys the loaders look up and upsert on
+CREATE UNIQUE INDEX uq_country_name ON country (country_name);
+CREATE UNIQUE INDEX uq_city_name_country ON city (city_name, country_id);
+CREATE UNIQUE INDEX uq_origin_coordinates ON origin (lat, long);
+CREATE UNIQUE INDEX uq_botanist_email ON botanist (email);
+
+-- Per-plant history and latest-reading lookups (dashboard, notifications,
+-- spool de-duplication)
+CREATE NONCLUSTERED INDEX ix_plant_reading_plant_recording
+    ON plant_reading (plant_id, recording_taken)
+    INCLUDE (soil_moisture, temperature, last_watered);
+
+-- Time-window scans (live dashboard, daily export, retention delete)
+CREATE NONCLUSTERED INDEX ix_plant_reading_recording_taken
+    ON plant_reading (recording_taken)
+    INCLUDE (plant_id, soil_moisture, temperature, last_watered);
@@ -0,0 +1,36 @@
+-- Partition plant_reading by day so retention truncates whole days instead
+-- of deleting row by row. The table starts as a single partition; the daily
+-- export (rds_s3_pipeline/reading_partitions.py) splits day boundaries ahead
+-- of the data, truncates the days it retires and merges their boundaries away.
+-- Both survive schema.sql dropping the table, so re-migrating reuses them
+IF NOT EXISTS (SELECT 1 FROM sys.partition_functions WHERE name = 'pf_plant_reading_day')
+    CREATE PARTITION FUNCTION pf_plant_reading_day (DATETIME)
+        AS RANGE RIGHT FOR VALUES ();
+
+IF NOT EXISTS (SELECT 1 FROM sys.partition_schemes WHERE name = 'ps_plant_reading_day')
+    CREATE PARTITION SCHEME ps_plant_reading_day
+        AS PARTITION pf_plant_reading_day ALL TO ([PRIMARY]);
+
+-- The partitioning column must be part of the clustered key
+DECLARE @primary_key SYSNAME = (
+    SELECT name FROM sys.key_constraints
+    WHERE parent_object_id = OBJECT_ID('plant_reading') AND type = 'PK');
+EXEC('ALTER TABLE plant_reading DROP CONSTRAINT ' + @primary_key);
+
+ALTER TABLE plant_reading
+    ADD CONSTRAINT pk_plant_reading
+    PRIMARY KEY CLUSTERED (recording_taken, plant_reading_id)
+    ON ps_plant_reading_day (recording_taken);
+
+-- Partition truncation needs every index aligned with the table
+CREATE NONCLUSTERED INDEX ix_plant_reading_plant_recording
+    ON plant_reading (plant_id, recording_taken)
+    INCLUDE (soil_moisture, temperature, last_watered)
+    WITH (DROP_EXISTING = ON)
+    ON ps_plant_reading_day (recording_taken);
+
+CREATE NONCLUSTERED INDEX ix_plant_reading_recording_taken
+    ON plant_reading (recording_taken)
+    INCLUDE (plant_id, soil_moisture, temperature, last_watered)
+    WITH (DROP_EXISTING = ON)
+    ON ps_plant_reading_day (recording_taken);
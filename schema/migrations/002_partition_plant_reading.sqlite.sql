@@ -0,0 +1,3 @@
+-- SQLite has no table partitioning. Retention falls back to a range delete
+-- on ix_plant_reading_recording_taken, so there is nothing to change.
+SELECT 1;
@@ -0,0 +1,27 @@
+-- One row per plant holding its most recent reading, upserted by every
+-- pipeline load, so "current state" queries read O(plants) rows instead of
+-- grouping the whole of plant_reading.
+CREATE TABLE plant_latest_reading (
+    plant_id SMALLINT NOT NULL PRIMARY KEY,
+    soil_moisture FLOAT NOT NULL,
+    temperature FLOAT NOT NULL,
+    recording_taken DATETIME NOT NULL,
+    last_watered DATETIME NOT NULL,
+    -- Hours between the last watering and recording_taken
+    hours_since_watered FLOAT NOT NULL
+);
+
+ALTER TABLE plant_latest_reading
+    ADD CONSTRAINT FK_plant_latest_reading_plant_id FOREIGN KEY (plant_id) REFERENCES plant(plant_id);
+
+-- Seed from the readings already stored
+INSERT INTO plant_latest_reading (plant_id, soil_moisture, temperature,
+                                  recording_taken, last_watered, hours_since_watered)
+SELECT plant_id, soil_moisture, temperature, recording_taken, last_watered,
+       DATEDIFF(second, last_watered, recording_taken) / 3600.0
+FROM (
+    SELECT *, ROW_NUMBER() OVER (
+        PARTITION BY plant_id ORDER BY recording_taken DESC, plant_reading_id DESC) AS newest
+    FROM plant_reading
+) AS ranked
+WHERE newest = 1;
@@ -0,0 +1,21 @@
+-- SQLite version of 003_plant_latest_reading.sql: julianday() in place of
+-- DATEDIFF, and no foreign key (SQLite cannot add one to an existing table).
+CREATE TABLE plant_latest_reading (
+    plant_id SMALLINT NOT NULL PRIMARY KEY,
+    soil_moisture FLOAT NOT NULL,
+    temperature FLOAT NOT NULL,
+    recording_taken DATETIME NOT NULL,
+    last_watered DATETIME NOT NULL,
+    hours_since_watered FLOAT NOT NULL
+);
+
+INSERT INTO plant_latest_reading (plant_id, soil_moisture, temperature,
+                                  recording_taken, last_watered, hours_since_watered)
+SELECT plant_id, soil_moisture, temperature, recording_taken, last_watered,
+       (julianday(recording_taken) - julianday(last_watered)) * 24
+FROM (
+    SELECT *, ROW_NUMBER() OVER (
+        PARTITION BY plant_id ORDER BY recording_taken DESC, plant_reading_id DESC) AS newest
+    FROM plant_reading
+) AS ranked
+WHERE newest = 1;
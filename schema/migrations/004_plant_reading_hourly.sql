@@ -0,0 +1,43 @@
+-- Hourly per-plant rollups of plant_reading. Every load merges the readings
+-- it inserted into their hours: counts and sums add up and minimums/maximums
+-- widen, so a partly loaded hour combines correctly with the rest of it later.
+-- Averages are sum / count, and variance is
+-- sum_squares / count - (sum / count)^2. first_watered and last_watered are
+-- the earliest and latest last_watered values seen in the hour.
+CREATE TABLE plant_reading_hourly (
+    plant_id SMALLINT NOT NULL,
+    reading_hour DATETIME NOT NULL,
+    reading_count INT NOT NULL,
+    min_temperature FLOAT NOT NULL,
+    max_temperature FLOAT NOT NULL,
+    sum_temperature FLOAT NOT NULL,
+    sum_squares_temperature FLOAT NOT NULL,
+    min_soil_moisture FLOAT NOT NULL,
+    max_soil_moisture FLOAT NOT NULL,
+    sum_soil_moisture FLOAT NOT NULL,
+    sum_squares_soil_moisture FLOAT NOT NULL,
+    first_watered DATETIME NOT NULL,
+    last_watered DATETIME NOT NULL,
+    CONSTRAINT pk_plant_reading_hourly PRIMARY KEY (plant_id, reading_hour)
+);
+
+ALTER TABLE plant_reading_hourly
+    ADD CONSTRAINT FK_plant_reading_hourly_plant_id FOREIGN KEY (plant_id) REFERENCES plant(plant_id);
+
+-- Seed from the readings already stored
+INSERT INTO plant_reading_hourly (plant_id, reading_hour, reading_count,
+                                  min_temperature, max_temperature,
+                                  sum_temperature, sum_squares_temperature,
+                                  min_soil_moisture, max_soil_moisture,
+                                  sum_soil_moisture, sum_squares_soil_moisture,
+                                  first_watered, last_watered)
+SELECT plant_id,
+       DATEADD(hour, DATEDIFF(hour, 0, recording_taken), 0) AS reading_hour,
+       COUNT(*),
+       MIN(temperature), MAX(temperature),
+       SUM(temperature), SUM(temperature * temperature),
+       MIN(soil_moisture), MAX(soil_moisture),
+       SUM(soil_moisture), SUM(soil_moisture * soil_moisture),
+       MIN(last_watered), MAX(last_watered)
+FROM plant_reading
+GROUP BY plant_id, DATEADD(hour, DATEDIFF(hour, 0, recording_taken), 0);
@@ -0,0 +1,35 @@
+-- SQLite version of 004_plant_reading_hourly.sql: strftime() truncates to
+-- the hour, and there is no foreign key (SQLite cannot add one later).
+CREATE TABLE plant_reading_hourly (
+    plant_id SMALLINT NOT NULL,
+    reading_hour DATETIME NOT NULL,
+    reading_count INT NOT NULL,
+    min_temperature FLOAT NOT NULL,
+    max_temperature FLOAT NOT NULL,
+    sum_temperature FLOAT NOT NULL,
+    sum_squares_temperature FLOAT NOT NULL,
+    min_soil_moisture FLOAT NOT NULL,
+    max_soil_moisture FLOAT NOT NULL,
+    sum_soil_moisture FLOAT NOT NULL,
+    sum_squares_soil_moisture FLOAT NOT NULL,
+    first_watered DATETIME NOT NULL,
+    last_watered DATETIME NOT NULL,
+    CONSTRAINT pk_plant_reading_hourly PRIMARY KEY (plant_id, reading_hour)
+);
+
+INSERT INTO plant_reading_hourly (plant_id, reading_hour, reading_count,
+                                  min_temperature, max_temperature,
+                                  sum_temperature, sum_squares_temperature,
+                                  min_soil_moisture, max_soil_moisture,
+                                  sum_soil_moisture, sum_squares_soil_moisture,
+                                  first_watered, last_watered)
+SELECT plant_id,
+       strftime('%Y-%m-%d %H:00:00', recording_taken) AS reading_hour,
+       COUNT(*),
+       MIN(temperature), MAX(temperature),
+       SUM(temperature), SUM(temperature * temperature),
+       MIN(soil_moisture), MAX(soil_moisture),
+       SUM(soil_moisture), SUM(soil_moisture * soil_moisture),
+       MIN(last_watered), MAX(last_watered)
+FROM plant_reading
+GROUP BY plant_id, strftime('%Y-%m-%d %H:00:00', recording_taken);
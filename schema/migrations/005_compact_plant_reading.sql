@@ -0,0 +1,87 @@
+-- Compact plant_reading: REAL readings, second-precision DATETIME2(0)
+-- timestamps and page compression. last_watered repeats for every minute
+-- between waterings, so it moves out into plant_watering, one row per
+-- watering event. A reading's last watering is the latest event at or
+-- before it was taken.
+--
+-- recording_taken is the partitioning column, so the day partitions move to
+-- a DATETIME2(0) partition function that keeps migration 002's boundaries.
+IF NOT EXISTS (SELECT 1 FROM sys.partition_functions WHERE name = 'pf_plant_reading_day_s')
+    CREATE PARTITION FUNCTION pf_plant_reading_day_s (DATETIME2(0))
+        AS RANGE RIGHT FOR VALUES ();
+
+IF NOT EXISTS (SELECT 1 FROM sys.partition_schemes WHERE name = 'ps_plant_reading_day_s')
+    CREATE PARTITION SCHEME ps_plant_reading_day_s
+        AS PARTITION pf_plant_reading_day_s ALL TO ([PRIMARY]);
+
+CREATE TABLE plant_watering (
+    plant_id SMALLINT NOT NULL,
+    watered_at DATETIME2(0) NOT NULL,
+    CONSTRAINT pk_plant_watering PRIMARY KEY CLUSTERED (plant_id, watered_at)
+        WITH (DATA_COMPRESSION = PAGE)
+);
+
+ALTER TABLE plant_watering
+    ADD CONSTRAINT FK_plant_watering_plant_id FOREIGN KEY (plant_id) REFERENCES plant(plant_id);
+
+INSERT INTO plant_watering (plant_id, watered_at)
+SELECT DISTINCT plant_id, CAST(last_watered AS DATETIME2(0))
+FROM plant_reading;
+
+-- Column types cannot change while the table is partitioned on them, so it
+-- is moved to a heap on PRIMARY, altered, then re-clustered on the new scheme
+DROP INDEX ix_plant_reading_plant_recording ON plant_reading;
+DROP INDEX ix_plant_reading_recording_taken ON plant_reading;
+ALTER TABLE plant_reading DROP CONSTRAINT pk_plant_reading WITH (MOVE TO [PRIMARY]);
+
+ALTER TABLE plant_reading DROP COLUMN last_watered;
+ALTER TABLE plant_reading ALTER COLUMN soil_moisture REAL NOT NULL;
+ALTER TABLE plant_reading ALTER COLUMN temperature REAL NOT NULL;
+ALTER TABLE plant_reading ALTER COLUMN recording_taken DATETIME2(0) NOT NULL;
+
+-- Split the new function at every old boundary while the table is a heap
+-- on PRIMARY, so no split moves rows
+DECLARE @boundary DATETIME2(0);
+DECLARE boundaries CURSOR LOCAL FAST_FORWARD FOR
+    SELECT CAST(prv.value AS DATETIME2(0))
+    FROM sys.partition_range_values prv
+    INNER JOIN sys.partition_functions pf ON pf.function_id = prv.function_id
+    WHERE pf.name = 'pf_plant_reading_day'
+      AND CAST(prv.value AS DATETIME2(0)) NOT IN (
+          SELECT CAST(new_prv.value AS DATETIME2(0))
+          FROM sys.partition_range_values new_prv
+          INNER JOIN sys.partition_functions new_pf ON new_pf.function_id = new_prv.function_id
+          WHERE new_pf.name = 'pf_plant_reading_day_s')
+    ORDER BY prv.boundary_id;
+OPEN boundaries;
+FETCH NEXT FROM boundaries INTO @boundary;
+WHILE @@FETCH_STATUS = 0
+BEGIN
+    ALTER PARTITION SCHEME ps_plant_reading_day_s NEXT USED [PRIMARY];
+    ALTER PARTITION FUNCTION pf_plant_reading_day_s() SPLIT RANGE (@boundary);
+    FETCH NEXT FROM boundaries INTO @boundary;
+END;
+CLOSE boundaries;
+DEALLOCATE boundaries;
+
+ALTER TABLE plant_reading
+    ADD CONSTRAINT pk_plant_reading
+    PRIMARY KEY CLUSTERED (recording_taken, plant_reading_id)
+    WITH (DATA_COMPRESSION = PAGE)
+    ON ps_plant_reading_day_s (recording_taken);
+
+CREATE NONCLUSTERED INDEX ix_plant_reading_plant_recording
+    ON plant_reading (plant_id, recording_taken)
+    INCLUDE (soil_moisture, temperature)
+    WITH (DATA_COMPRESSION = PAGE)
+    ON ps_plant_reading_day_s (recording_taken);
+
+CREATE NONCLUSTERED INDEX ix_plant_reading_recording_taken
+    ON plant_reading (recording_taken)
+    INCLUDE (plant_id, soil_moisture, temperature)
+    WITH (DATA_COMPRESSION = PAGE)
+    ON ps_plant_reading_day_s (recording_taken);
+
+-- Nothing uses migration 002's function and scheme any more
+DROP PARTITION SCHEME ps_plant_reading_day;
+DROP PARTITION FUNCTION pf_plant_reading_day;
@@ -0,0 +1,23 @@
+-- SQLite stores every REAL in eight bytes and has no page compression, so
+-- only the normalisation applies: last_watered moves out of plant_reading
+-- into plant_watering, one row per watering event.
+CREATE TABLE plant_watering (
+    plant_id SMALLINT NOT NULL,
+    watered_at DATETIME NOT NULL,
+    PRIMARY KEY (plant_id, watered_at)
+) WITHOUT ROWID;
+
+INSERT INTO plant_watering (plant_id, watered_at)
+SELECT DISTINCT plant_id, strftime('%Y-%m-%d %H:%M:%S', last_watered)
+FROM plant_reading;
+
+-- A column cannot be dropped while an index refers to it
+DROP INDEX ix_plant_reading_plant_recording;
+DROP INDEX ix_plant_reading_recording_taken;
+ALTER TABLE plant_reading DROP COLUMN last_watered;
+
+CREATE INDEX ix_plant_reading_plant_recording
+    ON plant_reading (plant_id, recording_taken, soil_moisture, temperature);
+
+CREATE INDEX ix_plant_reading_recording_taken
+    ON plant_reading (recording_taken, plant_id, soil_moisture, temperature);
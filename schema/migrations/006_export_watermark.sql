@@ -0,0 +1,8 @@
+-- Progress of the incremental exports in rds_s3_pipeline/export_to_parquet.py.
+-- exported_through is the last whole day an export has written; the next run
+-- starts the day after, and retention never retires readings past it.
+CREATE TABLE export_watermark (
+    export_name VARCHAR(100) NOT NULL PRIMARY KEY,
+    exported_through DATE NOT NULL,
+    updated_at DATETIME NOT NULL
+);
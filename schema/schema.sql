@@ -1,4 +1,9 @@
 -- Now drop tables in correct order
+IF OBJECT_ID('schema_migrations', 'U') IS NOT NULL DROP TABLE schema_migrations;
+IF OBJECT_ID('export_watermark', 'U') IS NOT NULL DROP TABLE export_watermark;
+IF OBJECT_ID('plant_latest_reading', 'U') IS NOT NULL DROP TABLE plant_latest_reading;
+IF OBJECT_ID('plant_reading_hourly', 'U') IS NOT NULL DROP TABLE plant_reading_hourly;
+IF OBJECT_ID('plant_watering', 'U') IS NOT NULL DROP TABLE plant_watering;
 IF OBJECT_ID('plant_reading', 'U') IS NOT NULL DROP TABLE plant_reading;
 IF OBJECT_ID('plant', 'U') IS NOT NULL DROP TABLE plant;
 IF OBJECT_ID('origin', 'U') IS NOT NULL DROP TABLE origin;
@@ -28,6 +33,9 @@ CREATE TABLE origin (
     lat FLOAT NOT NULL,
     long FLOAT NOT NULL
 );
+-- The layout before schema/migrations. The pipeline writes the layout of
+-- migrations 001-006, where last_watered moves to plant_watering (005), and
+-- refuses to load until they are applied
 CREATE TABLE plant_reading (
     plant_reading_id BIGINT IDENTITY(1,1) NOT NULL PRIMARY KEY,
     plant_id SMALLINT NOT NULL,
@@ -0,0 +1,103 @@
+"""Tests for the load_schema_and_data module."""
+import contextlib
+import io
+import pytest
+from load_schema_and_data import (
+    SeedTable, seed_table, load_schema_and_data, make_synthetic_rows, MAX_SYNTHETIC_PLANTS)
+from db_backend import connect_sqlite  # pylint: disable=wrong-import-order
+
+
+@pytest.fixture
+def conn(tmp_path):
+    """An open connection to an empty embedded database."""
+    conn = connect_sqlite(str(tmp_path / "plants.db"))
+    yield conn
+    conn.close()
+
+
+@pytest.fixture
+def seed_dir(tmp_path):
+    """A directory holding the three seed CSV files."""
+    (tmp_path / "countries.csv").write_text(
+        "country_id,origin_country\n3,Suriname\n7,Brazil\n")
+    (tmp_path / "cities.csv").write_text(
+        "city_id,origin_city,country_id\n10,Mitchellfurt,3\n11,Recife,7\n")
+    (tmp_path / "seed_botanists.csv").write_text(
+        "botanist_email,botanist_name,botanist_phone\n"
+        "sherry.campbell@lnhm.co.uk,Sherry Campbell,+1-662-659-8097\n")
+    return tmp_path
+
+
+def fetch_all(conn, query: str) -> list[tuple]:
+    """Run a query and return every row."""
+    with conn.cursor() as cursor:
+        cursor.execute(query)
+        rows = cursor.fetchall()
+    conn.commit()
+    return rows
+
+
+class TestSeedTable:
+    """Tests for the seed_table function."""
+
+    def test_batches_and_sets_identity_insert_once(self, mocker):
+        """SQL Server should get one IDENTITY_INSERT pair around full batches."""
+        mocker.patch("load_schema_and_data.get_dialect", return_value="mssql")
+        conn = mocker.MagicMock()
+        cursor = conn.cursor.return_value.__enter__.return_value
+        table = SeedTable("country", ["country_id", "country_name"], identity=True)
+
+        n_rows = seed_table(conn, table, ((i, f"Country {i}") for i in range(5)), batch_size=2)
+
+        queries = [call.args[0] for call in cursor.execute.call_args_list]
+        assert n_rows == 5
+        assert queries[0] == "SET IDENTITY_INSERT country ON"
+        assert queries[-1] == "SET IDENTITY_INSERT country OFF"
+        assert len(queries) == 2 + 3
+        conn.commit.assert_called_once()
+
+    def test_rolls_back_on_error(self, mocker):
+        """A failed batch should roll back the whole table."""
+        mocker.patch("load_schema_and_data.get_dialect", return_value="mssql")
+        conn = mocker.MagicMock()
+        conn.cursor.return_value.__enter__.return_value.execute.side_effect = [
+            None, Exception("DB error")]
+        table = SeedTable("country", ["country_id", "country_name"], identity=True)
+
+        with pytest.raises(Exception):
+            seed_table(conn, table, [(1, "Suriname")])
+
+        conn.rollback.assert_called_once()
+        conn.commit.assert_not_called()
+
+
+class TestLoadSchemaAndData:
+    """Tests for the load_schema_and_data function."""
+
+    def test_seeds_csv_files_with_their_ids(self, conn, seed_dir):
+        """Countries and cities should keep the IDs the files give them."""
+        with contextlib.redirect_stdout(io.StringIO()):
+            timings = load_schema_and_data(conn, seed_dir=seed_dir)
+
+        assert fetch_all(conn, "SELECT country_id, country_name FROM country "
+                               "ORDER BY country_id") == [(3, "Suriname"), (7, "Brazil")]
+        assert fetch_all(conn, "SELECT city_id, country_id FROM city "
+                               "ORDER BY city_id") == [(10, 3), (11, 7)]
+        assert timings["botanist"][0] == 1
+        assert timings["indexes"][0] > 0
+
+    def test_seeds_synthetic_catalogue(self, conn):
+        """A synthetic catalogue should satisfy the unique indexes built after it."""
+        with contextlib.redirect_stdout(io.StringIO()):
+            timings = load_schema_and_data(conn, synthetic_plants=600)
+
+        assert timings["plant"][0] == 600
+        assert timings["country"][0] == 3
+        assert fetch_all(conn, "SELECT COUNT(*) FROM plant p "
+                               "JOIN origin o ON p.origin_id = o.origin_id "
+                               "JOIN botanist b ON p.botanist_id = b.botanist_id") == [(600,)]
+
+    def test_rejects_oversized_catalogue(self):
+        """plant_id is a SMALLINT, so larger catalogues should be refused."""
+        with pytest.raises(ValueError):
+            make_synthetic_rows(MAX_SYNTHETIC_PLANTS + 1)